@@ -0,0 +1,236 @@
+"""
+相位計算引擎 (Vectorized Aspect Engine)
+======================================
+
+以 NumPy 一次建立整個角距矩陣並套用所有相位容許度：
+1. 單一星盤：N 顆行星的角距矩陣（只取上三角，即每對行星一次）
+2. 合盤（synastry）：兩張星盤之間的 N×M 角距矩陣
+3. 批次：以上兩種皆可加上前置的星盤維度 (C, N)
+
+結果為結構化陣列（ASPECT_DTYPE），依星盤、相位強度由強到弱排序，
+強度相同時保持（行星1、行星2、相位定義）的產生順序，
+與 AstrologyCalculator 原本逐一檢查再穩定排序的結果完全一致。
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .chart_models import ASPECT_BY_INDEX, Aspect, Planet
+
+# 相位定義：名稱 → (角度, 容許度)，順序即檢查順序
+ASPECT_DEFINITIONS: Dict[str, Tuple[float, float]] = {
+    "合相": (0, 8),
+    "六分相": (60, 6),
+    "四分相": (90, 8),
+    "三分相": (120, 8),
+    "對分相": (180, 8)
+}
+
+# 相位記錄欄位：星盤序號、行星索引、相位索引（ASPECT_DEFINITIONS 的順序）、
+# 角距、與精確相位的差距、是否入相位、強度 (0-1)
+ASPECT_DTYPE = np.dtype([
+    ("chart", np.int64),
+    ("planet1", np.int64),
+    ("planet2", np.int64),
+    ("aspect", np.int64),
+    ("angle", np.float64),
+    ("orb", np.float64),
+    ("applying", np.bool_),
+    ("strength", np.float64),
+])
+
+
+def angular_separation(longitudes1: np.ndarray, longitudes2: np.ndarray) -> np.ndarray:
+    """
+    計算兩組黃經之間的角距矩陣（0–180 度）
+
+    Args:
+        longitudes1: 黃經 (..., N)
+        longitudes2: 黃經 (..., M)
+
+    Returns:
+        角距 (..., N, M)
+    """
+    angle = np.abs(longitudes1[..., :, None] - longitudes2[..., None, :])
+    return np.where(angle > 180, 360 - angle, angle)
+
+
+@lru_cache(maxsize=32)
+def _definition_arrays(items: Tuple[Tuple[str, Tuple[float, float]], ...]) -> Tuple[np.ndarray, np.ndarray]:
+    targets = np.array([target for _, (target, _) in items], dtype=np.float64)
+    orbs = np.array([orb for _, (_, orb) in items], dtype=np.float64)
+    return targets, orbs
+
+
+@lru_cache(maxsize=32)
+def _pair_indices(count1: int, count2: int, upper: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """行星組合的索引（行優先順序）；upper 為真時只取 i < j"""
+    if upper:
+        return np.triu_indices(count1, k=1)
+    index1, index2 = np.divmod(np.arange(count1 * count2), count2)
+    return index1, index2
+
+
+def _match(
+    longitudes1: np.ndarray,
+    speeds1: np.ndarray,
+    longitudes2: np.ndarray,
+    speeds2: np.ndarray,
+    upper: bool,
+    definitions: Dict[str, Tuple[float, float]]
+) -> np.ndarray:
+    """套用所有相位容許度並返回排序後的相位記錄（輸入皆為 (C, N) / (C, M)）"""
+    targets, orbs = _definition_arrays(tuple(definitions.items()))
+    index1, index2 = _pair_indices(longitudes1.shape[-1], longitudes2.shape[-1], upper)
+
+    # 只計算需要的行星組合：(C, P) 角距、(C, P, A) 與各相位的差距
+    angle = np.abs(longitudes1[:, index1] - longitudes2[:, index2])
+    angle = np.where(angle > 180, 360 - angle, angle)
+    diff = np.abs(angle[..., None] - targets)
+
+    # nonzero 依 (星盤, 行星組合, 相位) 的字典序返回，即原本的產生順序
+    chart, pair, aspect = np.nonzero(diff <= orbs)
+    planet1 = index1[pair]
+    planet2 = index2[pair]
+
+    records = np.empty(len(chart), dtype=ASPECT_DTYPE)
+    records["chart"] = chart
+    records["planet1"] = planet1
+    records["planet2"] = planet2
+    records["aspect"] = aspect
+    records["angle"] = angle[chart, pair]
+    records["orb"] = diff[chart, pair, aspect]
+    # 簡化判斷：速度差為正表示正在接近
+    records["applying"] = (speeds1[chart, planet1] - speeds2[chart, planet2]) > 0
+    records["strength"] = 1.0 - (records["orb"] / orbs[aspect])
+
+    # 各星盤內依強度由強到弱（穩定排序，與 list.sort(reverse=True) 相同）
+    order = np.lexsort((-records["strength"], records["chart"]))
+    return records[order]
+
+
+def _as_batch(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    return values[None, :] if values.ndim == 1 else values
+
+
+def find_aspects(
+    longitudes: np.ndarray,
+    speeds: np.ndarray,
+    definitions: Dict[str, Tuple[float, float]] = ASPECT_DEFINITIONS
+) -> np.ndarray:
+    """
+    計算星盤內行星之間的相位（每對行星只計一次）
+
+    Args:
+        longitudes: 黃經 (N,) 或批次 (C, N)
+        speeds: 速度，形狀同 longitudes
+        definitions: 相位定義（預設 ASPECT_DEFINITIONS）
+
+    Returns:
+        ASPECT_DTYPE 結構化陣列；單一星盤時 chart 欄位皆為 0
+    """
+    longitudes = _as_batch(longitudes)
+    speeds = _as_batch(speeds)
+    return _match(longitudes, speeds, longitudes, speeds, True, definitions)
+
+
+def find_synastry_aspects(
+    longitudes1: np.ndarray,
+    speeds1: np.ndarray,
+    longitudes2: np.ndarray,
+    speeds2: np.ndarray,
+    definitions: Dict[str, Tuple[float, float]] = ASPECT_DEFINITIONS
+) -> np.ndarray:
+    """
+    計算兩張星盤之間的相位（合盤，所有 N×M 行星組合）
+
+    Args:
+        longitudes1: 第一張星盤的黃經 (N,) 或批次 (C, N)
+        speeds1: 第一張星盤的速度
+        longitudes2: 第二張星盤的黃經 (M,) 或批次 (C, M)
+        speeds2: 第二張星盤的速度
+        definitions: 相位定義（預設 ASPECT_DEFINITIONS）
+
+    Returns:
+        ASPECT_DTYPE 結構化陣列；planet1 為第一張星盤的行星索引，planet2 為第二張
+    """
+    longitudes1 = _as_batch(longitudes1)
+    speeds1 = _as_batch(speeds1)
+    longitudes2 = _as_batch(longitudes2)
+    speeds2 = _as_batch(speeds2)
+    return _match(longitudes1, speeds1, longitudes2, speeds2, False, definitions)
+
+
+def aspects_to_dicts(
+    records: np.ndarray,
+    names1: Sequence[str],
+    names2: Optional[Sequence[str]] = None,
+    definitions: Dict[str, Tuple[float, float]] = ASPECT_DEFINITIONS
+) -> List[Dict]:
+    """
+    將相位記錄轉為 AstrologyCalculator 輸出的 dict 列表
+
+    Args:
+        records: find_aspects / find_synastry_aspects 的結果（單一星盤的部分）
+        names1: planet1 索引對應的行星名稱
+        names2: planet2 索引對應的行星名稱（預設同 names1）
+        definitions: 產生記錄時使用的相位定義
+
+    Returns:
+        相位列表（角距與差距取兩位小數）
+    """
+    names2 = names1 if names2 is None else names2
+    aspect_names = list(definitions)
+    return [
+        {
+            "planet1": names1[planet1],
+            "planet2": names2[planet2],
+            "aspect": aspect_names[aspect],
+            "angle": round(angle, 2),
+            "orb": round(orb, 2),
+            "applying": applying,
+            "strength": strength
+        }
+        for _, planet1, planet2, aspect, angle, orb, applying, strength in records.tolist()
+    ]
+
+
+def aspects_to_models(
+    records: np.ndarray,
+    planets1: Sequence[Planet],
+    planets2: Optional[Sequence[Planet]] = None
+) -> Tuple[Aspect, ...]:
+    """
+    將相位記錄轉為 Aspect 模型（僅適用於預設的 ASPECT_DEFINITIONS）
+
+    Args:
+        records: find_aspects / find_synastry_aspects 的結果（單一星盤的部分）
+        planets1: planet1 索引對應的行星
+        planets2: planet2 索引對應的行星（預設同 planets1）
+
+    Returns:
+        Aspect 元組（to_dict() 與 aspects_to_dicts 的輸出相同）
+    """
+    planets2 = planets1 if planets2 is None else planets2
+    return tuple(
+        Aspect(planets1[planet1], planets2[planet2], ASPECT_BY_INDEX[aspect], angle, orb, applying, strength)
+        for _, planet1, planet2, aspect, angle, orb, applying, strength in records.tolist()
+    )
+
+
+def split_by_chart(records: np.ndarray, chart_count: int) -> List[np.ndarray]:
+    """
+    將批次相位記錄依星盤拆開
+
+    Args:
+        records: 批次計算的相位記錄（已依星盤排序）
+        chart_count: 星盤數
+
+    Returns:
+        長度為 chart_count 的列表，每項為該星盤的相位記錄
+    """
+    bounds = np.searchsorted(records["chart"], np.arange(chart_count + 1))
+    return [records[bounds[i]:bounds[i + 1]] for i in range(chart_count)]
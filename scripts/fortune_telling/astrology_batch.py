@@ -0,0 +1,330 @@
+"""
+占星批次計算 (Batch Ephemeris Engine)
+====================================
+
+一次計算大量星盤的行星位置與宮位：
+1. Swiss Ephemeris 只設定一次（星曆路徑、計算旗標、分宮法）；
+   找不到星曆檔時 swe 每次呼叫都會先嘗試開檔再退回 Moshier 解析星曆，
+   批次計算器在建立時探測一次並直接使用 Moshier（結果相同，省去每次開檔）
+2. 以緊湊迴圈逐筆呼叫 swe.calc_ut / swe.houses，結果直接寫入預先配置的 NumPy 陣列
+3. 輸出為欄式（columnar）陣列，適合批次重算、統計與後續的向量化相位計算
+
+位置數值與 AstrologyCalculator 使用相同的 Swiss Ephemeris 呼叫，
+analyze_many() 的結果與逐筆 AstrologyCalculator.analyze() 完全一致。
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pytz
+import swisseph as swe
+
+from .astrology_calculator import (
+    PLANET_IDS,
+    HOUSE_SYSTEM,
+    AstrologyCalculator,
+    julian_day_utc,
+)
+from .aspects import aspects_to_models, find_aspects, split_by_chart
+from .chart_models import PLANET_BY_INDEX, AstrologyChart, PlanetPosition, house_cusps
+from .utils import ZODIAC_SIGNS
+
+logger = logging.getLogger(__name__)
+
+# 行星欄位順序（與 AstrologyCalculator 輸出順序一致）
+PLANET_NAMES: List[str] = list(PLANET_IDS)
+
+_PLANET_ID_LIST = list(PLANET_IDS.values())
+
+# 探測星曆檔時使用的時間點（1500、1900、2000、2100、2500 年，涵蓋多個星曆檔區段）
+_PROBE_JULIAN_DAYS = (2268932.5, 2415020.5, 2451544.5, 2488069.5, 2634166.5)
+
+BirthTimes = Union[Sequence[datetime], np.ndarray]
+
+
+def julian_days(birth_datetimes: BirthTimes) -> np.ndarray:
+    """
+    批次計算 Julian Day（UT）
+
+    Args:
+        birth_datetimes: datetime 序列（含時區者轉為 UTC，無時區者視為 UTC），
+            或 UTC 的 numpy datetime64 陣列
+
+    Returns:
+        Julian Day 陣列 (N,)
+    """
+    if isinstance(birth_datetimes, np.ndarray) and np.issubdtype(birth_datetimes.dtype, np.datetime64):
+        seconds = birth_datetimes.astype('datetime64[s]')
+        birth_datetimes = seconds.astype(datetime).tolist()
+
+    result = np.empty(len(birth_datetimes), dtype=np.float64)
+    for i, dt in enumerate(birth_datetimes):
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(pytz.UTC)
+        result[i] = julian_day_utc(dt)
+    return result
+
+
+class AstrologyBatch:
+    """
+    占星批次計算器
+
+    建立時設定 Swiss Ephemeris，之後的所有批次共用同一個設定。
+    """
+
+    def __init__(
+        self,
+        ephe_path: Optional[str] = None,
+        flags: int = swe.FLG_SWIEPH | swe.FLG_SPEED,
+        house_system: bytes = HOUSE_SYSTEM
+    ):
+        """
+        Args:
+            ephe_path: Swiss Ephemeris 星曆檔目錄（None 表示沿用目前設定）
+            flags: swe.calc_ut 計算旗標（預設與 AstrologyCalculator 相同）
+            house_system: 分宮法代碼（預設 Placidus）
+        """
+        if ephe_path is not None:
+            swe.set_ephe_path(ephe_path)
+        self.flags = self._resolve_flags(flags)
+        self.house_system = house_system
+
+    @staticmethod
+    def _resolve_flags(flags: int) -> int:
+        """
+        要求 Swiss 星曆但所有探測時間點都退回 Moshier 時（未安裝星曆檔），
+        直接改用 Moshier 旗標；計算結果與 swe 自動退回時相同。
+        """
+        if not flags & swe.FLG_SWIEPH:
+            return flags
+
+        for jd in _PROBE_JULIAN_DAYS:
+            _, retflags = swe.calc_ut(jd, swe.SUN, flags)
+            if not retflags & swe.FLG_MOSEPH:
+                return flags
+
+        logger.debug("未找到 Swiss Ephemeris 星曆檔，批次計算直接使用 Moshier 星曆")
+        return (flags & ~swe.FLG_SWIEPH) | swe.FLG_MOSEPH
+
+    @property
+    def ephemeris(self) -> str:
+        """實際使用的星曆（"swiss" 或 "moshier"）"""
+        return "moshier" if self.flags & swe.FLG_MOSEPH else "swiss"
+
+    def planets(self, julian_days: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        批次計算十大行星位置
+
+        Args:
+            julian_days: Julian Day（UT）陣列 (N,)
+
+        Returns:
+            {"longitude", "latitude", "distance", "speed"}：各為 (N, 10) 陣列，
+            行依 PLANET_NAMES 順序
+        """
+        julian_days = np.asarray(julian_days, dtype=np.float64)
+        count = len(julian_days)
+        positions = np.empty((count, len(_PLANET_ID_LIST), 4), dtype=np.float64)
+
+        calc_ut = swe.calc_ut
+        flags = self.flags
+        planet_ids = _PLANET_ID_LIST
+        for i, jd in enumerate(julian_days.tolist()):
+            row = positions[i]
+            for j, planet_id in enumerate(planet_ids):
+                xx, _ = calc_ut(jd, planet_id, flags)
+                row[j] = xx[:4]
+
+        return {
+            "longitude": positions[:, :, 0],
+            "latitude": positions[:, :, 1],
+            "distance": positions[:, :, 2],
+            "speed": positions[:, :, 3],
+        }
+
+    def houses(
+        self,
+        julian_days: np.ndarray,
+        latitudes: Union[float, np.ndarray],
+        longitudes: Union[float, np.ndarray]
+    ) -> Dict[str, np.ndarray]:
+        """
+        批次計算宮位
+
+        Args:
+            julian_days: Julian Day（UT）陣列 (N,)
+            latitudes: 出生地緯度（單一值或 (N,) 陣列）
+            longitudes: 出生地經度（單一值或 (N,) 陣列）
+
+        Returns:
+            {"cusps": (N, 12), "ascendant", "mc", "armc", "vertex": (N,)}
+        """
+        julian_days = np.asarray(julian_days, dtype=np.float64)
+        count = len(julian_days)
+        latitudes = np.broadcast_to(np.asarray(latitudes, dtype=np.float64), (count,))
+        longitudes = np.broadcast_to(np.asarray(longitudes, dtype=np.float64), (count,))
+
+        cusps = np.empty((count, 12), dtype=np.float64)
+        points = np.empty((count, 4), dtype=np.float64)
+
+        houses = swe.houses
+        house_system = self.house_system
+        for i, (jd, lat, lon) in enumerate(zip(julian_days.tolist(), latitudes.tolist(), longitudes.tolist())):
+            house_cusps, ascmc = houses(jd, lat, lon, house_system)
+            cusps[i] = house_cusps[:12]
+            points[i] = ascmc[:4]
+
+        return {
+            "cusps": cusps,
+            "ascendant": points[:, 0],
+            "mc": points[:, 1],
+            "armc": points[:, 2],
+            "vertex": points[:, 3],
+        }
+
+    def compute(
+        self,
+        birth_datetimes: BirthTimes,
+        latitudes: Union[float, np.ndarray],
+        longitudes: Union[float, np.ndarray]
+    ) -> Dict[str, np.ndarray]:
+        """
+        批次計算行星與宮位
+
+        Args:
+            birth_datetimes: 出生時間（見 julian_days()）
+            latitudes: 出生地緯度（單一值或 (N,) 陣列）
+            longitudes: 出生地經度（單一值或 (N,) 陣列）
+
+        Returns:
+            欄式結果：
+            - julian_day (N,)
+            - planet_longitude / planet_latitude / planet_distance / planet_speed (N, 10)
+            - planet_sign (N, 10)：星座索引（ZODIAC_SIGNS）
+            - retrograde (N, 10)
+            - cusps (N, 12)、ascendant / mc / armc / vertex (N,)
+        """
+        jd = julian_days(birth_datetimes)
+        planets = self.planets(jd)
+        houses = self.houses(jd, latitudes, longitudes)
+
+        return {
+            "julian_day": jd,
+            "planet_longitude": planets["longitude"],
+            "planet_latitude": planets["latitude"],
+            "planet_distance": planets["distance"],
+            "planet_speed": planets["speed"],
+            "planet_sign": (planets["longitude"] // 30).astype(np.int64) % len(ZODIAC_SIGNS),
+            "retrograde": planets["speed"] < 0,
+            **houses,
+        }
+
+    @staticmethod
+    def aspects(columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        批次計算各星盤的行星相位
+
+        與 AstrologyCalculator 相同，以四位小數的黃經與速度計算，
+        因此結果與逐筆 analyze() 的 aspects 一致（見 aspects.aspects_to_dicts）。
+
+        Args:
+            columns: compute() 的結果
+
+        Returns:
+            ASPECT_DTYPE 結構化陣列（chart 欄位為星盤序號，可用 aspects.split_by_chart 拆開）
+        """
+        def round4(values: np.ndarray) -> np.ndarray:
+            # Python round() 與 np.round 在少數值上相差一個 ulp，需逐一以 round() 取值
+            return np.array([round(v, 4) for v in values.ravel().tolist()]).reshape(values.shape)
+
+        return find_aspects(round4(columns["planet_longitude"]), round4(columns["planet_speed"]))
+
+    def analyze_many(
+        self,
+        birth_datetimes: Sequence[datetime],
+        latitudes: Union[float, Sequence[float]],
+        longitudes: Union[float, Sequence[float]]
+    ) -> List[Dict]:
+        """
+        批次完整占星分析
+
+        行星與宮位由批次引擎計算，相位、解讀與摘要沿用 AstrologyCalculator，
+        每一筆結果與 AstrologyCalculator(...).analyze() 完全相同。
+
+        Args:
+            birth_datetimes: 出生日期時間序列
+            latitudes: 出生地緯度（單一值或序列）
+            longitudes: 出生地經度（單一值或序列）
+
+        Returns:
+            分析結果列表
+        """
+        count = len(birth_datetimes)
+        latitudes = np.broadcast_to(np.asarray(latitudes, dtype=np.float64), (count,)).tolist()
+        longitudes = np.broadcast_to(np.asarray(longitudes, dtype=np.float64), (count,)).tolist()
+
+        columns = self.compute(birth_datetimes, latitudes, longitudes)
+        planet_longitude = columns["planet_longitude"].tolist()
+        planet_latitude = columns["planet_latitude"].tolist()
+        planet_speed = columns["planet_speed"].tolist()
+        cusps = columns["cusps"].tolist()
+        ascendant = columns["ascendant"].tolist()
+        mc = columns["mc"].tolist()
+
+        results = []
+        for i, birth_datetime in enumerate(birth_datetimes):
+            calculator = AstrologyCalculator(birth_datetime, latitudes[i], longitudes[i])
+            planets = {
+                planet.value: PlanetPosition(planet, lon, lat, speed).to_dict()
+                for planet, lon, lat, speed in zip(
+                    PLANET_BY_INDEX, planet_longitude[i], planet_latitude[i], planet_speed[i]
+                )
+            }
+            houses = {house.name: house.to_dict() for house in house_cusps(cusps[i], ascendant[i], mc[i])}
+            results.append(calculator._analyze_positions(planets, houses))
+
+        return results
+
+    def charts(
+        self,
+        birth_datetimes: BirthTimes,
+        latitudes: Union[float, np.ndarray],
+        longitudes: Union[float, np.ndarray]
+    ) -> List[AstrologyChart]:
+        """
+        批次計算星盤模型
+
+        每一筆與 AstrologyCalculator(...).chart() 相同，不產生解讀與摘要，
+        適合需要大量保留星盤（行星、宮位、相位）的流程。
+
+        Args:
+            birth_datetimes: 出生時間（見 julian_days()）
+            latitudes: 出生地緯度（單一值或 (N,) 陣列）
+            longitudes: 出生地經度（單一值或 (N,) 陣列）
+
+        Returns:
+            AstrologyChart 列表
+        """
+        columns = self.compute(birth_datetimes, latitudes, longitudes)
+        count = len(columns["julian_day"])
+        aspects = split_by_chart(self.aspects(columns), count)
+
+        planet_longitude = columns["planet_longitude"].tolist()
+        planet_latitude = columns["planet_latitude"].tolist()
+        planet_speed = columns["planet_speed"].tolist()
+        cusps = columns["cusps"].tolist()
+        ascendant = columns["ascendant"].tolist()
+        mc = columns["mc"].tolist()
+
+        return [
+            AstrologyChart(
+                planets=tuple(map(
+                    PlanetPosition, PLANET_BY_INDEX, planet_longitude[i], planet_latitude[i], planet_speed[i]
+                )),
+                houses=house_cusps(cusps[i], ascendant[i], mc[i]),
+                aspects=aspects_to_models(aspects[i], PLANET_BY_INDEX)
+            )
+            for i in range(count)
+        ]
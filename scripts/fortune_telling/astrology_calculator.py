@@ -15,13 +15,38 @@ from typing import Dict, List, Tuple
 from datetime import datetime
 import pytz
 import swisseph as swe
-from .utils import ZODIAC_SIGNS, PLANETS, ASPECTS, HOUSES
+from .utils import PLANETS, ASPECTS, HOUSES
+from .aspects import find_aspects, aspects_to_dicts, aspects_to_models
+from .chart_models import (
+    PLANET_BY_INDEX,
+    AstrologyChart,
+    HouseCusp,
+    PlanetPosition,
+    house_cusps,
+)
+
+# 主要行星（Swiss Ephemeris 編號），順序即輸出順序
+PLANET_IDS: Dict[str, int] = {
+    "太陽": swe.SUN,
+    "月亮": swe.MOON,
+    "水星": swe.MERCURY,
+    "金星": swe.VENUS,
+    "火星": swe.MARS,
+    "木星": swe.JUPITER,
+    "土星": swe.SATURN,
+    "天王星": swe.URANUS,
+    "海王星": swe.NEPTUNE,
+    "冥王星": swe.PLUTO
+}
+
+# Placidus 分宮法
+HOUSE_SYSTEM = b'P'
 
 
 class AstrologyCalculator:
     """西洋占星計算器 - 精簡實用版"""
 
-    def __init__(self, birth_datetime: datetime, latitude: float, longitude: float):
+    def __init__(self, birth_datetime: datetime, latitude: float, longitude: float, ephemeris=None):
         """
         初始化占星計算器
 
@@ -29,10 +54,13 @@ class AstrologyCalculator:
             birth_datetime: 出生日期時間（含時區）
             latitude: 出生地緯度
             longitude: 出生地經度
+            ephemeris: 行星位置後端，需提供 planets(julian_days) 方法
+                （如 transits.PlanetPositionTable、AstrologyBatch）；None 表示直接呼叫 Swiss Ephemeris
         """
         self.birth_datetime = birth_datetime
         self.latitude = latitude
         self.longitude = longitude
+        self.ephemeris = ephemeris
 
         # 轉換為 UTC 時間（Swiss Ephemeris 使用 UTC）
         if birth_datetime.tzinfo is None:
@@ -46,13 +74,7 @@ class AstrologyCalculator:
 
     def _calculate_julian_day(self) -> float:
         """計算 Julian Day Number"""
-        dt = self.birth_datetime_utc
-        year = dt.year
-        month = dt.month
-        day = dt.day
-        hour = dt.hour + dt.minute / 60.0 + dt.second / 3600.0
-
-        return swe.julday(year, month, day, hour)
+        return julian_day_utc(self.birth_datetime_utc)
 
     def analyze(self) -> Dict:
         """完整占星分析"""
@@ -62,6 +84,10 @@ class AstrologyCalculator:
         # 2. 計算宮位
         houses = self._calculate_houses()
 
+        return self._analyze_positions(planets, houses)
+
+    def _analyze_positions(self, planets: Dict, houses: Dict) -> Dict:
+        """由行星與宮位資料完成相位、解讀與摘要（批次計算時由 AstrologyBatch 直接提供位置）"""
         # 3. 計算相位
         aspects = self._calculate_aspects(planets)
 
@@ -85,6 +111,24 @@ class AstrologyCalculator:
             "summary": summary
         }
 
+    def chart(self) -> AstrologyChart:
+        """
+        星盤模型（行星、宮位與相位）
+
+        與 analyze() 的 planets、houses、aspects 內容相同（chart().to_dict()），
+        但以緊湊的 NamedTuple 保存，適合大量保留星盤的批次與服務流程。
+        """
+        planets = self._planet_positions()
+        records = find_aspects(
+            [round(position.longitude, 4) for position in planets],
+            [round(position.speed, 4) for position in planets]
+        )
+        return AstrologyChart(
+            planets=planets,
+            houses=self._house_cusps(),
+            aspects=aspects_to_models(records, [position.planet for position in planets])
+        )
+
     def _calculate_planets(self) -> Dict:
         """
         計算主要行星位置
@@ -92,49 +136,31 @@ class AstrologyCalculator:
         包括：太陽、月亮、水星、金星、火星、木星、土星、天王星、海王星、冥王星
         以及上升點、天頂
         """
-        planets_data = {}
-
-        # 主要行星（Swiss Ephemeris 編號）
-        planet_ids = {
-            "太陽": swe.SUN,
-            "月亮": swe.MOON,
-            "水星": swe.MERCURY,
-            "金星": swe.VENUS,
-            "火星": swe.MARS,
-            "木星": swe.JUPITER,
-            "土星": swe.SATURN,
-            "天王星": swe.URANUS,
-            "海王星": swe.NEPTUNE,
-            "冥王星": swe.PLUTO
-        }
+        return {position.planet.value: position.to_dict() for position in self._planet_positions()}
+
+    def _planet_positions(self) -> Tuple[PlanetPosition, ...]:
+        """十大行星位置（依 PLANET_IDS 順序）"""
+        if self.ephemeris is not None:
+            positions = self.ephemeris.planets([self.julian_day])
+            return tuple(
+                PlanetPosition(planet, longitude, latitude, speed)
+                for planet, longitude, latitude, speed in zip(
+                    PLANET_BY_INDEX,
+                    positions["longitude"][0].tolist(),
+                    positions["latitude"][0].tolist(),
+                    positions["speed"][0].tolist()
+                )
+            )
 
-        for planet_name, planet_id in planet_ids.items():
+        positions = []
+        for planet, planet_id in zip(PLANET_BY_INDEX, PLANET_IDS.values()):
             # 計算行星位置
             result, ret = swe.calc_ut(self.julian_day, planet_id)
 
-            longitude = result[0]  # 黃經
-            latitude = result[1]   # 黃緯
-            distance = result[2]   # 距離
-            speed = result[3]      # 速度
-
-            # 判斷星座
-            sign_index = int(longitude / 30)
-            sign_degree = longitude % 30
-
-            # 判斷逆行
-            is_retrograde = speed < 0
-
-            planets_data[planet_name] = {
-                "longitude": round(longitude, 4),
-                "latitude": round(latitude, 4),
-                "sign": ZODIAC_SIGNS[sign_index],
-                "degree": round(sign_degree, 2),
-                "speed": round(speed, 4),
-                "retrograde": is_retrograde,
-                "position_text": f"{ZODIAC_SIGNS[sign_index]} {int(sign_degree)}°{int((sign_degree % 1) * 60)}'"
-            }
+            # 黃經、黃緯、速度
+            positions.append(PlanetPosition(planet, result[0], result[1], result[3]))
 
-        return planets_data
+        return tuple(positions)
 
     def _calculate_houses(self) -> Dict:
         """
@@ -142,89 +168,25 @@ class AstrologyCalculator:
 
         返回 12 宮位的起始點以及重要點（上升、天頂、下降、天底）
         """
+        return {house.name: house.to_dict() for house in self._house_cusps()}
+
+    def _house_cusps(self) -> Tuple[HouseCusp, ...]:
+        """12 宮首與四個軸點"""
         # Placidus 分宮法（'P'）
         cusps, ascmc = swe.houses(
             self.julian_day,
             self.latitude,
             self.longitude,
-            b'P'  # Placidus
+            HOUSE_SYSTEM
         )
 
-        houses_data = {}
-
-        # 12 宮位
-        for i in range(12):
-            house_num = i + 1
-            cusp_longitude = cusps[i]
-
-            sign_index = int(cusp_longitude / 30)
-            sign_degree = cusp_longitude % 30
-
-            houses_data[f"第{house_num}宮"] = {
-                "cusp": round(cusp_longitude, 4),
-                "sign": ZODIAC_SIGNS[sign_index],
-                "degree": round(sign_degree, 2),
-                "position_text": f"{ZODIAC_SIGNS[sign_index]} {int(sign_degree)}°{int((sign_degree % 1) * 60)}'"
-            }
-
-        # 重要點
         # ascmc[0] = 上升點 (Ascendant)
         # ascmc[1] = 天頂 (MC - Medium Coeli)
-        # ascmc[2] = ARMC (直接在赤道上的 MC)
-        # ascmc[3] = 頂點 (Vertex)
-
-        asc_longitude = ascmc[0]
-        mc_longitude = ascmc[1]
-
-        asc_sign_index = int(asc_longitude / 30)
-        asc_degree = asc_longitude % 30
-
-        mc_sign_index = int(mc_longitude / 30)
-        mc_degree = mc_longitude % 30
-
-        houses_data["上升點"] = {
-            "longitude": round(asc_longitude, 4),
-            "sign": ZODIAC_SIGNS[asc_sign_index],
-            "degree": round(asc_degree, 2),
-            "position_text": f"{ZODIAC_SIGNS[asc_sign_index]} {int(asc_degree)}°{int((asc_degree % 1) * 60)}'"
-        }
-
-        houses_data["天頂"] = {
-            "longitude": round(mc_longitude, 4),
-            "sign": ZODIAC_SIGNS[mc_sign_index],
-            "degree": round(mc_degree, 2),
-            "position_text": f"{ZODIAC_SIGNS[mc_sign_index]} {int(mc_degree)}°{int((mc_degree % 1) * 60)}'"
-        }
-
-        # 計算下降點（上升點對面）
-        desc_longitude = (asc_longitude + 180) % 360
-        desc_sign_index = int(desc_longitude / 30)
-        desc_degree = desc_longitude % 30
-
-        houses_data["下降點"] = {
-            "longitude": round(desc_longitude, 4),
-            "sign": ZODIAC_SIGNS[desc_sign_index],
-            "degree": round(desc_degree, 2),
-            "position_text": f"{ZODIAC_SIGNS[desc_sign_index]} {int(desc_degree)}°{int((desc_degree % 1) * 60)}'"
-        }
-
-        # 計算天底（天頂對面）
-        ic_longitude = (mc_longitude + 180) % 360
-        ic_sign_index = int(ic_longitude / 30)
-        ic_degree = ic_longitude % 30
-
-        houses_data["天底"] = {
-            "longitude": round(ic_longitude, 4),
-            "sign": ZODIAC_SIGNS[ic_sign_index],
-            "degree": round(ic_degree, 2),
-            "position_text": f"{ZODIAC_SIGNS[ic_sign_index]} {int(ic_degree)}°{int((ic_degree % 1) * 60)}'"
-        }
-
-        return houses_data
+        return house_cusps(cusps, ascmc[0], ascmc[1])
 
     def _calculate_aspects(self, planets: Dict) -> List[Dict]:
         """
-        計算行星相位
+        計算行星相位（向量化計算，見 aspects.py）
 
         主要相位：
         - 合相 (0°, ±8°)
@@ -233,67 +195,14 @@ class AstrologyCalculator:
         - 三分相 (120°, ±8°)
         - 對分相 (180°, ±8°)
         """
-        aspects_list = []
-
-        # 相位定義（角度和容許度）
-        aspect_definitions = {
-            "合相": (0, 8),
-            "六分相": (60, 6),
-            "四分相": (90, 8),
-            "三分相": (120, 8),
-            "對分相": (180, 8)
-        }
-
         planet_names = list(planets.keys())
+        records = find_aspects(
+            [planets[name]["longitude"] for name in planet_names],
+            [planets[name]["speed"] for name in planet_names]
+        )
 
-        # 計算所有行星對之間的相位
-        for i, planet1 in enumerate(planet_names):
-            for planet2 in planet_names[i + 1:]:
-                lon1 = planets[planet1]["longitude"]
-                lon2 = planets[planet2]["longitude"]
-
-                # 計算角度差
-                angle = abs(lon1 - lon2)
-                if angle > 180:
-                    angle = 360 - angle
-
-                # 檢查是否形成相位
-                for aspect_name, (target_angle, orb) in aspect_definitions.items():
-                    diff = abs(angle - target_angle)
-
-                    if diff <= orb:
-                        # 形成相位
-                        aspects_list.append({
-                            "planet1": planet1,
-                            "planet2": planet2,
-                            "aspect": aspect_name,
-                            "angle": round(angle, 2),
-                            "orb": round(diff, 2),
-                            "applying": self._is_applying(planets[planet1], planets[planet2], angle),
-                            "strength": self._calculate_aspect_strength(diff, orb)
-                        })
-
-        # 按相位強度排序
-        aspects_list.sort(key=lambda x: x["strength"], reverse=True)
-
-        return aspects_list
-
-    def _is_applying(self, planet1: Dict, planet2: Dict, current_angle: float) -> bool:
-        """
-        判斷相位是入相位（applying）還是離相位（separating）
-
-        入相位：兩行星正在接近精確相位
-        離相位：兩行星正在遠離精確相位
-        """
-        speed1 = planet1["speed"]
-        speed2 = planet2["speed"]
-
-        # 簡化判斷：速度差為正表示正在接近
-        return (speed1 - speed2) > 0
-
-    def _calculate_aspect_strength(self, orb_diff: float, max_orb: float) -> float:
-        """計算相位強度（0-1）"""
-        return 1.0 - (orb_diff / max_orb)
+        # 已按相位強度排序
+        return aspects_to_dicts(records, planet_names)
 
     def _interpret_chart(self, planets: Dict, houses: Dict, aspects: List[Dict]) -> Dict:
         """
@@ -503,13 +412,28 @@ class AstrologyCalculator:
         }
 
 
+def julian_day_utc(dt_utc: datetime) -> float:
+    """
+    計算 UTC 時間的 Julian Day（精確到秒，與 AstrologyCalculator 一致）
+
+    Args:
+        dt_utc: UTC 時間（naive 或 UTC aware）
+
+    Returns:
+        Julian Day（UT）
+    """
+    hour = dt_utc.hour + dt_utc.minute / 60.0 + dt_utc.second / 3600.0
+    return swe.julday(dt_utc.year, dt_utc.month, dt_utc.day, hour)
+
+
 def quick_astrology_analysis(
     birth_datetime: datetime,
     latitude: float,
-    longitude: float
+    longitude: float,
+    ephemeris=None
 ) -> Dict:
     """快速占星分析"""
-    calculator = AstrologyCalculator(birth_datetime, latitude, longitude)
+    calculator = AstrologyCalculator(birth_datetime, latitude, longitude, ephemeris)
     return calculator.analyze()
 
 
@@ -23,6 +23,7 @@ from .prompt_utils import (
     calculate_confidence_level
 )
 from .llm_analyzer import (
+    LLMRequest,
     get_llm_analyzer,
     construct_astrology_area_prompt
 )
@@ -719,40 +720,50 @@ def interpret_natal_chart(astrology_data: Dict) -> Dict:
     llm_analyzer = get_llm_analyzer()
 
     if llm_analyzer.is_available() and ASTROLOGY_SYSTEM_PROMPT:
-        # For comprehensive chart analysis
-        analysis_prompt = construct_astrology_area_prompt('綜合星盤分析', astrology_data)
-
-        llm_result = llm_analyzer.analyze_with_fallback(
-            system_prompt=ASTROLOGY_SYSTEM_PROMPT,
-            analysis_prompt=analysis_prompt,
-            fallback_func=_traditional_natal_chart_analysis,
-            fallback_args=(astrology_data,),
-            min_length=300,
-            temperature=0.7,
-            max_tokens=4000
-        )
-
-        # Check if llm_result is a string (LLM success) or dict (fallback was used)
-        if isinstance(llm_result, str) and len(llm_result.replace(' ', '').replace('\n', '')) >= 300:
-            confidence = calculate_confidence_level(
-                consensus_indicators=1,
-                total_indicators=1,
-                data_quality=1.0,
-                theoretical_support=0.9
-            )
-
-            traditional_result = _traditional_natal_chart_analysis(astrology_data)
-            traditional_result['llm_analysis'] = llm_result
-            traditional_result['confidence_level'] = confidence
-            traditional_result['analysis_method'] = 'LLM enhanced'
-            return traditional_result
-        elif isinstance(llm_result, dict):
-            # Fallback was already executed, return it directly
-            return llm_result
+        return llm_analyzer.run_request(natal_chart_request(astrology_data))
 
     return _traditional_natal_chart_analysis(astrology_data)
 
 
+def natal_chart_request(astrology_data: Dict) -> Optional[LLMRequest]:
+    """
+    星盤分析的LLM請求（可交給 LLMAnalyzer.analyze_many 與其他請求並行）
+
+    Returns:
+        LLMRequest，系統提示詞未載入時返回 None
+    """
+    if not ASTROLOGY_SYSTEM_PROMPT:
+        return None
+
+    return LLMRequest(
+        key='astrology_natal_chart',
+        system_prompt=ASTROLOGY_SYSTEM_PROMPT,
+        # For comprehensive chart analysis
+        analysis_prompt=construct_astrology_area_prompt('綜合星盤分析', astrology_data),
+        fallback_func=_traditional_natal_chart_analysis,
+        fallback_args=(astrology_data,),
+        min_length=300,
+        on_success=lambda llm_result: _llm_enhanced_natal_chart(astrology_data, llm_result),
+        llm_kwargs={'temperature': 0.7, 'max_tokens': 4000}
+    )
+
+
+def _llm_enhanced_natal_chart(astrology_data: Dict, llm_result: str) -> Dict:
+    """將LLM分析附加到傳統星盤分析結構（保持相容）"""
+    confidence = calculate_confidence_level(
+        consensus_indicators=1,
+        total_indicators=1,
+        data_quality=1.0,
+        theoretical_support=0.9
+    )
+
+    traditional_result = _traditional_natal_chart_analysis(astrology_data)
+    traditional_result['llm_analysis'] = llm_result
+    traditional_result['confidence_level'] = confidence
+    traditional_result['analysis_method'] = 'LLM enhanced'
+    return traditional_result
+
+
 def _traditional_natal_chart_analysis(astrology_data: Dict) -> Dict:
     """傳統占星分析"""
     planets = astrology_data.get('planets', {})
@@ -980,6 +991,7 @@ def _generate_integration_guidance(planets: Dict, aspects: List[Dict], houses: D
 
 __all__ = [
     'interpret_natal_chart',
+    'natal_chart_request',
     'ZODIAC_PSYCHOLOGY',
     'HOUSE_PSYCHOLOGY',
     'ASPECT_PSYCHOLOGY'
@@ -0,0 +1,372 @@
+"""
+八字批次計算引擎 (Columnar BaZi Batch Engine)
+============================================
+
+以 NumPy 陣列一次計算大量命盤的統計型欄位，供歷史命盤分析等離線任務使用：
+1. 五行統計（天干、地支、地支藏干）、缺失/偏弱/旺盛
+2. 五行平衡度
+3. 身強身弱
+4. 十神配置、十神分佈、主導十神
+5. 格局判斷
+
+輸入為年月日時八個干支的整數編碼（見 utils.STEM_CODE / BRANCH_CODE），
+所有計算皆為查表 (gather) 與陣列運算，不逐筆執行 Python 迴圈。
+結果與 BaziCalculator.analyze 的對應欄位完全一致。
+"""
+
+import itertools
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .bazi_calculator import BaziCalculator, PATTERN_BY_MONTH_GOD, DEFAULT_PATTERN
+from .utils import (
+    WuXing,
+    TenGods,
+    STEM_CODE,
+    BRANCH_CODE,
+    STEM_WUXING,
+    BRANCH_WUXING,
+    BRANCH_HIDDEN_STEM_CODES,
+    TEN_GOD_MATRIX,
+)
+
+# 欄位順序（與 BaziCalculator 輸出的 dict 鍵順序一致）
+WUXING_ORDER: List[WuXing] = [WuXing.WOOD, WuXing.FIRE, WuXing.EARTH, WuXing.METAL, WuXing.WATER]
+TEN_GOD_ORDER: List[TenGods] = list(TenGods)
+STRENGTH_LEVELS: List[str] = ["身強", "身弱", "身中和"]
+
+WUXING_LABELS = np.array([wx.value for wx in WUXING_ORDER])
+TEN_GOD_LABELS = np.array([god.value for god in TEN_GOD_ORDER])
+STRENGTH_LABELS = np.array(STRENGTH_LEVELS)
+
+_WUXING_CODE = {wx: code for code, wx in enumerate(WUXING_ORDER)}
+_TEN_GOD_CODE = {god: code for code, god in enumerate(TEN_GOD_ORDER)}
+
+
+# ============================================
+# 查找表 (Lookup Tables)
+# ============================================
+
+# 天干 → 五行編碼
+_STEM_WUXING = np.array([_WUXING_CODE[wx] for wx in STEM_WUXING], dtype=np.int64)
+
+# 天干 → 五行計數向量 (10, 5)
+_STEM_WUXING_COUNTS = np.eye(5, dtype=np.int64)[_STEM_WUXING]
+
+# 地支 → 本氣加藏干的五行計數向量 (12, 5)
+_BRANCH_WUXING_COUNTS = np.zeros((12, 5), dtype=np.int64)
+for _code, _wuxing in enumerate(BRANCH_WUXING):
+    _BRANCH_WUXING_COUNTS[_code, _WUXING_CODE[_wuxing]] += 1
+    for _hidden_code, _ in BRANCH_HIDDEN_STEM_CODES[_code]:
+        _BRANCH_WUXING_COUNTS[_code, _STEM_WUXING[_hidden_code]] += 1
+del _code, _wuxing, _hidden_code
+
+# 十神矩陣 (10, 10) → 十神編碼
+_TEN_GOD_MATRIX = np.array(
+    [[_TEN_GOD_CODE[god] for god in row] for row in TEN_GOD_MATRIX], dtype=np.int64
+)
+
+# 月干十神 → 格局類型、品質
+_PATTERN_TYPES = np.array([
+    PATTERN_BY_MONTH_GOD.get(god, DEFAULT_PATTERN)[0] for god in TEN_GOD_ORDER
+])
+_PATTERN_QUALITIES = np.array([
+    PATTERN_BY_MONTH_GOD.get(god, DEFAULT_PATTERN)[1] for god in TEN_GOD_ORDER
+])
+
+# 五行總數的可能範圍：4 天干 + 4 地支 + 每支 1-3 個藏干
+_HIDDEN_COUNTS = [len(hidden) for hidden in BRANCH_HIDDEN_STEM_CODES]
+_MIN_TOTAL = 8 + 4 * min(_HIDDEN_COUNTS)
+_MAX_TOTAL = 8 + 4 * max(_HIDDEN_COUNTS)
+_RADIX = _MAX_TOTAL + 1
+
+_score_tables: Optional[Dict[str, np.ndarray]] = None
+
+
+def _get_score_tables() -> Dict[str, np.ndarray]:
+    """
+    建立（首次使用時）平衡度與身強弱分數的查找表
+
+    兩種分數都經過 Python round(x, 2)，其結果與 np.round 在部分數值上不同，
+    因此預先以 BaziCalculator 的原始公式列舉所有可能的五行計數組合，
+    執行時只需 searchsorted 與 gather。
+    """
+    global _score_tables
+    if _score_tables is not None:
+        return _score_tables
+
+    balance_keys = []
+    balance_scores = []
+    for total in range(_MIN_TOTAL, _MAX_TOTAL + 1):
+        for head in itertools.product(range(total + 1), repeat=4):
+            last = total - sum(head)
+            if last < 0:
+                continue
+            counts = head + (last,)
+            balance_keys.append(_encode_counts_scalar(counts))
+            balance_scores.append(BaziCalculator._calculate_balance_score(
+                {wx.value: count for wx, count in zip(WUXING_ORDER, counts)}
+            ))
+
+    order = np.argsort(balance_keys)
+    strength_scores = np.zeros((_RADIX, _RADIX), dtype=np.float64)
+    for total in range(_MIN_TOTAL, _MAX_TOTAL + 1):
+        average = total / 5
+        for count in range(total + 1):
+            strength_scores[total, count] = round(count / average, 2)
+
+    _score_tables = {
+        "balance_keys": np.array(balance_keys, dtype=np.int64)[order],
+        "balance_scores": np.array(balance_scores, dtype=np.float64)[order],
+        "strength_scores": strength_scores,
+    }
+    return _score_tables
+
+
+def _encode_counts_scalar(counts: Sequence[int]) -> int:
+    key = 0
+    for count in counts:
+        key = key * _RADIX + count
+    return key
+
+
+def _encode_counts(counts: np.ndarray) -> np.ndarray:
+    key = np.zeros(len(counts), dtype=np.int64)
+    for column in range(5):
+        key = key * _RADIX + counts[:, column]
+    return key
+
+
+# ============================================
+# 編碼輔助 (Encoding Helpers)
+# ============================================
+
+def encode_stems(stems) -> np.ndarray:
+    """
+    將天干字元陣列轉換為整數編碼
+
+    Args:
+        stems: 天干字元陣列（任意形狀）
+
+    Returns:
+        同形狀的 int64 編碼陣列
+    """
+    return _encode(stems, STEM_CODE, "天干")
+
+
+def encode_branches(branches) -> np.ndarray:
+    """
+    將地支字元陣列轉換為整數編碼
+
+    Args:
+        branches: 地支字元陣列（任意形狀）
+
+    Returns:
+        同形狀的 int64 編碼陣列
+    """
+    return _encode(branches, BRANCH_CODE, "地支")
+
+
+def _encode(values, code_map: Dict[str, int], label: str) -> np.ndarray:
+    values = np.asarray(values)
+    unique, inverse = np.unique(values, return_inverse=True)
+    try:
+        codes = np.array([code_map[str(v)] for v in unique], dtype=np.int64)
+    except KeyError as e:
+        raise ValueError(f"無效的{label}: {e.args[0]}")
+    return codes[inverse].reshape(values.shape)
+
+
+def codes_from_calendar(calendar_data: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    從 CalendarConverter 的結果取出四柱干支編碼
+
+    支援 convert_to_lunar 的單筆結果列表與 convert_many 的欄式結果。
+
+    Args:
+        calendar_data: convert_many 的結果，或 convert_to_lunar 結果的列表
+
+    Returns:
+        (天干編碼 (N, 4), 地支編碼 (N, 4))，欄順序為年、月、日、時
+    """
+    positions = ("year", "month", "day", "hour")
+    if isinstance(calendar_data, dict):
+        pillars = calendar_data["four_pillars"]
+        stems = np.stack([pillars[p]["stem"] for p in positions], axis=1)
+        branches = np.stack([pillars[p]["branch"] for p in positions], axis=1)
+    else:
+        stems = [[c["four_pillars"][p]["stem"] for p in positions] for c in calendar_data]
+        branches = [[c["four_pillars"][p]["branch"] for p in positions] for c in calendar_data]
+    return encode_stems(stems), encode_branches(branches)
+
+
+# ============================================
+# 批次計算 (Batch Analysis)
+# ============================================
+
+def analyze_batch(stems: np.ndarray, branches: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    批次計算八字統計欄位
+
+    Args:
+        stems: 天干編碼 (N, 4)，欄順序為年、月、日、時
+        branches: 地支編碼 (N, 4)，欄順序為年、月、日、時
+
+    Returns:
+        欄式結果字典（五行欄按 WUXING_ORDER，十神欄按 TEN_GOD_ORDER）：
+        - wuxing_counts (N, 5)、wuxing_total、wuxing_average
+        - wuxing_missing / wuxing_weak / wuxing_strong (N, 5) 布林遮罩
+        - balance_score
+        - strength_level（STRENGTH_LEVELS 的編碼）、strength_label、strength_score
+        - ten_gods (N, 4) 十神編碼（日柱固定為比肩）
+        - ten_god_distribution (N, 10)
+        - dominant_gods (N, 2) 主導十神編碼，不足兩個時為 -1
+        - pattern_type、pattern_quality、month_commander（十神編碼）
+    """
+    stems = np.asarray(stems, dtype=np.int64)
+    branches = np.asarray(branches, dtype=np.int64)
+    if stems.ndim != 2 or stems.shape[1] != 4 or stems.shape != branches.shape:
+        raise ValueError(f"干支編碼形狀應為 (N, 4)，實際為 {stems.shape} / {branches.shape}")
+
+    n = len(stems)
+    rows = np.arange(n)
+    tables = _get_score_tables()
+
+    # 1. 五行統計
+    counts = (
+        _STEM_WUXING_COUNTS[stems].sum(axis=1)
+        + _BRANCH_WUXING_COUNTS[branches].sum(axis=1)
+    )
+    total = counts.sum(axis=1)
+    average = total / 5
+
+    missing = counts == 0
+    weak = (counts > 0) & (counts < (average * 0.6)[:, None])
+    strong = counts > (average * 1.5)[:, None]
+
+    # 2. 五行平衡度
+    keys = _encode_counts(counts)
+    balance_score = tables["balance_scores"][np.searchsorted(tables["balance_keys"], keys)]
+
+    # 3. 身強身弱
+    day_code = stems[:, 2]
+    day_master_count = counts[rows, _STEM_WUXING[day_code]]
+    strength_level = np.where(
+        day_master_count > average * 1.2, 0,
+        np.where(day_master_count < average * 0.8, 1, 2)
+    )
+    strength_score = tables["strength_scores"][total, day_master_count]
+
+    # 4. 十神
+    ten_god_row = _TEN_GOD_MATRIX[day_code]
+    year_god = ten_god_row[rows, stems[:, 0]]
+    month_god = ten_god_row[rows, stems[:, 1]]
+    hour_god = ten_god_row[rows, stems[:, 3]]
+    day_god = np.full(n, _TEN_GOD_CODE[TenGods.BI_JIAN], dtype=np.int64)
+
+    ten_gods = np.stack([year_god, month_god, day_god, hour_god], axis=1)
+    gods = np.stack([year_god, month_god, hour_god], axis=1)  # 不包含日主
+    distribution = np.zeros((n, len(TEN_GOD_ORDER)), dtype=np.int64)
+    np.add.at(distribution, (np.repeat(rows, 3), gods.ravel()), 1)
+
+    # 主導十神：依 Counter.most_common(2)（次數相同時按首次出現順序）
+    first_second = year_god == month_god
+    first_third = year_god == hour_god
+    second_third = month_god == hour_god
+    all_same = first_second & second_third
+    dominant_first = np.where(second_third & ~first_second, month_god, year_god)
+    dominant_second = np.select(
+        [all_same, first_second, first_third, second_third],
+        [-1, hour_god, month_god, year_god],
+        default=month_god
+    )
+    dominant = np.stack([dominant_first, dominant_second], axis=1)
+
+    # 5. 格局
+    pattern_type = _PATTERN_TYPES[month_god]
+    pattern_quality = _PATTERN_QUALITIES[month_god]
+
+    return {
+        "wuxing_counts": counts,
+        "wuxing_total": total,
+        "wuxing_average": average,
+        "wuxing_missing": missing,
+        "wuxing_weak": weak,
+        "wuxing_strong": strong,
+        "balance_score": balance_score,
+        "strength_level": strength_level,
+        "strength_label": STRENGTH_LABELS[strength_level],
+        "strength_score": strength_score,
+        "ten_gods": ten_gods,
+        "ten_god_distribution": distribution,
+        "dominant_gods": dominant,
+        "pattern_type": pattern_type,
+        "pattern_quality": pattern_quality,
+        "month_commander": month_god,
+    }
+
+
+def verify_against_calculator(
+    calendar_datas: List[Dict],
+    batch: Optional[Dict[str, np.ndarray]] = None
+) -> List[str]:
+    """
+    將批次結果與 BaziCalculator.analyze 逐筆比對
+
+    Args:
+        calendar_datas: convert_to_lunar 結果的列表
+        batch: analyze_batch 的結果（None 表示在此計算）
+
+    Returns:
+        差異描述列表，空列表表示完全一致
+    """
+    if batch is None:
+        batch = analyze_batch(*codes_from_calendar(calendar_datas))
+
+    differences = []
+    for i, calendar_data in enumerate(calendar_datas):
+        result = BaziCalculator(calendar_data).analyze(include_luck_pillars=False, use_cache=False)
+        wuxing = result["wuxing_analysis"]
+        ten_gods = result["ten_gods_analysis"]
+        labels = WUXING_LABELS
+
+        expected = {
+            "counts": wuxing["counts"],
+            "total": wuxing["total"],
+            "average": wuxing["average"],
+            "missing": wuxing["missing"],
+            "weak": wuxing["weak"],
+            "strong": wuxing["strong"],
+            "balance_score": wuxing["balance_score"],
+            "strength": (result["strength"]["level"], result["strength"]["score"]),
+            "ten_gods": [ten_gods[p] for p in ("year", "month", "day", "hour")],
+            "distribution": ten_gods["distribution"],
+            "dominant": ten_gods["dominant"],
+            "pattern": (result["pattern"]["type"], result["pattern"]["quality"],
+                        result["pattern"]["month_commander"]),
+        }
+        actual = {
+            "counts": {str(wx): int(c) for wx, c in zip(labels, batch["wuxing_counts"][i])},
+            "total": int(batch["wuxing_total"][i]),
+            "average": float(batch["wuxing_average"][i]),
+            "missing": [str(wx) for wx in labels[batch["wuxing_missing"][i]]],
+            "weak": [str(wx) for wx in labels[batch["wuxing_weak"][i]]],
+            "strong": [str(wx) for wx in labels[batch["wuxing_strong"][i]]],
+            "balance_score": float(batch["balance_score"][i]),
+            "strength": (str(batch["strength_label"][i]), float(batch["strength_score"][i])),
+            "ten_gods": [str(TEN_GOD_LABELS[g]) for g in batch["ten_gods"][i]],
+            "distribution": {str(god): int(c) for god, c in zip(TEN_GOD_LABELS, batch["ten_god_distribution"][i])},
+            "dominant": [str(TEN_GOD_LABELS[g]) for g in batch["dominant_gods"][i] if g >= 0],
+            "pattern": (str(batch["pattern_type"][i]), str(batch["pattern_quality"][i]),
+                        str(TEN_GOD_LABELS[batch["month_commander"][i]])),
+        }
+
+        for field, value in expected.items():
+            if actual[field] != value:
+                pillars = " ".join(
+                    calendar_data["four_pillars"][p]["pillar"] for p in ("year", "month", "day", "hour")
+                )
+                differences.append(f"#{i} {pillars} {field}: analyze={value} batch={actual[field]}")
+
+    return differences
@@ -15,22 +15,334 @@
 基於子平八字、滴天髓等經典命理理論
 """
 
-from typing import Dict, List, Tuple, Optional
-from collections import Counter
+import hashlib
+import json
+import logging
+import threading
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Union
 from .utils import (
     HEAVENLY_STEMS,
-    EARTHLY_BRANCHES,
     WuXing,
     TenGods,
-    BRANCH_HIDDEN_STEMS,
-    get_wuxing_from_stem,
-    get_wuxing_from_branch,
-    get_ten_god,
-    get_nayin,
-    get_stem_branch_by_index,
-    is_yin_yang,
+    STEM_CODE,
+    BRANCH_CODE,
+    STEM_YINYANG,
+    STEM_WUXING,
+    BRANCH_WUXING,
+    BRANCH_HIDDEN_STEM_CODES,
+    TEN_GOD_MATRIX,
+    JIAZI_TABLE,
+    get_nayin_by_index,
+    freeze,
+    thaw,
     FourPillars
 )
+from .chart_models import BaziChart, Pillar
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# 分析結果緩存 (Analysis Cache)
+# ============================================
+
+# 分析邏輯變更時遞增，使磁碟上的舊結果失效
+ANALYSIS_CACHE_VERSION = 1
+
+
+class BaziAnalysisCache:
+    """
+    八字分析結果緩存（內容定址、進程共享、線程安全）
+
+    analyze() 的結果只取決於八個干支、性別、是否計算大運與所選區塊，
+    因此以這些內容為鍵緩存。兩層結構：
+    1. 記憶體 LRU：命中時直接返回共享的唯讀結果
+    2. 磁碟（可選）：以鍵的 SHA-256 為檔名的 JSON，跨進程、跨重啟共用
+
+    緩存中的結果為 FrozenDict/FrozenList；analyze() 預設返回可修改的副本（見 frozen 參數）。
+    """
+
+    def __init__(self, maxsize: int = 4096, disk_dir: Optional[Path] = None):
+        """
+        Args:
+            maxsize: 記憶體中最多緩存的命盤數量
+            disk_dir: 磁碟緩存目錄（None 表示停用磁碟層）
+        """
+        self.maxsize = maxsize
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_errors = 0
+
+    @staticmethod
+    def make_key(
+        pillars: Tuple[str, ...],
+        gender: str,
+        include_luck_pillars: bool,
+        sections: Optional[Tuple[str, ...]] = None
+    ) -> str:
+        """
+        由命盤內容計算緩存鍵
+
+        Args:
+            pillars: 年月日時的天干地支（共 8 個字）
+            gender: 性別
+            include_luck_pillars: 是否包含大運
+            sections: 只計算部分區塊時的區塊名稱（None 表示完整分析）
+
+        Returns:
+            SHA-256 十六進位字串
+        """
+        content = f"v{ANALYSIS_CACHE_VERSION}|{''.join(pillars)}|{gender}|{int(include_luck_pillars)}"
+        if sections is not None:
+            content += f"|{','.join(sections)}"
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, loader: Callable[[], Dict]) -> Dict:
+        """
+        獲取分析結果，兩層皆未命中時呼叫 loader 計算並寫入
+
+        Args:
+            key: make_key() 產生的緩存鍵
+            loader: 未命中時用於計算分析結果的函數
+
+        Returns:
+            唯讀的分析結果（多個呼叫端共享同一物件）
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+        result = self._read_disk(key)
+        if result is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            with self._lock:
+                self.misses += 1
+            result = freeze(loader())
+            self._write_disk(key, result)
+
+        with self._lock:
+            # 並發計算同一命盤時保留先寫入者，確保共享同一物件
+            result = self._entries.setdefault(key, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return result
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[Dict]:
+        if self.disk_dir is None:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return freeze(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"八字緩存檔讀取失敗，重新計算: {path} ({e})")
+            with self._lock:
+                self.disk_errors += 1
+            return None
+
+    def _write_disk(self, key: str, result: Dict):
+        if self.disk_dir is None:
+            return
+
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"八字緩存檔寫入失敗: {path} ({e})")
+            with self._lock:
+                self.disk_errors += 1
+
+    def stats(self) -> Dict:
+        """獲取緩存統計（記憶體命中、磁碟命中、未命中、命中率、當前大小）"""
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "disk_dir": str(self.disk_dir) if self.disk_dir is not None else None,
+                "disk_errors": self.disk_errors
+            }
+
+    def clear(self):
+        """清空記憶體層並重置統計（磁碟層保留）"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+            self.disk_errors = 0
+
+
+# 進程共享的八字分析緩存
+_analysis_cache = BaziAnalysisCache()
+
+
+# ============================================
+# 格局判斷表 (Pattern Table)
+# ============================================
+
+# 月干十神 → (格局類型, 格局品質)，其餘為普通格局
+PATTERN_BY_MONTH_GOD: Dict[TenGods, Tuple[str, str]] = {
+    TenGods.ZHENG_GUAN: ("正官格", "良好"),
+    TenGods.ZHENG_CAI: ("正財格", "良好"),
+    TenGods.ZHENG_YIN: ("正印格", "良好"),
+    TenGods.SHI_SHEN: ("食神格", "良好"),
+}
+DEFAULT_PATTERN: Tuple[str, str] = ("普通格局", "中等")
+
+
+# ============================================
+# 延遲分析結果 (Lazy Analysis)
+# ============================================
+
+# 分析結果的區塊（完整分析的輸出順序）
+ANALYSIS_SECTIONS: Tuple[str, ...] = (
+    "basic_chart",
+    "wuxing_analysis",
+    "ten_gods_analysis",
+    "hidden_stems",
+    "pattern",
+    "yongshen",
+    "strength",
+    "luck_pillars",
+    "destiny_features",
+)
+
+
+def normalize_sections(sections: Iterable[str]) -> Tuple[str, ...]:
+    """
+    檢查區塊名稱並依 ANALYSIS_SECTIONS 的順序去重排列
+
+    Args:
+        sections: 區塊名稱（可為單一字串）
+
+    Returns:
+        排序後的區塊名稱
+
+    Raises:
+        ValueError: 含有未知的區塊名稱
+    """
+    if isinstance(sections, str):
+        sections = (sections,)
+    requested = set(sections)
+    unknown = requested.difference(ANALYSIS_SECTIONS)
+    if unknown:
+        raise ValueError(f"未知的八字分析區塊: {', '.join(sorted(unknown))}")
+    return tuple(name for name in ANALYSIS_SECTIONS if name in requested)
+
+
+class BaziAnalysis(Mapping):
+    """
+    延遲計算的八字分析結果
+
+    以 dict 的方式讀取，各區塊在第一次存取時才計算並記住結果；
+    區塊之間共用的中間結果（如五行分析）只計算一次。
+    例如只讀取 strength 時僅會計算五行分析與身強弱，不排大運、不解讀命運特徵。
+    """
+
+    def __init__(self, calculator: "BaziCalculator", gender: str = "男", include_luck_pillars: bool = True):
+        """
+        Args:
+            calculator: 八字計算器
+            gender: 性別（"男" 或 "女"）
+            include_luck_pillars: 是否包含大運（否則 luck_pillars 為 None）
+        """
+        self._calculator = calculator
+        self.gender = gender
+        self.include_luck_pillars = include_luck_pillars
+        self._sections: Dict = {}
+
+    def __getitem__(self, name: str):
+        if name not in self._sections:
+            if name not in ANALYSIS_SECTIONS:
+                raise KeyError(name)
+            self._sections[name] = getattr(self, f"_compute_{name}")()
+        return self._sections[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(ANALYSIS_SECTIONS)
+
+    def __len__(self) -> int:
+        return len(ANALYSIS_SECTIONS)
+
+    def is_computed(self, name: str) -> bool:
+        """檢查區塊是否已計算"""
+        return name in self._sections
+
+    def to_dict(self, sections: Optional[Iterable[str]] = None) -> Dict:
+        """
+        計算並返回指定區塊（預設全部）的普通 dict
+
+        Args:
+            sections: 區塊名稱（None 表示全部）
+
+        Returns:
+            {區塊名稱: 分析結果}，依 ANALYSIS_SECTIONS 的順序
+        """
+        names = ANALYSIS_SECTIONS if sections is None else normalize_sections(sections)
+        return {name: self[name] for name in names}
+
+    def _compute_basic_chart(self) -> Dict:
+        return self._calculator._get_basic_chart()
+
+    def _compute_wuxing_analysis(self) -> Dict:
+        return self._calculator._analyze_wuxing()
+
+    def _compute_ten_gods_analysis(self) -> Dict:
+        return self._calculator._analyze_ten_gods()
+
+    def _compute_hidden_stems(self) -> Dict:
+        return self._calculator._analyze_hidden_stems()
+
+    def _compute_pattern(self) -> Dict:
+        return self._calculator._analyze_pattern()
+
+    def _compute_yongshen(self) -> Dict:
+        return self._calculator._analyze_yongshen(self["wuxing_analysis"])
+
+    def _compute_strength(self) -> Dict:
+        return self._calculator._calculate_strength(self["wuxing_analysis"])
+
+    def _compute_luck_pillars(self) -> Optional[List[Dict]]:
+        if not self.include_luck_pillars:
+            return None
+        birth_date = self._calculator.calendar_data["gregorian"]["datetime"]
+        return self._calculator._calculate_luck_pillars(self.gender, birth_date)
+
+    def _compute_destiny_features(self) -> Dict:
+        return self._calculator._analyze_destiny_features(
+            self["wuxing_analysis"],
+            self["ten_gods_analysis"],
+            self["strength"]
+        )
 
 
 class BaziCalculator:
@@ -63,117 +375,89 @@ class BaziCalculator:
         # 日主（命主）
         self.day_master = self.day_stem
 
-    def analyze(self, gender: str = "男", include_luck_pillars: bool = True) -> Dict:
+        # 整數編碼（年、月、日、時），內部計算一律查表
+        self._stem_codes = tuple(STEM_CODE[s] for s in (
+            self.year_stem, self.month_stem, self.day_stem, self.hour_stem
+        ))
+        self._branch_codes = tuple(BRANCH_CODE[b] for b in (
+            self.year_branch, self.month_branch, self.day_branch, self.hour_branch
+        ))
+        self._day_code = self._stem_codes[2]
+
+    def analyze(
+        self,
+        gender: str = "男",
+        include_luck_pillars: bool = True,
+        use_cache: bool = True,
+        sections: Optional[Iterable[str]] = None,
+        frozen: bool = False
+    ) -> Dict:
         """
         完整八字分析
 
+        相同命盤（八字、性別、是否含大運、所選區塊）的結果由進程共享緩存提供，
+        預設返回一般 dict/list 的副本，呼叫端可自由加入欄位或修改。
+
         Args:
             gender: 性別（"男" 或 "女"）
             include_luck_pillars: 是否包含大運分析
+            use_cache: 是否使用分析結果緩存（見 BaziAnalysisCache）
+            sections: 只計算並返回這些區塊（見 ANALYSIS_SECTIONS），None 表示完整分析
+            frozen: 直接返回緩存中共享的唯讀結果（FrozenDict/FrozenList，省去複製；
+                只讀取結果的批次呼叫端使用）
 
         Returns:
-            完整的八字分析結果
+            完整（或所選區塊）的八字分析結果
         """
-        # 1. 基本命盤
-        basic_chart = self._get_basic_chart()
+        if sections is not None:
+            sections = normalize_sections(sections)
 
-        # 2. 五行統計
-        wuxing_analysis = self._analyze_wuxing()
+        if not use_cache:
+            return self.lazy_analyze(gender, include_luck_pillars).to_dict(sections)
 
-        # 3. 十神分析
-        ten_gods_analysis = self._analyze_ten_gods()
-
-        # 4. 地支藏干
-        hidden_stems = self._analyze_hidden_stems()
+        pillars = (
+            self.year_stem, self.year_branch,
+            self.month_stem, self.month_branch,
+            self.day_stem, self.day_branch,
+            self.hour_stem, self.hour_branch
+        )
+        key = _analysis_cache.make_key(pillars, gender, include_luck_pillars, sections)
+        result = _analysis_cache.get(
+            key, lambda: self.lazy_analyze(gender, include_luck_pillars).to_dict(sections)
+        )
+        return result if frozen else thaw(result)
 
-        # 5. 格局判斷
-        pattern_analysis = self._analyze_pattern()
+    def lazy_analyze(self, gender: str = "男", include_luck_pillars: bool = True) -> BaziAnalysis:
+        """
+        延遲八字分析（不經緩存）
 
-        # 6. 用神分析
-        yongshen_analysis = self._analyze_yongshen(wuxing_analysis)
+        返回的結果在讀取各區塊時才計算，適合只需要少數區塊、
+        但事先不確定需要哪些區塊的呼叫端。
 
-        # 7. 身強身弱
-        strength = self._calculate_strength(wuxing_analysis)
+        Args:
+            gender: 性別（"男" 或 "女"）
+            include_luck_pillars: 是否包含大運分析
 
-        # 8. 大運（如果需要）
-        luck_pillars = None
-        if include_luck_pillars:
-            birth_date = self.calendar_data["gregorian"]["datetime"]
-            luck_pillars = self._calculate_luck_pillars(gender, birth_date)
+        Returns:
+            BaziAnalysis（可當作唯讀 dict 使用）
+        """
+        return BaziAnalysis(self, gender, include_luck_pillars)
 
-        # 9. 命運特徵
-        destiny_features = self._analyze_destiny_features(
-            wuxing_analysis,
-            ten_gods_analysis,
-            strength
-        )
+    def chart(self) -> BaziChart:
+        """
+        四柱模型（只保存干支編碼）
 
-        return {
-            "basic_chart": basic_chart,
-            "wuxing_analysis": wuxing_analysis,
-            "ten_gods_analysis": ten_gods_analysis,
-            "hidden_stems": hidden_stems,
-            "pattern": pattern_analysis,
-            "yongshen": yongshen_analysis,
-            "strength": strength,
-            "luck_pillars": luck_pillars,
-            "destiny_features": destiny_features
-        }
+        與 analyze() 的 basic_chart 內容相同（chart().to_dict()），
+        但以緊湊的 NamedTuple 保存
+        """
+        return BaziChart(*(
+            Pillar(stem_code, branch_code)
+            for stem_code, branch_code in zip(self._stem_codes, self._branch_codes)
+        ))
 
     def _get_basic_chart(self) -> Dict:
         """獲取基本四柱資訊"""
-        return {
-            "year": {
-                "pillar": f"{self.year_stem}{self.year_branch}",
-                "stem": self.year_stem,
-                "branch": self.year_branch,
-                "stem_wuxing": get_wuxing_from_stem(self.year_stem).value,
-                "branch_wuxing": get_wuxing_from_branch(self.year_branch).value,
-                "nayin": get_nayin(self.year_stem, self.year_branch),
-                "yinyang": {
-                    "stem": is_yin_yang(self.year_stem),
-                    "branch": is_yin_yang(self.year_branch)
-                }
-            },
-            "month": {
-                "pillar": f"{self.month_stem}{self.month_branch}",
-                "stem": self.month_stem,
-                "branch": self.month_branch,
-                "stem_wuxing": get_wuxing_from_stem(self.month_stem).value,
-                "branch_wuxing": get_wuxing_from_branch(self.month_branch).value,
-                "nayin": get_nayin(self.month_stem, self.month_branch),
-                "yinyang": {
-                    "stem": is_yin_yang(self.month_stem),
-                    "branch": is_yin_yang(self.month_branch)
-                }
-            },
-            "day": {
-                "pillar": f"{self.day_stem}{self.day_branch}",
-                "stem": self.day_stem,
-                "branch": self.day_branch,
-                "stem_wuxing": get_wuxing_from_stem(self.day_stem).value,
-                "branch_wuxing": get_wuxing_from_branch(self.day_branch).value,
-                "nayin": get_nayin(self.day_stem, self.day_branch),
-                "yinyang": {
-                    "stem": is_yin_yang(self.day_stem),
-                    "branch": is_yin_yang(self.day_branch)
-                }
-            },
-            "hour": {
-                "pillar": f"{self.hour_stem}{self.hour_branch}",
-                "stem": self.hour_stem,
-                "branch": self.hour_branch,
-                "stem_wuxing": get_wuxing_from_stem(self.hour_stem).value,
-                "branch_wuxing": get_wuxing_from_branch(self.hour_branch).value,
-                "nayin": get_nayin(self.hour_stem, self.hour_branch),
-                "yinyang": {
-                    "stem": is_yin_yang(self.hour_stem),
-                    "branch": is_yin_yang(self.hour_branch)
-                }
-            },
-            "day_master": self.day_master,
-            "day_master_wuxing": get_wuxing_from_stem(self.day_master).value
-        }
+        return self.chart().to_dict()
 
     def _analyze_wuxing(self) -> Dict:
         """
@@ -183,18 +467,16 @@ class BaziCalculator:
             五行分佈與強弱分析
         """
         # 統計天干五行
-        stems = [self.year_stem, self.month_stem, self.day_stem, self.hour_stem]
-        stem_wuxing = [get_wuxing_from_stem(s) for s in stems]
+        stem_wuxing = [STEM_WUXING[code] for code in self._stem_codes]
 
         # 統計地支五行
-        branches = [self.year_branch, self.month_branch, self.day_branch, self.hour_branch]
-        branch_wuxing = [get_wuxing_from_branch(b) for b in branches]
+        branch_wuxing = [BRANCH_WUXING[code] for code in self._branch_codes]
 
         # 統計藏干五行
         hidden_wuxing = []
-        for branch in branches:
-            for hidden_stem, _ in BRANCH_HIDDEN_STEMS[branch]:
-                hidden_wuxing.append(get_wuxing_from_stem(hidden_stem))
+        for branch_code in self._branch_codes:
+            for hidden_code, _ in BRANCH_HIDDEN_STEM_CODES[branch_code]:
+                hidden_wuxing.append(STEM_WUXING[hidden_code])
 
         # 綜合統計
         all_wuxing = stem_wuxing + branch_wuxing + hidden_wuxing
@@ -227,7 +509,8 @@ class BaziCalculator:
             "balance_score": self._calculate_balance_score(wuxing_count)
         }
 
-    def _calculate_balance_score(self, wuxing_count: Dict) -> float:
+    @staticmethod
+    def _calculate_balance_score(wuxing_count: Dict) -> float:
         """
         計算五行平衡度（0-1，1為完全平衡）
         """
@@ -252,10 +535,11 @@ class BaziCalculator:
             十神配置與解讀
         """
         # 計算各柱的十神
-        year_god = get_ten_god(self.day_stem, self.year_stem)
-        month_god = get_ten_god(self.day_stem, self.month_stem)
+        ten_gods = TEN_GOD_MATRIX[self._day_code]
+        year_god = ten_gods[self._stem_codes[0]]
+        month_god = ten_gods[self._stem_codes[1]]
         day_god = TenGods.BI_JIAN  # 日柱天干就是日主，必為比肩
-        hour_god = get_ten_god(self.day_stem, self.hour_stem)
+        hour_god = ten_gods[self._stem_codes[3]]
 
         # 統計十神分佈
         gods = [year_god, month_god, hour_god]  # 不包含日主
@@ -308,20 +592,16 @@ class BaziCalculator:
     def _analyze_hidden_stems(self) -> Dict:
         """分析地支藏干"""
         hidden_analysis = {}
+        ten_gods = TEN_GOD_MATRIX[self._day_code]
 
-        for position, branch in [
-            ("year", self.year_branch),
-            ("month", self.month_branch),
-            ("day", self.day_branch),
-            ("hour", self.hour_branch)
-        ]:
+        for position, branch_code in zip(("year", "month", "day", "hour"), self._branch_codes):
             hidden = []
-            for stem, days in BRANCH_HIDDEN_STEMS[branch]:
+            for stem_code, days in BRANCH_HIDDEN_STEM_CODES[branch_code]:
                 hidden.append({
-                    "stem": stem,
+                    "stem": HEAVENLY_STEMS[stem_code],
                     "days": days,
-                    "wuxing": get_wuxing_from_stem(stem).value,
-                    "ten_god": get_ten_god(self.day_stem, stem).value
+                    "wuxing": STEM_WUXING[stem_code].value,
+                    "ten_god": ten_gods[stem_code].value
                 })
             hidden_analysis[position] = hidden
 
@@ -337,24 +617,9 @@ class BaziCalculator:
         # 這是簡化版的格局判斷
         # 實際八字格局判斷非常複雜，需要考慮月令、透干、會局等多種因素
 
-        month_god = get_ten_god(self.day_stem, self.month_stem)
-
-        pattern_type = "普通格局"
-        pattern_quality = "中等"
-
-        # 基本格局判斷
-        if month_god == TenGods.ZHENG_GUAN:
-            pattern_type = "正官格"
-            pattern_quality = "良好"
-        elif month_god == TenGods.ZHENG_CAI:
-            pattern_type = "正財格"
-            pattern_quality = "良好"
-        elif month_god == TenGods.ZHENG_YIN:
-            pattern_type = "正印格"
-            pattern_quality = "良好"
-        elif month_god == TenGods.SHI_SHEN:
-            pattern_type = "食神格"
-            pattern_quality = "良好"
+        month_god = TEN_GOD_MATRIX[self._day_code][self._stem_codes[1]]
+
+        pattern_type, pattern_quality = PATTERN_BY_MONTH_GOD.get(month_god, DEFAULT_PATTERN)
 
         return {
             "type": pattern_type,
@@ -373,7 +638,7 @@ class BaziCalculator:
         Returns:
             用神、喜神、忌神分析
         """
-        day_master_wuxing = get_wuxing_from_stem(self.day_master)
+        day_master_wuxing = STEM_WUXING[self._day_code]
         strong_wx = wuxing_analysis["strong"]
         weak_wx = wuxing_analysis["weak"]
         missing_wx = wuxing_analysis["missing"]
@@ -479,7 +744,7 @@ class BaziCalculator:
         Returns:
             身強弱評估
         """
-        day_master_wuxing = get_wuxing_from_stem(self.day_master)
+        day_master_wuxing = STEM_WUXING[self._day_code]
         day_master_count = wuxing_analysis["counts"][day_master_wuxing.value]
         average = wuxing_analysis["average"]
 
@@ -513,7 +778,7 @@ class BaziCalculator:
         """
         # 確定順行還是逆行
         # 陽男陰女順行，陰男陽女逆行
-        year_stem_yinyang = is_yin_yang(self.year_stem)
+        year_stem_yinyang = STEM_YINYANG[self._stem_codes[0]]
 
         if gender == "男":
             forward = (year_stem_yinyang == "陽")
@@ -525,8 +790,7 @@ class BaziCalculator:
         start_age = 3
 
         # 從月柱開始推算大運
-        month_pillar_index = HEAVENLY_STEMS.index(self.month_stem) * 6 + \
-                            EARTHLY_BRANCHES.index(self.month_branch)
+        month_pillar_index = self._stem_codes[1] * 6 + self._branch_codes[1]
 
         luck_pillars = []
         for i in range(8):  # 計算8步大運（80年）
@@ -538,17 +802,17 @@ class BaziCalculator:
             else:
                 luck_index = (month_pillar_index - i - 1) % 60
 
-            stem, branch = get_stem_branch_by_index(luck_index)
+            jiazi = JIAZI_TABLE[luck_index]
 
             luck_pillars.append({
                 "sequence": i + 1,
                 "age_range": f"{age_start}-{age_end}歲",
-                "pillar": f"{stem}{branch}",
-                "stem": stem,
-                "branch": branch,
-                "stem_wuxing": get_wuxing_from_stem(stem).value,
-                "branch_wuxing": get_wuxing_from_branch(branch).value,
-                "nayin": get_nayin(stem, branch)
+                "pillar": jiazi.pillar,
+                "stem": jiazi.stem,
+                "branch": jiazi.branch,
+                "stem_wuxing": STEM_WUXING[jiazi.stem_code].value,
+                "branch_wuxing": BRANCH_WUXING[jiazi.branch_code].value,
+                "nayin": get_nayin_by_index(jiazi.index)
             })
 
         return luck_pillars
@@ -727,6 +991,40 @@ class BaziCalculator:
 # 便捷函數
 # ============================================
 
+def configure_bazi_cache(
+    maxsize: Optional[int] = None,
+    disk_dir: Union[str, Path, None, bool] = False
+) -> Dict:
+    """
+    調整進程共享的八字分析緩存
+
+    Args:
+        maxsize: 記憶體層上限（None 表示不變）
+        disk_dir: 磁碟緩存目錄；None 停用磁碟層，False 表示不變
+
+    Returns:
+        調整後的緩存統計
+    """
+    with _analysis_cache._lock:
+        if maxsize is not None:
+            _analysis_cache.maxsize = maxsize
+            while len(_analysis_cache._entries) > maxsize:
+                _analysis_cache._entries.popitem(last=False)
+        if disk_dir is not False:
+            _analysis_cache.disk_dir = Path(disk_dir) if disk_dir is not None else None
+    return _analysis_cache.stats()
+
+
+def get_bazi_cache_stats() -> Dict:
+    """獲取進程共享八字分析緩存的統計資訊"""
+    return _analysis_cache.stats()
+
+
+def clear_bazi_cache():
+    """清空進程共享八字分析緩存的記憶體層"""
+    _analysis_cache.clear()
+
+
 def quick_bazi_analysis(calendar_data: Dict, gender: str = "男") -> Dict:
     """
     快速八字分析
@@ -21,6 +21,7 @@ from .prompt_utils import (
     AnalysisTemplate
 )
 from .llm_analyzer import (
+    LLMRequest,
     get_llm_analyzer,
     construct_bazi_personality_prompt,
     construct_bazi_career_prompt
@@ -358,45 +359,52 @@ def interpret_personality(bazi_data: Dict) -> Dict:
     llm_analyzer = get_llm_analyzer()
 
     if llm_analyzer.is_available() and BAZI_SYSTEM_PROMPT:
-        # Construct LLM prompt
-        analysis_prompt = construct_bazi_personality_prompt(bazi_data)
-
-        # Try LLM analysis
-        llm_result = llm_analyzer.analyze_with_fallback(
-            system_prompt=BAZI_SYSTEM_PROMPT,
-            analysis_prompt=analysis_prompt,
-            fallback_func=_traditional_personality_analysis,
-            fallback_args=(bazi_data,),
-            min_length=300,
-            temperature=0.7,
-            max_tokens=4000
-        )
-
-        # If LLM returned rich analysis, package it
-        # Check if llm_result is a string (LLM success) or dict (fallback was used)
-        if isinstance(llm_result, str) and len(llm_result.replace(' ', '').replace('\n', '')) >= 300:
-            # Calculate confidence (LLM + good data quality = high confidence)
-            confidence = calculate_confidence_level(
-                consensus_indicators=1,  # Single method (BaZi only)
-                total_indicators=1,
-                data_quality=1.0,  # Assuming complete BaZi data
-                theoretical_support=0.9  # BaZi has strong theoretical support
-            )
-
-            # Return LLM result with traditional structure for compatibility
-            traditional_result = _traditional_personality_analysis(bazi_data)
-            traditional_result['llm_analysis'] = llm_result
-            traditional_result['confidence_level'] = confidence
-            traditional_result['analysis_method'] = 'LLM enhanced'
-            return traditional_result
-        elif isinstance(llm_result, dict):
-            # Fallback was already executed, return it directly
-            return llm_result
+        return llm_analyzer.run_request(personality_request(bazi_data))
 
     # Fallback to traditional analysis
     return _traditional_personality_analysis(bazi_data)
 
 
+def personality_request(bazi_data: Dict) -> Optional[LLMRequest]:
+    """
+    性格分析的LLM請求（可交給 LLMAnalyzer.analyze_many 與其他請求並行）
+
+    Returns:
+        LLMRequest，系統提示詞未載入時返回 None
+    """
+    if not BAZI_SYSTEM_PROMPT:
+        return None
+
+    return LLMRequest(
+        key='bazi_personality',
+        system_prompt=BAZI_SYSTEM_PROMPT,
+        analysis_prompt=construct_bazi_personality_prompt(bazi_data),
+        fallback_func=_traditional_personality_analysis,
+        fallback_args=(bazi_data,),
+        min_length=300,
+        on_success=lambda llm_result: _llm_enhanced_result(_traditional_personality_analysis, bazi_data, llm_result),
+        llm_kwargs={'temperature': 0.7, 'max_tokens': 4000}
+    )
+
+
+def _llm_enhanced_result(traditional_func, bazi_data: Dict, llm_result: str) -> Dict:
+    """將LLM分析附加到傳統分析結構（保持相容）"""
+    # Calculate confidence (LLM + good data quality = high confidence)
+    confidence = calculate_confidence_level(
+        consensus_indicators=1,  # Single method (BaZi only)
+        total_indicators=1,
+        data_quality=1.0,  # Assuming complete BaZi data
+        theoretical_support=0.9  # BaZi has strong theoretical support
+    )
+
+    # Return LLM result with traditional structure for compatibility
+    traditional_result = traditional_func(bazi_data)
+    traditional_result['llm_analysis'] = llm_result
+    traditional_result['confidence_level'] = confidence
+    traditional_result['analysis_method'] = 'LLM enhanced'
+    return traditional_result
+
+
 def _traditional_personality_analysis(bazi_data: Dict) -> Dict:
     """傳統八字性格分析（原有邏輯）"""
     day_master = bazi_data['basic_chart']['day']['stem']
@@ -713,39 +721,33 @@ def interpret_career(bazi_data: Dict) -> Dict:
     llm_analyzer = get_llm_analyzer()
 
     if llm_analyzer.is_available() and BAZI_SYSTEM_PROMPT:
-        analysis_prompt = construct_bazi_career_prompt(bazi_data)
-
-        llm_result = llm_analyzer.analyze_with_fallback(
-            system_prompt=BAZI_SYSTEM_PROMPT,
-            analysis_prompt=analysis_prompt,
-            fallback_func=_traditional_career_analysis,
-            fallback_args=(bazi_data,),
-            min_length=300,
-            temperature=0.7,
-            max_tokens=4000
-        )
-
-        # Check if llm_result is a string (LLM success) or dict (fallback was used)
-        if isinstance(llm_result, str) and len(llm_result.replace(' ', '').replace('\n', '')) >= 300:
-            confidence = calculate_confidence_level(
-                consensus_indicators=1,
-                total_indicators=1,
-                data_quality=1.0,
-                theoretical_support=0.9
-            )
-
-            traditional_result = _traditional_career_analysis(bazi_data)
-            traditional_result['llm_analysis'] = llm_result
-            traditional_result['confidence_level'] = confidence
-            traditional_result['analysis_method'] = 'LLM enhanced'
-            return traditional_result
-        elif isinstance(llm_result, dict):
-            # Fallback was already executed, return it directly
-            return llm_result
+        return llm_analyzer.run_request(career_request(bazi_data))
 
     return _traditional_career_analysis(bazi_data)
 
 
+def career_request(bazi_data: Dict) -> Optional[LLMRequest]:
+    """
+    事業分析的LLM請求（可交給 LLMAnalyzer.analyze_many 與其他請求並行）
+
+    Returns:
+        LLMRequest，系統提示詞未載入時返回 None
+    """
+    if not BAZI_SYSTEM_PROMPT:
+        return None
+
+    return LLMRequest(
+        key='bazi_career',
+        system_prompt=BAZI_SYSTEM_PROMPT,
+        analysis_prompt=construct_bazi_career_prompt(bazi_data),
+        fallback_func=_traditional_career_analysis,
+        fallback_args=(bazi_data,),
+        min_length=300,
+        on_success=lambda llm_result: _llm_enhanced_result(_traditional_career_analysis, bazi_data, llm_result),
+        llm_kwargs={'temperature': 0.7, 'max_tokens': 4000}
+    )
+
+
 def _traditional_career_analysis(bazi_data: Dict) -> Dict:
     """傳統八字事業分析"""
     day_stem = bazi_data.get('basic_chart', {}).get('day_pillar', {}).get('stem', '')
@@ -2089,6 +2091,8 @@ def _generate_preventive_measures(wuxing: Dict) -> List[str]:
 __all__ = [
     'interpret_personality',
     'interpret_career',
+    'personality_request',
+    'career_request',
     'interpret_wealth',
     'interpret_relationship',
     'interpret_health',
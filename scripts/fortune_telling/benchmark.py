@@ -0,0 +1,379 @@
+"""
+效能基準測試 (Benchmarks)
+========================
+
+量測命理計算熱點的執行速度，並輸出與基準實作的精度比較。
+
+用法（於 scripts 目錄執行）：
+    python -m fortune_telling.benchmark equation-of-time
+    python -m fortune_telling.benchmark equation-of-time --calls 50000 --start 1900 --end 2100
+    python -m fortune_telling.benchmark nayin
+    python -m fortune_telling.benchmark bazi-batch --charts 1000000
+    python -m fortune_telling.benchmark astrology-batch --charts 2000
+    python -m fortune_telling.benchmark transits
+    python -m fortune_telling.benchmark markdown --dir ../data/fortune-telling
+"""
+
+import argparse
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+import pytz
+
+
+def _time_calls(func: Callable, args: list, repeat: int = 3) -> float:
+    """重複執行並返回最快一輪的每次呼叫耗時（微秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for arg in args:
+            func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best / len(args) * 1_000_000
+
+
+def _time_once(func: Callable, repeat: int = 3) -> float:
+    """重複執行並返回最快一輪的耗時（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# ============================================
+# 均時差 (Equation of Time)
+# ============================================
+
+def _benchmark_equation_of_time(args: argparse.Namespace) -> int:
+    from .equation_of_time import (
+        EquationOfTimeMethod,
+        accuracy_report,
+        format_accuracy_report,
+        get_equation_of_time_provider,
+    )
+
+    rng = np.random.default_rng(0)
+    base = datetime(args.start, 1, 1, tzinfo=pytz.utc)
+    span_minutes = int((datetime(args.end + 1, 1, 1) - datetime(args.start, 1, 1)).total_seconds() // 60)
+    offsets = rng.integers(0, span_minutes, size=args.calls)
+    moments = [base + timedelta(minutes=int(m)) for m in offsets]
+    utc_us = np.array(
+        [(m.replace(tzinfo=None) - datetime(1970, 1, 1)) // timedelta(microseconds=1) for m in moments],
+        dtype=np.int64
+    )
+
+    providers = [get_equation_of_time_provider(method) for method in EquationOfTimeMethod]
+
+    print(f"均時差效能（{args.calls} 次呼叫，{args.start}–{args.end}）")
+    print(f"{'方式':<10}{'單筆(µs/次)':>14}{'批次(µs/筆)':>14}{'單筆加速':>10}")
+    timings = {}
+    for provider in providers:
+        per_call = _time_calls(provider.minutes, moments)
+        per_item = _time_once(lambda: provider.minutes_many(utc_us)) / args.calls * 1_000_000
+        timings[provider.method] = (per_call, per_item)
+
+    ephem_per_call = timings[EquationOfTimeMethod.EPHEM][0]
+    for method, (per_call, per_item) in timings.items():
+        print(f"{method.value:<10}{per_call:>14.2f}{per_item:>14.3f}{ephem_per_call / per_call:>9.1f}x")
+
+    print()
+    print(f"均時差精度（相對 ephem，取樣間隔 {args.step_hours} 小時）")
+    reports = [
+        accuracy_report(provider, args.start, args.end, args.step_hours)
+        for provider in providers
+        if provider.method != EquationOfTimeMethod.EPHEM
+    ]
+    print(format_accuracy_report(reports))
+    return 0
+
+
+# ============================================
+# 納音查詢 (Nayin Lookup)
+# ============================================
+
+def _benchmark_nayin(args: argparse.Namespace) -> int:
+    from .utils import (
+        HEAVENLY_STEMS,
+        EARTHLY_BRANCHES,
+        NAYIN_TABLE,
+        JIAZI_INDEX,
+        STEM_CODE,
+        BRANCH_CODE,
+        get_nayin,
+        get_nayin_by_index,
+    )
+
+    def linear_scan(stem: str, branch: str) -> str:
+        # 舊版 get_nayin：逐一掃描 30 組納音
+        pillar = stem + branch
+        for key, value in NAYIN_TABLE.items():
+            if pillar in key:
+                return value
+        return "未知"
+
+    pairs = [(stem, branch) for stem in HEAVENLY_STEMS for branch in EARTHLY_BRANCHES]
+    mismatches = [
+        (stem, branch) for stem, branch in pairs
+        if len({
+            linear_scan(stem, branch),
+            get_nayin(stem, branch),
+            get_nayin_by_index(JIAZI_INDEX[STEM_CODE[stem]][BRANCH_CODE[branch]]),
+        }) != 1
+    ]
+    if mismatches:
+        print(f"❌ 納音查詢結果不一致: {mismatches}")
+        return 1
+
+    calls = [pairs[i % len(pairs)] for i in range(args.calls)]
+    indices = [JIAZI_INDEX[STEM_CODE[stem]][BRANCH_CODE[branch]] for stem, branch in calls]
+
+    scan = _time_calls(lambda pair: linear_scan(*pair), calls)
+    by_pillar = _time_calls(lambda pair: get_nayin(*pair), calls)
+    by_index = _time_calls(get_nayin_by_index, indices)
+
+    print(f"納音查詢效能（{args.calls} 次呼叫，120 種干支組合結果一致）")
+    print(f"{'方式':<24}{'µs/次':>10}{'加速':>8}")
+    for label, per_call in [
+        ("舊版線性掃描", scan),
+        ("get_nayin(干, 支)", by_pillar),
+        ("get_nayin_by_index(序號)", by_index),
+    ]:
+        print(f"{label:<24}{per_call:>10.3f}{scan / per_call:>7.1f}x")
+    return 0
+
+
+# ============================================
+# 八字批次計算 (BaZi Batch Engine)
+# ============================================
+
+def _benchmark_bazi_batch(args: argparse.Namespace) -> int:
+    from .bazi_batch import analyze_batch, verify_against_calculator
+    from .bazi_calculator import BaziCalculator
+    from .utils import HEAVENLY_STEMS, EARTHLY_BRANCHES
+
+    rng = np.random.default_rng(args.seed)
+
+    # 驗證語料：隨機干支組合（含陰陽不配者），逐筆與 analyze 比對
+    stems = rng.integers(0, 10, size=(args.verify, 4))
+    branches = rng.integers(0, 12, size=(args.verify, 4))
+    positions = ("year", "month", "day", "hour")
+    corpus = [
+        {"four_pillars": {
+            position: {
+                "stem": HEAVENLY_STEMS[s],
+                "branch": EARTHLY_BRANCHES[b],
+                "pillar": HEAVENLY_STEMS[s] + EARTHLY_BRANCHES[b],
+            }
+            for position, s, b in zip(positions, stem_row, branch_row)
+        }}
+        for stem_row, branch_row in zip(stems, branches)
+    ]
+    differences = verify_against_calculator(corpus, analyze_batch(stems, branches))
+    if differences:
+        for line in differences[:20]:
+            print(f"❌ {line}")
+        print(f"\n共 {len(differences)} 筆差異")
+        return 1
+    print(f"✅ 批次結果與 BaziCalculator.analyze 一致（{args.verify} 筆驗證語料）")
+
+    # 吞吐量
+    stems = rng.integers(0, 10, size=(args.charts, 4))
+    branches = rng.integers(0, 12, size=(args.charts, 4))
+    analyze_batch(stems[:1], branches[:1])  # 建立分數查找表
+    elapsed = _time_once(lambda: analyze_batch(stems, branches))
+
+    sample = corpus[:min(len(corpus), 2000)]
+    per_chart = _time_once(lambda: [
+        BaziCalculator(c).analyze(include_luck_pillars=False, use_cache=False) for c in sample
+    ], repeat=1) / len(sample)
+
+    print(f"批次：{args.charts} 筆 {elapsed:.3f}s（{args.charts / elapsed:,.0f} 筆/秒）")
+    print(f"逐筆 analyze：{1 / per_chart:,.0f} 筆/秒（加速 {per_chart * args.charts / elapsed:.0f}x）")
+    return 0
+
+
+# ============================================
+# 占星批次計算 (Astrology Batch Engine)
+# ============================================
+
+def _benchmark_astrology_batch(args: argparse.Namespace) -> int:
+    import json
+
+    from .astrology_batch import AstrologyBatch
+    from .astrology_calculator import AstrologyCalculator
+
+    rng = np.random.default_rng(args.seed)
+    base = datetime(1900, 1, 1, tzinfo=pytz.utc)
+    seconds = rng.integers(0, 200 * 365 * 86400, size=args.charts)
+    birth_datetimes = [base + timedelta(seconds=int(s)) for s in seconds]
+    latitudes = rng.uniform(-66, 66, size=args.charts).tolist()
+    longitudes = rng.uniform(-180, 180, size=args.charts).tolist()
+
+    batch = AstrologyBatch()
+    results = []
+    per_chart = _time_once(lambda: results.append([
+        AstrologyCalculator(dt, lat, lon).analyze()
+        for dt, lat, lon in zip(birth_datetimes, latitudes, longitudes)
+    ]), repeat=1) / args.charts
+    batch_results = []
+    per_batch = _time_once(
+        lambda: batch_results.append(batch.analyze_many(birth_datetimes, latitudes, longitudes)), repeat=1
+    ) / args.charts
+    per_columns = _time_once(lambda: batch.compute(birth_datetimes, latitudes, longitudes), repeat=1) / args.charts
+
+    mismatches = sum(
+        json.dumps(a, ensure_ascii=False) != json.dumps(b, ensure_ascii=False)
+        for a, b in zip(results[0], batch_results[0])
+    )
+    if mismatches:
+        print(f"❌ {mismatches} 筆批次結果與 AstrologyCalculator.analyze 不一致")
+        return 1
+
+    print(f"占星批次效能（{args.charts} 張星盤，星曆：{batch.ephemeris}，結果與逐筆 analyze 一致）")
+    print(f"{'方式':<28}{'µs/張':>10}{'加速':>8}")
+    for label, seconds_per_chart in [
+        ("逐筆 AstrologyCalculator", per_chart),
+        ("AstrologyBatch.analyze_many", per_batch),
+        ("AstrologyBatch.compute", per_columns),
+    ]:
+        print(f"{label:<28}{seconds_per_chart * 1e6:>10.1f}{per_chart / seconds_per_chart:>7.1f}x")
+    return 0
+
+
+# ============================================
+# 行運星曆 (Transit Table)
+# ============================================
+
+def _benchmark_transits(args: argparse.Namespace) -> int:
+    from .astrology_batch import AstrologyBatch
+    from .transits import load_table
+
+    table = load_table()
+    if table is None:
+        print("❌ 行星位置表不存在，請先執行 build_tables planet-positions")
+        return 1
+
+    rng = np.random.default_rng(0)
+    julian_days = rng.uniform(table.start_jd, table.end_jd, size=args.instants)
+    sample = julian_days[:min(args.instants, 2000)]
+
+    per_table = _time_once(lambda: table.planets(julian_days)) / len(julian_days)
+    per_swe = _time_once(lambda: AstrologyBatch().planets(sample), repeat=1) / len(sample)
+
+    start_jd = table.start_jd + 100 * 365.25
+    end_jd = start_jd + 30 * 365.25
+    roots = []
+    per_crossing = _time_once(lambda: roots.append(table.crossings("月亮", 0.0, start_jd, end_jd)))
+
+    print(f"行星位置查詢（{table.start_year}–{table.end_year}，取樣間隔 {table.step_days * 24:g} 小時）")
+    print(f"{'方式':<24}{'µs/時刻':>12}{'加速':>8}")
+    print(f"{'Swiss Ephemeris':<24}{per_swe * 1e6:>12.2f}{1.0:>7.1f}x")
+    print(f"{'預計算表插值':<24}{per_table * 1e6:>12.2f}{per_swe / per_table:>7.1f}x")
+    print()
+    print(f"月亮 30 年內經過 0° 的時刻：{len(roots[0])} 次，{per_crossing * 1e3:.2f} ms")
+    return 0
+
+
+# ============================================
+# Markdown 轉 HTML (Markdown Renderer)
+# ============================================
+
+DEFAULT_MARKDOWN_DIR = Path(__file__).resolve().parents[2] / "data" / "fortune-telling"
+
+
+def _benchmark_markdown(args: argparse.Namespace) -> int:
+    from .html_report_generator import MARKDOWN_STYLES
+    from .markdown_renderer import iter_markdown_file, markdown_to_html
+
+    def replace_chain(md_text: str) -> str:
+        # 舊版 _markdown_to_html：整份文件多次 replace，再以正規表達式處理粗體
+        html = md_text
+        html = html.replace('### ', '<h4>')
+        html = html.replace('\n##', '</h4>\n##')
+        html = html.replace('## ', '<h3>')
+        html = html.replace('\n#', '</h3>\n#')
+        html = html.replace('# ', '<h2>')
+        html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
+        html = html.replace('\n\n', '</p><p>')
+        html = html.replace('\n', '<br>')
+        return f'<p>{html}</p>'
+
+    paths = sorted(Path(args.dir).glob('*.md'))
+    if not paths:
+        print(f"❌ 找不到 Markdown 檔: {args.dir}")
+        return 1
+    texts = [path.read_text(encoding='utf-8') for path in paths]
+    total_mb = sum(len(text.encode('utf-8')) for text in texts) / 1e6
+
+    methods = [("舊版 replace 串接", lambda: [replace_chain(text) for text in texts])]
+    try:
+        import markdown
+        methods.append(("python-markdown", lambda: [
+            markdown.markdown(text, extensions=['extra', 'nl2br', 'tables']) for text in texts
+        ]))
+    except ImportError:
+        pass
+    methods.append(("markdown_renderer", lambda: [
+        markdown_to_html(text, heading_offset=1, styles=MARKDOWN_STYLES) for text in texts
+    ]))
+    methods.append(("markdown_renderer（逐行讀檔）", lambda: [
+        ''.join(iter_markdown_file(path, heading_offset=1, styles=MARKDOWN_STYLES)) for path in paths
+    ]))
+
+    print(f"Markdown 轉 HTML（{len(paths)} 個檔案，共 {total_mb:.2f} MB，{args.dir}）")
+    print(f"{'方式':<30}{'ms/輪':>10}{'MB/s':>10}")
+    for label, run in methods:
+        elapsed = _time_once(run, repeat=args.repeat)
+        print(f"{label:<30}{elapsed * 1e3:>10.2f}{total_mb / elapsed:>10.1f}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令列入口"""
+    parser = argparse.ArgumentParser(description='命理計算效能基準測試')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    parser_eot = subparsers.add_parser('equation-of-time', help='均時差各計算方式的速度與精度')
+    parser_eot.add_argument('--calls', type=int, default=20000, help='每種方式的呼叫次數')
+    parser_eot.add_argument('--start', type=int, default=1900, help='起始年份')
+    parser_eot.add_argument('--end', type=int, default=2100, help='結束年份（含）')
+    parser_eot.add_argument('--step-hours', type=float, default=73.0, help='精度取樣間隔（小時）')
+    parser_eot.set_defaults(handler=_benchmark_equation_of_time)
+
+    parser_nayin = subparsers.add_parser('nayin', help='納音查詢：線性掃描與序號查表')
+    parser_nayin.add_argument('--calls', type=int, default=200000, help='每種方式的呼叫次數')
+    parser_nayin.set_defaults(handler=_benchmark_nayin)
+
+    parser_batch = subparsers.add_parser('bazi-batch', help='八字批次引擎：驗證與吞吐量')
+    parser_batch.add_argument('--charts', type=int, default=1_000_000, help='吞吐量測試的命盤數')
+    parser_batch.add_argument('--verify', type=int, default=20000, help='逐筆驗證的命盤數')
+    parser_batch.add_argument('--seed', type=int, default=0, help='隨機種子')
+    parser_batch.set_defaults(handler=_benchmark_bazi_batch)
+
+    parser_astro = subparsers.add_parser('astrology-batch', help='占星批次引擎：驗證與吞吐量')
+    parser_astro.add_argument('--charts', type=int, default=2000, help='星盤數')
+    parser_astro.add_argument('--seed', type=int, default=0, help='隨機種子')
+    parser_astro.set_defaults(handler=_benchmark_astrology_batch)
+
+    parser_transits = subparsers.add_parser('transits', help='行星位置表：插值查詢與經過時刻搜尋')
+    parser_transits.add_argument('--instants', type=int, default=100000, help='查詢的時刻數')
+    parser_transits.set_defaults(handler=_benchmark_transits)
+
+    parser_markdown = subparsers.add_parser('markdown', help='Markdown 轉 HTML：舊版 replace 串接與單次掃描')
+    parser_markdown.add_argument('--dir', default=str(DEFAULT_MARKDOWN_DIR), help='Markdown 報告目錄')
+    parser_markdown.add_argument('--repeat', type=int, default=10, help='重複輪數（取最快一輪）')
+    parser_markdown.set_defaults(handler=_benchmark_markdown)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
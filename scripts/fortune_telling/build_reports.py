@@ -0,0 +1,441 @@
+"""
+報告批次建置 (Report Builder)
+============================
+
+模板或渲染程式更新後，重新產生整個目錄的 HTML 報告：
+1. 探索輸入：fortune_tell_*.json 輸出同名的 .generated.html（generate_html_report），
+   含 calculations.json 的 Markdown 分析目錄輸出該目錄下的 report.generated.html
+   （generate_html_from_markdown_files）。同名的 .html 是代理產生的最終報告，不會被覆寫；
+   只有計算結果（沒有 interpretation / synthesis）的 JSON 不建置
+2. 跳過已是最新的報告：輸出比所有輸入與渲染程式（模板、產生器）都新時直接跳過；
+   否則比對輸入內容與渲染程式的雜湊，與上次建置記錄相同時也跳過
+3. 以行程池並行渲染
+4. 每份報告先寫入暫存檔再 rename，建置記錄同樣原子寫入
+5. 輸出吞吐量摘要（報告數/秒、MB/秒）
+6. --minify 在可讀版旁另寫精簡版 *.min.html，--precompress 為各版本寫入 .gz / .br 副本
+   供伺服器直接送出（見 report_artifacts）
+
+建置記錄保存在各輸入目錄的 .build_reports.json，並記下建置選項：改變選項的報告會重建。
+輸出檔已存在但不在建置記錄中（不是本工具產生的）時不覆寫，除非指定 --force。
+
+用法（於 scripts 目錄執行）：
+    python -m fortune_telling.build_reports
+    python -m fortune_telling.build_reports ../data/fortune-telling --workers 8
+    python -m fortune_telling.build_reports ../data/fortune-telling --minify --precompress
+    python -m fortune_telling.build_reports ../data/fortune-telling/fortune_tell_Frank_20251029_105037.json --force
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .html_report_generator import MARKDOWN_SECTIONS, generate_html_from_markdown_files, generate_html_report
+from .report_artifacts import artifact_paths, stale_artifact_paths
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPORT_DIR = Path(__file__).resolve().parents[2] / "data" / "fortune-telling"
+MANIFEST_NAME = ".build_reports.json"
+# 與代理產生的最終報告（fortune_tell_*.html）區分
+GENERATED_SUFFIX = ".generated.html"
+MARKDOWN_REPORT_NAME = "report" + GENERATED_SUFFIX
+
+# 報告種類
+JSON_REPORT = "json"
+MARKDOWN_REPORT = "markdown"
+
+# 建置狀態
+BUILT = "built"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+_PACKAGE_DIR = Path(__file__).resolve().parent
+# 影響報告輸出的程式碼（模板另外依 templates/*.html 列入）
+_RENDERER_SOURCES = ("html_report_generator.py", "html_templates.py", "markdown_renderer.py", "report_artifacts.py")
+
+
+class ReportJob(NamedTuple):
+    """一份待建置的報告"""
+    kind: str                  # JSON_REPORT 或 MARKDOWN_REPORT
+    source: str                # JSON 檔或 Markdown 分析目錄
+    output: str                # 輸出 HTML 路徑
+    inputs: Tuple[str, ...]    # 影響輸出的所有輸入檔（依固定順序）
+    root: str                  # 建置記錄所在目錄
+
+
+class ReportResult(NamedTuple):
+    """單份報告的建置結果"""
+    job: ReportJob
+    status: str
+    digest: Optional[str] = None
+    input_bytes: int = 0
+    output_bytes: int = 0
+    error: Optional[str] = None
+    note: Optional[str] = None     # 未建置的原因
+
+
+class BuildSummary(NamedTuple):
+    """整批建置的結果"""
+    results: List[ReportResult]
+    elapsed: float
+    workers: int
+
+    def count(self, status: str) -> int:
+        return sum(1 for result in self.results if result.status == status)
+
+    @property
+    def input_bytes(self) -> int:
+        return sum(result.input_bytes for result in self.results if result.status == BUILT)
+
+    @property
+    def output_bytes(self) -> int:
+        return sum(result.output_bytes for result in self.results if result.status == BUILT)
+
+
+# ============================================
+# 探索輸入 (Discovery)
+# ============================================
+
+def _markdown_job(directory: Path, root: Path) -> ReportJob:
+    inputs = [directory / "calculations.json"]
+    inputs.extend(
+        directory / filename for filename, _, _ in MARKDOWN_SECTIONS
+        if (directory / filename).exists()
+    )
+    return ReportJob(
+        MARKDOWN_REPORT, str(directory), str(directory / MARKDOWN_REPORT_NAME),
+        tuple(str(path) for path in inputs), str(root)
+    )
+
+
+def _json_job(path: Path, root: Path) -> ReportJob:
+    output = path.with_name(path.stem + GENERATED_SUFFIX)
+    return ReportJob(JSON_REPORT, str(path), str(output), (str(path),), str(root))
+
+
+def discover_reports(paths: Iterable[str]) -> List[ReportJob]:
+    """
+    找出可建置的報告
+
+    Args:
+        paths: 目錄（遞迴搜尋）、fortune_tell_*.json 檔或 Markdown 分析目錄
+
+    Returns:
+        ReportJob 列表（依輸出路徑排序，不重複）
+
+    Raises:
+        ValueError: 路徑不存在或不是可建置的輸入
+    """
+    jobs: Dict[str, ReportJob] = {}
+    for raw in paths:
+        path = Path(raw).resolve()
+        if path.is_file():
+            if path.name == "calculations.json":
+                job = _markdown_job(path.parent, path.parent)
+            elif path.suffix == ".json":
+                job = _json_job(path, path.parent)
+            else:
+                raise ValueError(f"不是可建置的輸入: {raw}")
+            jobs[job.output] = job
+        elif path.is_dir():
+            for json_path in path.rglob("fortune_tell_*.json"):
+                job = _json_job(json_path, path)
+                jobs.setdefault(job.output, job)
+            for calculations in path.rglob("calculations.json"):
+                job = _markdown_job(calculations.parent, path)
+                jobs.setdefault(job.output, job)
+        else:
+            raise ValueError(f"路徑不存在: {raw}")
+    return [jobs[output] for output in sorted(jobs)]
+
+
+# ============================================
+# 是否需要重建 (Up-to-date Check)
+# ============================================
+
+def _renderer_files() -> List[Path]:
+    files = [_PACKAGE_DIR / name for name in _RENDERER_SOURCES]
+    files.extend(sorted((_PACKAGE_DIR / "templates").glob("*.html")))
+    return files
+
+
+def renderer_fingerprint() -> Tuple[str, float]:
+    """
+    渲染程式（模板與產生器）的內容雜湊與最新修改時間
+
+    Returns:
+        (SHA-256 十六進位字串, 最新 mtime)
+    """
+    digest = hashlib.sha256()
+    newest = 0.0
+    for path in _renderer_files():
+        digest.update(path.name.encode('utf-8'))
+        digest.update(path.read_bytes())
+        newest = max(newest, path.stat().st_mtime)
+    return digest.hexdigest(), newest
+
+
+def input_digest(job: ReportJob, fingerprint: str) -> str:
+    """輸入檔內容（含檔名）與渲染程式雜湊合併後的 SHA-256"""
+    digest = hashlib.sha256(fingerprint.encode('utf-8'))
+    for path in job.inputs:
+        digest.update(os.path.basename(path).encode('utf-8') + b'\0')
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def build_variant(minify: bool = False, precompress: bool = False) -> str:
+    """建置選項的代號（記入建置記錄；預設選項為空字串）"""
+    return '+'.join(name for name, enabled in (('minify', minify), ('precompress', precompress)) if enabled)
+
+
+def _manifest_entry(variant: str, digest: str) -> str:
+    return f"{variant}:{digest}" if variant else digest
+
+
+def _entry_variant(entry: Optional[str]) -> str:
+    return entry.rpartition(':')[0] if entry else ''
+
+
+def _output_paths(job: ReportJob, minify: bool, precompress: bool) -> List[str]:
+    return [job.output] + artifact_paths(job.output, minify, precompress)
+
+
+def _outputs_present(job: ReportJob, minify: bool = False, precompress: bool = False) -> bool:
+    """輸出與需要的精簡版、壓縮副本都存在，且沒有這次不會寫入的舊檔"""
+    if not all(os.path.exists(path) for path in _output_paths(job, minify, precompress)):
+        return False
+    return not any(os.path.exists(path) for path in stale_artifact_paths(job.output, minify, precompress))
+
+
+def _is_newer(job: ReportJob, renderer_mtime: float, minify: bool = False, precompress: bool = False) -> bool:
+    """輸出（與需要的精簡版、壓縮副本）是否比所有輸入與渲染程式都新"""
+    if not _outputs_present(job, minify, precompress):
+        return False
+    try:
+        output_mtime = min(os.stat(path).st_mtime for path in _output_paths(job, minify, precompress))
+        newest_input = max(os.stat(path).st_mtime for path in job.inputs)
+    except OSError:
+        return False
+    return output_mtime >= max(newest_input, renderer_mtime)
+
+
+def _manifest_key(job: ReportJob) -> str:
+    return Path(job.output).relative_to(job.root).as_posix()
+
+
+def _load_manifest(root: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"建置記錄無法讀取，將全部重新比對: {root} ({e})")
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _save_manifest(root: str, manifest: Dict[str, str]):
+    path = Path(root) / MANIFEST_NAME
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+# ============================================
+# 建置 (Build)
+# ============================================
+
+def has_report_content(data: Dict) -> bool:
+    """
+    JSON 是否含有報告內容
+
+    run_fortune_analysis 寫出的 JSON 只有各方法的 calculation，
+    產生的報告只會有頁首與CSS，沒有任何區塊。
+    """
+    if data.get('synthesis'):
+        return True
+    return any(isinstance(value, dict) and value.get('interpretation') for value in data.values())
+
+
+def build_report(job: ReportJob, digest: Optional[str] = None, minify: bool = False,
+                 precompress: bool = False) -> ReportResult:
+    """
+    建置單份報告（行程池的工作函數，錯誤以結果返回而不拋出）
+
+    Args:
+        job: 待建置的報告
+        digest: input_digest() 的結果（寫入建置記錄用）
+        minify: 另寫精簡版 *.min.html
+        precompress: 各版本同時寫入 .gz / .br 副本
+
+    Returns:
+        ReportResult
+    """
+    try:
+        input_bytes = sum(os.path.getsize(path) for path in job.inputs)
+        if job.kind == JSON_REPORT:
+            with open(job.source, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not has_report_content(data):
+                return ReportResult(job, SKIPPED, note="只有計算結果（沒有 interpretation / synthesis）")
+            generate_html_report(data, job.output, minify=minify, precompress=precompress)
+        else:
+            generate_html_from_markdown_files(job.source, job.output, minify=minify, precompress=precompress)
+        return ReportResult(job, BUILT, digest, input_bytes, os.path.getsize(job.output))
+    except Exception as e:
+        return ReportResult(job, FAILED, error=f"{type(e).__name__}: {e}")
+
+
+def build_reports(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    force: bool = False,
+    on_result=None,
+    minify: bool = False,
+    precompress: bool = False
+) -> BuildSummary:
+    """
+    探索並建置報告
+
+    Args:
+        paths: 見 discover_reports()
+        workers: 行程數（預設為 CPU 數；1 表示在目前行程中依序建置）
+        force: 忽略修改時間與建置記錄，全部重建（也會覆寫不在建置記錄中的既有輸出檔）
+        on_result: 每份報告完成（或跳過）時呼叫 on_result(ReportResult)
+        minify: 另寫精簡版 *.min.html（未指定時移除舊的精簡版）
+        precompress: 各版本同時寫入 .gz / .br 副本（未指定時移除舊副本）
+
+    Returns:
+        BuildSummary
+
+    Raises:
+        ValueError: 路徑無效或 workers 小於 1
+    """
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers 必須至少為 1: {workers}")
+
+    start = time.perf_counter()
+    jobs = discover_reports(paths)
+    fingerprint, renderer_mtime = renderer_fingerprint()
+    manifests = {root: _load_manifest(root) for root in {job.root for job in jobs}}
+    variant = build_variant(minify, precompress)
+
+    results: List[ReportResult] = []
+
+    def finish(result: ReportResult):
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    pending: List[Tuple[ReportJob, str]] = []
+    for job in jobs:
+        entry = manifests[job.root].get(_manifest_key(job))
+        if not force and entry is None and os.path.exists(job.output):
+            finish(ReportResult(job, SKIPPED, note="輸出檔不是本工具產生的（不在建置記錄中），以 --force 覆寫"))
+            continue
+        if not force and _entry_variant(entry) == variant and _is_newer(job, renderer_mtime, minify, precompress):
+            finish(ReportResult(job, SKIPPED))
+            continue
+        try:
+            digest = input_digest(job, fingerprint)
+        except OSError as e:
+            finish(ReportResult(job, FAILED, error=f"{type(e).__name__}: {e}"))
+            continue
+        if not force and entry == _manifest_entry(variant, digest) and _outputs_present(job, minify, precompress):
+            finish(ReportResult(job, SKIPPED, digest))
+            continue
+        pending.append((job, digest))
+
+    worker = partial(build_report, minify=minify, precompress=precompress)
+    workers = min(workers or os.cpu_count() or 1, max(len(pending), 1))
+    if workers == 1:
+        for job, digest in pending:
+            finish(worker(job, digest))
+    else:
+        # 報告通常只需幾毫秒，分批送出以減少行程間往返
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(worker, *zip(*pending), chunksize=chunksize):
+                finish(result)
+
+    for root, manifest in manifests.items():
+        built = {
+            _manifest_key(result.job): _manifest_entry(variant, result.digest) for result in results
+            if result.job.root == root and result.status == BUILT
+        }
+        if built:
+            manifest.update(built)
+            _save_manifest(root, manifest)
+
+    return BuildSummary(results, time.perf_counter() - start, workers)
+
+
+# ============================================
+# 命令列 (CLI)
+# ============================================
+
+def format_summary(summary: BuildSummary) -> str:
+    """格式化建置摘要（報告數/秒與 MB/秒只計算實際建置的報告）"""
+    built = summary.count(BUILT)
+    megabytes = summary.output_bytes / 1e6
+    elapsed = max(summary.elapsed, 1e-9)
+    return (
+        f"建置 {built} 份、跳過 {summary.count(SKIPPED)} 份、失敗 {summary.count(FAILED)} 份，"
+        f"耗時 {summary.elapsed:.2f} 秒（{summary.workers} 個行程）\n"
+        f"吞吐量：{built / elapsed:.1f} 份/秒，{megabytes / elapsed:.2f} MB/秒"
+        f"（讀取 {summary.input_bytes / 1e6:.2f} MB，輸出 {megabytes:.2f} MB）"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令列入口"""
+    parser = argparse.ArgumentParser(description='批次重新產生命理分析 HTML 報告')
+    parser.add_argument('paths', nargs='*', default=[str(DEFAULT_REPORT_DIR)],
+                        help='報告目錄、fortune_tell_*.json 或 Markdown 分析目錄（預設為 data/fortune-telling）')
+    parser.add_argument('--workers', type=int, default=None, help='行程數（預設為 CPU 數）')
+    parser.add_argument('--force', action='store_true', help='忽略修改時間與建置記錄，全部重建（也會覆寫不在建置記錄中的既有輸出檔）')
+    parser.add_argument('--minify', action='store_true', help='另寫精簡版 *.min.html（行內樣式改為共用 class、壓縮空白）')
+    parser.add_argument('--precompress', action='store_true', help='可讀版與精簡版各自寫入 .gz / .br 壓縮副本（.br 需要 brotli 套件）')
+    parser.add_argument('--quiet', action='store_true', help='只輸出失敗的報告與摘要')
+    args = parser.parse_args(argv)
+
+    def report(result: ReportResult):
+        if result.status == FAILED:
+            print(f"❌ {result.job.source}: {result.error}")
+        elif not args.quiet:
+            mark = "✅" if result.status == BUILT else "⏭️ "
+            note = f"（{result.note}）" if result.note else ""
+            print(f"{mark} {result.job.output}{note}")
+
+    try:
+        summary = build_reports(args.paths, workers=args.workers, force=args.force, on_result=report,
+                                minify=args.minify, precompress=args.precompress)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    print()
+    print(format_summary(summary))
+    return 1 if summary.count(FAILED) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+預計算表建置工具 (Precomputed Table Builder)
+==========================================
+
+離線產生並驗證命理計算所需的預計算表。
+
+用法（於 scripts 目錄執行）：
+    python -m fortune_telling.build_tables solar-terms
+    python -m fortune_telling.build_tables verify-solar-terms --start 1900 --end 2100
+    python -m fortune_telling.build_tables equation-of-time
+    python -m fortune_telling.build_tables lunar-dates
+    python -m fortune_telling.build_tables verify-lunar-dates
+    python -m fortune_telling.build_tables ziwei-layouts
+    python -m fortune_telling.build_tables verify-ziwei-layouts
+    python -m fortune_telling.build_tables planet-positions --start 1900 --end 2100 --step-minutes 1440
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .equation_of_time import (
+    DEFAULT_TABLE_PATH as EQUATION_OF_TIME_TABLE_PATH,
+    TABLE_START_YEAR as EQUATION_OF_TIME_START_YEAR,
+    TABLE_END_YEAR as EQUATION_OF_TIME_END_YEAR,
+    build_table as build_equation_of_time_table,
+)
+from .lunar_table import (
+    DEFAULT_TABLE_PATH as LUNAR_TABLE_PATH,
+    TABLE_START_YEAR as LUNAR_START_YEAR,
+    TABLE_END_YEAR as LUNAR_END_YEAR,
+    LunarDateTable,
+    build_table as build_lunar_table,
+    verify_table as verify_lunar_table,
+)
+from .solar_term_table import (
+    DEFAULT_TABLE_PATH as SOLAR_TERM_TABLE_PATH,
+    TABLE_START_YEAR,
+    TABLE_END_YEAR,
+    SolarTermTable,
+    build_table as build_solar_term_table,
+    verify_table as verify_solar_term_table,
+)
+from .transits import (
+    DEFAULT_TABLE_PATH as PLANET_TABLE_PATH,
+    TABLE_START_YEAR as PLANET_START_YEAR,
+    TABLE_END_YEAR as PLANET_END_YEAR,
+    TABLE_STEP_MINUTES as PLANET_STEP_MINUTES,
+    PlanetPositionTable,
+    accuracy_report as planet_accuracy_report,
+    build_table as build_planet_table,
+    format_accuracy_report as format_planet_accuracy_report,
+)
+from .ziwei_table import (
+    DEFAULT_TABLE_PATH as ZIWEI_TABLE_PATH,
+    ZiweiLayoutTable,
+    build_table as build_ziwei_table,
+    verify_table as verify_ziwei_table,
+)
+
+
+def _build_solar_terms(args: argparse.Namespace) -> int:
+    path = build_solar_term_table(args.output, args.start, args.end)
+    print(f"✅ 節氣表已建立：{path}（{args.start}–{args.end}）")
+    return 0
+
+
+def _verify_solar_terms(args: argparse.Namespace) -> int:
+    table = SolarTermTable(args.table)
+    differences = verify_solar_term_table(table, args.start, args.end, args.tolerance)
+    if differences:
+        for line in differences:
+            print(f"❌ {line}")
+        print(f"\n共 {len(differences)} 筆差異")
+        return 1
+
+    start = table.start_year if args.start is None else args.start
+    end = table.end_year if args.end is None else args.end
+    print(f"✅ 節氣表與 ephem 計算一致（{start}–{end}）")
+    return 0
+
+
+def _build_equation_of_time(args: argparse.Namespace) -> int:
+    path = build_equation_of_time_table(args.output, args.start, args.end)
+    print(f"✅ 均時差表已建立：{path}（{args.start}–{args.end}）")
+    return 0
+
+
+def _build_lunar_dates(args: argparse.Namespace) -> int:
+    path = build_lunar_table(args.output, args.start, args.end)
+    print(f"✅ 農曆日期表已建立：{path}（{args.start}–{args.end}）")
+    return 0
+
+
+def _verify_lunar_dates(args: argparse.Namespace) -> int:
+    table = LunarDateTable(args.table)
+    differences = verify_lunar_table(table, args.start, args.end)
+    if differences:
+        for line in differences:
+            print(f"❌ {line}")
+        print(f"\n共 {len(differences)} 筆差異")
+        return 1
+
+    start = table.start_year if args.start is None else args.start
+    end = table.end_year if args.end is None else args.end
+    print(f"✅ 農曆日期表與 lunarcalendar 一致（{start}–{end}）")
+    return 0
+
+
+def _build_ziwei_layouts(args: argparse.Namespace) -> int:
+    path = build_ziwei_table(args.output)
+    print(f"✅ 紫微命盤表已建立：{path}")
+    return 0
+
+
+def _verify_ziwei_layouts(args: argparse.Namespace) -> int:
+    differences = verify_ziwei_table(ZiweiLayoutTable(args.table))
+    if differences:
+        for line in differences[:50]:
+            print(f"❌ {line}")
+        print(f"\n共 {len(differences)} 筆差異，請執行 build_tables ziwei-layouts 重建")
+        return 1
+
+    print("✅ 紫微命盤表與即時計算一致（12 月 × 30 日 × 12 時 × 10 年干）")
+    return 0
+
+
+def _build_planet_positions(args: argparse.Namespace) -> int:
+    path = build_planet_table(args.output, args.start, args.end, args.step_minutes)
+    print(f"✅ 行星位置表已建立：{path}（{args.start}–{args.end}，每 {args.step_minutes} 分鐘）")
+    print()
+    print("插值精度（相對 Swiss Ephemeris 即時計算）")
+    print(format_planet_accuracy_report(planet_accuracy_report(PlanetPositionTable(path))))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令列入口"""
+    parser = argparse.ArgumentParser(description='命理預計算表建置與驗證工具')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    parser_build = subparsers.add_parser('solar-terms', help='以 ephem 建立節氣表')
+    parser_build.add_argument('--start', type=int, default=TABLE_START_YEAR, help='起始年份')
+    parser_build.add_argument('--end', type=int, default=TABLE_END_YEAR, help='結束年份（含）')
+    parser_build.add_argument('--output', type=Path, default=SOLAR_TERM_TABLE_PATH, help='輸出檔案路徑')
+    parser_build.set_defaults(handler=_build_solar_terms)
+
+    parser_verify = subparsers.add_parser('verify-solar-terms', help='比對節氣表與 ephem 即時計算')
+    parser_verify.add_argument('--start', type=int, default=None, help='起始年份')
+    parser_verify.add_argument('--end', type=int, default=None, help='結束年份（含）')
+    parser_verify.add_argument('--table', type=Path, default=SOLAR_TERM_TABLE_PATH, help='節氣表檔案路徑')
+    parser_verify.add_argument('--tolerance', type=float, default=0.0, help='容許誤差（秒）')
+    parser_verify.set_defaults(handler=_verify_solar_terms)
+
+    parser_eot = subparsers.add_parser('equation-of-time', help='以 ephem 建立逐日均時差表')
+    parser_eot.add_argument('--start', type=int, default=EQUATION_OF_TIME_START_YEAR, help='起始年份')
+    parser_eot.add_argument('--end', type=int, default=EQUATION_OF_TIME_END_YEAR, help='結束年份（含）')
+    parser_eot.add_argument('--output', type=Path, default=EQUATION_OF_TIME_TABLE_PATH, help='輸出檔案路徑')
+    parser_eot.set_defaults(handler=_build_equation_of_time)
+
+    parser_lunar = subparsers.add_parser('lunar-dates', help='以 lunarcalendar 建立公曆→農曆逐日表')
+    parser_lunar.add_argument('--start', type=int, default=LUNAR_START_YEAR, help='起始年份')
+    parser_lunar.add_argument('--end', type=int, default=LUNAR_END_YEAR, help='結束年份（含）')
+    parser_lunar.add_argument('--output', type=Path, default=LUNAR_TABLE_PATH, help='輸出檔案路徑')
+    parser_lunar.set_defaults(handler=_build_lunar_dates)
+
+    parser_verify_lunar = subparsers.add_parser('verify-lunar-dates', help='比對農曆日期表與 lunarcalendar')
+    parser_verify_lunar.add_argument('--start', type=int, default=None, help='起始年份')
+    parser_verify_lunar.add_argument('--end', type=int, default=None, help='結束年份（含）')
+    parser_verify_lunar.add_argument('--table', type=Path, default=LUNAR_TABLE_PATH, help='農曆日期表檔案路徑')
+    parser_verify_lunar.set_defaults(handler=_verify_lunar_dates)
+
+    parser_ziwei = subparsers.add_parser('ziwei-layouts', help='依目前的安星規則建立紫微命盤表')
+    parser_ziwei.add_argument('--output', type=Path, default=ZIWEI_TABLE_PATH, help='輸出檔案路徑')
+    parser_ziwei.set_defaults(handler=_build_ziwei_layouts)
+
+    parser_verify_ziwei = subparsers.add_parser('verify-ziwei-layouts', help='比對紫微命盤表與即時計算')
+    parser_verify_ziwei.add_argument('--table', type=Path, default=ZIWEI_TABLE_PATH, help='紫微命盤表檔案路徑')
+    parser_verify_ziwei.set_defaults(handler=_verify_ziwei_layouts)
+
+    parser_planets = subparsers.add_parser('planet-positions', help='以 Swiss Ephemeris 建立行星位置表')
+    parser_planets.add_argument('--start', type=int, default=PLANET_START_YEAR, help='起始年份')
+    parser_planets.add_argument('--end', type=int, default=PLANET_END_YEAR, help='結束年份（含）')
+    parser_planets.add_argument('--step-minutes', type=int, default=PLANET_STEP_MINUTES, help='取樣間隔（分鐘，需整除一天）')
+    parser_planets.add_argument('--output', type=Path, default=PLANET_TABLE_PATH, help='輸出檔案路徑')
+    parser_planets.set_defaults(handler=_build_planet_positions)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
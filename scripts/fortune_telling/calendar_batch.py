@@ -0,0 +1,351 @@
+"""
+批次曆法轉換引擎 (Vectorized Calendar Conversion)
+================================================
+
+以 NumPy 陣列一次處理大量出生時間，供 CalendarConverter.convert_many 使用：
+1. 時區轉換：以 pytz 轉換表做 searchsorted，僅歧義/不存在的本地時間退回逐筆 localize
+2. 日柱、時柱：日數與小時的整數運算
+3. 年柱、月柱：在節氣時刻陣列上 searchsorted
+4. 真太陽時：由呼叫端提供的批次均時差函數
+
+所有時間在內部以 int64 微秒表示（UTC 紀元起算）。
+"""
+
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pytz
+
+from .utils import (
+    HEAVENLY_STEMS,
+    EARTHLY_BRANCHES,
+    SOLAR_TERMS,
+    SOLAR_TERM_TO_MONTH,
+)
+
+US_PER_SECOND = 1_000_000
+US_PER_MINUTE = 60 * US_PER_SECOND
+US_PER_HOUR = 60 * US_PER_MINUTE
+US_PER_DAY = 24 * US_PER_HOUR
+
+_EPOCH = datetime(1970, 1, 1)
+_DAY_PILLAR_BASE = (datetime(1900, 1, 1) - _EPOCH).days  # 1900-01-01 為丙戌日
+_DAY_PILLAR_BASE_OFFSET = 22
+_LICHUN_CODE = SOLAR_TERMS.index("立春")
+
+_STEMS = np.array(HEAVENLY_STEMS)
+_BRANCHES = np.array(EARTHLY_BRANCHES)
+_TERMS = np.array(SOLAR_TERMS)
+
+
+def _build_month_branch_by_term() -> np.ndarray:
+    """依節氣推月支的查表（與 CalendarConverter._calculate_month_pillar 的規則一致）"""
+    lookup = np.full(len(SOLAR_TERMS), -1, dtype=np.int8)
+    for code, current_term in enumerate(SOLAR_TERMS):
+        for term, branch in SOLAR_TERM_TO_MONTH.items():
+            if current_term == term or (
+                SOLAR_TERMS.index(current_term) > SOLAR_TERMS.index(term) and
+                (SOLAR_TERMS.index(current_term) - SOLAR_TERMS.index(term)) <= 1
+            ):
+                lookup[code] = EARTHLY_BRANCHES.index(branch)
+                break
+    return lookup
+
+
+# 節氣 → 月支索引
+_MONTH_BRANCH_BY_TERM = _build_month_branch_by_term()
+
+# 公曆月份 → 月支索引（節氣無法對應時的備援）
+_MONTH_BRANCH_BY_GREGORIAN = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 0], dtype=np.int8)
+
+# 五虎遁：年干 → 寅月天干
+_MONTH_STEM_START = np.array([2, 4, 6, 8, 0, 2, 4, 6, 8, 0], dtype=np.int8)
+
+# 五鼠遁：日干 → 子時天干
+_HOUR_STEM_START = np.array([0, 2, 4, 6, 8, 0, 2, 4, 6, 8], dtype=np.int8)
+
+
+# ============================================
+# 時間轉換 (Time Conversion)
+# ============================================
+
+def to_epoch_us(dt: datetime) -> int:
+    """將 datetime 轉換為紀元微秒（時區感知者換算為 UTC，naive 者視為牆上時間）"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(pytz.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _tz_transitions(tz) -> Tuple[np.ndarray, np.ndarray]:
+    """取得 pytz 時區的 UTC 轉換時刻與對應偏移（微秒）"""
+    utc_transition_times = getattr(tz, '_utc_transition_times', None)
+    if not utc_transition_times:
+        offset = tz.localize(datetime(2000, 1, 1)).utcoffset()
+        return (
+            np.array([np.iinfo(np.int64).min], dtype=np.int64),
+            np.array([offset // timedelta(microseconds=1)], dtype=np.int64),
+        )
+
+    transitions = np.array(
+        [(t - _EPOCH) // timedelta(microseconds=1) for t in utc_transition_times],
+        dtype=np.int64
+    )
+    offsets = np.array(
+        [info[0] // timedelta(microseconds=1) for info in tz._transition_info],
+        dtype=np.int64
+    )
+    return transitions, offsets
+
+
+def _period_index(transitions: np.ndarray, utc_us: np.ndarray) -> np.ndarray:
+    """找出 UTC 時刻所在的時區區段（等同 pytz 的 bisect_right - 1）"""
+    return np.maximum(np.searchsorted(transitions, utc_us, side='right') - 1, 0)
+
+
+def localize_offsets(
+    tz_name: str,
+    wall_us: np.ndarray,
+    is_utc: np.ndarray
+) -> np.ndarray:
+    """
+    計算一批時間在指定時區的 UTC 偏移（微秒）
+
+    naive 時間依 pytz localize(is_dst=False) 的規則決定偏移；
+    只有落在夏令時切換處（歧義或不存在）的少數時間退回逐筆 localize。
+
+    Args:
+        tz_name: 時區名稱
+        wall_us: 時間（naive 者為牆上時間，時區感知者為 UTC），紀元微秒
+        is_utc: 對應元素是否為 UTC 時刻
+
+    Returns:
+        每筆時間的 UTC 偏移（微秒）
+    """
+    tz = pytz.timezone(tz_name)
+    transitions, offsets = _tz_transitions(tz)
+
+    result = offsets[_period_index(transitions, wall_us)]
+    naive = ~is_utc
+    if not naive.any():
+        return result
+
+    wall = wall_us[naive]
+
+    def candidate(shift_us: int):
+        offset = offsets[_period_index(transitions, wall + shift_us)]
+        valid = offsets[_period_index(transitions, wall - offset)] == offset
+        return offset, valid
+
+    offset_before, valid_before = candidate(-US_PER_DAY)
+    offset_after, valid_after = candidate(US_PER_DAY)
+
+    naive_offsets = np.where(valid_before, offset_before, offset_after)
+    resolved = (valid_before ^ valid_after) | (
+        valid_before & valid_after & (offset_before == offset_after)
+    )
+
+    # 夏令時切換處：逐筆交給 pytz 處理
+    for i in np.flatnonzero(~resolved):
+        local_dt = _EPOCH + timedelta(microseconds=int(wall[i]))
+        naive_offsets[i] = tz.localize(local_dt).utcoffset() // timedelta(microseconds=1)
+
+    result[naive] = naive_offsets
+    return result
+
+
+# ============================================
+# 節氣矩陣 (Solar-Term Matrix)
+# ============================================
+
+def solar_term_matrix(
+    first_year: int,
+    last_year: int,
+    loader: Callable[[int], list]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    組裝連續年份的節氣時刻與名稱矩陣
+
+    Args:
+        first_year: 起始年份
+        last_year: 結束年份（含）
+        loader: 年份 → [(節氣名稱, 時刻), ...] 的函數
+
+    Returns:
+        (時刻矩陣 int64 微秒, 名稱代碼矩陣 int8)，形狀皆為 (年數, 24)
+    """
+    years = last_year - first_year + 1
+    times = np.empty((years, len(SOLAR_TERMS)), dtype=np.int64)
+    codes = np.empty((years, len(SOLAR_TERMS)), dtype=np.int8)
+
+    for row, year in enumerate(range(first_year, last_year + 1)):
+        for col, (term_name, term_time) in enumerate(loader(year)):
+            times[row, col] = to_epoch_us(term_time)
+            codes[row, col] = SOLAR_TERMS.index(term_name)
+
+    return times, codes
+
+
+def locate_solar_terms(
+    term_times: np.ndarray,
+    rows: np.ndarray,
+    utc_us: np.ndarray
+) -> np.ndarray:
+    """
+    對每筆時間在其所屬年份列做 searchsorted
+
+    各列以 4 年為間距平移後攤平成單一遞增陣列，一次 searchsorted 完成所有查找。
+
+    Args:
+        term_times: 節氣時刻矩陣（每列已排序）
+        rows: 每筆時間所屬的列
+        utc_us: UTC 紀元微秒
+
+    Returns:
+        每筆時間在該列中不晚於它的節氣數量（0-24）
+    """
+    n_rows, n_cols = term_times.shape
+    stride = 4 * 366 * US_PER_DAY
+    row_base = term_times[:, 0]
+
+    keys = (term_times - row_base[:, None] + (np.arange(n_rows, dtype=np.int64) * stride)[:, None]).ravel()
+    relative = np.clip(utc_us - row_base[rows], -stride // 2, stride // 2)
+    positions = np.searchsorted(keys, rows * stride + relative, side='right')
+
+    return positions - rows * n_cols
+
+
+# ============================================
+# 批次轉換 (Batch Conversion)
+# ============================================
+
+def convert_many(
+    wall_us: np.ndarray,
+    is_utc: np.ndarray,
+    longitudes: np.ndarray,
+    tz_names: np.ndarray,
+    solar_term_loader: Callable[[int], list],
+    lunar_lookup: Callable[[np.ndarray], np.ndarray],
+    equation_of_time: Callable[[np.ndarray], np.ndarray],
+    use_true_solar_time: bool = True
+) -> Dict[str, np.ndarray]:
+    """
+    批次計算曆法與四柱
+
+    Args:
+        wall_us: 出生時間（naive 為當地牆上時間，時區感知者為 UTC），紀元微秒
+        is_utc: 對應元素是否為 UTC 時刻
+        longitudes: 出生地經度
+        tz_names: 出生地時區名稱
+        solar_term_loader: 年份 → 節氣列表
+        lunar_lookup: 紀元日數陣列 → 農曆記錄陣列 (N, 4)：年、月、日、閏月旗標
+        equation_of_time: UTC 紀元微秒陣列 → 均時差陣列（分鐘）
+        use_true_solar_time: 是否使用真太陽時校正
+
+    Returns:
+        欄式結果，每個欄位為長度 N 的陣列
+    """
+    n = len(wall_us)
+
+    # 1. 時區：算出 UTC 時刻與當地牆上時間
+    offsets = np.empty(n, dtype=np.int64)
+    for tz_name in np.unique(tz_names):
+        mask = tz_names == tz_name
+        offsets[mask] = localize_offsets(tz_name, wall_us[mask], is_utc[mask])
+
+    utc_us = np.where(is_utc, wall_us, wall_us - offsets)
+    local_us = utc_us + offsets
+
+    local_days = local_us // US_PER_DAY
+    dates = local_days.astype('datetime64[D]')
+    years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    months = dates.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    days = (dates - dates.astype('datetime64[M]')).astype(np.int64) + 1
+    hours = (local_us % US_PER_DAY) // US_PER_HOUR
+    minutes = (local_us % US_PER_HOUR) // US_PER_MINUTE
+
+    # 2. 真太陽時
+    if use_true_solar_time:
+        difference = (longitudes - 120.0) * 4 + equation_of_time(utc_us)
+        difference_us = np.round(difference * US_PER_MINUTE).astype(np.int64)
+    else:
+        difference_us = np.zeros(n, dtype=np.int64)
+    adjusted_us = local_us + difference_us
+
+    # 3. 節氣（按當地年份取列，前後各多取一年）
+    first_year = int(years.min()) - 1
+    last_year = int(years.max()) + 1
+    term_times, term_codes = solar_term_matrix(first_year, last_year, solar_term_loader)
+
+    rows = years - first_year
+    count = locate_solar_terms(term_times, rows, utc_us)
+
+    current_row = np.where(count == 0, rows - 1, rows)
+    current_col = np.where(count == 0, len(SOLAR_TERMS) - 1, count - 1)
+    next_row = np.where(count == len(SOLAR_TERMS), rows + 1, rows)
+    next_col = np.where(count == len(SOLAR_TERMS), 0, count)
+
+    current_code = term_codes[current_row, current_col]
+    next_code = term_codes[next_row, next_col]
+
+    # 4. 年柱（立春為界）
+    lichun_col = np.argmax(term_codes == _LICHUN_CODE, axis=1)
+    lichun_us = term_times[np.arange(len(term_times)), lichun_col]
+    pillar_years = years - (utc_us < lichun_us[rows])
+    year_index = (pillar_years - 1984) % 60
+    year_stem = year_index % 10
+    year_branch = year_index % 12
+
+    # 5. 月柱（節氣定月支，五虎遁定月干）
+    month_branch = _MONTH_BRANCH_BY_TERM[current_code].astype(np.int64)
+    month_branch = np.where(month_branch < 0, _MONTH_BRANCH_BY_GREGORIAN[months - 1], month_branch)
+    month_stem = (_MONTH_STEM_START[year_stem] + month_branch - 2) % 10
+
+    # 6. 日柱（以 1900-01-01 丙戌日為基準）
+    day_index = (_DAY_PILLAR_BASE_OFFSET + local_days - _DAY_PILLAR_BASE) % 60
+    day_stem = day_index % 10
+    day_branch = day_index % 12
+
+    # 7. 時柱（時辰地支由校正後時間決定，五鼠遁定時干）
+    adjusted_hours = (adjusted_us % US_PER_DAY) // US_PER_HOUR
+    hour_branch = ((adjusted_hours + 1) // 2) % 12
+    hour_stem = (_HOUR_STEM_START[day_stem] + hour_branch) % 10
+
+    # 8. 農曆
+    lunar = lunar_lookup(local_days)
+
+    def pillar(stem: np.ndarray, branch: np.ndarray) -> Dict[str, np.ndarray]:
+        stems = _STEMS[stem]
+        branches = _BRANCHES[branch]
+        return {
+            "stem": stems,
+            "branch": branches,
+            "pillar": np.char.add(stems, branches)
+        }
+
+    return {
+        "year": years,
+        "month": months,
+        "day": days,
+        "hour": hours,
+        "minute": minutes,
+        "timezone": tz_names,
+        "utc": utc_us.astype('datetime64[us]'),
+        "local_time": local_us.astype('datetime64[us]'),
+        "lunar_year": lunar[:, 0],
+        "lunar_month": lunar[:, 1],
+        "lunar_day": lunar[:, 2],
+        "lunar_is_leap_month": lunar[:, 3].astype(bool),
+        "adjusted_time": adjusted_us.astype('datetime64[us]'),
+        "difference_minutes": difference_us / US_PER_SECOND / 60,
+        "solar_term_current": _TERMS[current_code],
+        "solar_term_current_time": term_times[current_row, current_col].astype('datetime64[us]'),
+        "solar_term_next": _TERMS[next_code],
+        "solar_term_next_time": term_times[next_row, next_col].astype('datetime64[us]'),
+        "four_pillars": {
+            "year": pillar(year_stem, year_branch),
+            "month": pillar(month_stem, month_branch),
+            "day": pillar(day_stem, day_branch),
+            "hour": pillar(hour_stem, hour_branch),
+        },
+    }
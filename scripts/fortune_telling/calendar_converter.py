@@ -12,16 +12,26 @@
 準確度：專業級（使用天文曆法數據）
 """
 
+from bisect import bisect_right
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple, Union
+import threading
 import pytz
-from lunarcalendar import Converter, Solar, Lunar
 import ephem
+from .equation_of_time import (
+    EquationOfTimeMethod,
+    EquationOfTimeProvider,
+    get_equation_of_time_provider,
+)
+from .lunar_table import solar_to_lunar, solar_to_lunar_many
+from .solar_term_table import get_default_table
 from .utils import (
     HEAVENLY_STEMS,
-    EARTHLY_BRANCHES,
     SOLAR_TERMS,
     SOLAR_TERM_TO_MONTH,
+    STEM_CODE,
+    BRANCH_CODE,
     calculate_hour_branch,
     get_stem_branch_by_index,
     get_city_info,
@@ -30,6 +40,81 @@ from .utils import (
 )
 
 
+class SolarTermCache:
+    """
+    節氣緩存（進程共享、線程安全）
+
+    以年份為鍵的有界 LRU 緩存，所有 CalendarConverter 實例共用，
+    長時間運行的 worker 不會重複計算已見過的年份。
+    """
+
+    def __init__(self, maxsize: int = 512):
+        """
+        Args:
+            maxsize: 最多緩存的年份數量
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, year: int, loader: Callable[[int], list]) -> list:
+        """
+        獲取指定年份的節氣列表，未命中時呼叫 loader 計算並緩存
+
+        計算在鎖外進行，避免一個年份的天文計算阻塞其他線程的查詢。
+        返回的列表為共享物件，呼叫端不應修改。
+
+        Args:
+            year: 年份
+            loader: 未命中時用於計算節氣列表的函數
+
+        Returns:
+            [(節氣名稱, 時刻), ...] 列表，按時間排序
+        """
+        with self._lock:
+            solar_terms = self._entries.get(year)
+            if solar_terms is not None:
+                self._entries.move_to_end(year)
+                self.hits += 1
+                return solar_terms
+            self.misses += 1
+
+        solar_terms = loader(year)
+
+        with self._lock:
+            self._entries[year] = solar_terms
+            self._entries.move_to_end(year)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return solar_terms
+
+    def stats(self) -> Dict:
+        """獲取緩存統計（命中、未命中、命中率、當前大小）"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize
+            }
+
+    def clear(self):
+        """清空緩存並重置統計"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# 進程共享的節氣緩存
+_solar_term_cache = SolarTermCache()
+
+
 class CalendarConverter:
     """
     曆法轉換器
@@ -37,9 +122,22 @@ class CalendarConverter:
     負責所有曆法相關的轉換和計算，確保專業級準確度。
     """
 
-    def __init__(self):
-        """初始化曆法轉換器"""
-        self._solar_term_cache = {}  # 節氣計算緩存
+    def __init__(
+        self,
+        equation_of_time: Union[str, EquationOfTimeMethod, EquationOfTimeProvider] = EquationOfTimeMethod.ANALYTIC
+    ):
+        """
+        初始化曆法轉換器
+
+        Args:
+            equation_of_time: 真太陽時使用的均時差計算方式
+                - "analytic": NOAA/Meeus 解析級數（預設，誤差約數秒）
+                - "table": 1900–2100 逐日預計算表內插
+                - "ephem": ephem 即時計算（最精確但最慢）
+                也可以傳入自訂的 EquationOfTimeProvider
+        """
+        self._solar_term_cache = _solar_term_cache  # 節氣計算緩存（進程共享）
+        self._equation_of_time = get_equation_of_time_provider(equation_of_time)
 
     def convert_to_lunar(
         self,
@@ -81,9 +179,10 @@ class CalendarConverter:
         if use_true_solar_time:
             adjusted_time = self._adjust_true_solar_time(birth_date, longitude)
 
-        # 4. 公曆轉農曆
-        solar = Solar(birth_date.year, birth_date.month, birth_date.day)
-        lunar = Converter.Solar2Lunar(solar)
+        # 4. 公曆轉農曆（查預計算表）
+        lunar_year, lunar_month, lunar_day, is_leap_month = solar_to_lunar(
+            birth_date.year, birth_date.month, birth_date.day
+        )
 
         # 5. 計算節氣
         solar_term = self._get_solar_term(birth_date)
@@ -116,13 +215,13 @@ class CalendarConverter:
 
             # 農曆資訊
             "lunar": {
-                "year": lunar.year,
-                "month": lunar.month,
-                "day": lunar.day,
-                "is_leap_month": lunar.isleap,
-                "year_cn": f"{lunar.year}年",
-                "month_cn": f"{lunar.month}月",
-                "day_cn": f"{lunar.day}日"
+                "year": lunar_year,
+                "month": lunar_month,
+                "day": lunar_day,
+                "is_leap_month": is_leap_month,
+                "year_cn": f"{lunar_year}年",
+                "month_cn": f"{lunar_month}月",
+                "day_cn": f"{lunar_day}日"
             },
 
             # 真太陽時資訊
@@ -160,6 +259,85 @@ class CalendarConverter:
 
         return result
 
+    def convert_many(
+        self,
+        birth_dates,
+        locations,
+        use_true_solar_time: bool = True
+    ) -> Dict:
+        """
+        批次將公曆日期轉換為農曆並計算四柱（向量化）
+
+        適合大量命盤的批次處理，結果與逐筆呼叫 convert_to_lunar 一致。
+
+        Args:
+            birth_dates: 出生時間序列（datetime 列表，naive 或已含時區），
+                或 numpy datetime64 陣列（視為當地牆上時間）
+            locations: 出生地點（單一地點字串，或與 birth_dates 等長的序列）
+            use_true_solar_time: 是否使用真太陽時校正
+
+        Returns:
+            欄式結果字典，每個欄位為長度 N 的 numpy 陣列：
+            year/month/day/hour/minute/timezone/utc/local_time、
+            lunar_year/lunar_month/lunar_day/lunar_is_leap_month、
+            adjusted_time/difference_minutes、
+            solar_term_current/solar_term_current_time/solar_term_next/solar_term_next_time、
+            four_pillars（year/month/day/hour 各含 stem/branch/pillar）、
+            location/longitude/latitude
+        """
+        import numpy as np
+        from . import calendar_batch
+
+        # 1. 出生時間 → 紀元微秒
+        if isinstance(birth_dates, np.ndarray) and np.issubdtype(birth_dates.dtype, np.datetime64):
+            wall_us = birth_dates.astype('datetime64[us]').astype(np.int64)
+            is_utc = np.zeros(len(wall_us), dtype=bool)
+        else:
+            birth_dates = list(birth_dates)
+            wall_us = np.array(
+                [calendar_batch.to_epoch_us(dt) for dt in birth_dates], dtype=np.int64
+            )
+            is_utc = np.array([dt.tzinfo is not None for dt in birth_dates], dtype=bool)
+
+        n = len(wall_us)
+
+        # 2. 地點 → 經緯度與時區（每個不同地點只查詢一次）
+        if isinstance(locations, str):
+            locations = [locations] * n
+        location_names = np.asarray(locations, dtype=str)
+        if len(location_names) != n:
+            raise ValueError(f"地點數量 ({len(location_names)}) 與出生時間數量 ({n}) 不符")
+
+        unique_locations, inverse = np.unique(location_names, return_inverse=True)
+        city_infos = []
+        for location in unique_locations:
+            city_info = get_city_info(str(location))
+            if not city_info:
+                raise ValueError(f"無法識別的地點: {location}")
+            city_infos.append(city_info)
+
+        longitudes = np.array([info["lon"] for info in city_infos], dtype=np.float64)[inverse]
+        latitudes = np.array([info["lat"] for info in city_infos], dtype=np.float64)[inverse]
+        tz_names = np.array([info["tz"] for info in city_infos])[inverse]
+
+        # 3. 向量化計算
+        result = calendar_batch.convert_many(
+            wall_us,
+            is_utc,
+            longitudes,
+            tz_names,
+            solar_term_loader=self._get_solar_terms,
+            lunar_lookup=solar_to_lunar_many,
+            equation_of_time=self._equation_of_time.minutes_many,
+            use_true_solar_time=use_true_solar_time
+        )
+
+        result["location"] = location_names
+        result["longitude"] = longitudes
+        result["latitude"] = latitudes
+
+        return result
+
     def _adjust_true_solar_time(
         self,
         local_time: datetime,
@@ -203,20 +381,9 @@ class CalendarConverter:
             dt: 日期時間
 
         Returns:
-            均時差（分鐘），範圍約為 -16 到 +14 分鐘
+            均時差（分鐘），範圍約為 -14 到 +16 分鐘
         """
-        # 使用 ephem 計算精確的均時差
-        observer = ephem.Observer()
-        observer.date = dt
-
-        sun = ephem.Sun()
-        sun.compute(observer)
-
-        # 真太陽時與平太陽時的差值
-        equation_of_time = float(sun.ra - observer.sidereal_time()) * 12.0 / ephem.pi
-
-        # 轉換為分鐘
-        return equation_of_time * 4.0
+        return self._equation_of_time.minutes(dt)
 
     def _get_solar_term(self, dt: datetime) -> Dict:
         """
@@ -230,32 +397,24 @@ class CalendarConverter:
         """
         year = dt.year
 
-        # 檢查緩存
-        if year not in self._solar_term_cache:
-            self._solar_term_cache[year] = self._calculate_solar_terms_for_year(year)
-
-        solar_terms = self._solar_term_cache[year]
-
-        # 找到當前和下一個節氣
-        current_term = None
-        next_term = None
-
-        for i, (term_name, term_time) in enumerate(solar_terms):
-            if dt >= term_time:
-                current_term = (term_name, term_time)
-                if i + 1 < len(solar_terms):
-                    next_term = solar_terms[i + 1]
-                else:
-                    # 如果是最後一個節氣，下一個是明年第一個
-                    next_year_terms = self._calculate_solar_terms_for_year(year + 1)
-                    next_term = next_year_terms[0] if next_year_terms else None
-            else:
-                if current_term is None:
-                    # 在第一個節氣之前，需要查找去年最後一個
-                    prev_year_terms = self._calculate_solar_terms_for_year(year - 1)
-                    current_term = prev_year_terms[-1] if prev_year_terms else None
-                next_term = (term_name, term_time)
-                break
+        solar_terms = self._get_solar_terms(year)
+
+        # 二分查找當前和下一個節氣（節氣列表已按時間排序）
+        index = bisect_right([term_time for _, term_time in solar_terms], dt)
+
+        if index == 0:
+            # 在第一個節氣之前，需要查找去年最後一個
+            prev_year_terms = self._get_solar_terms(year - 1)
+            current_term = prev_year_terms[-1] if prev_year_terms else None
+        else:
+            current_term = solar_terms[index - 1]
+
+        if index < len(solar_terms):
+            next_term = solar_terms[index]
+        else:
+            # 如果是最後一個節氣，下一個是明年第一個
+            next_year_terms = self._get_solar_terms(year + 1)
+            next_term = next_year_terms[0] if next_year_terms else None
 
         return {
             "current": current_term[0] if current_term else "未知",
@@ -264,6 +423,28 @@ class CalendarConverter:
             "next_time": next_term[1] if next_term else None
         }
 
+    def _get_solar_terms(self, year: int) -> list:
+        """獲取一年中所有24個節氣（經由進程共享緩存）"""
+        return self._solar_term_cache.get(year, self._lookup_solar_terms)
+
+    def _lookup_solar_terms(self, year: int) -> list:
+        """
+        獲取一年中所有24個節氣
+
+        優先讀取預計算節氣表（1800–2200），表外年份退回 ephem 即時計算。
+
+        Args:
+            year: 年份
+
+        Returns:
+            [(節氣名稱, 時刻), ...] 列表，按時間排序
+        """
+        table = get_default_table()
+        if table is not None and table.covers(year):
+            return table.get_solar_terms(year)
+
+        return self._calculate_solar_terms_for_year(year)
+
     def _calculate_solar_terms_for_year(self, year: int) -> list:
         """
         計算一年中所有24個節氣的精確時刻
@@ -405,10 +586,13 @@ class CalendarConverter:
 
     def _get_lichun_time(self, year: int) -> datetime:
         """獲取指定年份的立春時刻"""
-        if year not in self._solar_term_cache:
-            self._solar_term_cache[year] = self._calculate_solar_terms_for_year(year)
+        table = get_default_table()
+        if table is not None and table.covers(year):
+            lichun_time = table.get_term_time(year, "立春")
+            if lichun_time is not None:
+                return lichun_time
 
-        solar_terms = self._solar_term_cache[year]
+        solar_terms = self._get_solar_terms(year)
         for term_name, term_time in solar_terms:
             if term_name == "立春":
                 return term_time
@@ -460,8 +644,8 @@ class CalendarConverter:
         # 丙辛之歲尋庚上，丁壬壬寅順水流，
         # 戊癸之年何方起，甲寅之上好追求。
 
-        year_stem_index = HEAVENLY_STEMS.index(year_stem)
-        month_branch_index = EARTHLY_BRANCHES.index(month_branch)
+        year_stem_index = STEM_CODE[year_stem]
+        month_branch_index = BRANCH_CODE[month_branch]
 
         # 五虎遁推算
         month_stem_start = {
@@ -535,8 +719,8 @@ class CalendarConverter:
         # 丙辛從戊起，丁壬庚子居，
         # 戊癸何方發，壬子是真途。
 
-        day_stem_index = HEAVENLY_STEMS.index(day_stem)
-        hour_branch_index = EARTHLY_BRANCHES.index(hour_branch)
+        day_stem_index = STEM_CODE[day_stem]
+        hour_branch_index = BRANCH_CODE[hour_branch]
 
         # 子時是地支的第1位（索引0）
         hour_stem_start = {
@@ -562,6 +746,36 @@ class CalendarConverter:
 # 便捷函數 (Convenience Functions)
 # ============================================
 
+def warm_up_solar_term_cache(start_year: int, end_year: int) -> Dict:
+    """
+    預熱節氣緩存
+
+    適合在 worker 啟動時呼叫，預先載入常用年份範圍。
+    年份數量超過緩存上限時，最早載入的年份會被淘汰。
+
+    Args:
+        start_year: 起始年份
+        end_year: 結束年份（含）
+
+    Returns:
+        預熱後的緩存統計
+    """
+    converter = CalendarConverter()
+    for year in range(start_year, end_year + 1):
+        converter._get_solar_terms(year)
+    return _solar_term_cache.stats()
+
+
+def get_solar_term_cache_stats() -> Dict:
+    """獲取進程共享節氣緩存的統計資訊"""
+    return _solar_term_cache.stats()
+
+
+def clear_solar_term_cache():
+    """清空進程共享節氣緩存"""
+    _solar_term_cache.clear()
+
+
 def quick_convert(
     year: int,
     month: int,
@@ -0,0 +1,300 @@
+"""
+命盤資料模型 (Chart Data Models)
+===============================
+
+以 NamedTuple（不帶 __dict__ 的緊湊元組）表示命盤的基本單元，
+取代逐一建立的巢狀 dict：
+1. 八字：Pillar / BaziChart（只保存干支編碼，文字由共享常數表查出）
+2. 紫微：Palace（宮名、地支位置、主星）
+3. 占星：PlanetPosition / HouseCusp / Aspect / AstrologyChart
+
+星座、行星與相位名稱使用 str 枚舉（ZodiacSign、Planet、AspectType），
+每個名稱在程序內只有一個物件；position_text 等衍生文字改為需要時才計算。
+
+所有模型都提供 to_dict()，輸出與計算器原本的 dict 完全相同（枚舉轉為普通字串），
+可直接用於 JSON 序列化與既有的報告流程。
+"""
+
+from enum import Enum
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from .utils import (
+    HEAVENLY_STEMS,
+    EARTHLY_BRANCHES,
+    STEM_YINYANG,
+    BRANCH_YINYANG,
+    STEM_WUXING,
+    BRANCH_WUXING,
+    JIAZI_TABLE,
+    JIAZI_INDEX,
+    HOUSES,
+    get_nayin_by_index,
+)
+
+# ============================================
+# 枚舉 (Interned Names)
+# ============================================
+
+class ZodiacSign(str, Enum):
+    """黃道十二星座（順序即黃經順序，每 30 度一宮）"""
+    ARIES = "白羊座"
+    TAURUS = "金牛座"
+    GEMINI = "雙子座"
+    CANCER = "巨蟹座"
+    LEO = "獅子座"
+    VIRGO = "處女座"
+    LIBRA = "天秤座"
+    SCORPIO = "天蠍座"
+    SAGITTARIUS = "射手座"
+    CAPRICORN = "摩羯座"
+    AQUARIUS = "水瓶座"
+    PISCES = "雙魚座"
+
+
+class Planet(str, Enum):
+    """十大行星（順序即 AstrologyCalculator 的輸出順序）"""
+    SUN = "太陽"
+    MOON = "月亮"
+    MERCURY = "水星"
+    VENUS = "金星"
+    MARS = "火星"
+    JUPITER = "木星"
+    SATURN = "土星"
+    URANUS = "天王星"
+    NEPTUNE = "海王星"
+    PLUTO = "冥王星"
+
+
+class AspectType(str, Enum):
+    """主要相位（順序同 aspects.ASPECT_DEFINITIONS）"""
+    CONJUNCTION = "合相"
+    SEXTILE = "六分相"
+    SQUARE = "四分相"
+    TRINE = "三分相"
+    OPPOSITION = "對分相"
+
+
+# 索引 → 枚舉
+ZODIAC_BY_INDEX: List[ZodiacSign] = list(ZodiacSign)
+PLANET_BY_INDEX: List[Planet] = list(Planet)
+ASPECT_BY_INDEX: List[AspectType] = list(AspectType)
+
+
+def zodiac_position(longitude: float) -> Tuple[ZodiacSign, float, str]:
+    """
+    由黃經求星座、星座內度數與位置文字（如「白羊座 12°34'」）
+
+    Args:
+        longitude: 黃經 (0-360)
+
+    Returns:
+        (星座, 星座內度數, 位置文字)
+    """
+    sign = ZODIAC_BY_INDEX[int(longitude / 30)]
+    degree = longitude % 30
+    return sign, degree, f"{sign.value} {int(degree)}°{int((degree % 1) * 60)}'"
+
+
+# ============================================
+# 八字 (BaZi)
+# ============================================
+
+class Pillar(NamedTuple):
+    """單柱干支（只保存編碼）"""
+    stem_code: int
+    branch_code: int
+
+    @property
+    def stem(self) -> str:
+        return HEAVENLY_STEMS[self.stem_code]
+
+    @property
+    def branch(self) -> str:
+        return EARTHLY_BRANCHES[self.branch_code]
+
+    @property
+    def pillar(self) -> str:
+        return JIAZI_TABLE[JIAZI_INDEX[self.stem_code][self.branch_code]].pillar
+
+    def to_dict(self) -> Dict:
+        """BaziCalculator 的單柱資訊 dict"""
+        stem_code, branch_code = self
+        return {
+            "pillar": self.pillar,
+            "stem": HEAVENLY_STEMS[stem_code],
+            "branch": EARTHLY_BRANCHES[branch_code],
+            "stem_wuxing": STEM_WUXING[stem_code].value,
+            "branch_wuxing": BRANCH_WUXING[branch_code].value,
+            "nayin": get_nayin_by_index(JIAZI_INDEX[stem_code][branch_code]),
+            "yinyang": {
+                "stem": STEM_YINYANG[stem_code],
+                "branch": BRANCH_YINYANG[branch_code]
+            }
+        }
+
+
+class BaziChart(NamedTuple):
+    """八字四柱"""
+    year: Pillar
+    month: Pillar
+    day: Pillar
+    hour: Pillar
+
+    @property
+    def day_master(self) -> str:
+        return HEAVENLY_STEMS[self.day.stem_code]
+
+    def to_dict(self) -> Dict:
+        """BaziCalculator 分析結果中的 basic_chart"""
+        chart = {position: pillar.to_dict() for position, pillar in zip(self._fields, self)}
+        chart["day_master"] = self.day_master
+        chart["day_master_wuxing"] = STEM_WUXING[self.day.stem_code].value
+        return chart
+
+
+# ============================================
+# 紫微斗數 (Zi Wei Dou Shu)
+# ============================================
+
+class Palace(NamedTuple):
+    """紫微命盤的一宮"""
+    name: str
+    position: int                  # 地支位置 (0-11)
+    major_stars: Tuple[str, ...]
+
+    @property
+    def branch(self) -> str:
+        return EARTHLY_BRANCHES[self.position]
+
+    def to_dict(self) -> Dict:
+        """ZiweiCalculator 分析結果中的單宮 dict"""
+        return {
+            "name": self.name,
+            "position": self.position,
+            "branch": EARTHLY_BRANCHES[self.position],
+            "major_stars": list(self.major_stars),
+            "transformations": []
+        }
+
+
+def palaces_to_dict(palaces: Sequence[Palace]) -> Dict:
+    """十二宮 → {宮名: 單宮 dict}"""
+    return {palace.name: palace.to_dict() for palace in palaces}
+
+
+# ============================================
+# 西洋占星 (Western Astrology)
+# ============================================
+
+class PlanetPosition(NamedTuple):
+    """行星位置（保存未取整的黃經、黃緯與速度）"""
+    planet: Planet
+    longitude: float
+    latitude: float
+    speed: float
+
+    @property
+    def sign(self) -> ZodiacSign:
+        return ZODIAC_BY_INDEX[int(self.longitude / 30)]
+
+    @property
+    def retrograde(self) -> bool:
+        return self.speed < 0
+
+    def to_dict(self) -> Dict:
+        """AstrologyCalculator 分析結果中的單一行星 dict"""
+        sign, degree, position_text = zodiac_position(self.longitude)
+        return {
+            "longitude": round(self.longitude, 4),
+            "latitude": round(self.latitude, 4),
+            "sign": sign.value,
+            "degree": round(degree, 2),
+            "speed": round(self.speed, 4),
+            "retrograde": self.speed < 0,
+            "position_text": position_text
+        }
+
+
+class HouseCusp(NamedTuple):
+    """宮首或軸點（上升、天頂、下降、天底）"""
+    name: str
+    longitude: float
+    is_cusp: bool                  # True 為第 1–12 宮宮首，False 為軸點
+
+    @property
+    def sign(self) -> ZodiacSign:
+        return ZODIAC_BY_INDEX[int(self.longitude / 30)]
+
+    def to_dict(self) -> Dict:
+        """AstrologyCalculator 分析結果中的單一宮位 dict"""
+        sign, degree, position_text = zodiac_position(self.longitude)
+        return {
+            "cusp" if self.is_cusp else "longitude": round(self.longitude, 4),
+            "sign": sign.value,
+            "degree": round(degree, 2),
+            "position_text": position_text
+        }
+
+
+def house_cusps(cusps: Sequence[float], asc_longitude: float, mc_longitude: float) -> Tuple[HouseCusp, ...]:
+    """
+    由 12 宮起點、上升點與天頂組出宮位（12 宮首 + 上升、天頂、下降、天底）
+
+    Args:
+        cusps: 第 1–12 宮起點黃經
+        asc_longitude: 上升點黃經（swe.houses 的 ascmc[0]）
+        mc_longitude: 天頂黃經（swe.houses 的 ascmc[1]）
+    """
+    return tuple(HouseCusp(HOUSES[i], cusps[i], True) for i in range(12)) + (
+        HouseCusp("上升點", asc_longitude, False),
+        HouseCusp("天頂", mc_longitude, False),
+        HouseCusp("下降點", (asc_longitude + 180) % 360, False),
+        HouseCusp("天底", (mc_longitude + 180) % 360, False),
+    )
+
+
+class Aspect(NamedTuple):
+    """兩顆行星之間的相位"""
+    planet1: Planet
+    planet2: Planet
+    aspect: AspectType
+    angle: float
+    orb: float
+    applying: bool
+    strength: float
+
+    def to_dict(self) -> Dict:
+        """AstrologyCalculator 分析結果中的單一相位 dict（角距與差距取兩位小數）"""
+        return {
+            "planet1": self.planet1.value,
+            "planet2": self.planet2.value,
+            "aspect": self.aspect.value,
+            "angle": round(self.angle, 2),
+            "orb": round(self.orb, 2),
+            "applying": self.applying,
+            "strength": self.strength
+        }
+
+
+class AstrologyChart(NamedTuple):
+    """星盤：行星、宮位與相位"""
+    planets: Tuple[PlanetPosition, ...]
+    houses: Tuple[HouseCusp, ...]
+    aspects: Tuple[Aspect, ...]
+
+    def planets_dict(self) -> Dict:
+        return {position.planet.value: position.to_dict() for position in self.planets}
+
+    def houses_dict(self) -> Dict:
+        return {house.name: house.to_dict() for house in self.houses}
+
+    def aspects_list(self) -> List[Dict]:
+        return [aspect.to_dict() for aspect in self.aspects]
+
+    def to_dict(self) -> Dict:
+        """{"planets", "houses", "aspects"}，與 AstrologyCalculator.analyze 的對應欄位相同"""
+        return {
+            "planets": self.planets_dict(),
+            "houses": self.houses_dict(),
+            "aspects": self.aspects_list()
+        }
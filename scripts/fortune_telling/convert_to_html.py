@@ -4,18 +4,23 @@ Convert fortune-telling markdown analyses to HTML and generate final report
 """
 
 import json
-import markdown
+import sys
 from datetime import datetime
 from pathlib import Path
 
+# Make the fortune_telling package importable when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fortune_telling.markdown_renderer import markdown_to_html
+
 def read_file(filepath):
     """Read file content"""
     with open(filepath, 'r', encoding='utf-8') as f:
         return f.read()
 
 def convert_markdown_to_html(md_content):
-    """Convert markdown to HTML with extensions"""
-    return markdown.markdown(md_content, extensions=['extra', 'nl2br', 'tables'])
+    """Convert markdown to HTML (headings, lists, tables, line breaks)"""
+    return markdown_to_html(md_content)
 
 def main():
     # File paths
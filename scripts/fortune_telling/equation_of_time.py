@@ -0,0 +1,392 @@
+"""
+均時差計算 (Equation of Time)
+============================
+
+真太陽時校正所需的均時差，提供三種可互換的計算方式：
+1. analytic：NOAA/Meeus 解析級數，無需天文曆表，誤差約數秒
+2. table：1900–2100 年逐日預計算表（ephem 計算），線性內插
+3. ephem：以 ephem 即時計算太陽視赤經，作為精度基準
+
+CalendarConverter 以 equation_of_time 參數選擇計算方式（預設 analytic）。
+
+預計算表檔案格式（little-endian）：
+1. 標頭 16 bytes：魔數 b"EOT1"、起始年 (int32)、結束年 (int32)、保留欄位 (uint32)
+2. 數據區：起始年 1 月 1 日至結束年翌年 1 月 1 日每日 0 時 (UTC) 的均時差，float32 分鐘
+"""
+
+import logging
+import math
+import mmap
+import struct
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import ephem
+import numpy as np
+import pytz
+
+logger = logging.getLogger(__name__)
+
+# 預設表範圍與檔案位置
+TABLE_START_YEAR = 1900
+TABLE_END_YEAR = 2100
+DEFAULT_TABLE_PATH = Path(__file__).parent / 'tables' / 'equation_of_time.bin'
+
+_MAGIC = b"EOT1"
+_HEADER = struct.Struct("<4siiI")
+_EPOCH = datetime(1970, 1, 1)
+_US_PER_DAY = 86_400_000_000
+_JULIAN_DAY_EPOCH = 2440587.5  # 1970-01-01 00:00 UTC 的儒略日
+
+
+class EquationOfTimeMethod(str, Enum):
+    """均時差計算方式"""
+    ANALYTIC = "analytic"
+    TABLE = "table"
+    EPHEM = "ephem"
+
+
+def _to_epoch_us(dt: datetime) -> int:
+    """將 datetime 轉換為 UTC 紀元微秒（naive 者視為 UTC）"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(pytz.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+# ============================================
+# 解析公式 (Analytic Series)
+# ============================================
+
+def _meeus_series(t, xp):
+    """
+    NOAA 太陽計算器使用的均時差級數（Meeus, Astronomical Algorithms）
+
+    Args:
+        t: 自 J2000.0 起算的儒略世紀數
+        xp: math 或 numpy 模組（分別用於單筆與陣列計算）
+
+    Returns:
+        均時差（分鐘）
+    """
+    mean_longitude = xp.radians((280.46646 + t * (36000.76983 + t * 0.0003032)) % 360.0)
+    mean_anomaly = xp.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    eccentricity = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+
+    mean_obliquity = 23.0 + (26.0 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60.0) / 60.0
+    omega = xp.radians(125.04 - 1934.136 * t)
+    obliquity = xp.radians(mean_obliquity + 0.00256 * xp.cos(omega))
+
+    y = xp.tan(obliquity / 2.0) ** 2
+
+    eot = (
+        y * xp.sin(2.0 * mean_longitude)
+        - 2.0 * eccentricity * xp.sin(mean_anomaly)
+        + 4.0 * eccentricity * y * xp.sin(mean_anomaly) * xp.cos(2.0 * mean_longitude)
+        - 0.5 * y * y * xp.sin(4.0 * mean_longitude)
+        - 1.25 * eccentricity * eccentricity * xp.sin(2.0 * mean_anomaly)
+    )
+
+    return 4.0 * xp.degrees(eot)
+
+
+def _julian_centuries(utc_us):
+    """UTC 紀元微秒 → 自 J2000.0 起算的儒略世紀數"""
+    return (utc_us / _US_PER_DAY + _JULIAN_DAY_EPOCH - 2451545.0) / 36525.0
+
+
+# ============================================
+# 計算方式 (Providers)
+# ============================================
+
+class EquationOfTimeProvider:
+    """
+    均時差計算方式的基底類別
+
+    子類別實作 minutes_at（單筆），可選擇覆寫 minutes_many（陣列）。
+    """
+
+    method: EquationOfTimeMethod
+
+    def minutes(self, dt: datetime) -> float:
+        """
+        計算均時差（分鐘）
+
+        Args:
+            dt: 時刻（時區感知者換算為 UTC，naive 者視為 UTC）
+
+        Returns:
+            均時差（分鐘），真太陽時 = 平太陽時 + 均時差
+        """
+        return self.minutes_at(_to_epoch_us(dt))
+
+    def minutes_at(self, utc_us: int) -> float:
+        """計算 UTC 紀元微秒時刻的均時差（分鐘）"""
+        raise NotImplementedError
+
+    def minutes_many(self, utc_us: np.ndarray) -> np.ndarray:
+        """
+        批次計算均時差（分鐘）
+
+        Args:
+            utc_us: UTC 紀元微秒陣列
+
+        Returns:
+            均時差陣列（分鐘）
+        """
+        return np.array([self.minutes_at(int(v)) for v in utc_us], dtype=np.float64)
+
+
+class AnalyticEquationOfTime(EquationOfTimeProvider):
+    """NOAA/Meeus 解析級數，與 ephem 相比誤差約數秒"""
+
+    method = EquationOfTimeMethod.ANALYTIC
+
+    def minutes_at(self, utc_us: int) -> float:
+        return _meeus_series(_julian_centuries(utc_us), math)
+
+    def minutes_many(self, utc_us: np.ndarray) -> np.ndarray:
+        return _meeus_series(_julian_centuries(np.asarray(utc_us, dtype=np.int64)), np)
+
+
+class EphemEquationOfTime(EquationOfTimeProvider):
+    """
+    以 ephem 即時計算均時差（精度基準，但每次呼叫都要建立 Observer 並計算太陽位置）
+
+    均時差 = 格林威治視太陽時 - 世界時，
+    格林威治視太陽時 = 視恆星時 - 太陽視赤經 + 12 時。
+    """
+
+    method = EquationOfTimeMethod.EPHEM
+
+    def minutes_at(self, utc_us: int) -> float:
+        utc_time = _EPOCH + timedelta(microseconds=utc_us)
+
+        observer = ephem.Observer()
+        observer.lon = '0'
+        observer.lat = '0'
+        observer.date = utc_time
+        observer.epoch = observer.date  # 赤經以當日春分點為準，與恆星時一致
+
+        sun = ephem.Sun()
+        sun.compute(observer)
+
+        hour_angle_hours = float(observer.sidereal_time() - sun.g_ra) * 12.0 / ephem.pi
+        ut_hours = (utc_us % _US_PER_DAY) / 3_600_000_000
+        difference_hours = (hour_angle_hours + 12.0 - ut_hours + 12.0) % 24.0 - 12.0
+
+        return difference_hours * 60.0
+
+
+class TableEquationOfTime(EquationOfTimeProvider):
+    """
+    逐日預計算表，線性內插（表外年份退回解析級數）
+
+    以 mmap 映射二進位表，不複製整張表。
+    """
+
+    method = EquationOfTimeMethod.TABLE
+
+    def __init__(self, path: Path = DEFAULT_TABLE_PATH):
+        """
+        載入均時差表
+
+        Args:
+            path: 二進位表檔案路徑
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, start_year, end_year, _ = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"無效的均時差表檔案: {self.path}")
+
+        self.start_year = start_year
+        self.end_year = end_year
+
+        count = (datetime(end_year + 1, 1, 1) - datetime(start_year, 1, 1)).days + 1
+        if len(self._mmap) != _HEADER.size + count * 4:
+            raise ValueError(f"均時差表檔案大小不符: {self.path}")
+
+        self._values = np.frombuffer(self._mmap, dtype='<f4', count=count, offset=_HEADER.size)
+        self._start_us = _to_epoch_us(datetime(start_year, 1, 1))
+        self._fallback = AnalyticEquationOfTime()
+
+    def minutes_at(self, utc_us: int) -> float:
+        day, remainder = divmod(utc_us - self._start_us, _US_PER_DAY)
+        if not 0 <= day < len(self._values) - 1:
+            return self._fallback.minutes_at(utc_us)
+
+        fraction = remainder / _US_PER_DAY
+        before = float(self._values[day])
+        after = float(self._values[day + 1])
+        return before + (after - before) * fraction
+
+    def minutes_many(self, utc_us: np.ndarray) -> np.ndarray:
+        utc_us = np.asarray(utc_us, dtype=np.int64)
+        day, remainder = np.divmod(utc_us - self._start_us, _US_PER_DAY)
+        inside = (day >= 0) & (day < len(self._values) - 1)
+
+        index = np.where(inside, day, 0)
+        fraction = remainder / _US_PER_DAY
+        before = self._values[index].astype(np.float64)
+        after = self._values[index + 1].astype(np.float64)
+        result = before + (after - before) * fraction
+
+        if not inside.all():
+            result[~inside] = self._fallback.minutes_many(utc_us[~inside])
+        return result
+
+
+def load_table(path: Path = DEFAULT_TABLE_PATH) -> Optional[TableEquationOfTime]:
+    """
+    載入均時差表，檔案不存在或損壞時返回 None
+
+    Args:
+        path: 二進位表檔案路徑
+
+    Returns:
+        TableEquationOfTime 或 None
+    """
+    if not Path(path).exists():
+        logger.warning(f"均時差預計算表不存在: {path}")
+        return None
+
+    try:
+        return TableEquationOfTime(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"均時差預計算表載入失敗: {e}")
+        return None
+
+
+_providers: Dict[EquationOfTimeMethod, EquationOfTimeProvider] = {}
+
+
+def get_equation_of_time_provider(
+    method: Union[str, EquationOfTimeMethod, EquationOfTimeProvider] = EquationOfTimeMethod.ANALYTIC
+) -> EquationOfTimeProvider:
+    """
+    獲取均時差計算方式（同一方式在進程內共用同一實例）
+
+    Args:
+        method: 計算方式名稱（analytic/table/ephem）或自訂的 EquationOfTimeProvider
+
+    Returns:
+        EquationOfTimeProvider 實例；table 表檔不可用時退回 analytic
+    """
+    if isinstance(method, EquationOfTimeProvider):
+        return method
+
+    try:
+        method = EquationOfTimeMethod(method)
+    except ValueError:
+        raise ValueError(f"不支援的均時差計算方式: {method}")
+
+    provider = _providers.get(method)
+    if provider is None:
+        if method == EquationOfTimeMethod.TABLE:
+            provider = load_table() or get_equation_of_time_provider(EquationOfTimeMethod.ANALYTIC)
+        elif method == EquationOfTimeMethod.EPHEM:
+            provider = EphemEquationOfTime()
+        else:
+            provider = AnalyticEquationOfTime()
+        _providers[method] = provider
+
+    return provider
+
+
+# ============================================
+# 建表與精度報告 (Build & Accuracy Report)
+# ============================================
+
+def build_table(
+    path: Path = DEFAULT_TABLE_PATH,
+    start_year: int = TABLE_START_YEAR,
+    end_year: int = TABLE_END_YEAR
+) -> Path:
+    """
+    以 ephem 計算逐日均時差並寫出二進位表
+
+    Args:
+        path: 輸出檔案路徑
+        start_year: 起始年份
+        end_year: 結束年份（含）
+
+    Returns:
+        輸出檔案路徑
+    """
+    reference = EphemEquationOfTime()
+    start_us = _to_epoch_us(datetime(start_year, 1, 1))
+    count = (datetime(end_year + 1, 1, 1) - datetime(start_year, 1, 1)).days + 1
+
+    values = np.array(
+        [reference.minutes_at(start_us + day * _US_PER_DAY) for day in range(count)],
+        dtype='<f4'
+    )
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, start_year, end_year, 0))
+        f.write(values.tobytes())
+    tmp_path.replace(path)
+
+    return path
+
+
+def accuracy_report(
+    provider: EquationOfTimeProvider,
+    start_year: int = TABLE_START_YEAR,
+    end_year: int = TABLE_END_YEAR,
+    step_hours: float = 73.0
+) -> Dict:
+    """
+    將計算方式與 ephem 逐點比對
+
+    取樣間隔預設 73 小時，使取樣點輪流落在一天中的不同時刻。
+
+    Args:
+        provider: 要評估的計算方式
+        start_year: 起始年份
+        end_year: 結束年份（含）
+        step_hours: 取樣間隔（小時）
+
+    Returns:
+        包含取樣數、最大/平均/均方根誤差（秒）及最大誤差時刻的字典
+    """
+    reference = EphemEquationOfTime()
+    start_us = _to_epoch_us(datetime(start_year, 1, 1))
+    end_us = _to_epoch_us(datetime(end_year + 1, 1, 1))
+    samples = np.arange(start_us, end_us, int(step_hours * 3_600_000_000), dtype=np.int64)
+
+    expected = reference.minutes_many(samples)
+    errors = np.abs(provider.minutes_many(samples) - expected) * 60.0
+    worst = int(np.argmax(errors))
+
+    return {
+        "method": provider.method.value,
+        "start_year": start_year,
+        "end_year": end_year,
+        "samples": len(samples),
+        "max_error_seconds": float(errors[worst]),
+        "mean_error_seconds": float(errors.mean()),
+        "rms_error_seconds": float(np.sqrt((errors ** 2).mean())),
+        "worst_time": (_EPOCH + timedelta(microseconds=int(samples[worst]))).isoformat(),
+    }
+
+
+def format_accuracy_report(reports: List[Dict]) -> str:
+    """將精度報告格式化為表格文字"""
+    lines = [
+        f"{'方式':<10}{'取樣數':>10}{'最大誤差(s)':>14}{'平均誤差(s)':>14}{'RMS(s)':>10}  最大誤差時刻 (UTC)",
+    ]
+    for report in reports:
+        lines.append(
+            f"{report['method']:<10}{report['samples']:>10}"
+            f"{report['max_error_seconds']:>14.3f}{report['mean_error_seconds']:>14.3f}"
+            f"{report['rms_error_seconds']:>10.3f}  {report['worst_time']}"
+        )
+    return "\n".join(lines)
@@ -18,12 +18,30 @@ HTML 報告生成器 (Comprehensive 8-Method Analysis)
 - 時間軸可視化
 - LLM深度分析展示
 - 完整八方法詳細報告
+
+頁面框架與CSS位於 templates/*_report_template.html，各區塊由預先編譯的片段模板逐段產生，
+可直接寫入檔案或 socket（iter_html_report / write_html_report），不必先組出整份文件。
+
+各渲染函數與方法區塊以 fragment_cached 依實際用到的輸入雜湊緩存：重新產生報告時
+（例如只更新了某一段LLM分析），只有輸入改變的區塊會重新渲染，其餘直接沿用。
+
+要直接對外提供的報告可加上 minify=True（在可讀版旁另寫精簡版 *.min.html：行內樣式改為
+去重的 class、壓縮空白）與 precompress=True（兩個版本各自寫入 .gz / .br 副本），見 report_artifacts。
 """
 
-from typing import Dict, List, Optional
+import json
+import os
+import threading
 from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, TextIO
 
+from .html_templates import compile_template, fragment_cached, load_template
+from .markdown_renderer import iter_markdown_file
+from .report_artifacts import minified_path, minify_html, remove_stale_artifacts, write_precompressed
 
+
+@fragment_cached()
 def _render_confidence_badge(confidence_data: Dict) -> str:
     """
     渲染信心度徽章（帶顏色編碼）
@@ -58,6 +76,12 @@ def _render_confidence_badge(confidence_data: Dict) -> str:
     '''
 
 
+@fragment_cached(lambda synthesis_data, domain_name: [
+    # 領域不存在時輸出空字串、存在但沒有下列欄位時輸出空的對比框，兩者不能共用緩存
+    bool(synthesis_data.get(domain_name)),
+    {key: synthesis_data.get(domain_name, {}).get(key)
+     for key in ('convergent_traits', 'bazi_perspective', 'ziwei_perspective', 'astro_perspective')}
+])
 def _render_method_comparison(synthesis_data: Dict, domain_name: str) -> str:
     """
     渲染三方法對比可視化
@@ -135,6 +159,7 @@ def _render_method_comparison(synthesis_data: Dict, domain_name: str) -> str:
     return html
 
 
+@fragment_cached(lambda bazi_data: bazi_data.get('calculation', {}).get('luck_pillars', [])[:10])
 def _render_timeline_visualization(bazi_data: Dict) -> str:
     """
     渲染時間軸可視化（大運）
@@ -192,6 +217,9 @@ def _render_timeline_visualization(bazi_data: Dict) -> str:
     return html
 
 
+@fragment_cached(lambda analysis_data, section_title: [
+    analysis_data.get('llm_analysis', ''), analysis_data.get('analysis_method', '')
+])
 def _render_llm_analysis(analysis_data: Dict, section_title: str) -> str:
     """
     渲染LLM深度分析內容
@@ -224,1598 +252,514 @@ def _render_llm_analysis(analysis_data: Dict, section_title: str) -> str:
     return html
 
 
-def generate_html_report(data: Dict, output_path: str) -> str:
-    """
-    生成HTML格式的綜合命理分析報告（Phase 4 Enhanced）
-
-    Args:
-        data: 完整的分析數據
-        output_path: 輸出文件路徑
-
-    Returns:
-        HTML報告文件路徑
-    """
-
-    # 提取基本信息
-    basic_info = data.get('basic_info', {})
-    calendar_data = data.get('calendar_data', {})
-    four_pillars = calendar_data.get('four_pillars', {})
+# ============================================
+# 報告片段模板 (Fragment Templates)
+# ============================================
 
-    # 提取分析結果
-    bazi = data.get('bazi', {})
-    ziwei = data.get('ziwei', {})
-    astrology = data.get('astrology', {})
-    synthesis = data.get('synthesis', {})
-
-    # 生成HTML
-    html = f"""<!DOCTYPE html>
-<html lang="zh-Hant">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{basic_info.get('name', 'Unknown')} 命理綜合分析報告</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        body {{
-            font-family: "PingFang TC", "Microsoft JhengHei", "Heiti TC", sans-serif;
-            line-height: 1.8;
-            color: #e0e0e0;
-            background: #000000;
-            padding: 20px;
-        }}
-
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: #1a1a1a;
-            border-radius: 20px;
-            box-shadow: 0 10px 40px rgba(0,0,0,0.5);
-            overflow: hidden;
-        }}
-
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 40px;
-            text-align: center;
-        }}
-
-        .header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.2);
-        }}
-
-        .birth-info {{
-            background: rgba(255,255,255,0.1);
-            padding: 20px;
-            border-radius: 10px;
-            margin-top: 20px;
-            backdrop-filter: blur(10px);
-        }}
-
-        .birth-info-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin-top: 15px;
-        }}
-
-        .info-item {{
-            text-align: center;
-        }}
-
-        .info-label {{
-            font-size: 0.9em;
-            opacity: 0.9;
-            margin-bottom: 5px;
-        }}
-
-        .info-value {{
-            font-size: 1.3em;
-            font-weight: bold;
-        }}
-
-        .four-pillars {{
-            display: flex;
-            justify-content: center;
-            gap: 20px;
-            margin-top: 20px;
-            flex-wrap: wrap;
-        }}
-
-        .pillar {{
-            background: rgba(255,255,255,0.15);
-            padding: 15px 25px;
-            border-radius: 10px;
-            text-align: center;
-            min-width: 100px;
-        }}
-
-        .pillar-label {{
-            font-size: 0.9em;
-            margin-bottom: 8px;
-            opacity: 0.9;
-        }}
-
-        .pillar-value {{
-            font-size: 1.8em;
-            font-weight: bold;
-            letter-spacing: 3px;
-        }}
-
-        .content {{
-            padding: 40px;
-            background: #1a1a1a;
-        }}
-
-        .section {{
-            margin-bottom: 50px;
-        }}
-
-        .section-title {{
-            font-size: 2em;
-            color: #8b9cff;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 3px solid #8b9cff;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }}
-
-        .subsection {{
-            margin: 30px 0;
-            padding: 25px;
-            background: #2a2a2a;
-            border-radius: 15px;
-            border-left: 5px solid #8b9cff;
-        }}
-
-        .subsection-title {{
-            font-size: 1.5em;
-            color: #a5b4fc;
-            margin-bottom: 15px;
-        }}
-
-        /* Phase 4: Enhanced Confidence Badges */
-        .confidence-badge {{
-            display: inline-block;
-            padding: 8px 16px;
-            border-radius: 20px;
-            font-size: 0.9em;
-            font-weight: 600;
-            margin: 5px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
-
-        .confidence-very-high {{
-            background: linear-gradient(135deg, #4CAF50 0%, #45a049 100%);
-            color: white;
-        }}
-
-        .confidence-high {{
-            background: linear-gradient(135deg, #2196F3 0%, #1976D2 100%);
-            color: white;
-        }}
-
-        .confidence-medium {{
-            background: linear-gradient(135deg, #FFC107 0%, #FFA000 100%);
-            color: white;
-        }}
-
-        .confidence-low {{
-            background: linear-gradient(135deg, #FF9800 0%, #F57C00 100%);
-            color: white;
-        }}
-
-        .confidence-uncertain {{
-            background: linear-gradient(135deg, #9E9E9E 0%, #757575 100%);
-            color: white;
-        }}
-
-        /* Phase 4: Method Comparison */
-        .method-comparison {{
-            background: #2a2a2a;
-            border-radius: 15px;
-            padding: 25px;
-            margin: 20px 0;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.3);
-        }}
-
-        .comparison-title {{
-            font-size: 1.3em;
-            color: #8b9cff;
-            margin-bottom: 20px;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }}
-
-        .convergent-section {{
-            background: linear-gradient(135deg, #1a4d2e 0%, #2d5f3f 100%);
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-            border-left: 5px solid #4CAF50;
-        }}
-
-        .convergent-header {{
-            display: flex;
-            align-items: center;
-            gap: 10px;
-            margin-bottom: 15px;
-            font-weight: bold;
-            color: #a5d6a7;
-        }}
-
-        .convergent-icon {{
-            font-size: 1.5em;
-        }}
-
-        .convergent-title {{
-            font-size: 1.1em;
-        }}
-
-        .trait-tags {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-
-        .trait-tag {{
-            padding: 8px 15px;
-            border-radius: 20px;
-            font-size: 0.95em;
-            font-weight: 500;
-            box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-        }}
-
-        .trait-tag.convergent {{
-            background: #1a1a1a;
-            color: #a5d6a7;
-            border: 2px solid #4CAF50;
-        }}
-
-        .perspectives-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 15px;
-            margin-top: 15px;
-        }}
-
-        .perspective-card {{
-            padding: 15px;
-            border-radius: 10px;
-            border-left: 4px solid;
-        }}
-
-        .perspective-card.perspective-bazi {{
-            background: #2a1f00;
-            border-left-color: #FF9800;
-        }}
-
-        .perspective-card.perspective-ziwei {{
-            background: #1a1a2e;
-            border-left-color: #673AB7;
-        }}
-
-        .perspective-card.perspective-astro {{
-            background: #001f2a;
-            border-left-color: #03A9F4;
-        }}
-
-        .perspective-header {{
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            margin-bottom: 10px;
-            font-weight: bold;
-        }}
-
-        .perspective-icon {{
-            font-size: 1.2em;
-        }}
-
-        .trait-tag.bazi {{
-            background: #1a1a1a;
-            color: #ffb74d;
-            border: 2px solid #FF9800;
-        }}
-
-        .trait-tag.ziwei {{
-            background: #1a1a1a;
-            color: #9575cd;
-            border: 2px solid #673AB7;
-        }}
-
-        .trait-tag.astro {{
-            background: #1a1a1a;
-            color: #4fc3f7;
-            border: 2px solid #03A9F4;
-        }}
-
-        /* Phase 4: Timeline Visualization */
-        .timeline-section {{
-            background: #2a2a2a;
-            padding: 25px;
-            border-radius: 15px;
-            margin: 20px 0;
-        }}
-
-        .timeline-title {{
-            font-size: 1.3em;
-            color: #8b9cff;
-            margin-bottom: 20px;
-        }}
-
-        .timeline-container {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(150px, 1fr));
-            gap: 15px;
-        }}
-
-        .timeline-item {{
-            background: #1f1f1f;
-            padding: 15px;
-            border-radius: 10px;
-            border-left: 4px solid;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.3);
-            position: relative;
-        }}
-
-        .timeline-marker {{
-            position: absolute;
-            left: -8px;
-            top: 20px;
-            width: 12px;
-            height: 12px;
-            border-radius: 50%;
-            border: 3px solid #000;
-        }}
-
-        .timeline-content {{
-            text-align: center;
-        }}
-
-        .timeline-pillar {{
-            font-size: 1.5em;
-            font-weight: bold;
-            margin-bottom: 5px;
-            letter-spacing: 2px;
-        }}
-
-        .timeline-age {{
-            font-size: 0.9em;
-            color: #b0b0b0;
-            margin-bottom: 5px;
-        }}
-
-        .timeline-element {{
-            font-size: 0.85em;
-            font-weight: bold;
-        }}
-
-        /* Phase 4: LLM Analysis */
-        .llm-analysis-section {{
-            background: linear-gradient(135deg, #1a2a3a 0%, #2d3d4d 100%);
-            padding: 25px;
-            border-radius: 15px;
-            margin: 20px 0;
-            border-left: 5px solid #2196F3;
-        }}
-
-        .llm-badge {{
-            display: inline-flex;
-            align-items: center;
-            gap: 8px;
-            background: #1a1a1a;
-            padding: 8px 16px;
-            border-radius: 20px;
-            font-weight: bold;
-            color: #64b5f6;
-            margin-bottom: 15px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.3);
-        }}
-
-        .llm-icon {{
-            font-size: 1.2em;
-        }}
-
-        .llm-content {{
-            background: #2a2a2a;
-            padding: 20px;
-            border-radius: 10px;
-            line-height: 2;
-            color: #e0e0e0;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.3);
-        }}
-
-        .score-card {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            border-radius: 15px;
-            text-align: center;
-            margin: 20px 0;
-        }}
-
-        .score-value {{
-            font-size: 3em;
-            font-weight: bold;
-            margin: 10px 0;
-        }}
-
-        .score-label {{
-            font-size: 1.2em;
-            opacity: 0.9;
-        }}
-
-        .domain-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 20px;
-            margin: 30px 0;
-        }}
-
-        .domain-card {{
-            background: #2a2a2a;
-            border-radius: 15px;
-            padding: 25px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.3);
-            transition: transform 0.3s ease, box-shadow 0.3s ease;
-        }}
-
-        .domain-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 10px 25px rgba(0,0,0,0.4);
-        }}
-
-        .domain-icon {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }}
-
-        .domain-name {{
-            font-size: 1.3em;
-            font-weight: bold;
-            color: #8b9cff;
-            margin-bottom: 15px;
-        }}
-
-        .domain-rating {{
-            font-size: 2em;
-            font-weight: bold;
-            color: #a5b4fc;
-            margin: 10px 0;
-        }}
-
-        .narrative-box {{
-            background: #2a2a2a;
-            border: 2px solid #3a3a3a;
-            border-radius: 10px;
-            padding: 25px;
-            margin: 20px 0;
-            line-height: 2;
-            color: #e0e0e0;
-        }}
-
-        .insight-list {{
-            list-style: none;
-            padding: 0;
-        }}
-
-        .insight-list li {{
-            padding: 15px;
-            margin: 10px 0;
-            background: #2a2a2a;
-            border-radius: 10px;
-            border-left: 4px solid #8b9cff;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.3);
-            color: #e0e0e0;
-        }}
-
-        .insight-list li strong {{
-            color: #8b9cff;
-        }}
-
-        .footer {{
-            background: #0a0a0a;
-            padding: 30px;
-            text-align: center;
-            color: #b0b0b0;
-            border-top: 1px solid #333;
-        }}
-
-        .timestamp {{
-            font-size: 0.9em;
-            color: #808080;
-            margin-top: 10px;
-        }}
-
-        @media print {{
-            body {{
-                background: #000000;
-                padding: 0;
-            }}
-            .container {{
-                box-shadow: none;
-                border-radius: 0;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <!-- Header -->
-        <div class="header">
-            <h1>🔮 綜合命理分析報告</h1>
-            <div class="birth-info">
-                <div class="birth-info-grid">
-                    <div class="info-item">
-                        <div class="info-label">姓名</div>
-                        <div class="info-value">{basic_info.get('name', 'N/A')}</div>
-                    </div>
-                    <div class="info-item">
-                        <div class="info-label">出生日期</div>
-                        <div class="info-value">{basic_info.get('birth_gregorian', 'N/A')}</div>
-                    </div>
-                    <div class="info-item">
-                        <div class="info-label">農曆</div>
-                        <div class="info-value">{basic_info.get('birth_lunar', 'N/A')}</div>
-                    </div>
-                    <div class="info-item">
-                        <div class="info-label">出生地</div>
-                        <div class="info-value">{basic_info.get('location', 'N/A')}</div>
-                    </div>
-                    <div class="info-item">
-                        <div class="info-label">性別</div>
-                        <div class="info-value">{basic_info.get('gender', 'N/A')}</div>
-                    </div>
-                </div>
+_SECTION_OPEN = compile_template('''
+            <div class="section">
+                <h2 class="section-title">{{TITLE}}</h2>
+''')
 
-                <!-- Four Pillars -->
-                <div class="four-pillars">
-                    <div class="pillar">
-                        <div class="pillar-label">年柱</div>
-                        <div class="pillar-value">{four_pillars.get('year', {}).get('pillar', 'N/A')}</div>
-                    </div>
-                    <div class="pillar">
-                        <div class="pillar-label">月柱</div>
-                        <div class="pillar-value">{four_pillars.get('month', {}).get('pillar', 'N/A')}</div>
-                    </div>
-                    <div class="pillar">
-                        <div class="pillar-label">日柱</div>
-                        <div class="pillar-value">{four_pillars.get('day', {}).get('pillar', 'N/A')}</div>
-                    </div>
-                    <div class="pillar">
-                        <div class="pillar-label">時柱</div>
-                        <div class="pillar-value">{four_pillars.get('hour', {}).get('pillar', 'N/A')}</div>
-                    </div>
-                </div>
+_SECTION_CLOSE = '''
             </div>
-        </div>
+'''
 
-        <!-- Content -->
-        <div class="content">
-"""
-
-    # ========================================
-    # 綜合分析（Comprehensive Synthesis）
-    # ========================================
-    if synthesis:
-        html += """
+_SYNTHESIS_INTRO = '''
             <!-- Comprehensive Synthesis Section -->
             <div class="section">
                 <h2 class="section-title">🎯 綜合分析總覽</h2>
                 <p style="font-size: 1.1em; color: #666; margin-bottom: 30px;">
                     整合<strong>八字命理</strong>、<strong>紫微斗數</strong>、<strong>西洋占星</strong>、<strong>梅花易數</strong>、<strong>奇門遁甲</strong>、<strong>六爻占卜</strong>、<strong>生命靈數</strong>、<strong>姓名學</strong>八大命理體系的綜合分析
                 </p>
-"""
-
-        # 生命領域卡片
-        domains = {
-            'personality_synthesis': ('💫', '核心人格'),
-            'career_synthesis': ('💼', '事業發展'),
-            'wealth_synthesis': ('💰', '財富運勢'),
-            'relationship_synthesis': ('💖', '感情關係'),
-            'health_synthesis': ('🏥', '健康狀況')
-        }
+'''
 
-        html += '<div class="domain-grid">'
-
-        for domain_key, (icon, name) in domains.items():
-            domain_data = synthesis.get(domain_key, {})
-            if domain_data:
-                rating = domain_data.get('overall_rating', 'N/A')
-                confidence_data = domain_data.get('confidence_level', {})
-
-                confidence_badge = _render_confidence_badge(confidence_data)
-
-                html += f"""
+_DOMAIN_CARD = compile_template('''
                 <div class="domain-card">
-                    <div class="domain-icon">{icon}</div>
-                    <div class="domain-name">{name}</div>
-                    <div class="domain-rating">{rating}/10</div>
-                    {confidence_badge}
-                </div>
-"""
-
-        html += '</div>'
-
-        # 性格綜合分析 - 詳細展開（含三方法對比）
-        personality = synthesis.get('personality_synthesis', {})
-        if personality:
-            confidence_data = personality.get('confidence_level', {})
-            narrative = personality.get('synthesis_narrative', '')
-
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">💫 核心人格詳細分析</h3>
-                    <div class="score-card">
-                        <div class="score-label">綜合評分</div>
-                        <div class="score-value">{personality.get('overall_rating', 'N/A')}/10</div>
-                        {_render_confidence_badge(confidence_data)}
-                    </div>
-
-                    <!-- Phase 4: Three-Method Comparison -->
-                    {_render_method_comparison(synthesis, 'personality_synthesis')}
-
-                    <div class="narrative-box">
-                        <h4 style="color: #667eea; margin-bottom: 15px;">📝 綜合敘事</h4>
-                        {narrative.replace(chr(10), '<br>')}
-                    </div>
-
-                    <!-- Phase 4: LLM Analysis (if available) -->
-                    {_render_llm_analysis(personality, '核心人格')}
+                    <div class="domain-icon">{{ICON}}</div>
+                    <div class="domain-name">{{NAME}}</div>
+                    <div class="domain-rating">{{RATING}}/10</div>
+                    {{CONFIDENCE_BADGE}}
                 </div>
-"""
+''')
 
-        # 事業發展詳細分析
-        career = synthesis.get('career_synthesis', {})
-        if career:
-            confidence_data = career.get('confidence_level', {})
-            narrative = career.get('synthesis_narrative', '')
-
-            html += f"""
+_SYNTHESIS_DETAIL = compile_template('''
                 <div class="subsection">
-                    <h3 class="subsection-title">💼 事業發展詳細分析</h3>
+                    <h3 class="subsection-title">{{TITLE}}</h3>
                     <div class="score-card">
                         <div class="score-label">綜合評分</div>
-                        <div class="score-value">{career.get('overall_rating', 'N/A')}/10</div>
-                        {_render_confidence_badge(confidence_data)}
+                        <div class="score-value">{{RATING}}/10</div>
+                        {{CONFIDENCE_BADGE}}
                     </div>
 
-                    {_render_method_comparison(synthesis, 'career_synthesis')}
+                    {{METHOD_COMPARISON}}
 
                     <div class="narrative-box">
                         <h4 style="color: #667eea; margin-bottom: 15px;">📝 綜合敘事</h4>
-                        {narrative.replace(chr(10), '<br>')}
+                        {{NARRATIVE}}
                     </div>
 
-                    {_render_llm_analysis(career, '事業發展')}
+                    {{LLM_ANALYSIS}}
                 </div>
-"""
+''')
 
-        html += """
-            </div>
-"""
-
-    # ========================================
-    # 八字分析部分（Phase 4 Enhanced）
-    # ========================================
-    bazi_interp = bazi.get('interpretation', {})
-    if bazi_interp:
-        html += """
-            <div class="section">
-                <h2 class="section-title">📚 八字命理分析</h2>
-"""
-
-        # 性格分析
-        personality = bazi_interp.get('personality', {})
-        if personality:
-            confidence_data = personality.get('confidence_level', {})
-            analysis_method = personality.get('analysis_method', '')
-
-            day_master_essence = personality.get('day_master_essence', {})
-            if isinstance(day_master_essence, dict):
-                core_essence = day_master_essence.get('core_essence', '')
-            else:
-                core_essence = str(day_master_essence)
-
-            html += f"""
+_BAZI_PERSONALITY = compile_template('''
                 <div class="subsection">
                     <h3 class="subsection-title">性格特質</h3>
-                    {_render_confidence_badge(confidence_data)}
-                    <span style="margin-left: 10px; font-size: 0.9em; color: #666;">分析方法: {analysis_method}</span>
+                    {{CONFIDENCE_BADGE}}
+                    <span style="margin-left: 10px; font-size: 0.9em; color: #666;">分析方法: {{ANALYSIS_METHOD}}</span>
 
                     <div class="narrative-box">
-                        {core_essence[:1000].replace(chr(10), '<br>')}
+                        {{CORE_ESSENCE}}
                     </div>
 
-                    {_render_llm_analysis(personality, '八字性格')}
+                    {{LLM_ANALYSIS}}
                 </div>
-"""
-
-        # 事業分析
-        career = bazi_interp.get('career', {})
-        if career:
-            confidence_data = career.get('confidence_level', {})
+''')
 
-            html += f"""
+_BADGE_SUBSECTION = compile_template('''
                 <div class="subsection">
-                    <h3 class="subsection-title">事業發展</h3>
-                    {_render_confidence_badge(confidence_data)}
+                    <h3 class="subsection-title">{{TITLE}}</h3>
+                    {{CONFIDENCE_BADGE}}
 
-                    {_render_llm_analysis(career, '八字事業')}
+                    {{LLM_ANALYSIS}}
                 </div>
-"""
-
-        # Phase 4: Timeline Visualization (大運)
-        timeline_html = _render_timeline_visualization(bazi)
-        if timeline_html:
-            html += timeline_html
-
-        html += """
-            </div>
-"""
+''')
 
-    # ========================================
-    # 紫微斗數分析（Phase 4 Enhanced）
-    # ========================================
-    ziwei_interp = ziwei.get('interpretation', {})
-    if ziwei_interp:
-        palace_interp = ziwei_interp.get('palace_interpretations', {})
-        destiny_palace = palace_interp.get('命宮', {})
-
-        if destiny_palace:
-            confidence_data = destiny_palace.get('confidence_level', {})
-
-            html += f"""
-            <div class="section">
-                <h2 class="section-title">🌟 紫微斗數分析</h2>
+_INSIGHT_SUBSECTION = compile_template('''
                 <div class="subsection">
-                    <h3 class="subsection-title">命宮</h3>
-                    {_render_confidence_badge(confidence_data)}
+                    <h3 class="subsection-title">{{TITLE}}</h3>
+                    {{CONFIDENCE_BADGE}}
 
-                    <ul class="insight-list">
-                        <li><strong>位置</strong>：{destiny_palace.get('position', 'N/A')}</li>
-                        <li><strong>主星</strong>：{', '.join(destiny_palace.get('major_stars', []))}</li>
+                    <ul class="insight-list">{{ITEMS}}
                     </ul>
 
-                    {_render_llm_analysis(destiny_palace, '紫微命宮')}
+                    {{LLM_ANALYSIS}}
                 </div>
-            </div>
-"""
+''')
 
-    # ========================================
-    # 西洋占星分析（Phase 4 Enhanced）
-    # ========================================
-    astro_interp = astrology.get('interpretation', {})
-    if astro_interp:
-        psych_profile = astro_interp.get('psychological_profile', {})
-        if psych_profile:
-            core_self = psych_profile.get('core_self', {})
-            confidence_data = astro_interp.get('confidence_level', {})
-
-            html += f"""
-            <div class="section">
-                <h2 class="section-title">⭐ 西洋占星分析</h2>
-                <div class="subsection">
-                    <h3 class="subsection-title">核心星座配置</h3>
-                    {_render_confidence_badge(confidence_data)}
-
-                    <ul class="insight-list">
-                        <li><strong>太陽星座</strong>：{core_self.get('sun_sign', 'N/A')}</li>
-                        <li><strong>月亮星座</strong>：{core_self.get('moon_sign', 'N/A')}</li>
-                        <li><strong>上升星座</strong>：{core_self.get('ascendant_sign', 'N/A')}</li>
-                    </ul>
-
-                    {_render_llm_analysis(astro_interp, '西洋占星')}
-                </div>
-            </div>
-"""
-
-    # ========================================
-    # 梅花易數分析（Plum Blossom）
-    # ========================================
-    plum = data.get('plum_blossom', {})
-    plum_interp = plum.get('interpretation', {})
-    if plum_interp:
-        confidence_data = plum_interp.get('confidence_level', {})
+_INSIGHT_ITEM = compile_template('''
+                        <li><strong>{{LABEL}}</strong>：{{VALUE}}</li>''')
 
-        html += f"""
-            <div class="section">
-                <h2 class="section-title">🌸 梅花易數分析</h2>
-"""
-
-        # 卦象分析
-        hexagram_analysis = plum_interp.get('hexagram_analysis', {})
-        if hexagram_analysis:
-            html += f"""
+_NARRATIVE_SUBSECTION = compile_template('''
                 <div class="subsection">
-                    <h3 class="subsection-title">卦象解析</h3>
-                    {_render_confidence_badge(confidence_data)}
+                    <h3 class="subsection-title">{{TITLE}}</h3>
+                    {{CONFIDENCE_BADGE}}
 
                     <div class="narrative-box">
-                        {str(hexagram_analysis).replace(chr(10), '<br>')}
+                        {{TEXT}}
                     </div>
-                </div>
-"""
 
-        # 時間卦分析
-        time_hexagram = plum_interp.get('time_hexagram', {})
-        if time_hexagram:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">時間卦分析</h3>
-                    <div class="narrative-box">
-                        {str(time_hexagram).replace(chr(10), '<br>')}
-                    </div>
+                    {{LLM_ANALYSIS}}
                 </div>
-"""
+''')
 
-        # 整體解讀
-        overall = plum_interp.get('overall_interpretation', '')
-        if overall:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">整體解讀</h3>
-                    <div class="narrative-box">
-                        {overall.replace(chr(10), '<br>')}
-                    </div>
-
-                    {_render_llm_analysis(plum_interp, '梅花易數')}
-                </div>
-"""
-
-        html += """
-            </div>
-"""
-
-    # ========================================
-    # 奇門遁甲分析（Qimen Dunjia）
-    # ========================================
-    qimen = data.get('qimen', {})
-    qimen_interp = qimen.get('interpretation', {})
-    if qimen_interp:
-        confidence_data = qimen_interp.get('confidence_level', {})
-
-        html += f"""
-            <div class="section">
-                <h2 class="section-title">🗺️ 奇門遁甲分析</h2>
-"""
-
-        # 局盤分析
-        bureau_analysis = qimen_interp.get('bureau_analysis', {})
-        if bureau_analysis:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">奇門局盤</h3>
-                    {_render_confidence_badge(confidence_data)}
-
-                    <div class="narrative-box">
-                        {str(bureau_analysis).replace(chr(10), '<br>')}
-                    </div>
-                </div>
-"""
-
-        # 用神分析
-        deity_analysis = qimen_interp.get('deity_analysis', {})
-        if deity_analysis:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">用神分析</h3>
-                    <div class="narrative-box">
-                        {str(deity_analysis).replace(chr(10), '<br>')}
-                    </div>
-                </div>
-"""
-
-        # 吉凶預測
-        prediction = qimen_interp.get('prediction', '')
-        if prediction:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">吉凶預測</h3>
-                    <div class="narrative-box">
-                        {prediction.replace(chr(10), '<br>')}
-                    </div>
-
-                    {_render_llm_analysis(qimen_interp, '奇門遁甲')}
-                </div>
-"""
-
-        html += """
+_MARKDOWN_SECTION = compile_template('''
+        <div class="section" id="{{ID}}">
+            <h2 class="section-title">{{TITLE}}</h2>
+            <div class="analysis-content">
+                {{CONTENT}}
             </div>
-"""
-
-    # ========================================
-    # 六爻分析（Liuyao）
-    # ========================================
-    liuyao = data.get('liuyao', {})
-    liuyao_interp = liuyao.get('interpretation', {})
-    if liuyao_interp:
-        confidence_data = liuyao_interp.get('confidence_level', {})
-
-        html += f"""
-            <div class="section">
-                <h2 class="section-title">☯️ 六爻占卜分析</h2>
-"""
-
-        # 本卦分析
-        primary_hexagram = liuyao_interp.get('primary_hexagram', {})
-        if primary_hexagram:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">本卦分析</h3>
-                    {_render_confidence_badge(confidence_data)}
-
-                    <div class="narrative-box">
-                        {str(primary_hexagram).replace(chr(10), '<br>')}
-                    </div>
-                </div>
-"""
-
-        # 變卦分析
-        changed_hexagram = liuyao_interp.get('changed_hexagram', {})
-        if changed_hexagram:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">變卦分析</h3>
-                    <div class="narrative-box">
-                        {str(changed_hexagram).replace(chr(10), '<br>')}
-                    </div>
-                </div>
-"""
-
-        # 世應分析
-        world_response = liuyao_interp.get('world_response_analysis', {})
-        if world_response:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">世應分析</h3>
-                    <div class="narrative-box">
-                        {str(world_response).replace(chr(10), '<br>')}
-                    </div>
-                </div>
-"""
-
-        # 綜合判斷
-        overall = liuyao_interp.get('overall_judgment', '')
-        if overall:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">綜合判斷</h3>
-                    <div class="narrative-box">
-                        {overall.replace(chr(10), '<br>')}
-                    </div>
-
-                    {_render_llm_analysis(liuyao_interp, '六爻占卜')}
-                </div>
-"""
+        </div>
+''')
+
+# 綜合分析的生命領域卡片：綜合結果鍵 → (圖示, 名稱)
+SYNTHESIS_DOMAINS = {
+    'personality_synthesis': ('💫', '核心人格'),
+    'career_synthesis': ('💼', '事業發展'),
+    'wealth_synthesis': ('💰', '財富運勢'),
+    'relationship_synthesis': ('💖', '感情關係'),
+    'health_synthesis': ('🏥', '健康狀況')
+}
+
+# 展開詳細分析（含三方法對比）的領域
+SYNTHESIS_DETAIL_DOMAINS = ('personality_synthesis', 'career_synthesis')
+
+# 以敘事小節呈現的方法：(報告資料鍵, 區塊標題, LLM區塊名稱, ((解釋欄位, 小節標題), ...))
+# 第一個小節附信心度徽章，最後一個小節（整體解讀）附LLM分析
+NARRATIVE_METHOD_SECTIONS = (
+    ('plum_blossom', '🌸 梅花易數分析', '梅花易數', (
+        ('hexagram_analysis', '卦象解析'),
+        ('time_hexagram', '時間卦分析'),
+        ('overall_interpretation', '整體解讀'),
+    )),
+    ('qimen', '🗺️ 奇門遁甲分析', '奇門遁甲', (
+        ('bureau_analysis', '奇門局盤'),
+        ('deity_analysis', '用神分析'),
+        ('prediction', '吉凶預測'),
+    )),
+    ('liuyao', '☯️ 六爻占卜分析', '六爻占卜', (
+        ('primary_hexagram', '本卦分析'),
+        ('changed_hexagram', '變卦分析'),
+        ('world_response_analysis', '世應分析'),
+        ('overall_judgment', '綜合判斷'),
+    )),
+    ('numerology', '🔢 生命靈數分析', '生命靈數', (
+        ('life_path_number', '生命靈數'),
+        ('destiny_number', '天賦數'),
+        ('soul_number', '靈魂數'),
+        ('overall_analysis', '綜合解析'),
+    )),
+    ('name_analysis', '📝 姓名學分析', '姓名學', (
+        ('five_grids', '五格剖象'),
+        ('three_talents', '三才配置'),
+        ('eighty_one_number', '81數理'),
+        ('overall_evaluation', '姓名綜評'),
+    )),
+)
+
+# Markdown 報告的區塊：(檔名, 錨點, 區塊標題)
+MARKDOWN_SECTIONS = (
+    ('synthesis_report.md', 'synthesis', '🎯 綜合分析總覽'),
+    ('bazi_analysis.md', 'bazi', '📿 八字命理分析'),
+    ('ziwei_analysis.md', 'ziwei', '⭐ 紫微斗數分析'),
+    ('astrology_analysis.md', 'astrology', '🌟 心理占星分析'),
+    ('plum_analysis.md', 'plum', '🌸 梅花易數分析'),
+    ('qimen_analysis.md', 'qimen', '🗺️ 奇門遁甲分析'),
+    ('liuyao_analysis.md', 'liuyao', '☯️ 六爻占卜分析'),
+    ('numerology_analysis.md', 'numerology', '🔢 生命靈數分析'),
+    ('name_analysis.md', 'name', '📝 姓名學分析'),
+)
+
+# Markdown 報告模板沒有內文元素的CSS，以行內樣式呈現（# 標題降一級為 <h2>）
+MARKDOWN_STYLES = {
+    'h2': 'color: #667eea; margin: 30px 0 20px 0; font-size: 1.6em;',
+    'h3': 'color: #8b9cff; margin: 25px 0 15px 0; font-size: 1.4em;',
+    'h4': 'color: #a5b4fc; margin: 20px 0 10px 0; font-size: 1.2em;',
+    'h5': 'color: #c7d2fe; margin: 15px 0 10px 0; font-size: 1.05em;',
+    'p': 'margin: 15px 0; line-height: 1.8; color: #e0e0e0;',
+    'ul': 'margin: 10px 0 15px 0; padding-left: 1.5em; line-height: 1.8; color: #e0e0e0;',
+    'ol': 'margin: 10px 0 15px 0; padding-left: 1.5em; line-height: 1.8; color: #e0e0e0;',
+    'table': 'border-collapse: collapse; margin: 15px 0; width: 100%; color: #e0e0e0;',
+    'th': 'border: 1px solid #444; padding: 8px 12px; background: #2a2a2a; color: #a5b4fc;',
+    'td': 'border: 1px solid #444; padding: 8px 12px;',
+    'blockquote': 'margin: 15px 0; padding: 10px 20px; border-left: 4px solid #667eea; background: #1a1a2e;',
+    'pre': 'margin: 15px 0; padding: 15px; background: #0a0a0a; color: #e0e0e0; overflow-x: auto;',
+    'hr': 'border: none; border-top: 1px solid #333; margin: 30px 0;',
+}
+
+
+def _nl2br(text) -> str:
+    """換行轉為 <br>"""
+    return str(text).replace('\n', '<br>')
+
+
+# ============================================
+# 綜合報告 (Comprehensive Report)
+# ============================================
+
+@fragment_cached()
+def _iter_synthesis_section(synthesis: Dict) -> Iterator[str]:
+    """綜合分析總覽：領域卡片與性格、事業詳細分析"""
+    yield _SYNTHESIS_INTRO
+    yield '<div class="domain-grid">'
+    for domain_key, (icon, name) in SYNTHESIS_DOMAINS.items():
+        domain_data = synthesis.get(domain_key, {})
+        if domain_data:
+            yield from _DOMAIN_CARD.stream(
+                ICON=icon,
+                NAME=name,
+                RATING=domain_data.get('overall_rating', 'N/A'),
+                CONFIDENCE_BADGE=_render_confidence_badge(domain_data.get('confidence_level', {}))
+            )
+    yield '</div>'
+
+    for domain_key in SYNTHESIS_DETAIL_DOMAINS:
+        domain_data = synthesis.get(domain_key, {})
+        if domain_data:
+            icon, name = SYNTHESIS_DOMAINS[domain_key]
+            yield from _SYNTHESIS_DETAIL.stream(
+                TITLE=f"{icon} {name}詳細分析",
+                RATING=domain_data.get('overall_rating', 'N/A'),
+                CONFIDENCE_BADGE=_render_confidence_badge(domain_data.get('confidence_level', {})),
+                METHOD_COMPARISON=_render_method_comparison(synthesis, domain_key),
+                NARRATIVE=_nl2br(domain_data.get('synthesis_narrative', '')),
+                LLM_ANALYSIS=_render_llm_analysis(domain_data, name)
+            )
+
+    yield _SECTION_CLOSE
+
+
+@fragment_cached(lambda bazi, bazi_interp: [
+    bazi.get('calculation', {}).get('luck_pillars', [])[:10],
+    bazi_interp.get('personality', {}),
+    bazi_interp.get('career', {})
+])
+def _iter_bazi_section(bazi: Dict, bazi_interp: Dict) -> Iterator[str]:
+    """八字命理：性格、事業與大運時間軸"""
+    yield from _SECTION_OPEN.stream(TITLE='📚 八字命理分析')
+
+    personality = bazi_interp.get('personality', {})
+    if personality:
+        day_master_essence = personality.get('day_master_essence', {})
+        if isinstance(day_master_essence, dict):
+            core_essence = day_master_essence.get('core_essence', '')
+        else:
+            core_essence = str(day_master_essence)
+
+        yield from _BAZI_PERSONALITY.stream(
+            CONFIDENCE_BADGE=_render_confidence_badge(personality.get('confidence_level', {})),
+            ANALYSIS_METHOD=personality.get('analysis_method', ''),
+            CORE_ESSENCE=_nl2br(core_essence[:1000]),
+            LLM_ANALYSIS=_render_llm_analysis(personality, '八字性格')
+        )
+
+    career = bazi_interp.get('career', {})
+    if career:
+        yield from _BADGE_SUBSECTION.stream(
+            TITLE='事業發展',
+            CONFIDENCE_BADGE=_render_confidence_badge(career.get('confidence_level', {})),
+            LLM_ANALYSIS=_render_llm_analysis(career, '八字事業')
+        )
+
+    yield _render_timeline_visualization(bazi)
+    yield _SECTION_CLOSE
+
+
+@fragment_cached(lambda title, subsection_title, confidence_data, items, llm_data, llm_title: [
+    title, subsection_title, confidence_data, items,
+    llm_data.get('llm_analysis', ''), llm_data.get('analysis_method', '')
+])
+def _iter_insight_section(title: str, subsection_title: str, confidence_data: Dict,
+                          items: List, llm_data: Dict, llm_title: str) -> Iterator[str]:
+    """單一小節、以重點列表呈現的區塊（紫微命宮、占星核心配置）"""
+    yield from _SECTION_OPEN.stream(TITLE=title)
+    yield from _INSIGHT_SUBSECTION.stream(
+        TITLE=subsection_title,
+        CONFIDENCE_BADGE=_render_confidence_badge(confidence_data),
+        ITEMS=[_INSIGHT_ITEM.render(LABEL=label, VALUE=value) for label, value in items],
+        LLM_ANALYSIS=_render_llm_analysis(llm_data, llm_title)
+    )
+    yield _SECTION_CLOSE
+
+
+@fragment_cached(lambda interpretation, title, llm_title, subsections: [
+    title, llm_title, subsections,
+    {key: interpretation.get(key) for key in ('confidence_level', 'llm_analysis', 'analysis_method')},
+    [interpretation.get(field_name) for field_name, _ in subsections]
+])
+def _iter_narrative_method_section(interpretation: Dict, title: str, llm_title: str,
+                                   subsections: tuple) -> Iterator[str]:
+    """以敘事小節呈現的方法（見 NARRATIVE_METHOD_SECTIONS）"""
+    confidence_data = interpretation.get('confidence_level', {})
+    last = len(subsections) - 1
+
+    yield from _SECTION_OPEN.stream(TITLE=title)
+    for i, (field_name, subsection_title) in enumerate(subsections):
+        value = interpretation.get(field_name)
+        if value:
+            yield from _NARRATIVE_SUBSECTION.stream(
+                TITLE=subsection_title,
+                CONFIDENCE_BADGE=_render_confidence_badge(confidence_data) if i == 0 else '',
+                TEXT=_nl2br(value),
+                LLM_ANALYSIS=_render_llm_analysis(interpretation, llm_title) if i == last else ''
+            )
+    yield _SECTION_CLOSE
+
+
+def iter_report_sections(data: Dict) -> Iterator[str]:
+    """
+    逐段產生報告內容區（不含頁面框架）
 
-        html += """
-            </div>
-"""
+    Args:
+        data: 完整的分析數據
 
-    # ========================================
-    # 生命靈數分析（Numerology）
-    # ========================================
-    numerology = data.get('numerology', {})
-    num_interp = numerology.get('interpretation', {})
-    if num_interp:
-        confidence_data = num_interp.get('confidence_level', {})
+    Yields:
+        HTML 片段（每個區塊完成一部分即產生）
+    """
+    synthesis = data.get('synthesis', {})
+    if synthesis:
+        yield from _iter_synthesis_section(synthesis)
 
-        html += f"""
-            <div class="section">
-                <h2 class="section-title">🔢 生命靈數分析</h2>
-"""
+    bazi = data.get('bazi', {})
+    bazi_interp = bazi.get('interpretation', {})
+    if bazi_interp:
+        yield from _iter_bazi_section(bazi, bazi_interp)
 
-        # 生命靈數
-        life_path = num_interp.get('life_path_number', {})
-        if life_path:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">生命靈數</h3>
-                    {_render_confidence_badge(confidence_data)}
+    ziwei_interp = data.get('ziwei', {}).get('interpretation', {})
+    if ziwei_interp:
+        destiny_palace = ziwei_interp.get('palace_interpretations', {}).get('命宮', {})
+        if destiny_palace:
+            yield from _iter_insight_section(
+                '🌟 紫微斗數分析', '命宮', destiny_palace.get('confidence_level', {}),
+                [('位置', destiny_palace.get('position', 'N/A')),
+                 ('主星', ', '.join(destiny_palace.get('major_stars', [])))],
+                destiny_palace, '紫微命宮'
+            )
+
+    astro_interp = data.get('astrology', {}).get('interpretation', {})
+    if astro_interp:
+        psych_profile = astro_interp.get('psychological_profile', {})
+        if psych_profile:
+            core_self = psych_profile.get('core_self', {})
+            yield from _iter_insight_section(
+                '⭐ 西洋占星分析', '核心星座配置', astro_interp.get('confidence_level', {}),
+                [('太陽星座', core_self.get('sun_sign', 'N/A')),
+                 ('月亮星座', core_self.get('moon_sign', 'N/A')),
+                 ('上升星座', core_self.get('ascendant_sign', 'N/A'))],
+                astro_interp, '西洋占星'
+            )
 
-                    <div class="narrative-box">
-                        {str(life_path).replace(chr(10), '<br>')}
-                    </div>
-                </div>
-"""
+    for data_key, title, llm_title, subsections in NARRATIVE_METHOD_SECTIONS:
+        interpretation = data.get(data_key, {}).get('interpretation', {})
+        if interpretation:
+            yield from _iter_narrative_method_section(interpretation, title, llm_title, subsections)
 
-        # 天賦數
-        destiny_number = num_interp.get('destiny_number', {})
-        if destiny_number:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">天賦數</h3>
-                    <div class="narrative-box">
-                        {str(destiny_number).replace(chr(10), '<br>')}
-                    </div>
-                </div>
-"""
 
-        # 靈魂數
-        soul_number = num_interp.get('soul_number', {})
-        if soul_number:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">靈魂數</h3>
-                    <div class="narrative-box">
-                        {str(soul_number).replace(chr(10), '<br>')}
-                    </div>
-                </div>
-"""
+def iter_html_report(data: Dict) -> Iterator[str]:
+    """
+    逐段產生HTML格式的綜合命理分析報告
 
-        # 綜合解析
-        overall = num_interp.get('overall_analysis', '')
-        if overall:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">綜合解析</h3>
-                    <div class="narrative-box">
-                        {overall.replace(chr(10), '<br>')}
-                    </div>
+    頁面框架與CSS來自 templates/comprehensive_report_template.html（每個進程只編譯一次），
+    內容區由 iter_report_sections 逐段產生，首段在計算任何區塊前即可送出。
 
-                    {_render_llm_analysis(num_interp, '生命靈數')}
-                </div>
-"""
+    Args:
+        data: 完整的分析數據
 
-        html += """
-            </div>
-"""
+    Yields:
+        HTML 片段
+    """
+    basic_info = data.get('basic_info', {})
+    four_pillars = data.get('calendar_data', {}).get('four_pillars', {})
+
+    yield from load_template('comprehensive_report_template.html').stream(
+        TITLE_NAME=basic_info.get('name', 'Unknown'),
+        NAME=basic_info.get('name', 'N/A'),
+        BIRTH_GREGORIAN=basic_info.get('birth_gregorian', 'N/A'),
+        BIRTH_LUNAR=basic_info.get('birth_lunar', 'N/A'),
+        LOCATION=basic_info.get('location', 'N/A'),
+        GENDER=basic_info.get('gender', 'N/A'),
+        YEAR_PILLAR=four_pillars.get('year', {}).get('pillar', 'N/A'),
+        MONTH_PILLAR=four_pillars.get('month', {}).get('pillar', 'N/A'),
+        DAY_PILLAR=four_pillars.get('day', {}).get('pillar', 'N/A'),
+        HOUR_PILLAR=four_pillars.get('hour', {}).get('pillar', 'N/A'),
+        CONTENT=iter_report_sections(data),
+        TIMESTAMP=datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')
+    )
+
+
+def write_html_report(data: Dict, out: TextIO) -> None:
+    """
+    將報告逐段寫入已開啟的文字串流（檔案、socket.makefile('w') 等）
 
-    # ========================================
-    # 姓名學分析（Name Analysis）
-    # ========================================
-    name_analysis = data.get('name_analysis', {})
-    name_interp = name_analysis.get('interpretation', {})
-    if name_interp:
-        confidence_data = name_interp.get('confidence_level', {})
+    Args:
+        data: 完整的分析數據
+        out: 具有 write(str) 的輸出串流
+    """
+    for chunk in iter_html_report(data):
+        out.write(chunk)
+
+
+def _write_atomic(output_path: str, chunks: Iterable[str]) -> str:
+    """逐段寫入暫存檔，完成後再取代目標檔（中途失敗不會留下不完整的報告）"""
+    path = Path(output_path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return output_path
 
-        html += f"""
-            <div class="section">
-                <h2 class="section-title">📝 姓名學分析</h2>
-"""
 
-        # 五格剖象
-        five_grids = name_interp.get('five_grids', {})
-        if five_grids:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">五格剖象</h3>
-                    {_render_confidence_badge(confidence_data)}
+def _write_report(output_path: str, chunks: Iterable[str], minify: bool, precompress: bool) -> str:
+    """寫入報告（與精簡版、壓縮副本）；需要時先組出整份文件（報告約數十KB）"""
+    if not (minify or precompress):
+        _write_atomic(output_path, chunks)
+    else:
+        document = ''.join(chunks)
+        _write_atomic(output_path, [document])
+        if precompress:
+            write_precompressed(output_path, document.encode('utf-8'))
+        if minify:
+            min_path = minified_path(output_path)
+            minified = minify_html(document)
+            _write_atomic(min_path, [minified])
+            if precompress:
+                write_precompressed(min_path, minified.encode('utf-8'))
+    remove_stale_artifacts(output_path, minify, precompress)
+    return output_path
 
-                    <div class="narrative-box">
-                        {str(five_grids).replace(chr(10), '<br>')}
-                    </div>
-                </div>
-"""
 
-        # 三才配置
-        three_talents = name_interp.get('three_talents', {})
-        if three_talents:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">三才配置</h3>
-                    <div class="narrative-box">
-                        {str(three_talents).replace(chr(10), '<br>')}
-                    </div>
-                </div>
-"""
+def generate_html_report(data: Dict, output_path: str, minify: bool = False,
+                         precompress: bool = False) -> str:
+    """
+    生成HTML格式的綜合命理分析報告（Phase 4 Enhanced）
 
-        # 81數理
-        eighty_one = name_interp.get('eighty_one_number', {})
-        if eighty_one:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">81數理</h3>
-                    <div class="narrative-box">
-                        {str(eighty_one).replace(chr(10), '<br>')}
-                    </div>
-                </div>
-"""
+    Args:
+        data: 完整的分析數據
+        output_path: 輸出文件路徑
+        minify: 另寫精簡版 *.min.html（見 report_artifacts.minify_html）；否則移除舊的精簡版
+        precompress: 各版本同時寫入 .gz / .br 副本；否則移除舊的副本
 
-        # 姓名綜評
-        overall = name_interp.get('overall_evaluation', '')
-        if overall:
-            html += f"""
-                <div class="subsection">
-                    <h3 class="subsection-title">姓名綜評</h3>
-                    <div class="narrative-box">
-                        {overall.replace(chr(10), '<br>')}
-                    </div>
+    Returns:
+        HTML報告文件路徑
+    """
+    return _write_report(output_path, iter_html_report(data), minify, precompress)
 
-                    {_render_llm_analysis(name_interp, '姓名學')}
-                </div>
-"""
 
-        html += """
-            </div>
-"""
+# ============================================
+# Markdown 報告 (Markdown Report)
+# ============================================
 
-    # Footer
-    html += f"""
-        </div>
+def _iter_markdown_sections(analysis_dir: str) -> Iterator[str]:
+    """逐一轉換各分析markdown文件（逐行讀取，不必先讀入整個文件）"""
+    for filename, anchor, title in MARKDOWN_SECTIONS:
+        filepath = os.path.join(analysis_dir, filename)
+        if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+            yield from _MARKDOWN_SECTION.stream(
+                ID=anchor,
+                TITLE=title,
+                CONTENT=iter_markdown_file(filepath, heading_offset=1, styles=MARKDOWN_STYLES)
+            )
 
-        <!-- Footer -->
-        <div class="footer">
-            <p><strong>重要提醒</strong></p>
-            <p>本報告整合<strong>八字命理</strong>、<strong>紫微斗數</strong>、<strong>西洋占星</strong>、<strong>梅花易數</strong>、<strong>奇門遁甲</strong>、<strong>六爻占卜</strong>、<strong>生命靈數</strong>、<strong>姓名學</strong>八大命理方法的綜合分析。</p>
-            <p><strong>命理分析僅供參考，您的人生由自己掌握。</strong></p>
-            <p class="timestamp">分析時間：{datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}</p>
-            <p class="timestamp">SuperClaude Fortune-Telling System v2.0 (Comprehensive 8-Method Analysis)</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
 
-    # 寫入文件
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
+def iter_html_from_markdown_files(analysis_dir: str) -> Iterator[str]:
+    """
+    逐段產生由Markdown分析文件組成的HTML報告
 
-    return output_path
+    Args:
+        analysis_dir: 包含calculations.json和分析.md文件的目錄
 
+    Yields:
+        HTML 片段
+    """
+    # 讀取基本信息
+    with open(os.path.join(analysis_dir, 'calculations.json'), 'r', encoding='utf-8') as f:
+        data = json.load(f)
 
-def generate_html_from_markdown_files(analysis_dir: str, output_path: str) -> str:
+    basic_info = data.get('basic_info', {})
+    four_pillars = data.get('calendar_data', {}).get('four_pillars', {})
+
+    yield from load_template('markdown_report_template.html').stream(
+        NAME=basic_info.get('name', '未知'),
+        BIRTH_GREGORIAN=basic_info.get('birth_gregorian', ''),
+        LOCATION=basic_info.get('location', ''),
+        GENDER=basic_info.get('gender', ''),
+        YEAR_PILLAR=four_pillars.get('year_pillar', ''),
+        MONTH_PILLAR=four_pillars.get('month_pillar', ''),
+        DAY_PILLAR=four_pillars.get('day_pillar', ''),
+        HOUR_PILLAR=four_pillars.get('hour_pillar', ''),
+        CONTENT=_iter_markdown_sections(analysis_dir),
+        TIMESTAMP=datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')
+    )
+
+
+def generate_html_from_markdown_files(analysis_dir: str, output_path: str, minify: bool = False,
+                                      precompress: bool = False) -> str:
     """
     從Markdown分析文件生成完整的HTML報告
 
     Args:
         analysis_dir: 包含calculations.json和分析.md文件的目錄
         output_path: 輸出HTML文件路徑
+        minify: 另寫精簡版 *.min.html（Markdown 內文的行內樣式改為去重的 class）
+        precompress: 各版本同時寫入 .gz / .br 副本；否則移除舊的副本
 
     Returns:
         生成的HTML文件路徑
     """
-    import json
-    import os
-
-    # 讀取基本信息
-    calc_path = os.path.join(analysis_dir, 'calculations.json')
-    with open(calc_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    basic_info = data.get('basic_info', {})
-    name = basic_info.get('name', '未知')
-    birth_gregorian = basic_info.get('birth_gregorian', '')
-    location = basic_info.get('location', '')
-    gender = basic_info.get('gender', '')
-
-    # 獲取四柱
-    calendar_data = data.get('calendar_data', {})
-    four_pillars = calendar_data.get('four_pillars', {})
-    year_pillar = four_pillars.get('year_pillar', '')
-    month_pillar = four_pillars.get('month_pillar', '')
-    day_pillar = four_pillars.get('day_pillar', '')
-    hour_pillar = four_pillars.get('hour_pillar', '')
-
-    # 讀取各個分析markdown文件
-    def read_md_file(filename):
-        filepath = os.path.join(analysis_dir, filename)
-        if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return f.read()
-        return None
-
-    synthesis = read_md_file('synthesis_report.md')
-    bazi = read_md_file('bazi_analysis.md')
-    ziwei = read_md_file('ziwei_analysis.md')
-    astrology = read_md_file('astrology_analysis.md')
-    plum = read_md_file('plum_analysis.md')
-    qimen = read_md_file('qimen_analysis.md')
-    liuyao = read_md_file('liuyao_analysis.md')
-    numerology = read_md_file('numerology_analysis.md')
-    name_analysis = read_md_file('name_analysis.md')
-
-    # 轉換markdown到HTML的簡單函數（保留換行和格式）
-    def md_to_html(md_text):
-        if not md_text:
-            return ''
-        # 簡單處理：轉換標題、粗體、換行
-        html = md_text
-        # ### 標題
-        html = html.replace('### ', '<h4 style="color: #a5b4fc; margin: 20px 0 10px 0; font-size: 1.2em;">')
-        html = html.replace('\n##', '</h4>\n##')
-        # ## 標題
-        html = html.replace('## ', '<h3 style="color: #8b9cff; margin: 25px 0 15px 0; font-size: 1.4em;">')
-        html = html.replace('\n#', '</h3>\n#')
-        # # 標題
-        html = html.replace('# ', '<h2 style="color: #667eea; margin: 30px 0 20px 0; font-size: 1.6em;">')
-        # 粗體
-        import re
-        html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
-        # 換行
-        html = html.replace('\n\n', '</p><p style="margin: 15px 0; line-height: 1.8; color: #e0e0e0;">')
-        html = html.replace('\n', '<br>')
-        # 包裝在段落中
-        html = f'<p style="margin: 15px 0; line-height: 1.8; color: #e0e0e0;">{html}</p>'
-        return html
-
-    # 開始生成HTML
-    html = f"""<!DOCTYPE html>
-<html lang="zh-Hant">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{name} 命理綜合分析報告</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        body {{
-            font-family: "PingFang TC", "Microsoft JhengHei", "Heiti TC", sans-serif;
-            line-height: 1.8;
-            color: #e0e0e0;
-            background: #000000;
-            padding: 20px;
-        }}
-
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: #1a1a1a;
-            border-radius: 20px;
-            box-shadow: 0 10px 40px rgba(0,0,0,0.5);
-            overflow: hidden;
-        }}
-
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 40px;
-            text-align: center;
-        }}
-
-        .header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.2);
-        }}
-
-        .birth-info {{
-            background: rgba(255,255,255,0.1);
-            padding: 20px;
-            border-radius: 10px;
-            margin-top: 20px;
-            backdrop-filter: blur(10px);
-        }}
-
-        .birth-info-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin-top: 15px;
-        }}
-
-        .info-item {{
-            text-align: center;
-        }}
-
-        .info-label {{
-            font-size: 0.9em;
-            opacity: 0.9;
-            margin-bottom: 5px;
-        }}
-
-        .info-value {{
-            font-size: 1.3em;
-            font-weight: bold;
-        }}
-
-        .four-pillars {{
-            display: flex;
-            justify-content: center;
-            gap: 20px;
-            margin-top: 20px;
-            flex-wrap: wrap;
-        }}
-
-        .pillar {{
-            background: rgba(255,255,255,0.15);
-            padding: 15px 25px;
-            border-radius: 10px;
-            text-align: center;
-            min-width: 100px;
-        }}
-
-        .pillar-label {{
-            font-size: 0.9em;
-            margin-bottom: 8px;
-            opacity: 0.9;
-        }}
-
-        .pillar-value {{
-            font-size: 1.8em;
-            font-weight: bold;
-            letter-spacing: 3px;
-        }}
-
-        .content {{
-            padding: 40px;
-            background: #1a1a1a;
-        }}
-
-        .section {{
-            margin-bottom: 50px;
-            background: #2a2a2a;
-            border-radius: 15px;
-            padding: 30px;
-            border-left: 5px solid #8b9cff;
-        }}
-
-        .section-title {{
-            font-size: 2em;
-            color: #8b9cff;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 3px solid #8b9cff;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }}
-
-        .analysis-content {{
-            background: #1f1f1f;
-            padding: 25px;
-            border-radius: 10px;
-            margin-top: 20px;
-            line-height: 2;
-            color: #e0e0e0;
-        }}
-
-        .footer {{
-            background: #0a0a0a;
-            padding: 30px;
-            text-align: center;
-            color: #b0b0b0;
-            border-top: 1px solid #333;
-        }}
-
-        .timestamp {{
-            color: #808080;
-            font-size: 0.9em;
-            margin-top: 10px;
-        }}
-
-        .nav-menu {{
-            background: rgba(255,255,255,0.15);
-            padding: 25px;
-            border-radius: 10px;
-            margin-top: 25px;
-            backdrop-filter: blur(10px);
-        }}
-
-        .nav-menu h3 {{
-            font-size: 1.3em;
-            margin-bottom: 15px;
-            text-align: center;
-            color: white;
-        }}
-
-        .nav-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 10px;
-        }}
-
-        .nav-link {{
-            display: block;
-            padding: 12px 15px;
-            background: rgba(255,255,255,0.1);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            text-align: center;
-            transition: all 0.3s ease;
-            font-size: 0.95em;
-        }}
-
-        .nav-link:hover {{
-            background: rgba(255,255,255,0.25);
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(0,0,0,0.2);
-        }}
-
-        html {{
-            scroll-behavior: smooth;
-        }}
-    </style>
-</head>
-<body>
-<div class="container">
-    <!-- Header -->
-    <div class="header">
-        <h1>✨ {name} 命理綜合分析報告</h1>
-
-        <div class="birth-info">
-            <div class="birth-info-grid">
-                <div class="info-item">
-                    <div class="info-label">出生時間</div>
-                    <div class="info-value">{birth_gregorian}</div>
-                </div>
-                <div class="info-item">
-                    <div class="info-label">出生地</div>
-                    <div class="info-value">{location}</div>
-                </div>
-                <div class="info-item">
-                    <div class="info-label">性別</div>
-                    <div class="info-value">{gender}</div>
-                </div>
-            </div>
-
-            <!-- Four Pillars -->
-            <div class="four-pillars">
-                <div class="pillar">
-                    <div class="pillar-label">年柱</div>
-                    <div class="pillar-value">{year_pillar}</div>
-                </div>
-                <div class="pillar">
-                    <div class="pillar-label">月柱</div>
-                    <div class="pillar-value">{month_pillar}</div>
-                </div>
-                <div class="pillar">
-                    <div class="pillar-label">日柱</div>
-                    <div class="pillar-value">{day_pillar}</div>
-                </div>
-                <div class="pillar">
-                    <div class="pillar-label">時柱</div>
-                    <div class="pillar-value">{hour_pillar}</div>
-                </div>
-            </div>
-
-            <!-- Navigation Menu -->
-            <div class="nav-menu">
-                <h3>📑 報告導航</h3>
-                <div class="nav-grid">
-                    <a href="#synthesis" class="nav-link">🎯 綜合分析總覽</a>
-                    <a href="#bazi" class="nav-link">📿 八字命理分析</a>
-                    <a href="#ziwei" class="nav-link">⭐ 紫微斗數分析</a>
-                    <a href="#astrology" class="nav-link">🌟 心理占星分析</a>
-                    <a href="#plum" class="nav-link">🌸 梅花易數分析</a>
-                    <a href="#qimen" class="nav-link">🗺️ 奇門遁甲分析</a>
-                    <a href="#liuyao" class="nav-link">☯️ 六爻占卜分析</a>
-                    <a href="#numerology" class="nav-link">🔢 生命靈數分析</a>
-                    <a href="#name" class="nav-link">📝 姓名學分析</a>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Content -->
-    <div class="content">
-"""
-
-    # 綜合分析
-    if synthesis:
-        html += f"""
-        <div class="section" id="synthesis">
-            <h2 class="section-title">🎯 綜合分析總覽</h2>
-            <div class="analysis-content">
-                {md_to_html(synthesis)}
-            </div>
-        </div>
-"""
-
-    # 八字命理
-    if bazi:
-        html += f"""
-        <div class="section" id="bazi">
-            <h2 class="section-title">📿 八字命理分析</h2>
-            <div class="analysis-content">
-                {md_to_html(bazi)}
-            </div>
-        </div>
-"""
-
-    # 紫微斗數
-    if ziwei:
-        html += f"""
-        <div class="section" id="ziwei">
-            <h2 class="section-title">⭐ 紫微斗數分析</h2>
-            <div class="analysis-content">
-                {md_to_html(ziwei)}
-            </div>
-        </div>
-"""
-
-    # 西洋占星
-    if astrology:
-        html += f"""
-        <div class="section" id="astrology">
-            <h2 class="section-title">🌟 心理占星分析</h2>
-            <div class="analysis-content">
-                {md_to_html(astrology)}
-            </div>
-        </div>
-"""
-
-    # 梅花易數
-    if plum:
-        html += f"""
-        <div class="section" id="plum">
-            <h2 class="section-title">🌸 梅花易數分析</h2>
-            <div class="analysis-content">
-                {md_to_html(plum)}
-            </div>
-        </div>
-"""
-
-    # 奇門遁甲
-    if qimen:
-        html += f"""
-        <div class="section" id="qimen">
-            <h2 class="section-title">🗺️ 奇門遁甲分析</h2>
-            <div class="analysis-content">
-                {md_to_html(qimen)}
-            </div>
-        </div>
-"""
-
-    # 六爻
-    if liuyao:
-        html += f"""
-        <div class="section" id="liuyao">
-            <h2 class="section-title">☯️ 六爻占卜分析</h2>
-            <div class="analysis-content">
-                {md_to_html(liuyao)}
-            </div>
-        </div>
-"""
-
-    # 生命靈數
-    if numerology:
-        html += f"""
-        <div class="section" id="numerology">
-            <h2 class="section-title">🔢 生命靈數分析</h2>
-            <div class="analysis-content">
-                {md_to_html(numerology)}
-            </div>
-        </div>
-"""
-
-    # 姓名學
-    if name_analysis:
-        html += f"""
-        <div class="section" id="name">
-            <h2 class="section-title">📝 姓名學分析</h2>
-            <div class="analysis-content">
-                {md_to_html(name_analysis)}
-            </div>
-        </div>
-"""
-
-    # Footer
-    html += f"""
-    </div>
-
-    <!-- Footer -->
-    <div class="footer">
-        <p><strong>重要提醒</strong></p>
-        <p>本報告整合<strong>八字命理</strong>、<strong>紫微斗數</strong>、<strong>西洋占星</strong>、<strong>梅花易數</strong>、<strong>奇門遁甲</strong>、<strong>六爻占卜</strong>、<strong>生命靈數</strong>、<strong>姓名學</strong>八大命理方法的綜合分析。</p>
-        <p><strong>命理分析僅供參考，您的人生由自己掌握。</strong></p>
-        <p class="timestamp">分析時間：{datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}</p>
-        <p class="timestamp">SuperClaude Fortune-Telling System v2.0 (Comprehensive 8-Method Analysis)</p>
-    </div>
-</div>
-</body>
-</html>
-"""
-
-    # 寫入文件
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
-
-    return output_path
+    return _write_report(output_path, iter_html_from_markdown_files(analysis_dir), minify, precompress)
@@ -0,0 +1,305 @@
+"""
+HTML 模板 (HTML Templates)
+=========================
+
+報告使用的極簡模板，佔位符為 {{NAME}}（大寫英文、數字與底線）：
+1. 模板編譯為「固定文字片段 + 佔位符名稱」，產生報告時只交錯輸出片段與值，
+   CSS 與頁面框架等大段固定文字不會被重新解析或複製
+2. templates/ 目錄下的模板檔依檔名緩存，每個進程只讀取、編譯一次
+3. 值可以是字串、產生字串的迭代器（例如各區塊的產生器）或其他物件（以 str() 轉換），
+   迭代器在串流輸出時才逐段展開
+
+值不做 HTML 跳脫，與原本以 f-string 組合報告時相同。
+
+報告片段另有進程共享的 FragmentCache：以渲染函數名稱與其輸入內容的雜湊為鍵，
+重新產生報告時只有輸入改變的片段需要重新渲染（見 fragment_cached）。
+"""
+
+import hashlib
+import inspect
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator as IteratorABC
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional, Tuple
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+_PLACEHOLDER = re.compile(r"\{\{([A-Z][A-Z0-9_]*)\}\}")
+
+
+class CompiledTemplate(NamedTuple):
+    """編譯後的模板（parts 比 fields 多一個：首尾的固定文字）"""
+    parts: Tuple[str, ...]
+    fields: Tuple[str, ...]
+
+    def stream(self, **values: Any) -> Iterator[str]:
+        """
+        逐段產生填入值後的文字
+
+        Args:
+            **values: 佔位符名稱 → 值
+
+        Yields:
+            文字片段
+
+        Raises:
+            ValueError: 缺少佔位符的值
+        """
+        missing = set(self.fields).difference(values)
+        if missing:
+            raise ValueError(f"模板缺少欄位: {', '.join(sorted(missing))}")
+
+        yield self.parts[0]
+        for name, part in zip(self.fields, self.parts[1:]):
+            value = values[name]
+            if isinstance(value, str):
+                yield value
+            elif isinstance(value, (IteratorABC, list, tuple)):
+                yield from value
+            else:
+                yield str(value)
+            yield part
+
+    def render(self, **values: Any) -> str:
+        """填入值並返回完整文字"""
+        return ''.join(self.stream(**values))
+
+
+def compile_template(text: str) -> CompiledTemplate:
+    """
+    編譯模板文字
+
+    Args:
+        text: 含 {{NAME}} 佔位符的模板
+
+    Returns:
+        CompiledTemplate
+    """
+    pieces = _PLACEHOLDER.split(text)
+    return CompiledTemplate(tuple(pieces[0::2]), tuple(pieces[1::2]))
+
+
+@lru_cache(maxsize=None)
+def load_template(name: str) -> CompiledTemplate:
+    """
+    讀取並編譯 templates/ 下的模板檔（每個進程只讀取一次）
+
+    Args:
+        name: 模板檔名
+
+    Returns:
+        CompiledTemplate
+    """
+    return compile_template((TEMPLATE_DIR / name).read_text(encoding='utf-8'))
+
+
+# ============================================
+# 片段緩存 (Fragment Cache)
+# ============================================
+
+class FragmentCache:
+    """
+    報告片段緩存（進程共享、線程安全）
+
+    以「渲染函數名稱 + 輸入內容雜湊」為鍵的 LRU 緩存，同時限制片段數量與總字元數
+    （LLM分析可能長達數 MB）。片段為不可變字串，可直接在多份報告之間共用。
+    """
+
+    def __init__(self, maxsize: int = 1024, max_chars: int = 16 * 1024 * 1024):
+        """
+        Args:
+            maxsize: 最多緩存的片段數量
+            max_chars: 所有片段的總字元數上限（超過上限的單一片段不緩存）
+        """
+        self.maxsize = maxsize
+        self.max_chars = max_chars
+        self.enabled = True
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.unhashable = 0
+
+    @staticmethod
+    def make_key(name: str, inputs: Any) -> Optional[str]:
+        """
+        由渲染函數名稱與輸入內容計算緩存鍵
+
+        輸入以 pickle 序列化：比 JSON 快數倍，FrozenDict、列舉等子類別也能依內容序列化，
+        不會像 str() 一樣把內容不同的物件序列化成相同的位元組。
+        字典順序不同只會造成未命中，不會誤中。
+
+        Returns:
+            BLAKE2b 十六進位字串；輸入含無法序列化的值時返回 None（不緩存）
+        """
+        try:
+            content = pickle.dumps(inputs, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return None
+        digest = hashlib.blake2b(content, digest_size=16)
+        digest.update(name.encode('utf-8'))
+        return digest.hexdigest()
+
+    def lookup(self, key: str) -> Optional[str]:
+        """讀取片段，未命中返回 None"""
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return fragment
+
+    def store(self, key: str, fragment: str):
+        """寫入片段，超出上限時淘汰最久未使用的片段"""
+        with self._lock:
+            if len(fragment) > self.max_chars:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._chars -= len(previous)
+            self._entries[key] = fragment
+            self._chars += len(fragment)
+            self._evict()
+
+    def _evict(self):
+        """淘汰最久未使用的片段直到符合上限（呼叫端需持有 self._lock）"""
+        while len(self._entries) > self.maxsize or self._chars > self.max_chars:
+            _, fragment = self._entries.popitem(last=False)
+            self._chars -= len(fragment)
+
+    def stats(self) -> Dict:
+        """獲取緩存統計（命中、未命中、無法雜湊、命中率、當前大小）"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "unhashable": self.unhashable,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "chars": self._chars,
+                "max_chars": self.max_chars
+            }
+
+    def clear(self):
+        """清空緩存並重置統計"""
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+            self.hits = 0
+            self.misses = 0
+            self.unhashable = 0
+
+
+# 進程共享的報告片段緩存
+_fragment_cache = FragmentCache()
+
+
+def fragment_cached(inputs: Optional[Callable[..., Any]] = None):
+    """
+    以輸入內容雜湊緩存渲染函數的輸出
+
+    被裝飾的函數可以返回字串，或是產生字串的產生器函數；
+    產生器未命中時邊產生邊收集，全部產生完畢後才寫入緩存，命中時一次產生完整片段。
+
+    Args:
+        inputs: 由呼叫參數取出實際用到的輸入（預設為全部位置與關鍵字參數），
+            只有這部分內容會被雜湊，避免雜湊渲染時用不到的大型資料
+
+    Returns:
+        裝飾器
+    """
+    def decorate(func: Callable) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        def cache_key(args: tuple, kwargs: dict) -> Optional[str]:
+            if not _fragment_cache.enabled:
+                return None
+            key = FragmentCache.make_key(name, inputs(*args, **kwargs) if inputs else [args, kwargs])
+            if key is None:
+                with _fragment_cache._lock:
+                    _fragment_cache.unhashable += 1
+            return key
+
+        if inspect.isgeneratorfunction(func):
+            @wraps(func)
+            def stream_wrapper(*args, **kwargs) -> Iterator[str]:
+                key = cache_key(args, kwargs)
+                if key is None:
+                    yield from func(*args, **kwargs)
+                    return
+
+                fragment = _fragment_cache.lookup(key)
+                if fragment is not None:
+                    yield fragment
+                    return
+
+                parts = []
+                for chunk in func(*args, **kwargs):
+                    parts.append(chunk)
+                    yield chunk
+                _fragment_cache.store(key, ''.join(parts))
+
+            return stream_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> str:
+            key = cache_key(args, kwargs)
+            if key is None:
+                return func(*args, **kwargs)
+
+            fragment = _fragment_cache.lookup(key)
+            if fragment is None:
+                fragment = func(*args, **kwargs)
+                _fragment_cache.store(key, fragment)
+            return fragment
+
+        return wrapper
+
+    return decorate
+
+
+def configure_fragment_cache(
+    maxsize: Optional[int] = None,
+    max_chars: Optional[int] = None,
+    enabled: Optional[bool] = None
+) -> Dict:
+    """
+    調整進程共享的報告片段緩存
+
+    Args:
+        maxsize: 片段數量上限（None 表示不變）
+        max_chars: 總字元數上限（None 表示不變）
+        enabled: 是否啟用（None 表示不變）
+
+    Returns:
+        調整後的緩存統計
+    """
+    with _fragment_cache._lock:
+        if maxsize is not None:
+            _fragment_cache.maxsize = maxsize
+        if max_chars is not None:
+            _fragment_cache.max_chars = max_chars
+        _fragment_cache._evict()
+        if enabled is not None:
+            _fragment_cache.enabled = enabled
+    return _fragment_cache.stats()
+
+
+def get_fragment_cache_stats() -> Dict:
+    """獲取進程共享報告片段緩存的統計資訊"""
+    return _fragment_cache.stats()
+
+
+def clear_fragment_cache():
+    """清空進程共享報告片段緩存"""
+    _fragment_cache.clear()
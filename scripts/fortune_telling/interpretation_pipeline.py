@@ -0,0 +1,161 @@
+"""
+深度解釋流程 (Interpretation Pipeline)
+=====================================
+
+將八字、紫微、占星的深度解釋與跨方法綜合串成一次呼叫：
+1. 第一輪：八字性格、八字事業、紫微命宮、占星星盤四個LLM請求彼此獨立，
+   以 LLMAnalyzer.analyze_many 並行送出（受並行數與提供商速率限制約束）
+2. 其餘區塊為規則引擎，直接計算
+3. 第二輪：性格綜合需要第一輪的結果，於第一輪完成後執行
+
+總延遲約為「第一輪最慢的請求 + 綜合分析」，而非所有請求的總和。
+個別請求失敗、字數不足或逾時時改用對應的傳統分析（_traditional_*）；
+個別區塊出錯只影響該區塊（結果為 None，錯誤記錄於 errors）。
+
+傳入 on_chunk / on_result 時LLM輸出以串流方式回傳，呼叫端（CLI、背景工作、報告產生器）
+可在各區塊完成前逐步顯示內容；字數檢查與fallback在串流結束後進行，結果與不串流時相同。
+"""
+
+import logging
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from . import astrology_interpretation
+from . import bazi_interpretation
+from . import synthesis_engine
+from . import ziwei_interpretation
+from .llm_analyzer import DEFAULT_MAX_CONCURRENCY, LLMAnalyzer, get_llm_analyzer
+
+logger = logging.getLogger(__name__)
+
+SYNTHESIS_KEY = 'personality_synthesis'
+
+# LLM請求key → 顯示名稱（串流回呼使用的 key）
+LLM_SECTION_LABELS: Dict[str, str] = {
+    'bazi_personality': '八字性格',
+    'bazi_career': '八字事業',
+    'ziwei_destiny_palace': '紫微命宮',
+    'astrology_natal_chart': '占星本命盤',
+    SYNTHESIS_KEY: '性格綜合',
+}
+
+
+def interpret_all(
+    bazi_result: Optional[Dict],
+    ziwei_result: Optional[Dict],
+    astrology_result: Optional[Dict],
+    gender: str = 'male',
+    analyzer: Optional[LLMAnalyzer] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    timeout: Optional[float] = None,
+    on_chunk: Optional[Callable[[str, str], None]] = None,
+    on_result: Optional[Callable[[str, Any], None]] = None
+) -> Dict:
+    """
+    執行三種方法的深度解釋與跨方法綜合
+
+    Args:
+        bazi_result: BaziCalculator.analyze() 的結果（None 表示略過）
+        ziwei_result: ZiweiCalculator.analyze() 的結果（None 表示略過）
+        astrology_result: AstrologyCalculator.analyze() 的結果（None 表示略過）
+        gender: 'male' 或 'female'（八字感情分析用）
+        analyzer: LLM分析器（預設為全局分析器）
+        max_concurrency: 同時進行的LLM請求數上限
+        timeout: 第一輪LLM請求的整體逾時秒數（None 表示不限）
+        on_chunk: 串流回呼 on_chunk(請求key, 片段)，請求key見 LLM_SECTION_LABELS
+        on_result: LLM請求得出最終結果（LLM或fallback）時呼叫 on_result(請求key, 結果)
+
+    Returns:
+        {
+            'bazi': Dict | None,       # 八字各領域解釋
+            'ziwei': Dict | None,      # 紫微宮位解釋
+            'astrology': Dict | None,  # 占星星盤解釋
+            'synthesis': Dict | None,  # 三方法綜合（三者皆有結果時才執行）
+            'errors': Dict[str, str]   # 出錯的區塊 → 錯誤訊息
+        }
+    """
+    analyzer = analyzer or get_llm_analyzer()
+    errors: Dict[str, str] = {}
+
+    def section(name: str, func: Callable[[], Dict]) -> Optional[Dict]:
+        try:
+            return func()
+        except Exception as e:
+            logger.exception(f"深度解釋區塊 {name} 失敗")
+            errors[name] = str(e)
+            return None
+
+    # 第一輪：彼此獨立的LLM請求並行送出
+    builders = [
+        (bazi_interpretation.personality_request, bazi_result),
+        (bazi_interpretation.career_request, bazi_result),
+        (ziwei_interpretation.destiny_palace_request, ziwei_result),
+        (astrology_interpretation.natal_chart_request, astrology_result),
+    ]
+    requests = [build(data) for build, data in builders if data]
+    requests = [request for request in requests if request is not None]
+
+    llm_results: Dict = {}
+    if requests:
+        try:
+            llm_results = analyzer.analyze_many(
+                requests,
+                max_concurrency=max_concurrency,
+                timeout=timeout,
+                on_chunk=on_chunk,
+                on_result=on_result
+            )
+        except Exception:
+            # 例如fallback本身出錯：改為逐一呼叫，讓錯誤只影響所屬區塊
+            logger.exception("並行LLM分析失敗，改為逐一分析")
+
+    def prefetched(key: str, interpret: Callable[[Dict], Dict], data: Dict) -> Dict:
+        return llm_results[key] if key in llm_results else interpret(data)
+
+    bazi_interp = None
+    if bazi_result:
+        bazi_interp = section('bazi', lambda: {
+            'personality': prefetched('bazi_personality', bazi_interpretation.interpret_personality, bazi_result),
+            'career': prefetched('bazi_career', bazi_interpretation.interpret_career, bazi_result),
+            'wealth': bazi_interpretation.interpret_wealth(bazi_result),
+            'relationship': bazi_interpretation.interpret_relationship(bazi_result, gender=gender),
+            'health': bazi_interpretation.interpret_health(bazi_result)
+        })
+
+    ziwei_interp = None
+    if ziwei_result:
+        def interpret_ziwei() -> Dict:
+            result = ziwei_interpretation.interpret_ziwei_palaces(ziwei_result)
+            result['destiny_palace'] = prefetched(
+                'ziwei_destiny_palace', ziwei_interpretation.interpret_destiny_palace, ziwei_result
+            )
+            return result
+
+        ziwei_interp = section('ziwei', interpret_ziwei)
+
+    astro_interp = None
+    if astrology_result:
+        astro_interp = section('astrology', lambda: prefetched(
+            'astrology_natal_chart', astrology_interpretation.interpret_natal_chart, astrology_result
+        ))
+
+    # 第二輪：跨方法綜合
+    synthesis = None
+    if bazi_interp and ziwei_interp and astro_interp:
+        synthesis = section('synthesis', lambda: synthesis_engine.synthesize_three_methods(
+            bazi_result=bazi_interp,
+            ziwei_result=ziwei_interp,
+            astro_result=astro_interp,
+            llm_analyzer=analyzer,
+            on_chunk=partial(on_chunk, SYNTHESIS_KEY) if on_chunk is not None else None
+        ))
+        if synthesis is not None and on_result is not None:
+            on_result(SYNTHESIS_KEY, synthesis['personality_synthesis'])
+
+    return {
+        'bazi': bazi_interp,
+        'ziwei': ziwei_interp,
+        'astrology': astro_interp,
+        'synthesis': synthesis,
+        'errors': errors
+    }
@@ -7,13 +7,23 @@ LLM Analyzer for Fortune-Telling Deep Analysis
 
 import os
 import json
+import asyncio
 import logging
+import math
+import shutil
 import subprocess
 import shlex
-from typing import Dict, Optional, Callable
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Dict, Iterator, Optional, Callable, Sequence
 from enum import Enum
 from pathlib import Path
 
+from .llm_cache import LLMResponseCache, get_llm_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +35,107 @@ class LLMProvider(Enum):
     NONE = "none"
 
 
+# ============================================
+# 並行請求與速率限制 (Concurrent Requests & Rate Limiting)
+# ============================================
+
+# analyze_many 預設同時進行的請求數
+DEFAULT_MAX_CONCURRENCY = 4
+
+# 各提供商預設的每分鐘請求上限（環境變量 FORTUNE_LLM_RPM 可覆蓋）
+DEFAULT_REQUESTS_PER_MINUTE: Dict[LLMProvider, float] = {
+    LLMProvider.OPENAI: 60,
+    LLMProvider.ANTHROPIC: 50,
+}
+
+
+@dataclass
+class LLMRequest:
+    """
+    一次帶fallback的LLM分析請求（analyze_many / run_request 的輸入）
+
+    on_success 將通過字數檢查的LLM文字包裝為最終結果（None 表示直接返回文字）；
+    LLM不可用、失敗、逾時或字數不足時返回 fallback_func(*fallback_args)
+    """
+    key: str
+    system_prompt: str
+    analysis_prompt: str
+    fallback_func: Callable
+    fallback_args: tuple = ()
+    min_length: int = 300
+    on_success: Optional[Callable[[str], Any]] = None
+    llm_kwargs: Dict = field(default_factory=dict)
+
+
+class RateLimiter:
+    """
+    每分鐘請求上限（GCRA 演算法，允許 burst 個請求同時放行）
+
+    只以執行緒鎖保護狀態，可在多個執行緒與事件迴圈之間共用
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int = 1):
+        if requests_per_minute <= 0:
+            raise ValueError(f"每分鐘請求上限必須為正數: {requests_per_minute}")
+        self.interval = 60.0 / requests_per_minute
+        self.burst = max(1, burst)
+        self._theoretical_arrival = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """預約一個請求名額，返回需要等待的秒數"""
+        with self._lock:
+            now = time.monotonic()
+            arrival = max(self._theoretical_arrival, now) + self.interval
+            self._theoretical_arrival = arrival
+            return max(0.0, arrival - self.burst * self.interval - now)
+
+    async def acquire(self):
+        """等待直到可以送出下一個請求"""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_rate_limiters: Dict[LLMProvider, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def _requests_per_minute(provider: LLMProvider) -> Optional[float]:
+    """FORTUNE_LLM_RPM（無效時記錄警告並改用提供商預設值）"""
+    default = DEFAULT_REQUESTS_PER_MINUTE.get(provider)
+    env_rpm = os.getenv('FORTUNE_LLM_RPM')
+    if not env_rpm:
+        return default
+    try:
+        requests_per_minute = float(env_rpm)
+    except ValueError:
+        requests_per_minute = None
+    if requests_per_minute is None or not math.isfinite(requests_per_minute) or requests_per_minute <= 0:
+        logger.warning(f"FORTUNE_LLM_RPM 必須為正數，忽略無效值 {env_rpm!r}，改用預設值 {default}")
+        return default
+    return requests_per_minute
+
+
+def get_rate_limiter(provider: LLMProvider) -> Optional[RateLimiter]:
+    """
+    獲取提供商共用的速率限制器（同一提供商的所有分析器共用額度）
+
+    Returns:
+        RateLimiter，提供商沒有上限時返回 None
+    """
+    requests_per_minute = _requests_per_minute(provider)
+    if not requests_per_minute:
+        return None
+
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(provider)
+        if limiter is None or limiter.interval != 60.0 / requests_per_minute:
+            limiter = RateLimiter(requests_per_minute, burst=DEFAULT_MAX_CONCURRENCY)
+            _rate_limiters[provider] = limiter
+        return limiter
+
+
 class LLMAnalyzer:
     """
     LLM輔助分析器
@@ -36,7 +147,9 @@ class LLMAnalyzer:
         self,
         provider: LLMProvider = LLMProvider.OPENAI,
         api_key: Optional[str] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        cache: Optional[LLMResponseCache] = None,
+        use_cache: bool = True
     ):
         """
         初始化LLM分析器
@@ -45,11 +158,14 @@ class LLMAnalyzer:
             provider: LLM提供商
             api_key: API密鑰（如果為None則從環境變量讀取）
             model: 模型名稱（如果為None則使用默認模型）
+            cache: 回應緩存（如果為None則使用進程共享緩存，見 llm_cache.get_llm_cache）
+            use_cache: 是否使用回應緩存
         """
         self.provider = provider
         self.api_key = api_key or self._get_api_key_from_env()
         self.model = model or self._get_default_model()
         self.client = None
+        self.cache = (cache if cache is not None else get_llm_cache()) if use_cache else None
 
         # 初始化客戶端
         if self.provider == LLMProvider.CLAUDE_CODE:
@@ -107,16 +223,20 @@ class LLMAnalyzer:
         system_prompt: str,
         analysis_prompt: str,
         temperature: float = 0.7,
-        max_tokens: int = 4000
+        max_tokens: int = 4000,
+        use_cache: bool = True
     ) -> Optional[str]:
         """
         使用LLM進行分析
 
+        相同請求（提供商、模型、提示詞、溫度、最大token數皆相同）優先返回緩存的回應。
+
         Args:
             system_prompt: 系統提示詞
             analysis_prompt: 分析提示
             temperature: 溫度參數（0-1）
             max_tokens: 最大token數
+            use_cache: 是否讀寫回應緩存（False 表示一定呼叫提供商）
 
         Returns:
             分析結果，失敗返回None
@@ -125,22 +245,30 @@ class LLMAnalyzer:
             logger.warning("LLM不可用，跳過AI分析")
             return None
 
+        cache_key = self._cache_key(system_prompt, analysis_prompt, temperature, max_tokens, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"💾 LLM緩存命中，返回{len(cached)}字")
+                return cached
+
         try:
+            result = None
             if self.provider == LLMProvider.CLAUDE_CODE:
-                return self._analyze_with_claude_code(
+                result = self._analyze_with_claude_code(
                     system_prompt,
                     analysis_prompt,
                     max_tokens
                 )
             elif self.provider == LLMProvider.OPENAI:
-                return self._analyze_with_openai(
+                result = self._analyze_with_openai(
                     system_prompt,
                     analysis_prompt,
                     temperature,
                     max_tokens
                 )
             elif self.provider == LLMProvider.ANTHROPIC:
-                return self._analyze_with_anthropic(
+                result = self._analyze_with_anthropic(
                     system_prompt,
                     analysis_prompt,
                     max_tokens
@@ -149,6 +277,77 @@ class LLMAnalyzer:
             logger.error(f"LLM分析失敗: {e}")
             return None
 
+        if cache_key is not None and result:
+            self.cache.put(cache_key, result, self.provider.value, self.model)
+        return result
+
+    def _cache_key(
+        self,
+        system_prompt: str,
+        analysis_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 4000,
+        use_cache: bool = True
+    ) -> Optional[str]:
+        """回應緩存鍵（參數同 analyze_with_prompt），不使用緩存時返回None"""
+        if self.cache is None or not use_cache:
+            return None
+        return LLMResponseCache.make_key(
+            self.provider.value, self.model, system_prompt, analysis_prompt, temperature, max_tokens
+        )
+
+    def stream_with_prompt(
+        self,
+        system_prompt: str,
+        analysis_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 4000,
+        use_cache: bool = True
+    ) -> Iterator[str]:
+        """
+        使用LLM進行分析，逐段產生輸出（參數同 analyze_with_prompt）
+
+        緩存命中時一次產生完整回應；完整讀完後才寫入緩存，
+        中途停止讀取或失敗的回應不會被緩存。
+
+        Yields:
+            LLM輸出片段（LLM不可用時不產生任何片段）
+
+        Raises:
+            Exception: 提供商呼叫或串流中斷（由呼叫端決定是否fallback）
+        """
+        if not self.is_available():
+            logger.warning("LLM不可用，跳過AI分析")
+            return
+
+        cache_key = self._cache_key(system_prompt, analysis_prompt, temperature, max_tokens, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"💾 LLM緩存命中，返回{len(cached)}字")
+                yield cached
+                return
+
+        if self.provider == LLMProvider.CLAUDE_CODE:
+            text = self._analyze_with_claude_code(system_prompt, analysis_prompt, max_tokens)
+            chunks = iter([text] if text else [])
+        elif self.provider == LLMProvider.OPENAI:
+            chunks = self._stream_with_openai(system_prompt, analysis_prompt, temperature, max_tokens)
+        elif self.provider == LLMProvider.ANTHROPIC:
+            chunks = self._stream_with_anthropic(system_prompt, analysis_prompt, max_tokens)
+        else:
+            return
+
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+
+        result = ''.join(parts)
+        logger.info(f"LLM串流完成，返回{len(result)}字")
+        if cache_key is not None and result:
+            self.cache.put(cache_key, result, self.provider.value, self.model)
+
     def _analyze_with_openai(
         self,
         system_prompt: str,
@@ -191,6 +390,48 @@ class LLMAnalyzer:
         logger.info(f"Claude分析完成，返回{len(result)}字")
         return result
 
+    def _stream_with_openai(
+        self,
+        system_prompt: str,
+        analysis_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> Iterator[str]:
+        """使用OpenAI串流分析"""
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": analysis_prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+
+    def _stream_with_anthropic(
+        self,
+        system_prompt: str,
+        analysis_prompt: str,
+        max_tokens: int
+    ) -> Iterator[str]:
+        """使用Anthropic Claude串流分析"""
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            system=system_prompt,
+            messages=[
+                {"role": "user", "content": analysis_prompt}
+            ]
+        ) as stream:
+            yield from stream.text_stream
+
     def _analyze_with_claude_code(
         self,
         system_prompt: str,
@@ -217,6 +458,7 @@ class LLMAnalyzer:
         fallback_func: Callable,
         fallback_args: tuple = (),
         min_length: int = 300,
+        on_chunk: Optional[Callable[[str], None]] = None,
         **llm_kwargs
     ) -> str:
         """
@@ -228,19 +470,45 @@ class LLMAnalyzer:
             fallback_func: fallback函數
             fallback_args: fallback函數參數
             min_length: 最低字數要求
+            on_chunk: 串流回呼，每收到一段LLM輸出呼叫一次（None 表示不串流）；
+                字數檢查在串流結束後進行，未通過時已推送的片段應由呼叫端捨棄
             **llm_kwargs: LLM額外參數
 
         Returns:
             分析結果（LLM或fallback）
         """
+        result = self._accepted_text(system_prompt, analysis_prompt, min_length, on_chunk, **llm_kwargs)
+        if result is not None:
+            return result
+
+        # Fallback到傳統方法
+        logger.info("🔄 執行fallback分析...")
+        return fallback_func(*fallback_args)
+
+    def _accepted_text(
+        self,
+        system_prompt: str,
+        analysis_prompt: str,
+        min_length: int,
+        on_chunk: Optional[Callable[[str], None]] = None,
+        **llm_kwargs
+    ) -> Optional[str]:
+        """呼叫LLM（on_chunk 不為 None 時串流）並檢查字數，成功返回文字，不可用、失敗或字數不足返回None"""
         # 嘗試使用LLM
         if self.is_available():
             try:
-                result = self.analyze_with_prompt(
-                    system_prompt,
-                    analysis_prompt,
-                    **llm_kwargs
-                )
+                if on_chunk is None:
+                    result = self.analyze_with_prompt(
+                        system_prompt,
+                        analysis_prompt,
+                        **llm_kwargs
+                    )
+                else:
+                    parts = []
+                    for chunk in self.stream_with_prompt(system_prompt, analysis_prompt, **llm_kwargs):
+                        parts.append(chunk)
+                        on_chunk(chunk)
+                    result = ''.join(parts)
 
                 if result:
                     # 驗證長度
@@ -252,14 +520,352 @@ class LLMAnalyzer:
                         logger.warning(
                             f"⚠️ LLM輸出{actual_length}字，未達{min_length}字標準，使用fallback"
                         )
+                        # 不讓未達標的回應留在緩存中，下次重新呼叫提供商
+                        cache_key = self._cache_key(system_prompt, analysis_prompt, **llm_kwargs)
+                        if cache_key is not None:
+                            self.cache.discard(cache_key)
             except Exception as e:
                 logger.error(f"❌ LLM分析異常: {e}，使用fallback")
         else:
             logger.info("ℹ️ LLM不可用，使用傳統分析方法")
 
-        # Fallback到傳統方法
-        logger.info("🔄 執行fallback分析...")
-        return fallback_func(*fallback_args)
+        return None
+
+    def _finish_request(self, request: LLMRequest, text: Optional[str]) -> Any:
+        """由LLM文字（或None）得出請求的最終結果"""
+        if text is not None:
+            return request.on_success(text) if request.on_success else text
+
+        logger.info(f"🔄 執行fallback分析: {request.key}")
+        return request.fallback_func(*request.fallback_args)
+
+    def run_request(self, request: LLMRequest, on_chunk: Optional[Callable[[str], None]] = None) -> Any:
+        """
+        同步執行單一請求
+
+        Args:
+            request: LLM請求
+            on_chunk: 串流回呼（見 analyze_with_fallback）
+
+        Returns:
+            on_success 包裝後的LLM結果，或fallback結果
+        """
+        text = self._accepted_text(
+            request.system_prompt,
+            request.analysis_prompt,
+            request.min_length,
+            on_chunk,
+            **request.llm_kwargs
+        )
+        return self._finish_request(request, text)
+
+    async def analyze_many_async(
+        self,
+        requests: Sequence[LLMRequest],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: Optional[float] = None,
+        on_chunk: Optional[Callable[[str, str], None]] = None,
+        on_result: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        並行執行多個彼此獨立的請求
+
+        同時進行的請求數不超過 max_concurrency，並受提供商的每分鐘請求上限約束。
+        個別請求失敗、字數不足或逾時只會讓該請求改用fallback；
+        呼叫端取消時，所有未完成的請求一併取消（已送出的HTTP請求結果會被丟棄）。
+
+        回呼函數都在事件迴圈的執行緒中被呼叫，可直接更新進度顯示或推送部分內容。
+        on_result 之後不會再收到同一 key 的 on_chunk；若結果為fallback，
+        先前推送的片段應由呼叫端以最終結果取代。
+
+        Args:
+            requests: LLM請求（key 不可重複）
+            max_concurrency: 同時進行的請求數上限
+            timeout: 整批請求的逾時秒數（None 表示不限），逾時未完成的請求改用fallback
+            on_chunk: 串流回呼 on_chunk(key, 片段)（None 表示不串流）
+            on_result: 每個請求得出最終結果（LLM或fallback）時呼叫 on_result(key, 結果)
+
+        Returns:
+            {key: 結果}，依 requests 的順序
+
+        Raises:
+            ValueError: key 重複或 max_concurrency 無效
+        """
+        keys = [request.key for request in requests]
+        if len(set(keys)) != len(keys):
+            raise ValueError(f"LLM請求的 key 重複: {keys}")
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency 必須至少為 1: {max_concurrency}")
+
+        finished = set()
+
+        def deliver(key: str, result: Any):
+            finished.add(key)
+            if on_result is not None:
+                on_result(key, result)
+
+        def forward_chunk(key: str, chunk: str):
+            # 逾時後改用fallback的請求，工作執行緒可能仍在產生片段
+            if key not in finished:
+                on_chunk(key, chunk)
+
+        if not requests:
+            return {}
+        if not self.is_available():
+            logger.info("ℹ️ LLM不可用，使用傳統分析方法")
+            results = {}
+            for request in requests:
+                results[request.key] = self._finish_request(request, None)
+                deliver(request.key, results[request.key])
+            return results
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        limiter = get_rate_limiter(self.provider)
+        # SDK 客戶端為同步介面，在專用執行緒池中呼叫，不占用事件迴圈
+        executor = ThreadPoolExecutor(max_workers=min(max_concurrency, len(requests)), thread_name_prefix="llm")
+
+        def push_chunk(key: str, chunk: str):
+            # 在工作執行緒中呼叫，轉交事件迴圈執行緒
+            try:
+                loop.call_soon_threadsafe(forward_chunk, key, chunk)
+            except RuntimeError:
+                pass   # 事件迴圈已結束（整批逾時或取消後仍在背景產生的片段）
+
+        async def call(request: LLMRequest) -> Any:
+            accepted_text = partial(
+                self._accepted_text,
+                request.system_prompt,
+                request.analysis_prompt,
+                request.min_length,
+                partial(push_chunk, request.key) if on_chunk is not None else None,
+                **request.llm_kwargs
+            )
+            # 已緩存的請求不呼叫提供商，不占用並行名額與速率額度
+            cache_key = self._cache_key(request.system_prompt, request.analysis_prompt, **request.llm_kwargs)
+            if cache_key is not None and cache_key in self.cache:
+                text = await loop.run_in_executor(executor, accepted_text)
+            else:
+                async with semaphore:
+                    if limiter is not None:
+                        await limiter.acquire()
+                    text = await loop.run_in_executor(executor, accepted_text)
+
+            result = self._finish_request(request, text)
+            deliver(request.key, result)
+            return result
+
+        tasks = [asyncio.create_task(call(request)) for request in requests]
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"⏱️ {len(pending)} 個LLM請求超過 {timeout:g} 秒未完成，使用fallback")
+
+        results = {}
+        for request, task in zip(requests, tasks):
+            if task in done:
+                try:
+                    results[request.key] = task.result()
+                    continue
+                except Exception as e:
+                    logger.error(f"❌ LLM請求 {request.key} 異常: {e}，使用fallback")
+            results[request.key] = self._finish_request(request, None)
+            deliver(request.key, results[request.key])
+
+        return results
+
+    def analyze_many(
+        self,
+        requests: Sequence[LLMRequest],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: Optional[float] = None,
+        on_chunk: Optional[Callable[[str, str], None]] = None,
+        on_result: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        analyze_many_async 的同步介面（已在事件迴圈中時請直接 await analyze_many_async）
+
+        回呼函數在呼叫端的執行緒中被呼叫。
+
+        Returns:
+            {key: 結果}，依 requests 的順序
+        """
+        return asyncio.run(self.analyze_many_async(requests, max_concurrency, timeout, on_chunk, on_result))
+
+
+# ============================================
+# 提供商偵測 (Provider Detection)
+# ============================================
+
+# 偵測結果的磁碟緩存（環境變量 FORTUNE_LLM_PROVIDER 指定提供商時不使用）
+PROVIDER_CACHE_PATH = Path.home() / ".cache" / "fortune_telling" / "llm_provider.json"
+PROVIDER_CACHE_TTL = 24 * 3600
+CLAUDE_PROBE_TIMEOUT = 5
+# 沒有緩存時等待背景確認結果的秒數（超過則先假設 claude 可用，確認結果仍會寫入緩存）
+CLAUDE_PROBE_WAIT = 2.0
+
+_API_KEY_ENV = (
+    (LLMProvider.OPENAI, 'OPENAI_API_KEY'),
+    (LLMProvider.ANTHROPIC, 'ANTHROPIC_API_KEY'),
+)
+
+_claude_probe_started = False
+_claude_probe_lock = threading.Lock()
+_claude_probe_done = threading.Event()
+_claude_probe_working = False
+
+
+def _provider_from_env() -> Optional[LLMProvider]:
+    """
+    由環境變量 FORTUNE_LLM_PROVIDER 指定提供商
+
+    Raises:
+        ValueError: 提供商名稱無效
+    """
+    value = os.getenv('FORTUNE_LLM_PROVIDER', '').strip().lower()
+    if not value:
+        return None
+    try:
+        return LLMProvider(value)
+    except ValueError:
+        choices = ', '.join(provider.value for provider in LLMProvider)
+        raise ValueError(f"無效的 FORTUNE_LLM_PROVIDER: {value}（可用: {choices}）") from None
+
+
+def _provider_by_priority(claude_available: bool) -> LLMProvider:
+    """依優先順序選擇提供商：Claude Code → OpenAI → Anthropic → 無"""
+    if claude_available:
+        return LLMProvider.CLAUDE_CODE
+    for provider, env_name in _API_KEY_ENV:
+        if os.getenv(env_name):
+            return provider
+    return LLMProvider.NONE
+
+
+def _detection_fingerprint(claude_path: Optional[str]) -> str:
+    """偵測條件（claude 路徑、已設定的API密鑰變量名稱）；條件改變時緩存失效"""
+    keys = ','.join(env_name for _, env_name in _API_KEY_ENV if os.getenv(env_name))
+    return f"{claude_path or ''}|{keys}"
+
+
+def _read_provider_cache(fingerprint: str) -> Optional[LLMProvider]:
+    try:
+        with open(PROVIDER_CACHE_PATH, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['fingerprint'] != fingerprint or time.time() - cached['checked_at'] >= PROVIDER_CACHE_TTL:
+            return None
+        return LLMProvider(cached['provider'])
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"LLM提供商緩存讀取失敗，重新偵測: {PROVIDER_CACHE_PATH} ({e})")
+        return None
+
+
+def _write_provider_cache(fingerprint: str, provider: LLMProvider):
+    tmp_path = PROVIDER_CACHE_PATH.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        PROVIDER_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint, 'provider': provider.value, 'checked_at': time.time()}, f)
+        tmp_path.replace(PROVIDER_CACHE_PATH)
+    except OSError as e:
+        logger.warning(f"LLM提供商緩存寫入失敗: {PROVIDER_CACHE_PATH} ({e})")
+
+
+def _probe_claude_cli(claude_path: str, fingerprint: str):
+    """確認 claude 命令可以執行，並將確認後的提供商寫入緩存"""
+    global _claude_probe_working
+
+    try:
+        try:
+            result = subprocess.run(
+                [claude_path, "--version"],
+                capture_output=True,
+                text=True,
+                timeout=CLAUDE_PROBE_TIMEOUT
+            )
+            working = result.returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            working = False
+
+        _claude_probe_working = working
+        provider = _provider_by_priority(working)
+        if not working:
+            logger.info(f"claude 命令無法執行，改用 {provider.value}")
+        _write_provider_cache(fingerprint, provider)
+    finally:
+        _claude_probe_done.set()
+
+
+def _start_claude_probe(claude_path: str, fingerprint: str):
+    """在背景執行緒中確認 claude 命令（每個程序最多一次；等待結果見 _claude_probe_done）"""
+    global _claude_probe_started
+
+    with _claude_probe_lock:
+        if _claude_probe_started:
+            return
+        _claude_probe_started = True
+
+    threading.Thread(
+        target=_probe_claude_cli,
+        args=(claude_path, fingerprint),
+        name="claude-probe",
+        daemon=True
+    ).start()
+
+
+def detect_llm_provider(use_cache: bool = True) -> LLMProvider:
+    """
+    偵測可用的LLM提供商（有緩存時不建立子程序）
+
+    1. 環境變量 FORTUNE_LLM_PROVIDER（claude_code / openai / anthropic / none）
+    2. 磁碟緩存中未過期、且偵測條件相同的結果
+    3. 依優先順序：PATH 中有 claude 命令 → OPENAI_API_KEY → ANTHROPIC_API_KEY → 無
+
+    找到 claude 命令且沒有緩存時，在背景執行 claude --version，最多等待 CLAUDE_PROBE_WAIT 秒：
+    確認無法執行時改用下一個提供商。確認的結果寫入磁碟緩存，之後的程序不再建立子程序；
+    等待逾時則先使用 Claude Code，緩存在確認完成後才寫入。
+
+    Args:
+        use_cache: 是否讀取磁碟緩存
+
+    Returns:
+        LLM提供商
+
+    Raises:
+        ValueError: FORTUNE_LLM_PROVIDER 無效
+    """
+    provider = _provider_from_env()
+    if provider is not None:
+        return provider
+
+    claude_path = shutil.which("claude")
+    fingerprint = _detection_fingerprint(claude_path)
+    if use_cache:
+        provider = _read_provider_cache(fingerprint)
+        if provider is not None:
+            return provider
+
+    if claude_path is None:
+        provider = _provider_by_priority(False)
+        _write_provider_cache(fingerprint, provider)
+        return provider
+
+    _start_claude_probe(claude_path, fingerprint)
+    if _claude_probe_done.wait(CLAUDE_PROBE_WAIT):
+        return _provider_by_priority(_claude_probe_working)
+    logger.info(f"claude 命令確認中（超過 {CLAUDE_PROBE_WAIT:g} 秒），先使用 Claude Code")
+    return LLMProvider.CLAUDE_CODE
 
 
 # 全局LLM分析器實例（延遲初始化）
@@ -274,7 +880,7 @@ def get_llm_analyzer(
     獲取全局LLM分析器實例
 
     Args:
-        force_reload: 強制重新加載
+        force_reload: 強制重新加載（同時重新偵測提供商，不使用磁碟緩存）
         provider: 指定提供商（僅在首次初始化或force_reload時有效）
 
     Returns:
@@ -285,30 +891,15 @@ def get_llm_analyzer(
     if _global_analyzer is None or force_reload:
         # 自動檢測可用的LLM提供商
         if provider is None:
-            # 優先使用Claude Code（無需API密鑰）
-            try:
-                result = subprocess.run(
-                    ["claude", "--version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    provider = LLMProvider.CLAUDE_CODE
-                    logger.info("檢測到Claude Code，使用Claude Code作為LLM提供商")
-                else:
-                    raise FileNotFoundError("claude command not working")
-            except (FileNotFoundError, subprocess.TimeoutExpired):
-                # Claude Code不可用，檢查其他提供商
-                if os.getenv('OPENAI_API_KEY'):
-                    provider = LLMProvider.OPENAI
-                    logger.info("檢測到OPENAI_API_KEY，使用OpenAI")
-                elif os.getenv('ANTHROPIC_API_KEY'):
-                    provider = LLMProvider.ANTHROPIC
-                    logger.info("檢測到ANTHROPIC_API_KEY，使用Anthropic")
-                else:
-                    provider = LLMProvider.NONE
-                    logger.info("未檢測到LLM提供商，使用傳統分析方法")
+            provider = detect_llm_provider(use_cache=not force_reload)
+            if provider == LLMProvider.CLAUDE_CODE:
+                logger.info("檢測到Claude Code，使用Claude Code作為LLM提供商")
+            elif provider == LLMProvider.OPENAI:
+                logger.info("檢測到OPENAI_API_KEY，使用OpenAI")
+            elif provider == LLMProvider.ANTHROPIC:
+                logger.info("檢測到ANTHROPIC_API_KEY，使用Anthropic")
+            else:
+                logger.info("未檢測到LLM提供商，使用傳統分析方法")
 
         _global_analyzer = LLMAnalyzer(provider=provider)
 
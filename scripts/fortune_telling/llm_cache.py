@@ -0,0 +1,335 @@
+"""
+LLM回應緩存 (LLM Response Cache)
+================================
+
+以 SQLite 保存LLM回應，相同請求不再重複呼叫提供商：
+1. 緩存鍵由（提供商、模型、系統提示詞雜湊、分析提示雜湊、溫度、最大token數）計算，
+   同一命盤特徵產生相同提示詞時即命中（例如日主與格局相同的八字性格分析）
+2. 每筆回應有存活時間（TTL），過期後視為未命中並刪除
+3. 筆數超過上限時，依最後讀取時間淘汰最久未使用的回應
+4. 資料庫使用 WAL 模式，可在多個執行緒與行程之間共用；讀寫失敗只記錄警告並視為未命中
+
+環境變量 FORTUNE_LLM_CACHE 可指定資料庫路徑，設為 off 則停用共享緩存。
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# 緩存鍵格式版本（鍵的組成改變時遞增，讓舊資料自然失效）
+LLM_CACHE_VERSION = 1
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "fortune_telling" / "llm_responses.sqlite3"
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+_DISABLED_VALUES = ("0", "off", "false", "no", "none")
+
+
+class LLMResponseCache:
+    """
+    SQLite LLM回應緩存
+
+    連線延遲到第一次讀寫時才建立，只建立分析器而不呼叫LLM時不會產生資料庫檔。
+    path 可為 ":memory:"（只存在於此物件）。
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_CACHE_PATH,
+        ttl: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        """
+        Args:
+            path: SQLite 資料庫路徑
+            ttl: 回應存活秒數（None 表示永不過期）
+            max_entries: 保留的回應筆數上限
+
+        Raises:
+            ValueError: ttl 或 max_entries 無效
+        """
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f"ttl 必須為正數: {ttl}")
+        if max_entries < 1:
+            raise ValueError(f"max_entries 必須至少為 1: {max_entries}")
+
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        system_prompt: str,
+        analysis_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """
+        由請求內容計算緩存鍵
+
+        Returns:
+            SHA-256 十六進位字串
+        """
+        system_hash = hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()
+        prompt_hash = hashlib.sha256(analysis_prompt.encode('utf-8')).hexdigest()
+        content = f"v{LLM_CACHE_VERSION}|{provider}|{model}|{system_hash}|{prompt_hash}|{temperature!r}|{max_tokens}"
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """建立（或沿用）資料庫連線，呼叫端需持有 self._lock"""
+        if self._connection is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            if self.path != ":memory:":
+                connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " provider TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+            self._connection = connection
+        return self._connection
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at >= self.ttl
+
+    def _failed(self, action: str, error: Exception):
+        """記錄資料庫錯誤（呼叫端需持有 self._lock）"""
+        logger.warning(f"LLM緩存{action}失敗: {self.path} ({error})")
+        self.errors += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        讀取回應並更新最後讀取時間
+
+        Returns:
+            緩存的回應，未命中或已過期返回 None
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                connection = self._connect()
+                row = connection.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and self._is_expired(row[1], now):
+                    connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.expired += 1
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    return None
+                connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            except sqlite3.Error as e:
+                self._failed("讀取", e)
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return row[0]
+
+    def __contains__(self, key: str) -> bool:
+        """是否有未過期的回應（不計入命中統計）"""
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._connect().execute(
+                    "SELECT created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._failed("讀取", e)
+                return False
+        return row is not None and not self._is_expired(row[0], now)
+
+    def put(self, key: str, response: str, provider: str = "", model: str = ""):
+        """
+        寫入回應，並刪除過期回應、淘汰超出上限的最久未使用回應
+
+        Args:
+            key: make_key() 產生的緩存鍵
+            response: LLM回應
+            provider: 提供商名稱（僅供檢視資料庫用）
+            model: 模型名稱（僅供檢視資料庫用）
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                connection = self._connect()
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, provider, model, response, now, now)
+                    )
+                    if self.ttl is not None:
+                        connection.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl,))
+                    size = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                    if size > self.max_entries:
+                        connection.execute(
+                            "DELETE FROM responses WHERE key IN ("
+                            " SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                            (size - self.max_entries,)
+                        )
+                        self.evictions += size - self.max_entries
+                    connection.execute("COMMIT")
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error as e:
+                self._failed("寫入", e)
+                return
+            self.writes += 1
+
+    def discard(self, key: str):
+        """刪除單筆回應（例如回應未通過字數檢查）"""
+        with self._lock:
+            try:
+                self._connect().execute("DELETE FROM responses WHERE key = ?", (key,))
+            except sqlite3.Error as e:
+                self._failed("刪除", e)
+
+    def stats(self) -> Dict:
+        """獲取緩存統計（命中、未命中、過期、寫入、淘汰、命中率、當前筆數）"""
+        with self._lock:
+            try:
+                size = self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            except sqlite3.Error as e:
+                self._failed("讀取", e)
+                size = None
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": size,
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "path": self.path
+            }
+
+    def clear(self):
+        """刪除所有回應並重置統計"""
+        with self._lock:
+            try:
+                self._connect().execute("DELETE FROM responses")
+            except sqlite3.Error as e:
+                self._failed("刪除", e)
+            self.hits = 0
+            self.misses = 0
+            self.expired = 0
+            self.writes = 0
+            self.evictions = 0
+            self.errors = 0
+
+    def close(self):
+        """關閉資料庫連線（之後讀寫時會重新連線）"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+# 進程共享的LLM回應緩存（延遲初始化）
+_shared_cache: Optional[LLMResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    獲取進程共享的LLM回應緩存
+
+    Returns:
+        LLMResponseCache，環境變量 FORTUNE_LLM_CACHE 設為 off 時返回 None
+    """
+    global _shared_cache
+
+    setting = os.getenv('FORTUNE_LLM_CACHE', '')
+    if setting.lower() in _DISABLED_VALUES:
+        return None
+
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMResponseCache(setting or DEFAULT_CACHE_PATH)
+        return _shared_cache
+
+
+def configure_llm_cache(
+    path: Union[str, Path, None] = None,
+    ttl: Union[float, None, bool] = False,
+    max_entries: Optional[int] = None
+) -> Optional[Dict]:
+    """
+    調整進程共享的LLM回應緩存（只影響之後建立的分析器）
+
+    Args:
+        path: 資料庫路徑（None 表示不變）
+        ttl: 存活秒數；None 表示永不過期，False 表示不變
+        max_entries: 筆數上限（None 表示不變）
+
+    Returns:
+        調整後的緩存統計，緩存已停用時返回 None
+
+    Raises:
+        ValueError: ttl 或 max_entries 無效
+    """
+    global _shared_cache
+
+    cache = get_llm_cache()
+    if cache is None:
+        return None
+
+    with _shared_cache_lock:
+        if path is not None and str(path) != cache.path:
+            cache.close()
+            cache = _shared_cache = LLMResponseCache(path, cache.ttl, cache.max_entries)
+        if ttl is not False:
+            if ttl is not None and ttl <= 0:
+                raise ValueError(f"ttl 必須為正數: {ttl}")
+            cache.ttl = ttl
+        if max_entries is not None:
+            if max_entries < 1:
+                raise ValueError(f"max_entries 必須至少為 1: {max_entries}")
+            cache.max_entries = max_entries
+    return cache.stats()
+
+
+def get_llm_cache_stats() -> Optional[Dict]:
+    """獲取進程共享LLM回應緩存的統計資訊（已停用時返回 None）"""
+    cache = get_llm_cache()
+    return cache.stats() if cache is not None else None
+
+
+def clear_llm_cache():
+    """刪除進程共享LLM回應緩存的所有回應"""
+    cache = get_llm_cache()
+    if cache is not None:
+        cache.clear()
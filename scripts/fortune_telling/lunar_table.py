@@ -0,0 +1,276 @@
+"""
+農曆日期預計算表 (Precomputed Gregorian→Lunar Table)
+==================================================
+
+將 1900–2100 年每一天對應的農曆日期預先計算並存成緊湊的二進位表，
+載入時以 mmap 映射，公曆轉農曆只需按日序號讀取一筆記錄，
+不必呼叫 lunarcalendar 逐月推算。
+
+檔案格式（little-endian）：
+1. 標頭 16 bytes：魔數 b"LUN1"、起始年 (int32)、結束年 (int32)、保留欄位 (uint32)
+2. 記錄區：起始年 1 月 1 日起每日一筆 uint32，
+   位元配置為 農曆年 (16 bits) | 閏月旗標 (1 bit) | 農曆月 (7 bits) | 農曆日 (8 bits)
+
+表中數據即 lunarcalendar Converter.Solar2Lunar 的輸出，
+表外日期由呼叫端退回 lunarcalendar 計算。
+
+建表與驗證請使用 build_tables 命令（見 build_tables.py）。
+"""
+
+import logging
+import mmap
+import struct
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 預設表範圍與檔案位置
+TABLE_START_YEAR = 1900
+TABLE_END_YEAR = 2100
+DEFAULT_TABLE_PATH = Path(__file__).parent / 'tables' / 'lunar_dates.bin'
+
+_MAGIC = b"LUN1"
+_HEADER = struct.Struct("<4siiI")
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_LEAP_FLAG = 0x8000
+
+LunarRecord = Tuple[int, int, int, bool]  # (農曆年, 農曆月, 農曆日, 是否閏月)
+
+
+def _pack(year: int, month: int, day: int, is_leap: bool) -> int:
+    return (year << 16) | (_LEAP_FLAG if is_leap else 0) | (month << 8) | day
+
+
+def _unpack(value: int) -> LunarRecord:
+    return value >> 16, (value >> 8) & 0x7F, value & 0xFF, bool(value & _LEAP_FLAG)
+
+
+class LunarDateTable:
+    """
+    農曆日期預計算表
+
+    以 mmap 映射二進位表，查詢時直接按日序號讀取，不複製整張表。
+    """
+
+    def __init__(self, path: Path):
+        """
+        載入農曆日期表
+
+        Args:
+            path: 二進位表檔案路徑
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, start_year, end_year, _ = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"無效的農曆日期表檔案: {self.path}")
+
+        self.start_year = start_year
+        self.end_year = end_year
+        self._start_ordinal = date(start_year, 1, 1).toordinal()
+
+        count = date(end_year, 12, 31).toordinal() - self._start_ordinal + 1
+        if len(self._mmap) != _HEADER.size + count * 4:
+            raise ValueError(f"農曆日期表檔案大小不符: {self.path}")
+
+        self._records = memoryview(self._mmap)[_HEADER.size:].cast('I')
+
+    def covers(self, year: int) -> bool:
+        """檢查公曆年份是否在表的範圍內"""
+        return self.start_year <= year <= self.end_year
+
+    def lookup(self, year: int, month: int, day: int) -> Optional[LunarRecord]:
+        """
+        查詢公曆日期對應的農曆日期
+
+        Args:
+            year: 公曆年
+            month: 公曆月
+            day: 公曆日
+
+        Returns:
+            (農曆年, 農曆月, 農曆日, 是否閏月)，日期不在表內則返回 None
+        """
+        if not self.covers(year):
+            return None
+        return _unpack(self._records[date(year, month, day).toordinal() - self._start_ordinal])
+
+    def lookup_many(self, epoch_days: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批次查詢農曆日期
+
+        Args:
+            epoch_days: 自 1970-01-01 起算的日數陣列
+
+        Returns:
+            (農曆記錄陣列 (N, 4)：年、月、日、閏月旗標, 是否在表內的布林陣列)
+            表外日期的記錄為 0，由呼叫端另行處理
+        """
+        records = np.frombuffer(self._records, dtype='<u4')
+        index = np.asarray(epoch_days, dtype=np.int64) + (_EPOCH_ORDINAL - self._start_ordinal)
+        inside = (index >= 0) & (index < len(records))
+
+        values = np.where(inside, records[np.where(inside, index, 0)], 0).astype(np.int64)
+        result = np.stack([
+            values >> 16,
+            (values >> 8) & 0x7F,
+            values & 0xFF,
+            (values & _LEAP_FLAG) != 0,
+        ], axis=1)
+        return result, inside
+
+
+def load_table(path: Path = DEFAULT_TABLE_PATH) -> Optional[LunarDateTable]:
+    """
+    載入農曆日期表，檔案不存在或損壞時返回 None（呼叫端應退回 lunarcalendar 計算）
+
+    Args:
+        path: 二進位表檔案路徑
+
+    Returns:
+        LunarDateTable 或 None
+    """
+    if not Path(path).exists():
+        logger.warning(f"農曆日期預計算表不存在，使用 lunarcalendar 計算: {path}")
+        return None
+
+    try:
+        return LunarDateTable(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"農曆日期預計算表載入失敗: {e}")
+        return None
+
+
+# 模組載入時映射預設表
+_default_table: Optional[LunarDateTable] = load_table()
+
+
+def get_default_table() -> Optional[LunarDateTable]:
+    """獲取模組載入時映射的預設農曆日期表"""
+    return _default_table
+
+
+def solar_to_lunar(year: int, month: int, day: int) -> LunarRecord:
+    """
+    公曆轉農曆（優先查表，表外日期退回 lunarcalendar）
+
+    Args:
+        year: 公曆年
+        month: 公曆月
+        day: 公曆日
+
+    Returns:
+        (農曆年, 農曆月, 農曆日, 是否閏月)
+    """
+    if _default_table is not None:
+        record = _default_table.lookup(year, month, day)
+        if record is not None:
+            return record
+    return _convert_with_lunarcalendar(year, month, day)
+
+
+def solar_to_lunar_many(epoch_days: np.ndarray) -> np.ndarray:
+    """
+    批次公曆轉農曆（表外日期逐日退回 lunarcalendar）
+
+    Args:
+        epoch_days: 自 1970-01-01 起算的日數陣列
+
+    Returns:
+        農曆記錄陣列 (N, 4)：年、月、日、閏月旗標
+    """
+    epoch_days = np.asarray(epoch_days, dtype=np.int64)
+    if _default_table is not None:
+        result, inside = _default_table.lookup_many(epoch_days)
+    else:
+        result = np.zeros((len(epoch_days), 4), dtype=np.int64)
+        inside = np.zeros(len(epoch_days), dtype=bool)
+
+    for i in np.flatnonzero(~inside):
+        d = date.fromordinal(int(epoch_days[i]) + _EPOCH_ORDINAL)
+        result[i] = _convert_with_lunarcalendar(d.year, d.month, d.day)
+
+    return result
+
+
+def _convert_with_lunarcalendar(year: int, month: int, day: int) -> LunarRecord:
+    from lunarcalendar import Converter, Solar
+
+    lunar = Converter.Solar2Lunar(Solar(year, month, day))
+    return lunar.year, lunar.month, lunar.day, bool(lunar.isleap)
+
+
+# ============================================
+# 建表與驗證 (Build & Verify)
+# ============================================
+
+def build_table(
+    path: Path = DEFAULT_TABLE_PATH,
+    start_year: int = TABLE_START_YEAR,
+    end_year: int = TABLE_END_YEAR
+) -> Path:
+    """
+    以 lunarcalendar 逐日轉換並寫出二進位表
+
+    Args:
+        path: 輸出檔案路徑
+        start_year: 起始年份
+        end_year: 結束年份（含）
+
+    Returns:
+        輸出檔案路徑
+    """
+    current = date(start_year, 1, 1)
+    last = date(end_year, 12, 31)
+    records: List[int] = []
+    while current <= last:
+        records.append(_pack(*_convert_with_lunarcalendar(current.year, current.month, current.day)))
+        current += timedelta(days=1)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, start_year, end_year, 0))
+        f.write(struct.pack(f"<{len(records)}I", *records))
+    tmp_path.replace(path)
+
+    return path
+
+
+def verify_table(
+    table: LunarDateTable,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None
+) -> List[str]:
+    """
+    將農曆日期表與 lunarcalendar 逐日比對
+
+    Args:
+        table: 要驗證的農曆日期表
+        start_year: 起始年份（預設為表的起始年）
+        end_year: 結束年份（預設為表的結束年）
+
+    Returns:
+        差異描述列表，空列表表示完全一致
+    """
+    start_year = table.start_year if start_year is None else start_year
+    end_year = table.end_year if end_year is None else end_year
+
+    differences = []
+    current = date(start_year, 1, 1)
+    last = date(end_year, 12, 31)
+    while current <= last:
+        expected = _convert_with_lunarcalendar(current.year, current.month, current.day)
+        actual = table.lookup(current.year, current.month, current.day)
+        if actual != expected:
+            differences.append(f"{current.isoformat()}: lunarcalendar={expected} table={actual}")
+        current += timedelta(days=1)
+
+    return differences
@@ -0,0 +1,363 @@
+"""
+Markdown 轉 HTML (Markdown Renderer)
+===================================
+
+將專家提示詞產出的分析報告（Markdown）轉為 HTML，支援的子集：
+1. 標題（# 至 ######，可整體降級，例如嵌入報告區塊時 # 輸出為 <h2>）
+2. 段落（段落內的換行輸出為 <br>）
+3. 無序與有序列表（以縮排表示巢狀）
+4. 管線表格（含 :--- / :---: / ---: 對齊）
+5. 引用、分隔線、程式碼區塊
+6. 行內粗體 **…**、斜體 *…*、行內程式碼 `…`
+
+每行只讀取、分類一次，行內格式以單一正規表達式處理，不會對整份文件反覆 replace。
+輸入可以是字串或逐行產生的迭代器（例如已開啟的檔案），輸出為逐區塊產生的 HTML 片段，
+轉換大型文件時不必先讀入整份內容。文字內容會做 HTML 跳脫。
+"""
+
+import html
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+_HEADING = re.compile(r'^ {0,3}(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$')
+_HR = re.compile(r'^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$')
+_FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+_QUOTE = re.compile(r'^ {0,3}>[ \t]?(.*)$')
+_LIST_ITEM = re.compile(r'^([ \t]*)([-*+]|\d{1,9}[.)])[ \t]+(.*)$')
+_TABLE_DELIMITER = re.compile(r'^[ \t]*\|?(?:[ \t]*:?-+:?[ \t]*\|)*[ \t]*:?-+:?[ \t]*\|?[ \t]*$')
+_CELL_SEPARATOR = re.compile(r'(?<!\\)\|')
+_INLINE = re.compile(
+    r'(`+)(.+?)\1'                              # 行內程式碼
+    r'|\*\*\*(?=\S)(.+?)(?<=\S)\*\*\*'          # 粗斜體
+    r'|\*\*(?=[^\s*])(.+?)(?<=\S)\*\*'          # 粗體
+    r'|\*(?=\*\*[^\s*]|[^\s*])(.+?)(?<=[^\s*])\*(?!\*)'   # 斜體（可包含粗體）
+)
+
+# 可能開始區塊的行首字元（其餘的行直接視為段落文字）
+_BLOCK_MARKERS = frozenset('#-*+_`~|0123456789')
+
+# 可設定樣式的區塊標籤
+BLOCK_TAGS = (
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'ul', 'ol', 'li',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td', 'blockquote', 'pre', 'hr',
+)
+
+Source = Union[str, Iterable[str]]
+
+
+# ============================================
+# 行內格式 (Inline Formatting)
+# ============================================
+
+def _replace_inline(match: 're.Match') -> str:
+    code, bold_italic, bold, italic = match.group(2, 3, 4, 5)
+    if code is not None:
+        return f'<code>{code.strip()}</code>'
+    if bold_italic is not None:
+        return f'<em><strong>{_INLINE.sub(_replace_inline, bold_italic)}</strong></em>'
+    if bold is not None:
+        return f'<strong>{_INLINE.sub(_replace_inline, bold)}</strong>'
+    return f'<em>{_INLINE.sub(_replace_inline, italic)}</em>'
+
+
+def render_inline(text: str) -> str:
+    """
+    跳脫並轉換單行文字的行內格式
+
+    Args:
+        text: 一行 Markdown 文字
+
+    Returns:
+        HTML
+    """
+    return _INLINE.sub(_replace_inline, html.escape(text, quote=False))
+
+
+# ============================================
+# 區塊解析 (Block Parser)
+# ============================================
+
+class _BlockParser:
+    """
+    逐行的區塊狀態機（每次轉換一個實例）
+
+    每行輸出對應的 HTML 字串（可能為空字串）。表格需要看到下一行（分隔列）才能確定，
+    只有以 | 開頭的行會被暫存一行；其餘的行讀入後立即輸出。
+    """
+
+    def __init__(self, heading_offset: int, styles: Dict[str, str]):
+        self.heading_offset = heading_offset
+        self.styles = styles
+        self.open_tags = {tag: self._open_tag(tag) for tag in BLOCK_TAGS}
+
+        self.in_paragraph = False
+        self.lists: List[Tuple[int, str]] = []  # (縮排, 'ul' | 'ol')
+        self.list_gap = False                    # 列表中遇到空行
+        self.fence: Optional[str] = None
+        self.table_aligns: Optional[List[Optional[str]]] = None
+        self.table_candidate: Optional[str] = None
+        self.quote_lines: List[str] = []
+
+    def _open_tag(self, tag: str, style: str = '', attributes: str = '') -> str:
+        base = self.styles.get(tag, '')
+        style = '; '.join(part for part in (base, style) if part)
+        style_attr = f' style="{style}"' if style else ''
+        return f'<{tag}{attributes}{style_attr}>'
+
+    # ---------- 關閉區塊 ----------
+
+    def _close_paragraph(self) -> str:
+        if not self.in_paragraph:
+            return ''
+        self.in_paragraph = False
+        return '</p>\n'
+
+    def _close_lists(self, indent: int = -1) -> str:
+        """關閉縮排大於 indent 的列表層級（預設全部關閉）"""
+        closed = ''
+        while self.lists and self.lists[-1][0] > indent:
+            closed += f'</li></{self.lists.pop()[1]}>\n'
+        if not self.lists:
+            self.list_gap = False
+        return closed
+
+    def _close_table(self) -> str:
+        if self.table_aligns is None:
+            return ''
+        self.table_aligns = None
+        return '</tbody></table>\n'
+
+    def _close_quote(self) -> str:
+        if not self.quote_lines:
+            return ''
+        lines, self.quote_lines = self.quote_lines, []
+        inner = ''.join(_BlockParser(self.heading_offset, self.styles).feed_all(lines))
+        return f"{self.open_tags['blockquote']}{inner}</blockquote>\n"
+
+    def _close_blocks(self) -> str:
+        return self._close_paragraph() + self._close_lists() + self._close_table() + self._close_quote()
+
+    # ---------- 表格 ----------
+
+    @staticmethod
+    def _split_cells(line: str) -> List[str]:
+        line = line.strip()
+        if line.startswith('|'):
+            line = line[1:]
+        if line.endswith('|') and not line.endswith('\\|'):
+            line = line[:-1]
+        return [cell.strip().replace('\\|', '|') for cell in _CELL_SEPARATOR.split(line)]
+
+    def _table_row(self, line: str, cell_tag: str) -> str:
+        cells = self._split_cells(line)
+        width = len(self.table_aligns)
+        cells = (cells + [''] * width)[:width]
+        row = [self.open_tags['tr']]
+        for cell, align in zip(cells, self.table_aligns):
+            if align:
+                row.append(self._open_tag(cell_tag, f'text-align: {align}'))
+            else:
+                row.append(self.open_tags[cell_tag])
+            row.append(f'{render_inline(cell)}</{cell_tag}>')
+        row.append('</tr>\n')
+        return ''.join(row)
+
+    def _start_table(self, header: str, delimiter: str) -> str:
+        aligns: List[Optional[str]] = []
+        for cell in self._split_cells(delimiter):
+            if cell.startswith(':') and cell.endswith(':'):
+                aligns.append('center')
+            elif cell.endswith(':'):
+                aligns.append('right')
+            elif cell.startswith(':'):
+                aligns.append('left')
+            else:
+                aligns.append(None)
+        self.table_aligns = aligns
+        return (self.open_tags['table'] + self.open_tags['thead'] + self._table_row(header, 'th')
+                + '</thead>' + self.open_tags['tbody'])
+
+    # ---------- 逐行處理 ----------
+
+    def _list_item(self, match: 're.Match') -> str:
+        indent = len(match.group(1).expandtabs(4))
+        marker, text = match.group(2), match.group(3)
+        tag = 'ol' if marker[0].isdigit() else 'ul'
+
+        out = self._close_paragraph() + self._close_lists(indent)
+        self.list_gap = False
+
+        if self.lists and self.lists[-1][0] == indent:
+            if self.lists[-1][1] == tag:
+                return f"{out}</li>{self.open_tags['li']}{render_inline(text)}"
+            out += self._close_lists(indent - 1)
+
+        if tag == 'ol' and int(marker[:-1]) != 1:
+            out += self._open_tag('ol', attributes=f' start="{int(marker[:-1])}"')
+        else:
+            out += self.open_tags[tag]
+        self.lists.append((indent, tag))
+        return f"{out}{self.open_tags['li']}{render_inline(text)}"
+
+    def _text(self, line: str, stripped: str) -> str:
+        out = ''
+        if self.lists:
+            indent = len(line[:len(line) - len(line.lstrip())].expandtabs(4))
+            if not self.list_gap or indent > self.lists[-1][0]:
+                # 列表項目的延續行
+                self.list_gap = False
+                return '<br>' + render_inline(stripped)
+            out = self._close_lists()
+
+        if self.in_paragraph:
+            return f'{out}<br>\n{render_inline(stripped)}'
+        self.in_paragraph = True
+        return f"{out}{self.open_tags['p']}{render_inline(stripped)}"
+
+    def _block_line(self, line: str, stripped: str) -> str:
+        """以區塊標記字元開頭的行（標題、列表、分隔線、程式碼區塊、表格）"""
+        fence = _FENCE.match(line)
+        if fence:
+            self.fence = fence.group(1)
+            return f"{self._close_blocks()}{self.open_tags['pre']}<code>"
+
+        heading = _HEADING.match(line)
+        if heading:
+            level = min(len(heading.group(1)) + self.heading_offset, 6)
+            return f'{self._close_blocks()}{self.open_tags[f"h{level}"]}{render_inline(heading.group(2))}</h{level}>\n'
+
+        if _HR.match(line):
+            return self._close_blocks() + self.open_tags['hr'] + '\n'
+
+        item = _LIST_ITEM.match(line)
+        if item:
+            return self._list_item(item)
+
+        if stripped[0] == '|':
+            self.table_candidate = line
+            return ''
+
+        return self._text(line, stripped)
+
+    def feed(self, line: str) -> str:
+        """處理一行（不含換行符），返回對應的 HTML（可能為空字串）"""
+        if self.fence is not None:
+            stripped = line.strip()
+            if stripped.startswith(self.fence) and not stripped.strip(self.fence[0]):
+                self.fence = None
+                return '</code></pre>\n'
+            return html.escape(line, quote=False) + '\n'
+
+        out = ''
+        if self.table_candidate is not None:
+            header, self.table_candidate = self.table_candidate, None
+            if _TABLE_DELIMITER.match(line):
+                return self._close_blocks() + self._start_table(header, line)
+            out = self._text(header, header.strip())
+
+        stripped = line.strip()
+        if self.table_aligns is not None:
+            if stripped.startswith('|'):
+                return out + self._table_row(line, 'td')
+            out += self._close_table()
+
+        if not stripped:
+            out += self._close_quote() + self._close_paragraph()
+            if self.lists:
+                self.list_gap = True
+            return out
+
+        first = stripped[0]
+        if first == '>':
+            quote = _QUOTE.match(line)
+            if quote:
+                if not self.quote_lines:
+                    out += self._close_blocks()
+                self.quote_lines.append(quote.group(1))
+                return out
+        if self.quote_lines:
+            out += self._close_quote()
+
+        if first in _BLOCK_MARKERS:
+            return out + self._block_line(line, stripped)
+        return out + self._text(line, stripped)
+
+    def finish(self) -> str:
+        """輸入結束：關閉所有未關閉的區塊"""
+        out = ''
+        if self.table_candidate is not None:
+            header, self.table_candidate = self.table_candidate, None
+            out = self._text(header, header.strip())
+        if self.fence is not None:
+            self.fence = None
+            out += '</code></pre>\n'
+        return out + self._close_blocks()
+
+    def feed_all(self, lines: Iterable[str]) -> Iterator[str]:
+        for line in lines:
+            chunk = self.feed(line.rstrip('\r\n'))
+            if chunk:
+                yield chunk
+        chunk = self.finish()
+        if chunk:
+            yield chunk
+
+
+# ============================================
+# 公開介面 (Public API)
+# ============================================
+
+def iter_markdown_html(
+    source: Source,
+    heading_offset: int = 0,
+    styles: Optional[Dict[str, str]] = None
+) -> Iterator[str]:
+    """
+    逐區塊產生 Markdown 轉換後的 HTML
+
+    Args:
+        source: Markdown 字串，或逐行產生文字的迭代器（例如已開啟的檔案）
+        heading_offset: 標題降級層數（1 表示 # 輸出為 <h2>，最多到 <h6>）
+        styles: 區塊標籤 → 行內 style（見 BLOCK_TAGS），供沒有對應 CSS 的頁面使用
+
+    Yields:
+        HTML 片段
+    """
+    if isinstance(source, str):
+        source = source.splitlines()
+    return _BlockParser(heading_offset, styles or {}).feed_all(source)
+
+
+def markdown_to_html(
+    source: Optional[Source],
+    heading_offset: int = 0,
+    styles: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    將 Markdown 轉為 HTML（參數見 iter_markdown_html）
+
+    Returns:
+        HTML 字串，source 為空時返回空字串
+    """
+    if not source:
+        return ''
+    return ''.join(iter_markdown_html(source, heading_offset, styles))
+
+
+def iter_markdown_file(
+    path: Union[str, Path],
+    heading_offset: int = 0,
+    styles: Optional[Dict[str, str]] = None
+) -> Iterator[str]:
+    """
+    逐行讀取 Markdown 檔並逐區塊產生 HTML（參數見 iter_markdown_html）
+
+    Args:
+        path: Markdown 檔路徑（UTF-8）
+
+    Yields:
+        HTML 片段
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_markdown_html(f, heading_offset, styles)
@@ -7,7 +7,7 @@ Provides real-time status updates during multi-stage analysis
 import sys
 import time
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 
 
 class ProgressTracker:
@@ -47,28 +47,35 @@ class ProgressTracker:
                 self._print_status()
                 break
 
-    def complete_stage(self, name: str):
-        """Mark stage as completed"""
+    def complete_stage(self, name: str, start_time: Optional[float] = None, end_time: Optional[float] = None):
+        """Mark stage as completed (optionally with timings measured by a worker)"""
         for stage in self.stages:
             if stage['name'] == name:
                 stage['status'] = 'completed'
-                stage['end_time'] = time.time()
+                if start_time is not None:
+                    stage['start_time'] = start_time
+                stage['end_time'] = end_time if end_time is not None else time.time()
                 elapsed = stage['end_time'] - stage['start_time']
-                self._print_status(elapsed)
+                self._print_status(elapsed, stage)
                 break
 
-    def fail_stage(self, name: str, error: str):
-        """Mark stage as failed"""
+    def fail_stage(self, name: str, error: str, start_time: Optional[float] = None, end_time: Optional[float] = None):
+        """Mark stage as failed (optionally with timings measured by a worker)"""
         for stage in self.stages:
             if stage['name'] == name:
                 stage['status'] = 'failed'
                 stage['error'] = error
-                self._print_status()
+                if start_time is not None:
+                    stage['start_time'] = start_time
+                if end_time is not None:
+                    stage['end_time'] = end_time
+                self._print_status(stage=stage)
                 break
 
-    def _print_status(self, elapsed: Optional[float] = None):
-        """Print current progress status"""
-        if not self.current_stage:
+    def _print_status(self, elapsed: Optional[float] = None, stage: Optional[dict] = None):
+        """Print progress status of the given stage (default: the current stage)"""
+        stage = stage or self.current_stage
+        if not stage:
             return
 
         status_emoji = {
@@ -78,7 +85,6 @@ class ProgressTracker:
             'failed': '❌'
         }
 
-        stage = self.current_stage
         emoji = status_emoji.get(stage['status'], '📋')
 
         print(f"\n{stage['emoji']} {emoji} {stage['description']}", end='')
@@ -199,6 +205,46 @@ class AgentProgressTracker:
                 print(f"         ❌ {agent.get('error', 'Unknown error')}")
 
 
+class StreamProgress:
+    """Show live character counts while LLM sections stream in
+
+    Use on_chunk / on_result as the streaming hooks of interpret_all or
+    LLMAnalyzer.analyze_many. The live line is only drawn on a terminal.
+    """
+
+    def __init__(self, labels: Dict[str, str]):
+        self.labels = labels
+        self.received: Dict[str, int] = {}
+        self.start_time = time.time()
+        self.live = sys.stdout.isatty()
+
+    def on_chunk(self, key: str, chunk: str):
+        """Count a streamed chunk and redraw the live line"""
+        self.received[key] = self.received.get(key, 0) + len(chunk)
+        self._draw()
+
+    def on_result(self, key: str, result: Any):
+        """Report a finished section (LLM output or fallback)"""
+        streamed = self.received.pop(key, 0)
+        method = result.get('analysis_method') if isinstance(result, dict) else None
+        detail = method or f"{streamed}字"
+        self._clear()
+        print(f"   📝 {self.labels.get(key, key)} ({detail}, {time.time() - self.start_time:.1f}s)")
+        self._draw()
+
+    def _draw(self):
+        if not self.live or not self.received:
+            return
+        parts = [f"{self.labels.get(key, key)} {count}字" for key, count in self.received.items()]
+        sys.stdout.write("\r\033[K   ✍️ " + " | ".join(parts))
+        sys.stdout.flush()
+
+    def _clear(self):
+        if self.live:
+            sys.stdout.write("\r\033[K")
+            sys.stdout.flush()
+
+
 # Global tracker instances
 _global_tracker: Optional[ProgressTracker] = None
 _global_agent_tracker: Optional[AgentProgressTracker] = None
@@ -0,0 +1,307 @@
+"""
+報告產物最佳化 (Report Artifacts)
+================================
+
+供網頁伺服器直接送出的報告檔案：
+1. minify_html：行內 style="..." 屬性改為去重後的 class（同樣的樣式只在 <head> 定義一次），
+   並移除註解、壓縮標籤間空白與 <style> 內的 CSS；精簡版寫在可讀版旁（report.min.html）
+2. write_precompressed：在報告旁寫入 .gz 與 .br 壓縮副本，伺服器可依 Accept-Encoding
+   直接送出，不必在每次請求時壓縮
+3. remove_stale_artifacts：報告重新產生時移除這次不再寫入的精簡版與壓縮副本，避免送出過期內容
+
+<pre>、<textarea> 與 <script> 的內容原樣保留。.br 需要 brotli 套件（pip install brotli），
+未安裝時只寫入 .gz。
+"""
+
+import gzip
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+GZIP_SUFFIX = ".gz"
+BROTLI_SUFFIX = ".br"
+PRECOMPRESSED_SUFFIXES = (GZIP_SUFFIX, BROTLI_SUFFIX)
+# 精簡版與可讀版並存：report.html → report.min.html
+MINIFIED_INFIX = ".min"
+
+# 由行內樣式產生的 class 名稱前綴（模板本身的 class 不以底線開頭）
+STYLE_CLASS_PREFIX = "_s"
+
+# 標籤間的純空白在相鄰標籤為區塊元素時可整段移除，否則保留一個空格
+_BLOCK_ELEMENTS = frozenset((
+    'html', 'head', 'body', 'title', 'meta', 'link', 'style', 'script',
+    'div', 'section', 'header', 'footer', 'nav', 'main', 'article', 'aside',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'ul', 'ol', 'li', 'dl', 'dt', 'dd',
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'th', 'td', 'blockquote', 'pre',
+    'hr', 'br', 'form', 'button', 'textarea',
+))
+
+# 註解、原樣保留的元素（含內容）或單一標籤
+_TOKEN = re.compile(
+    r'<!--.*?-->'
+    r'|<(pre|textarea|script|style)\b[^<>]*>.*?</\1\s*>'
+    r'|</?([a-zA-Z][a-zA-Z0-9-]*)[^<>]*>',
+    re.S | re.I
+)
+_STYLE_ATTR = re.compile(r'\sstyle\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.I)
+_CLASS_ATTR = re.compile(r'(\sclass\s*=\s*)(?:"([^"]*)"|\'([^\']*)\')', re.I)
+_OPEN_TAG = re.compile(r'<[a-zA-Z][a-zA-Z0-9-]*')
+_WHITESPACE = re.compile(r'\s+')
+
+_CSS_TOKEN = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'', re.S)
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+_CSS_COLON = re.compile(r':\s+')
+
+
+# ============================================
+# CSS
+# ============================================
+
+def minify_css(css: str) -> str:
+    """
+    移除註解並壓縮空白（字串常值原樣保留）
+
+    冒號前的空白不移除：選擇器中的 "div :hover" 與 "div:hover" 意義不同。
+    """
+    out = []
+    pos = 0
+    for match in _CSS_TOKEN.finditer(css):
+        out.append(_minify_css_code(css[pos:match.start()]))
+        if not match.group().startswith('/*'):
+            out.append(match.group())
+        pos = match.end()
+    out.append(_minify_css_code(css[pos:]))
+    return ''.join(out).strip().replace(';}', '}')
+
+
+def _minify_css_code(code: str) -> str:
+    code = _WHITESPACE.sub(' ', code)
+    code = _CSS_PUNCTUATION.sub(r'\1', code)
+    return _CSS_COLON.sub(':', code)
+
+
+def _normalize_declarations(style: str) -> str:
+    """行內樣式 → 規則內容；加上 !important 以維持行內樣式原本的優先順序"""
+    declarations = []
+    for declaration in style.split(';'):
+        name, sep, value = declaration.partition(':')
+        name, value = name.strip(), _WHITESPACE.sub(' ', value).strip()
+        if not sep or not name or not value:
+            continue
+        if not value.lower().endswith('!important'):
+            value += '!important'
+        declarations.append(f"{name.lower()}:{value}")
+    return ';'.join(declarations)
+
+
+# ============================================
+# HTML
+# ============================================
+
+class _StyleClasses:
+    """行內樣式 → class 名稱（依首次出現順序編號）"""
+
+    def __init__(self):
+        self.names: Dict[str, str] = {}
+
+    def hoist(self, tag: str) -> str:
+        """將標籤的 style 屬性改為 class"""
+        match = _STYLE_ATTR.search(tag)
+        if match is None:
+            return tag
+        declarations = _normalize_declarations(match.group(1) if match.group(1) is not None else match.group(2))
+        tag = tag[:match.start()] + tag[match.end():]
+        if not declarations:
+            return tag
+
+        name = self.names.get(declarations)
+        if name is None:
+            name = self.names[declarations] = f"{STYLE_CLASS_PREFIX}{len(self.names)}"
+
+        class_match = _CLASS_ATTR.search(tag)
+        if class_match is None:
+            open_tag = _OPEN_TAG.match(tag).end()
+            return f'{tag[:open_tag]} class="{name}"{tag[open_tag:]}'
+        classes = class_match.group(2) if class_match.group(2) is not None else class_match.group(3)
+        merged = f'{class_match.group(1)}"{classes} {name}"' if classes.strip() else f'{class_match.group(1)}"{name}"'
+        return tag[:class_match.start()] + merged + tag[class_match.end():]
+
+    def stylesheet(self) -> str:
+        rules = ''.join(f".{name}{{{declarations}}}" for declarations, name in self.names.items())
+        return f"<style>{rules}</style>" if rules else ''
+
+
+def minify_html(html: str) -> str:
+    """
+    產生精簡版的報告 HTML
+
+    Args:
+        html: 完整的 HTML 文件
+
+    Returns:
+        精簡後的 HTML：行內樣式改為去重的 class（規則插入 </head> 之前），
+        註解移除，空白壓縮，<style> 內的 CSS 壓縮
+    """
+    classes = _StyleClasses()
+    out: List[str] = []
+    pending_space = False    # 上一段文字或標籤後有空白，待下一個輸出決定是否保留
+    after_block = True       # 上一個輸出是區塊元素的標籤（文件開頭視同）
+
+    def emit_text(text: str):
+        nonlocal pending_space, after_block
+        text = _WHITESPACE.sub(' ', text)
+        if text.startswith(' '):
+            pending_space, text = True, text[1:]
+        if not text:
+            return
+        if pending_space and not after_block:
+            out.append(' ')
+        pending_space = text.endswith(' ')
+        out.append(text.rstrip(' '))
+        after_block = False
+
+    def emit_tag(tag: str, name: str):
+        nonlocal pending_space, after_block
+        is_block = name in _BLOCK_ELEMENTS
+        if pending_space and not after_block and not is_block:
+            out.append(' ')
+        pending_space = False
+        out.append(tag)
+        after_block = is_block
+
+    pos = 0
+    for match in _TOKEN.finditer(html):
+        emit_text(html[pos:match.start()])
+        pos = match.end()
+
+        token = match.group()
+        if token.startswith('<!--'):
+            continue
+        raw_element = match.group(1)
+        if raw_element is None:
+            emit_tag(classes.hoist(token), match.group(2).lower())
+            continue
+
+        open_end = token.index('>') + 1
+        close_start = token.rindex('</')
+        open_tag, body, close_tag = token[:open_end], token[open_end:close_start], token[close_start:]
+        name = raw_element.lower()
+        if name == 'style':
+            body = minify_css(body)
+        emit_tag(f"{classes.hoist(open_tag)}{body}{close_tag}", name)
+    emit_text(html[pos:])
+
+    minified = ''.join(out)
+    stylesheet = classes.stylesheet()
+    if not stylesheet:
+        return minified
+    head_end = minified.lower().find('</head>')
+    if head_end < 0:
+        return stylesheet + minified
+    return minified[:head_end] + stylesheet + minified[head_end:]
+
+
+# ============================================
+# 預先壓縮 (Precompression)
+# ============================================
+
+def _write_bytes_atomic(path: Path, data: bytes):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_precompressed(output_path: str, data: bytes) -> List[str]:
+    """
+    在報告旁寫入 .gz（與 .br）壓縮副本
+
+    gzip 標頭不記錄時間，相同內容產生相同的檔案（ETag 與建置快取保持穩定）。
+
+    Args:
+        output_path: 報告路徑（副本為 output_path + ".gz" / ".br"）
+        data: 報告內容（與 output_path 的內容相同）
+
+    Returns:
+        寫入的副本路徑列表
+    """
+    written = []
+    gz_path = Path(output_path + GZIP_SUFFIX)
+    _write_bytes_atomic(gz_path, gzip.compress(data, compresslevel=9, mtime=0))
+    written.append(str(gz_path))
+
+    br_path = Path(output_path + BROTLI_SUFFIX)
+    if brotli is not None:
+        _write_bytes_atomic(br_path, brotli.compress(data, mode=brotli.MODE_TEXT, quality=11))
+        written.append(str(br_path))
+    else:
+        # 舊的 .br 與新報告內容不符，不能留著
+        br_path.unlink(missing_ok=True)
+        logger.debug(f"未安裝 brotli，略過 {br_path.name}")
+    return written
+
+
+def precompressed_paths(output_path: str) -> List[str]:
+    """write_precompressed 會寫入的副本路徑（.br 僅在已安裝 brotli 時）"""
+    suffixes = PRECOMPRESSED_SUFFIXES if brotli is not None else (GZIP_SUFFIX,)
+    return [output_path + suffix for suffix in suffixes]
+
+
+# ============================================
+# 報告旁的檔案 (Sibling Artifacts)
+# ============================================
+
+def minified_path(output_path: str) -> str:
+    """精簡版的路徑（report.html → report.min.html）"""
+    base, ext = os.path.splitext(output_path)
+    return f"{base}{MINIFIED_INFIX}{ext}"
+
+
+def artifact_paths(output_path: str, minify: bool = False, precompress: bool = False) -> List[str]:
+    """
+    報告旁會寫入的檔案（不含報告本身）
+
+    Args:
+        output_path: 可讀版報告路徑
+        minify: 寫入精簡版
+        precompress: 可讀版與精簡版各自寫入壓縮副本（.br 僅在已安裝 brotli 時）
+
+    Returns:
+        檔案路徑列表
+    """
+    paths = precompressed_paths(output_path) if precompress else []
+    if minify:
+        min_path = minified_path(output_path)
+        paths.append(min_path)
+        if precompress:
+            paths.extend(precompressed_paths(min_path))
+    return paths
+
+
+def stale_artifact_paths(output_path: str, minify: bool = False, precompress: bool = False) -> List[str]:
+    """以前的建置可能留下、但這次不會寫入的檔案（與新報告內容不符）"""
+    wanted = set(artifact_paths(output_path, minify, precompress))
+    min_path = minified_path(output_path)
+    candidates = [output_path + suffix for suffix in PRECOMPRESSED_SUFFIXES]
+    candidates += [min_path] + [min_path + suffix for suffix in PRECOMPRESSED_SUFFIXES]
+    return [path for path in candidates if path not in wanted]
+
+
+def remove_stale_artifacts(output_path: str, minify: bool = False, precompress: bool = False):
+    """移除這次不會寫入的精簡版與壓縮副本"""
+    for path in stale_artifact_paths(output_path, minify, precompress):
+        Path(path).unlink(missing_ok=True)
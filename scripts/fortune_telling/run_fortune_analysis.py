@@ -26,6 +26,23 @@ from fortune_telling.numerology_calculator import NumerologyCalculator
 from fortune_telling.qimen_calculator import QimenCalculator
 from fortune_telling.liuyao_calculator import LiuyaoCalculator
 from fortune_telling.progress_tracker import init_tracker
+from fortune_telling.task_graph import Task, run_tasks, THREAD, PROCESS, INLINE
+
+# 分析方法：名稱 → (圖示, 中文名稱, 報告中的鍵, 執行方式)
+# 占星需呼叫 Swiss Ephemeris，放在行程池；其餘為輕量的純 Python 計算，放在執行緒池
+ANALYSIS_METHODS = {
+    'bazi': ('📚', '八字', 'bazi', THREAD),
+    'ziwei': ('🌟', '紫微斗數', 'ziwei', THREAD),
+    'astrology': ('⭐', '西洋占星', 'astrology', PROCESS),
+    'name': ('✍️', '姓名學', 'name_analysis', THREAD),
+    'plum': ('🌸', '梅花易數', 'plum_blossom', THREAD),
+    'numerology': ('🔢', '生命靈數', 'numerology', THREAD),
+    'qimen': ('🧭', '奇門遁甲', 'qimen', THREAD),
+    'liuyao': ('🎲', '六爻占卜', 'liuyao', THREAD),
+}
+
+# 每種方法的預設逾時（秒）
+DEFAULT_METHOD_TIMEOUT = 120.0
 
 
 def parse_arguments():
@@ -46,6 +63,10 @@ def parse_arguments():
                        choices=['bazi', 'ziwei', 'astrology', 'name', 'plum', 'numerology', 'qimen', 'liuyao', 'all'],
                        default=['all'],
                        help='選擇要執行的分析方法 (預設: all)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_METHOD_TIMEOUT,
+                       help=f'每種分析方法的逾時秒數 (預設: {DEFAULT_METHOD_TIMEOUT:g})')
+    parser.add_argument('--serial', action='store_true',
+                       help='依序執行各分析方法，不使用執行緒/行程池 (除錯用)')
 
     return parser.parse_args()
 
@@ -118,6 +139,54 @@ def convert_gender(gender_en):
     return "男" if gender_en.lower() == "male" else "女"
 
 
+def run_calculator(calculator_cls, init_kwargs, analyze_kwargs):
+    """建立計算器並執行 analyze()（模組層級函數，可交給行程池執行）"""
+    return calculator_cls(**init_kwargs).analyze(**analyze_kwargs)
+
+
+def build_method_tasks(methods, name, gender, birth_dt, city_info, calendar_data,
+                       timeout=DEFAULT_METHOD_TIMEOUT, serial=False):
+    """
+    建立各分析方法的任務（各方法只共用已準備好的輸入，彼此沒有相依）
+
+    Args:
+        methods: 要執行的方法名稱（見 ANALYSIS_METHODS）
+        name: 姓名
+        gender: 性別（男/女）
+        birth_dt: 含時區的出生時間
+        city_info: 出生地資訊（lat、lon、tz）
+        calendar_data: CalendarConverter.convert_to_lunar 的結果
+        timeout: 每種方法的逾時秒數
+        serial: 是否在呼叫端依序執行
+
+    Returns:
+        Task 列表（依 methods 順序）
+    """
+    calculators = {
+        'bazi': (BaziCalculator, {'calendar_data': calendar_data},
+                 {'gender': gender, 'include_luck_pillars': True}),
+        'ziwei': (ZiweiCalculator, {'calendar_data': calendar_data, 'gender': gender}, {}),
+        'astrology': (AstrologyCalculator,
+                      {'birth_datetime': birth_dt, 'latitude': city_info['lat'], 'longitude': city_info['lon']}, {}),
+        'name': (NameAnalysisCalculator, {'name': name, 'gender': gender}, {}),
+        'plum': (PlumBlossomCalculator, {'birth_datetime': birth_dt, 'method': "time"}, {}),
+        'numerology': (NumerologyCalculator, {'birth_date': birth_dt, 'full_name': name}, {}),
+        'qimen': (QimenCalculator, {'divination_time': birth_dt, 'method': "時家奇門"}, {}),
+        'liuyao': (LiuyaoCalculator, {'divination_time': birth_dt, 'method': "時間起卦"}, {}),
+    }
+
+    return [
+        Task(
+            name=method,
+            func=run_calculator,
+            args=calculators[method],
+            executor=INLINE if serial else ANALYSIS_METHODS[method][3],
+            timeout=timeout
+        )
+        for method in methods
+    ]
+
+
 def main():
     """執行完整分析"""
 
@@ -127,14 +196,8 @@ def main():
     # 註冊所有分析階段
     tracker.add_stage('parse', '解析輸入參數', '📝')
     tracker.add_stage('prepare', '準備計算資料', '📊')
-    tracker.add_stage('bazi', '執行八字分析', '📚')
-    tracker.add_stage('ziwei', '執行紫微斗數分析', '🌟')
-    tracker.add_stage('astrology', '執行西洋占星分析', '⭐')
-    tracker.add_stage('name', '執行姓名學分析', '✍️')
-    tracker.add_stage('plum', '執行梅花易數分析', '🌸')
-    tracker.add_stage('numerology', '執行生命靈數分析', '🔢')
-    tracker.add_stage('qimen', '執行奇門遁甲分析', '🧭')
-    tracker.add_stage('liuyao', '執行六爻占卜分析', '🎲')
+    for method, (emoji, label, _, _) in ANALYSIS_METHODS.items():
+        tracker.add_stage(method, f'執行{label}分析', emoji)
     tracker.add_stage('assemble', '組裝分析結果', '📝')
     tracker.add_stage('save', '儲存計算結果', '💾')
 
@@ -238,137 +301,28 @@ def main():
     print(f"🔬 階段 2：執行命理分析（{len(methods)}種方法）")
     print("=" * 80)
 
-    # 2.1 八字分析
-    bazi_result = None
-    if 'bazi' in methods:
-        tracker.start_stage('bazi')
-        print("\n📚 正在執行八字分析...")
-        try:
-            bazi_calc = BaziCalculator(calendar_data=calendar_data)
-            bazi_result = bazi_calc.analyze(gender=gender, include_luck_pillars=True)
-            print("✅ 八字分析完成")
-            tracker.complete_stage('bazi')
-        except Exception as e:
-            print(f"❌ 八字分析失敗：{str(e)}")
-            tracker.fail_stage('bazi', str(e))
-            import traceback
-            traceback.print_exc()
-
-    # 2.2 紫微斗數分析
-    ziwei_result = None
-    if 'ziwei' in methods:
-        tracker.start_stage('ziwei')
-        print("\n🌟 正在執行紫微斗數分析...")
-        try:
-            ziwei_calc = ZiweiCalculator(calendar_data=calendar_data, gender=gender)
-            ziwei_result = ziwei_calc.analyze()
-            print("✅ 紫微斗數分析完成")
-            tracker.complete_stage('ziwei')
-        except Exception as e:
-            print(f"❌ 紫微斗數分析失敗：{str(e)}")
-            tracker.fail_stage('ziwei', str(e))
-            import traceback
-            traceback.print_exc()
-
-    # 2.3 占星分析
-    astrology_result = None
-    if 'astrology' in methods:
-        tracker.start_stage('astrology')
-        print("\n⭐ 正在執行西洋占星分析...")
-        try:
-            astrology_calc = AstrologyCalculator(
-                birth_datetime=birth_dt,
-                latitude=city_info['lat'],
-                longitude=city_info['lon']
-            )
-            astrology_result = astrology_calc.analyze()
-            print("✅ 西洋占星分析完成")
-            tracker.complete_stage('astrology')
-        except Exception as e:
-            print(f"❌ 西洋占星分析失敗：{str(e)}")
-            tracker.fail_stage('astrology', str(e))
-            import traceback
-            traceback.print_exc()
-
-    # 2.4 姓名學分析
-    name_result = None
-    if 'name' in methods:
-        tracker.start_stage('name')
-        print("\n✍️ 正在執行姓名學分析...")
-        try:
-            name_calc = NameAnalysisCalculator(name=name, gender=gender)
-            name_result = name_calc.analyze()
-            print("✅ 姓名學分析完成")
-            tracker.complete_stage('name')
-        except Exception as e:
-            print(f"❌ 姓名學分析失敗：{str(e)}")
-            tracker.fail_stage('name', str(e))
-            import traceback
-            traceback.print_exc()
-
-    # 2.5 梅花易數分析
-    plum_result = None
-    if 'plum' in methods:
-        tracker.start_stage('plum')
-        print("\n🌸 正在執行梅花易數分析...")
-        try:
-            plum_calc = PlumBlossomCalculator(birth_datetime=birth_dt, method="time")
-            plum_result = plum_calc.analyze()
-            print("✅ 梅花易數分析完成")
-            tracker.complete_stage('plum')
-        except Exception as e:
-            print(f"❌ 梅花易數分析失敗：{str(e)}")
-            tracker.fail_stage('plum', str(e))
-            import traceback
-            traceback.print_exc()
-
-    # 2.6 生命靈數分析
-    numerology_result = None
-    if 'numerology' in methods:
-        tracker.start_stage('numerology')
-        print("\n🔢 正在執行生命靈數分析...")
-        try:
-            numerology_calc = NumerologyCalculator(birth_date=birth_dt, full_name=name)
-            numerology_result = numerology_calc.analyze()
-            print("✅ 生命靈數分析完成")
-            tracker.complete_stage('numerology')
-        except Exception as e:
-            print(f"❌ 生命靈數分析失敗：{str(e)}")
-            tracker.fail_stage('numerology', str(e))
-            import traceback
-            traceback.print_exc()
-
-    # 2.7 奇門遁甲分析
-    qimen_result = None
-    if 'qimen' in methods:
-        tracker.start_stage('qimen')
-        print("\n🧭 正在執行奇門遁甲分析...")
-        try:
-            qimen_calc = QimenCalculator(divination_time=birth_dt, method="時家奇門")
-            qimen_result = qimen_calc.analyze()
-            print("✅ 奇門遁甲分析完成")
-            tracker.complete_stage('qimen')
-        except Exception as e:
-            print(f"❌ 奇門遁甲分析失敗：{str(e)}")
-            tracker.fail_stage('qimen', str(e))
-            import traceback
-            traceback.print_exc()
-
-    # 2.8 六爻占卜分析
-    liuyao_result = None
-    if 'liuyao' in methods:
-        tracker.start_stage('liuyao')
-        print("\n🎲 正在執行六爻占卜分析...")
-        try:
-            liuyao_calc = LiuyaoCalculator(divination_time=birth_dt, method="時間起卦")
-            liuyao_result = liuyao_calc.analyze()
-            print("✅ 六爻占卜分析完成")
-            tracker.complete_stage('liuyao')
-        except Exception as e:
-            print(f"❌ 六爻占卜分析失敗：{str(e)}")
-            tracker.fail_stage('liuyao', str(e))
-            import traceback
-            traceback.print_exc()
+    # 各方法彼此獨立，同時執行；結果仍依固定順序組裝
+    def on_start(task):
+        emoji, label, _, _ = ANALYSIS_METHODS[task.name]
+        tracker.start_stage(task.name)
+        print(f"\n{emoji} 正在執行{label}分析...")
+
+    def on_finish(result):
+        _, label, _, _ = ANALYSIS_METHODS[result.name]
+        if result.ok:
+            print(f"✅ {label}分析完成")
+            tracker.complete_stage(result.name, result.start_time, result.end_time)
+        else:
+            print(f"❌ {label}分析失敗：{result.error}")
+            tracker.fail_stage(result.name, result.error, result.start_time, result.end_time)
+            if result.traceback:
+                print(result.traceback, file=sys.stderr)
+
+    tasks = build_method_tasks(
+        methods, name, gender, birth_dt, city_info, calendar_data,
+        timeout=args.timeout, serial=args.serial
+    )
+    method_results = run_tasks(tasks, on_start=on_start, on_finish=on_finish)
 
     # ========================================
     # 階段 3：組裝完整結果 (不包含深度解釋和綜合分析)
@@ -394,23 +348,11 @@ def main():
         "calendar_data": calendar_data
     }
 
-    # 根據方法添加結果
-    if bazi_result:
-        full_report["bazi"] = {"calculation": bazi_result}
-    if ziwei_result:
-        full_report["ziwei"] = {"calculation": ziwei_result}
-    if astrology_result:
-        full_report["astrology"] = {"calculation": astrology_result}
-    if name_result:
-        full_report["name_analysis"] = {"calculation": name_result}
-    if plum_result:
-        full_report["plum_blossom"] = {"calculation": plum_result}
-    if numerology_result:
-        full_report["numerology"] = {"calculation": numerology_result}
-    if qimen_result:
-        full_report["qimen"] = {"calculation": qimen_result}
-    if liuyao_result:
-        full_report["liuyao"] = {"calculation": liuyao_result}
+    # 根據方法添加結果（依 ANALYSIS_METHODS 的固定順序）
+    for method, (_, _, report_key, _) in ANALYSIS_METHODS.items():
+        result = method_results.get(method)
+        if result and result.ok and result.value:
+            full_report[report_key] = {"calculation": result.value}
 
     tracker.complete_stage('assemble')
 
@@ -19,11 +19,10 @@ from fortune_telling.calendar_converter import CalendarConverter
 from fortune_telling.bazi_calculator import BaziCalculator
 from fortune_telling.ziwei_calculator import ZiweiCalculator
 from fortune_telling.astrology_calculator import AstrologyCalculator
-from fortune_telling import bazi_interpretation
-from fortune_telling import ziwei_interpretation
-from fortune_telling import astrology_interpretation
-from fortune_telling import synthesis_engine
+from fortune_telling.interpretation_pipeline import LLM_SECTION_LABELS, interpret_all
+from fortune_telling.progress_tracker import StreamProgress
 from fortune_telling.html_report_generator import generate_html_report
+from fortune_telling.report_artifacts import minified_path
 
 
 def main():
@@ -145,60 +144,34 @@ def main():
         astrology_result = None
 
     # ========================================
-    # 階段 3：深度解釋
+    # 階段 3：深度解釋（各方法的LLM請求並行送出）
     # ========================================
     print("\n" + "=" * 80)
     print("💡 階段 3：深度解釋")
     print("=" * 80)
 
-    # 3.1 八字深度解釋
-    if bazi_result:
-        print("\n📖 正在進行八字深度解釋...")
-        try:
-            # 八字解釋需要分別調用各領域函數
-            bazi_interp = {
-                'personality': bazi_interpretation.interpret_personality(bazi_result),
-                'career': bazi_interpretation.interpret_career(bazi_result),
-                'wealth': bazi_interpretation.interpret_wealth(bazi_result),
-                'relationship': bazi_interpretation.interpret_relationship(bazi_result, gender='male'),
-                'health': bazi_interpretation.interpret_health(bazi_result)
-            }
-            print("✅ 八字深度解釋完成")
-        except Exception as e:
-            print(f"❌ 八字解釋失敗：{str(e)}")
-            import traceback
-            traceback.print_exc()
-            bazi_interp = None
-    else:
-        bazi_interp = None
-
-    # 3.2 紫微深度解釋
-    if ziwei_result:
-        print("\n📖 正在進行紫微斗數深度解釋...")
-        try:
-            ziwei_interp = ziwei_interpretation.interpret_ziwei_palaces(ziwei_result)
-            print("✅ 紫微斗數深度解釋完成")
-        except Exception as e:
-            print(f"❌ 紫微解釋失敗：{str(e)}")
-            import traceback
-            traceback.print_exc()
-            ziwei_interp = None
-    else:
-        ziwei_interp = None
-
-    # 3.3 占星深度解釋
-    if astrology_result:
-        print("\n📖 正在進行心理占星深度解釋...")
-        try:
-            astro_interp = astrology_interpretation.interpret_natal_chart(astrology_result)
-            print("✅ 心理占星深度解釋完成")
-        except Exception as e:
-            print(f"❌ 占星解釋失敗：{str(e)}")
-            import traceback
-            traceback.print_exc()
-            astro_interp = None
-    else:
-        astro_interp = None
+    print("\n📖 正在進行八字、紫微斗數、心理占星深度解釋...")
+    stream_progress = StreamProgress(LLM_SECTION_LABELS)
+    interpretations = interpret_all(
+        bazi_result,
+        ziwei_result,
+        astrology_result,
+        gender='male',
+        on_chunk=stream_progress.on_chunk,
+        on_result=stream_progress.on_result
+    )
+    errors = interpretations['errors']
+
+    bazi_interp = interpretations['bazi']
+    ziwei_interp = interpretations['ziwei']
+    astro_interp = interpretations['astrology']
+    for key, label, interp in (('bazi', '八字', bazi_interp),
+                               ('ziwei', '紫微斗數', ziwei_interp),
+                               ('astrology', '心理占星', astro_interp)):
+        if interp:
+            print(f"✅ {label}深度解釋完成")
+        elif key in errors:
+            print(f"❌ {label}解釋失敗：{errors[key]}")
 
     # ========================================
     # 階段 4：跨方法綜合分析
@@ -207,23 +180,13 @@ def main():
     print("🧩 階段 4：跨方法綜合分析")
     print("=" * 80)
 
-    if bazi_interp and ziwei_interp and astro_interp:
-        print("\n🔄 正在進行三方法綜合分析...")
-        try:
-            synthesis = synthesis_engine.synthesize_three_methods(
-                bazi_result=bazi_interp,
-                ziwei_result=ziwei_interp,
-                astro_result=astro_interp
-            )
-            print("✅ 綜合分析完成")
-        except Exception as e:
-            print(f"❌ 綜合分析失敗：{str(e)}")
-            import traceback
-            traceback.print_exc()
-            synthesis = None
+    synthesis = interpretations['synthesis']
+    if synthesis:
+        print("✅ 綜合分析完成")
+    elif 'synthesis' in errors:
+        print(f"❌ 綜合分析失敗：{errors['synthesis']}")
     else:
         print("⚠️ 跳過綜合分析（缺少必要的解釋結果）")
-        synthesis = None
 
     # ========================================
     # 階段 5：生成完整報告
@@ -273,8 +236,9 @@ def main():
     # 生成 HTML 格式報告
     html_file = output_dir / f"fortune_tell_{name}_{timestamp}.html"
     try:
-        generate_html_report(full_report, str(html_file))
-        print(f"✅ HTML報告已儲存：{html_file}")
+        # 可讀版之外另寫精簡版 .min.html，兩者各附 .gz / .br 副本供伺服器直接送出
+        generate_html_report(full_report, str(html_file), minify=True, precompress=True)
+        print(f"✅ HTML報告已儲存：{html_file}（精簡版：{minified_path(str(html_file))}）")
     except Exception as e:
         print(f"⚠️  HTML報告生成失敗：{str(e)}")
         import traceback
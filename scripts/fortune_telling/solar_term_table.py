@@ -0,0 +1,256 @@
+"""
+節氣預計算表 (Precomputed Solar-Term Table)
+==========================================
+
+將 1800–2200 年每年 24 個節氣的精確時刻預先計算並存成緊湊的二進位表，
+載入時以 mmap 映射，讓節氣查詢不必每次執行 ephem 天文計算。
+
+檔案格式（little-endian）：
+1. 標頭 16 bytes：魔數 b"STT1"、起始年 (int32)、結束年 (int32)、保留欄位 (uint32)
+2. 時刻區：每年 24 筆 int64，UTC 紀元微秒，按時間排序
+3. 名稱區：每年 24 筆 uint8，對應 SOLAR_TERMS 的索引
+
+表中數據即 CalendarConverter._calculate_solar_terms_for_year 的輸出，
+表外年份由呼叫端退回 ephem 即時計算。
+
+建表與驗證請使用 build_tables 命令（見 build_tables.py）。
+"""
+
+import logging
+import mmap
+import struct
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import pytz
+
+from .utils import SOLAR_TERMS
+
+logger = logging.getLogger(__name__)
+
+# 預設表範圍與檔案位置
+TABLE_START_YEAR = 1800
+TABLE_END_YEAR = 2200
+TERMS_PER_YEAR = 24
+DEFAULT_TABLE_PATH = Path(__file__).parent / 'tables' / 'solar_terms.bin'
+
+_MAGIC = b"STT1"
+_HEADER = struct.Struct("<4siiI")
+_EPOCH = datetime(1970, 1, 1)
+_BEIJING_TZ = pytz.timezone('Asia/Shanghai')
+
+
+def _to_epoch_us(dt: datetime) -> int:
+    """將時區感知的時間轉換為 UTC 紀元微秒"""
+    naive_utc = dt.astimezone(pytz.utc).replace(tzinfo=None)
+    return (naive_utc - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_epoch_us(value: int) -> datetime:
+    """將 UTC 紀元微秒還原為北京時間（與 ephem 計算結果相同的表示方式）"""
+    utc_time = _EPOCH + timedelta(microseconds=value)
+    return pytz.utc.localize(utc_time).astimezone(_BEIJING_TZ)
+
+
+class SolarTermTable:
+    """
+    節氣預計算表
+
+    以 mmap 映射二進位表，時刻與名稱均直接從映射區讀取，不複製整張表。
+    """
+
+    def __init__(self, path: Path):
+        """
+        載入節氣表
+
+        Args:
+            path: 二進位表檔案路徑
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, start_year, end_year, _ = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"無效的節氣表檔案: {self.path}")
+
+        self.start_year = start_year
+        self.end_year = end_year
+
+        count = (end_year - start_year + 1) * TERMS_PER_YEAR
+        times_end = _HEADER.size + count * 8
+        if len(self._mmap) != times_end + count:
+            raise ValueError(f"節氣表檔案大小不符: {self.path}")
+
+        view = memoryview(self._mmap)
+        self._times = view[_HEADER.size:times_end].cast('q')
+        self._names = view[times_end:times_end + count]
+
+    def covers(self, year: int) -> bool:
+        """檢查年份是否在表的範圍內"""
+        return self.start_year <= year <= self.end_year
+
+    def _slice(self, year: int) -> Tuple[int, int]:
+        start = (year - self.start_year) * TERMS_PER_YEAR
+        return start, start + TERMS_PER_YEAR
+
+    def get_solar_terms(self, year: int) -> Optional[List[Tuple[str, datetime]]]:
+        """
+        獲取指定年份的全部節氣
+
+        Args:
+            year: 年份
+
+        Returns:
+            [(節氣名稱, 時刻), ...] 列表（按時間排序），年份不在表內則返回 None
+        """
+        if not self.covers(year):
+            return None
+
+        start, end = self._slice(year)
+        return [
+            (SOLAR_TERMS[self._names[i]], _from_epoch_us(self._times[i]))
+            for i in range(start, end)
+        ]
+
+    def get_term_time(self, year: int, term_name: str) -> Optional[datetime]:
+        """
+        獲取指定年份某個節氣的時刻（例如立春）
+
+        Args:
+            year: 年份
+            term_name: 節氣名稱
+
+        Returns:
+            節氣時刻，年份不在表內則返回 None
+        """
+        if not self.covers(year):
+            return None
+
+        code = SOLAR_TERMS.index(term_name)
+        start, end = self._slice(year)
+        for i in range(start, end):
+            if self._names[i] == code:
+                return _from_epoch_us(self._times[i])
+        return None
+
+
+def load_table(path: Path = DEFAULT_TABLE_PATH) -> Optional[SolarTermTable]:
+    """
+    載入節氣表，檔案不存在或損壞時返回 None（呼叫端應退回 ephem 計算）
+
+    Args:
+        path: 二進位表檔案路徑
+
+    Returns:
+        SolarTermTable 或 None
+    """
+    if not Path(path).exists():
+        logger.warning(f"節氣預計算表不存在，使用 ephem 即時計算: {path}")
+        return None
+
+    try:
+        return SolarTermTable(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"節氣預計算表載入失敗: {e}")
+        return None
+
+
+# 模組載入時映射預設表
+_default_table: Optional[SolarTermTable] = load_table()
+
+
+def get_default_table() -> Optional[SolarTermTable]:
+    """獲取模組載入時映射的預設節氣表"""
+    return _default_table
+
+
+# ============================================
+# 建表與驗證 (Build & Verify)
+# ============================================
+
+def build_table(
+    path: Path = DEFAULT_TABLE_PATH,
+    start_year: int = TABLE_START_YEAR,
+    end_year: int = TABLE_END_YEAR
+) -> Path:
+    """
+    以 ephem 計算每年的節氣並寫出二進位表
+
+    Args:
+        path: 輸出檔案路徑
+        start_year: 起始年份
+        end_year: 結束年份（含）
+
+    Returns:
+        輸出檔案路徑
+    """
+    from .calendar_converter import CalendarConverter
+
+    converter = CalendarConverter()
+    times: List[int] = []
+    names = bytearray()
+
+    for year in range(start_year, end_year + 1):
+        solar_terms = converter._calculate_solar_terms_for_year(year)
+        if len(solar_terms) != TERMS_PER_YEAR:
+            raise ValueError(f"{year}年節氣數量異常: {len(solar_terms)}")
+
+        for term_name, term_time in solar_terms:
+            times.append(_to_epoch_us(term_time))
+            names.append(SOLAR_TERMS.index(term_name))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, start_year, end_year, 0))
+        f.write(struct.pack(f"<{len(times)}q", *times))
+        f.write(bytes(names))
+    tmp_path.replace(path)
+
+    return path
+
+
+def verify_table(
+    table: SolarTermTable,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+    tolerance_seconds: float = 0.0
+) -> List[str]:
+    """
+    將節氣表與 ephem 即時計算結果逐筆比對
+
+    Args:
+        table: 要驗證的節氣表
+        start_year: 起始年份（預設為表的起始年）
+        end_year: 結束年份（預設為表的結束年）
+        tolerance_seconds: 容許的時刻誤差（秒）
+
+    Returns:
+        差異描述列表，空列表表示完全一致
+    """
+    from .calendar_converter import CalendarConverter
+
+    converter = CalendarConverter()
+    start_year = table.start_year if start_year is None else start_year
+    end_year = table.end_year if end_year is None else end_year
+
+    differences = []
+    for year in range(start_year, end_year + 1):
+        expected = converter._calculate_solar_terms_for_year(year)
+        actual = table.get_solar_terms(year)
+        if actual is None:
+            differences.append(f"{year}: 不在表的範圍內")
+            continue
+
+        for (exp_name, exp_time), (act_name, act_time) in zip(expected, actual):
+            delta = abs((act_time - exp_time).total_seconds())
+            if exp_name != act_name or delta > tolerance_seconds:
+                differences.append(
+                    f"{year} {exp_name}: ephem={exp_time.isoformat()} "
+                    f"table={act_name} {act_time.isoformat()} (差 {delta:.3f}s)"
+                )
+
+    return differences
@@ -17,7 +17,7 @@
 日期：2025
 """
 
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 import statistics
 from .prompt_utils import (
     load_system_prompt,
@@ -27,6 +27,8 @@ from .prompt_utils import (
     AnalysisTemplate
 )
 from .llm_analyzer import (
+    LLMAnalyzer,
+    LLMRequest,
     get_llm_analyzer,
     construct_synthesis_prompt
 )
@@ -77,13 +79,17 @@ CONCEPT_MAPPING = {
 # 主要綜合分析函數 (Main Synthesis Functions)
 # ============================================================================
 
-def synthesize_three_methods(bazi_result: Dict, ziwei_result: Dict, astro_result: Dict) -> Dict:
+def synthesize_three_methods(bazi_result: Dict, ziwei_result: Dict, astro_result: Dict,
+                             llm_analyzer: Optional[LLMAnalyzer] = None,
+                             on_chunk: Optional[Callable[[str], None]] = None) -> Dict:
     """跨方法綜合分析主函數
 
     Args:
         bazi_result: 八字解釋結果
         ziwei_result: 紫微斗數解釋結果
         astro_result: 心理占星解釋結果
+        llm_analyzer: LLM分析器（預設為全局分析器）
+        on_chunk: 性格綜合LLM輸出的串流回呼（見 LLMAnalyzer.analyze_with_fallback）
 
     Returns:
         Dict: {
@@ -102,7 +108,9 @@ def synthesize_three_methods(bazi_result: Dict, ziwei_result: Dict, astro_result
     synthesis['personality_synthesis'] = synthesize_personality(
         bazi_result.get('personality', {}),
         ziwei_result.get('destiny_palace', {}),
-        astro_result.get('psychological_profile', {})
+        astro_result.get('psychological_profile', {}),
+        llm_analyzer=llm_analyzer,
+        on_chunk=on_chunk
     )
 
     # 2. 事業綜合分析
@@ -150,63 +158,80 @@ def synthesize_three_methods(bazi_result: Dict, ziwei_result: Dict, astro_result
 # 各領域綜合分析函數 (Domain-Specific Synthesis Functions)
 # ============================================================================
 
-def synthesize_personality(bazi_personality: Dict, ziwei_destiny: Dict, astro_profile: Dict) -> Dict:
+def synthesize_personality(bazi_personality: Dict, ziwei_destiny: Dict, astro_profile: Dict,
+                           llm_analyzer: Optional[LLMAnalyzer] = None,
+                           on_chunk: Optional[Callable[[str], None]] = None) -> Dict:
     """性格綜合分析（LLM增強版）
 
     整合三種方法對性格的分析，識別一致性與互補性
     """
     # Try LLM synthesis with fallback
-    llm_analyzer = get_llm_analyzer()
-
+    llm_analyzer = llm_analyzer or get_llm_analyzer()
     if llm_analyzer.is_available() and SYNTHESIS_SYSTEM_PROMPT:
+        return llm_analyzer.run_request(
+            personality_synthesis_request(bazi_personality, ziwei_destiny, astro_profile),
+            on_chunk=on_chunk
+        )
+
+    return _traditional_personality_synthesis(bazi_personality, ziwei_destiny, astro_profile)
+
+
+def personality_synthesis_request(bazi_personality: Dict, ziwei_destiny: Dict,
+                                  astro_profile: Dict) -> Optional[LLMRequest]:
+    """
+    性格綜合分析的LLM請求
+
+    Returns:
+        LLMRequest，系統提示詞未載入時返回 None
+    """
+    if not SYNTHESIS_SYSTEM_PROMPT:
+        return None
+
+    fallback_args = (bazi_personality, ziwei_destiny, astro_profile)
+    return LLMRequest(
+        key='personality_synthesis',
+        system_prompt=SYNTHESIS_SYSTEM_PROMPT,
         # Construct synthesis prompt with all three methods
-        analysis_prompt = construct_synthesis_prompt(
+        analysis_prompt=construct_synthesis_prompt(
             domain_name='核心人格',
             bazi_data=bazi_personality,
             ziwei_data=ziwei_destiny,
             astro_data=astro_profile
-        )
+        ),
+        fallback_func=_traditional_personality_synthesis,
+        fallback_args=fallback_args,
+        min_length=400,
+        on_success=lambda llm_result: _llm_personality_synthesis(*fallback_args, llm_result),
+        llm_kwargs={'temperature': 0.7, 'max_tokens': 5000}
+    )
 
-        llm_result = llm_analyzer.analyze_with_fallback(
-            system_prompt=SYNTHESIS_SYSTEM_PROMPT,
-            analysis_prompt=analysis_prompt,
-            fallback_func=_traditional_personality_synthesis,
-            fallback_args=(bazi_personality, ziwei_destiny, astro_profile),
-            min_length=400,
-            temperature=0.7,
-            max_tokens=5000
-        )
 
-        # Check if llm_result is a string (LLM success) or dict (fallback was used)
-        if isinstance(llm_result, str) and len(llm_result.replace(' ', '').replace('\n', '')) >= 400:
-            # Extract traits for consensus analysis
-            bazi_traits = _extract_bazi_personality_traits(bazi_personality)
-            ziwei_traits = _extract_ziwei_personality_traits(ziwei_destiny)
-            astro_traits = _extract_astro_personality_traits(astro_profile)
-
-            convergent_traits = _identify_convergent_traits([bazi_traits, ziwei_traits, astro_traits])
-
-            # Calculate high confidence (3 methods agree)
-            consensus_count = len(convergent_traits)
-            confidence = calculate_confidence_level(
-                consensus_indicators=3 if consensus_count > 0 else 2,
-                total_indicators=3,
-                data_quality=1.0,
-                theoretical_support=0.9
-            )
-
-            traditional_result = _traditional_personality_synthesis(
-                bazi_personality, ziwei_destiny, astro_profile
-            )
-            traditional_result['llm_analysis'] = llm_result
-            traditional_result['confidence_level'] = confidence
-            traditional_result['analysis_method'] = 'LLM three-method synthesis'
-            return traditional_result
-        elif isinstance(llm_result, dict):
-            # Fallback was already executed, return it directly
-            return llm_result
+def _llm_personality_synthesis(bazi_personality: Dict, ziwei_destiny: Dict,
+                               astro_profile: Dict, llm_result: str) -> Dict:
+    """將LLM綜合分析附加到傳統綜合結構（保持相容）"""
+    # Extract traits for consensus analysis
+    bazi_traits = _extract_bazi_personality_traits(bazi_personality)
+    ziwei_traits = _extract_ziwei_personality_traits(ziwei_destiny)
+    astro_traits = _extract_astro_personality_traits(astro_profile)
 
-    return _traditional_personality_synthesis(bazi_personality, ziwei_destiny, astro_profile)
+    convergent_traits = _identify_convergent_traits([bazi_traits, ziwei_traits, astro_traits])
+
+    # Calculate high confidence (3 methods agree)
+    consensus_count = len(convergent_traits)
+    confidence = calculate_confidence_level(
+        consensus_indicators=3 if consensus_count > 0 else 2,
+        total_indicators=3,
+        data_quality=1.0,
+        theoretical_support=0.9
+    )
+
+    traditional_result = _traditional_personality_synthesis(
+        bazi_personality, ziwei_destiny, astro_profile
+    )
+    traditional_result['llm_analysis'] = llm_result
+    traditional_result['confidence_level'] = confidence
+    traditional_result['analysis_method'] = 'LLM three-method synthesis'
+    return traditional_result
 
 
 def _traditional_personality_synthesis(bazi_personality: Dict, ziwei_destiny: Dict, astro_profile: Dict) -> Dict:
@@ -1032,6 +1057,7 @@ def calculate_overall_confidence(synthesis: Dict) -> Dict:
 
 __all__ = [
     'synthesize_three_methods',
+    'personality_synthesis_request',
     'synthesize_personality',
     'synthesize_career',
     'synthesize_wealth',
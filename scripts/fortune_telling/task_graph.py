@@ -0,0 +1,311 @@
+"""
+任務圖執行器 (Task Graph Executor)
+=================================
+
+依相依關係（DAG）排程多個彼此獨立的計算任務：
+1. 沒有前置任務（或前置任務皆已完成）的任務立即提交，
+   前置任務的結果以關鍵字參數（前置任務名稱）傳入
+2. 每個任務指定執行方式：
+   - "thread"：背景執行緒，適合輕量的純 Python 計算
+   - "process"：每個任務一個工作行程（同時執行的數量有上限），適合星曆等較重的計算
+     （函數、參數與結果需可 pickle）
+   - "inline"：在呼叫端依序執行（除錯或需要完全循序時使用）
+3. 每個任務可設定逾時；逾時或失敗不會中止其他任務，依賴它的任務標記為略過
+4. 執行時間在工作端量測（不含排隊時間），結果依任務登記順序返回
+
+逾時的處理依執行方式而不同：
+- process：工作行程直接被終止（kill），不會留下卡住的行程
+- inline：在主執行緒以 SIGALRM 中斷（僅限 Unix 主執行緒；卡在不釋放 GIL 的 C 呼叫中時
+  要等該呼叫返回才會中斷）；其他情況不套用逾時
+- thread：Python 無法中斷執行緒，逾時的任務會在背景繼續執行到結束後被丟棄。
+  執行緒為 daemon，不會阻擋程式結束，但在結束前仍佔用 CPU；
+  可能卡住的計算應使用 "process"
+"""
+
+import multiprocessing
+import signal
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# 執行方式
+THREAD = "thread"
+PROCESS = "process"
+INLINE = "inline"
+EXECUTORS = (THREAD, PROCESS, INLINE)
+
+# 任務狀態
+COMPLETED = "completed"
+FAILED = "failed"
+TIMEOUT = "timeout"
+SKIPPED = "skipped"
+
+
+@dataclass
+class Task:
+    """任務定義"""
+    name: str
+    func: Callable
+    args: Tuple = ()
+    kwargs: Dict = field(default_factory=dict)
+    depends_on: Tuple[str, ...] = ()
+    executor: str = THREAD
+    timeout: Optional[float] = None   # 秒；None 表示不限
+
+
+class TaskResult(NamedTuple):
+    """任務結果（start_time / end_time 為 time.time()，未執行的任務為 None）"""
+    name: str
+    status: str
+    value: Any = None
+    error: Optional[str] = None
+    traceback: Optional[str] = None
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == COMPLETED
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        if self.start_time is None or self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+
+def _timed_call(func: Callable, args: Tuple, kwargs: Dict) -> Tuple:
+    """在工作端執行任務並量測時間；例外轉為文字，避免無法 pickle 的例外卡住行程池"""
+    start_time = time.time()
+    try:
+        value = func(*args, **kwargs)
+    except Exception as e:
+        return FAILED, None, str(e), traceback.format_exc(), start_time, time.time()
+    return COMPLETED, value, None, None, start_time, time.time()
+
+
+def _send_result(sender, func: Callable, args: Tuple, kwargs: Dict) -> None:
+    """工作行程的進入點：執行任務並把結果送回"""
+    result = _timed_call(func, args, kwargs)
+    try:
+        sender.send(result)
+    except Exception as e:
+        sender.send((FAILED, None, f"結果無法傳回主行程: {e}", traceback.format_exc(), result[4], result[5]))
+    finally:
+        sender.close()
+
+
+class _WorkerProcess:
+    """單一任務的工作行程（逾時時由呼叫端終止）"""
+
+    def __init__(self, slots: threading.BoundedSemaphore):
+        self._slots = slots
+        self._lock = threading.Lock()
+        self._process = None
+        self._killed = False
+
+    def run(self, func: Callable, args: Tuple, kwargs: Dict) -> Tuple:
+        """啟動工作行程並等待結果（在監看執行緒中執行）"""
+        with self._slots:
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=_send_result, args=(sender, func, args, kwargs), daemon=True
+            )
+            with self._lock:
+                if self._killed:
+                    raise RuntimeError("任務已逾時")
+                process.start()
+                self._process = process
+            sender.close()
+            try:
+                return receiver.recv()
+            except EOFError:
+                process.join()
+                raise RuntimeError(f"工作行程異常終止（exit code {process.exitcode}）")
+            finally:
+                receiver.close()
+                process.join()
+
+    def kill(self) -> None:
+        """終止工作行程（尚未啟動時則不再啟動）"""
+        with self._lock:
+            self._killed = True
+            if self._process is not None and self._process.is_alive():
+                self._process.kill()
+
+
+def _start_daemon(target: Callable, *args) -> Future:
+    """在 daemon 執行緒中執行 target，以 Future 返回結果（放棄等待時不會阻擋程式結束）"""
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(target(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+class _InlineTimeout(BaseException):
+    """inline 任務逾時（繼承 BaseException，任務中的 except Exception 不會攔截）"""
+
+
+def _inline_call(task: Task, kwargs: Dict) -> Tuple:
+    """在呼叫端執行任務；可用 SIGALRM 時套用逾時"""
+    use_alarm = (
+        task.timeout is not None and hasattr(signal, 'setitimer')
+        and threading.current_thread() is threading.main_thread()
+    )
+    if not use_alarm:
+        return _timed_call(task.func, task.args, kwargs)
+
+    def on_alarm(signum, frame):
+        raise _InlineTimeout()
+
+    start_time = time.time()
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, task.timeout)
+    try:
+        return _timed_call(task.func, task.args, kwargs)
+    except _InlineTimeout:
+        return TIMEOUT, None, f"超過 {task.timeout:g} 秒未完成", None, start_time, time.time()
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def validate_tasks(tasks: Sequence[Task]) -> None:
+    """
+    檢查任務名稱、執行方式與相依關係
+
+    Raises:
+        ValueError: 名稱重複、執行方式無效、前置任務不存在或相依關係有循環
+    """
+    names = set()
+    for task in tasks:
+        if task.name in names:
+            raise ValueError(f"任務名稱重複: {task.name}")
+        if task.executor not in EXECUTORS:
+            raise ValueError(f"無效的執行方式: {task.executor}（可用: {', '.join(EXECUTORS)}）")
+        names.add(task.name)
+
+    for task in tasks:
+        unknown = [dep for dep in task.depends_on if dep not in names]
+        if unknown:
+            raise ValueError(f"任務 {task.name} 的前置任務不存在: {', '.join(unknown)}")
+
+    # 逐步移除沒有未完成前置任務的節點，剩下的即為循環
+    remaining = {task.name: set(task.depends_on) for task in tasks}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps & remaining.keys()]
+        if not ready:
+            raise ValueError(f"任務相依關係有循環: {', '.join(sorted(remaining))}")
+        for name in ready:
+            del remaining[name]
+
+
+def run_tasks(
+    tasks: Sequence[Task],
+    on_start: Optional[Callable[[Task], None]] = None,
+    on_finish: Optional[Callable[[TaskResult], None]] = None,
+    max_processes: Optional[int] = None
+) -> Dict[str, TaskResult]:
+    """
+    執行任務圖
+
+    回呼函數都在呼叫端的執行緒中被呼叫，可直接更新進度顯示。
+
+    Args:
+        tasks: 任務列表（順序即結果順序，同一批可提交的任務也依此順序提交）
+        on_start: 任務提交時呼叫
+        on_finish: 任務完成、失敗、逾時或略過時呼叫
+        max_processes: 同時執行的工作行程上限（預設為 CPU 數）
+
+    Returns:
+        {任務名稱: TaskResult}，依任務登記順序
+
+    Raises:
+        ValueError: 任務定義無效（見 validate_tasks）
+    """
+    validate_tasks(tasks)
+
+    process_slots = threading.BoundedSemaphore(max_processes or multiprocessing.cpu_count())
+
+    results: Dict[str, TaskResult] = {}
+    pending: List[Task] = list(tasks)
+    running: Dict = {}   # future → (任務, 截止時間, 工作行程或 None)
+
+    def finish(result: TaskResult) -> None:
+        results[result.name] = result
+        if on_finish:
+            on_finish(result)
+
+    try:
+        while pending or running:
+            # 提交所有前置任務已結束的任務；行程任務先提交，
+            # 讓工作行程在執行緒任務開始前建立
+            ready = [task for task in pending if all(dep in results for dep in task.depends_on)]
+            ready.sort(key=lambda task: task.executor != PROCESS)
+            for task in ready:
+                pending.remove(task)
+
+                unfinished = [dep for dep in task.depends_on if not results[dep].ok]
+                if unfinished:
+                    finish(TaskResult(task.name, SKIPPED, error=f"前置任務未完成: {', '.join(unfinished)}"))
+                    continue
+
+                kwargs = dict(task.kwargs)
+                kwargs.update((dep, results[dep].value) for dep in task.depends_on)
+
+                if on_start:
+                    on_start(task)
+
+                if task.executor == INLINE:
+                    finish(TaskResult(task.name, *_inline_call(task, kwargs)))
+                    continue
+
+                worker = None
+                if task.executor == PROCESS:
+                    worker = _WorkerProcess(process_slots)
+                    future = _start_daemon(worker.run, task.func, task.args, kwargs)
+                else:
+                    future = _start_daemon(_timed_call, task.func, task.args, kwargs)
+                deadline = time.monotonic() + task.timeout if task.timeout is not None else None
+                running[future] = (task, deadline, worker)
+
+            if not running:
+                continue
+
+            deadlines = [deadline for _, deadline, _ in running.values() if deadline is not None]
+            wait_timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            done, _ = wait(running, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                task, _, _ = running.pop(future)
+                try:
+                    finish(TaskResult(task.name, *future.result()))
+                except Exception as e:
+                    # 工作行程異常（被系統終止、參數無法 pickle 等）
+                    finish(TaskResult(task.name, FAILED, error=str(e) or type(e).__name__))
+
+            now = time.monotonic()
+            for future, (task, deadline, worker) in list(running.items()):
+                if deadline is not None and now >= deadline:
+                    if worker is not None:
+                        worker.kill()
+                    del running[future]
+                    finish(TaskResult(task.name, TIMEOUT, error=f"超過 {task.timeout:g} 秒未完成"))
+    finally:
+        # 中途發生例外（例如 KeyboardInterrupt）時不留下工作行程
+        for _, _, worker in running.values():
+            if worker is not None:
+                worker.kill()
+
+    return {task.name: results[task.name] for task in tasks}
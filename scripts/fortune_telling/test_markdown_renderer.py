@@ -0,0 +1,197 @@
+"""
+Markdown 轉換器測試
+==================
+
+固定 markdown_renderer 的輸出（含與 python-markdown 不同的已知行為）：
+- 段落後直接接列表時，列表另起區塊（不需空行）
+- 兩個空格縮排即為巢狀列表
+- 表格列的儲存格不足時補空白、多出的捨棄
+- 程式碼區塊的語言標記不輸出
+
+用法（於 scripts 目錄執行）：
+    python -m pytest fortune_telling/test_markdown_renderer.py
+    python -m fortune_telling.test_markdown_renderer
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fortune_telling.markdown_renderer import (
+    iter_markdown_file,
+    iter_markdown_html,
+    markdown_to_html,
+    render_inline
+)
+
+
+# ============================================
+# 標題 (Headings)
+# ============================================
+
+def test_headings():
+    assert markdown_to_html('# Title\n## Sub ##\n####### seven') == (
+        '<h1>Title</h1>\n'
+        '<h2>Sub</h2>\n'
+        '<p>####### seven</p>\n'
+    )
+
+
+def test_heading_offset_caps_at_h6():
+    assert markdown_to_html('# Title\n##### five', heading_offset=1) == (
+        '<h2>Title</h2>\n'
+        '<h6>five</h6>\n'
+    )
+    assert markdown_to_html('###### six', heading_offset=1) == '<h6>six</h6>\n'
+
+
+# ============================================
+# 列表 (Lists)
+# ============================================
+
+def test_nested_lists_with_two_space_indent():
+    assert markdown_to_html('- a\n  - b\n    - c\n- d') == (
+        '<ul><li>a<ul><li>b<ul><li>c</li></ul>\n</li></ul>\n</li><li>d</li></ul>\n'
+    )
+
+
+def test_ordered_list_keeps_start_number():
+    assert markdown_to_html('3. x\n4. y') == '<ol start="3"><li>x</li><li>y</li></ol>\n'
+
+
+def test_mixed_list_nesting():
+    assert markdown_to_html('1. one\n   - sub\n2. two') == (
+        '<ol><li>one<ul><li>sub</li></ul>\n</li><li>two</li></ol>\n'
+    )
+
+
+def test_list_directly_after_paragraph():
+    assert markdown_to_html('Intro line\n- item') == (
+        '<p>Intro line</p>\n'
+        '<ul><li>item</li></ul>\n'
+    )
+
+
+# ============================================
+# 表格 (Tables)
+# ============================================
+
+def test_table_alignment_and_short_rows():
+    source = (
+        '| A | B | C |\n'
+        '|---|:-:|--:|\n'
+        '| 1 | 2 |\n'
+        '| x | y | z | extra |'
+    )
+    assert markdown_to_html(source) == (
+        '<table><thead><tr><th>A</th><th style="text-align: center">B</th>'
+        '<th style="text-align: right">C</th></tr>\n</thead>'
+        '<tbody><tr><td>1</td><td style="text-align: center">2</td>'
+        '<td style="text-align: right"></td></tr>\n'
+        '<tr><td>x</td><td style="text-align: center">y</td>'
+        '<td style="text-align: right">z</td></tr>\n'
+        '</tbody></table>\n'
+    )
+
+
+def test_pipe_line_without_delimiter_is_paragraph():
+    assert markdown_to_html('| not | a table |') == '<p>| not | a table |</p>\n'
+
+
+# ============================================
+# 程式碼與跳脫 (Code and Escaping)
+# ============================================
+
+def test_fenced_code_is_escaped_and_not_formatted():
+    assert markdown_to_html('```python\nif a < b:\n    print("**x**")\n```') == (
+        '<pre><code>if a &lt; b:\n    print("**x**")\n</code></pre>\n'
+    )
+
+
+def test_unclosed_fence_runs_to_end():
+    assert markdown_to_html('~~~\ncode') == '<pre><code>code\n</code></pre>\n'
+
+
+def test_html_is_escaped():
+    assert markdown_to_html('a < b & "c" <script>') == '<p>a &lt; b &amp; "c" &lt;script&gt;</p>\n'
+
+
+def test_inline_code_keeps_markers():
+    assert render_inline('`**x** < y`') == '<code>**x** &lt; y</code>'
+
+
+# ============================================
+# 粗體與斜體 (Bold and Italic)
+# ============================================
+
+def test_bold_and_italic():
+    assert render_inline('**bold** and *it*') == '<strong>bold</strong> and <em>it</em>'
+    assert render_inline('**年柱**：甲子') == '<strong>年柱</strong>：甲子'
+
+
+def test_bold_italic():
+    assert render_inline('***both***') == '<em><strong>both</strong></em>'
+
+
+def test_bold_and_italic_nesting():
+    assert render_inline('**a *b* c**') == '<strong>a <em>b</em> c</strong>'
+    assert render_inline('*a **b** c*') == '<em>a <strong>b</strong> c</em>'
+    assert render_inline('***a** b*') == '<em><strong>a</strong> b</em>'
+
+
+def test_unmatched_or_spaced_asterisks_stay_literal():
+    assert render_inline('a * b * c') == 'a * b * c'
+    assert render_inline('*a*b*') == '<em>a</em>b*'
+
+
+# ============================================
+# 其他區塊與介面 (Other Blocks and API)
+# ============================================
+
+def test_blockquote_renders_nested_blocks():
+    assert markdown_to_html('> **q**\n> - item') == (
+        '<blockquote><p><strong>q</strong></p>\n'
+        '<ul><li>item</li></ul>\n'
+        '</blockquote>\n'
+    )
+
+
+def test_paragraph_line_breaks_and_rule():
+    assert markdown_to_html('line one\nline two\n\n---\n\nnext') == (
+        '<p>line one<br>\nline two</p>\n'
+        '<hr>\n'
+        '<p>next</p>\n'
+    )
+
+
+def test_styles_are_applied_inline():
+    styles = {'h2': 'color: red;', 'p': 'margin: 0;'}
+    assert markdown_to_html('# T\ntext', heading_offset=1, styles=styles) == (
+        '<h2 style="color: red;">T</h2>\n'
+        '<p style="margin: 0;">text</p>\n'
+    )
+
+
+def test_empty_source():
+    assert markdown_to_html('') == ''
+
+
+def test_streaming_matches_whole_document():
+    source = '# T\n\n- a\n  - b\n\n| A | B |\n|---|---|\n| 1 | 2 |\n\n```\ncode\n```\n'
+    expected = markdown_to_html(source)
+    assert ''.join(iter_markdown_html(source.splitlines(keepends=True))) == expected
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'report.md'
+        path.write_text(source, encoding='utf-8')
+        assert ''.join(iter_markdown_file(path)) == expected
+
+
+if __name__ == "__main__":
+    tests = [(name, func) for name, func in sorted(globals().items()) if name.startswith('test_')]
+    for name, func in tests:
+        func()
+        print(f"✅ {name}")
+    print(f"\n🎉 {len(tests)} 項測試通過！")
@@ -0,0 +1,379 @@
+"""
+行運星曆服務 (Transit / Ephemeris Time Series)
+============================================
+
+每日運勢與行運提醒會反覆查詢相同日期的行星位置，
+因此將十大行星（PLANETS）的位置預先以固定間隔取樣存成 float32 表，
+載入時以 mmap 映射，查詢時以三次 Hermite 插值（以速度作為導數）求任意時刻的位置，
+並以向量化的區間搜尋與二分法求「行星 X 在 t0–t1 之間何時經過黃經 L」。
+
+PlanetPositionTable 提供與 AstrologyBatch 相同的 planets() 介面，
+可作為 AstrologyCalculator 的行星位置後端（ephemeris 參數）。
+
+檔案格式（little-endian）：
+1. 標頭 16 bytes：魔數 b"PLN1"、起始年 (int32)、結束年 (int32)、取樣間隔分鐘數 (uint32)
+2. 數據區：起始年 1 月 1 日 0 時 (UT) 至結束年翌年 1 月 1 日 0 時每個取樣點一筆，
+   每筆 10 顆行星 × (黃經, 黃緯, 黃經速度, 黃緯速度)，float32，度與度/日
+
+預設表（1900–2100 年逐日，約 11 MB）不納入版本控制，
+請以 build_tables planet-positions 在本機產生（可調整年份範圍與取樣間隔）。
+"""
+
+import logging
+import mmap
+import struct
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import swisseph as swe
+
+from .astrology_batch import PLANET_NAMES, AstrologyBatch
+from .astrology_calculator import PLANET_IDS
+
+logger = logging.getLogger(__name__)
+
+# 預設表範圍、取樣間隔與檔案位置
+TABLE_START_YEAR = 1900
+TABLE_END_YEAR = 2100
+TABLE_STEP_MINUTES = 1440
+DEFAULT_TABLE_PATH = Path(__file__).parent / 'tables' / 'planet_positions.bin'
+
+_MAGIC = b"PLN1"
+_HEADER = struct.Struct("<4siiI")
+_FIELDS = 4  # 黃經、黃緯、黃經速度、黃緯速度
+_JULIAN_DAY_EPOCH = 2440587.5  # 1970-01-01 00:00 UT 的儒略日
+_BISECTION_STEPS = 48  # 區間長度 / 2^48，逐日表約為 0.3 微秒
+
+PlanetKey = Union[int, str]
+
+
+def _wrap180(degrees: np.ndarray) -> np.ndarray:
+    """將角度差換算到 [-180, 180)"""
+    return (degrees + 180.0) % 360.0 - 180.0
+
+
+def _hermite(p0, p1, m0, m1, s):
+    """三次 Hermite 插值（m0、m1 為乘上區間長度後的導數）"""
+    s2 = s * s
+    s3 = s2 * s
+    return (
+        (2 * s3 - 3 * s2 + 1) * p0
+        + (s3 - 2 * s2 + s) * m0
+        + (-2 * s3 + 3 * s2) * p1
+        + (s3 - s2) * m1
+    )
+
+
+def _hermite_slope(p0, p1, m0, m1, s):
+    """三次 Hermite 插值對 s 的導數"""
+    s2 = s * s
+    return (
+        (6 * s2 - 6 * s) * p0
+        + (3 * s2 - 4 * s + 1) * m0
+        + (-6 * s2 + 6 * s) * p1
+        + (3 * s2 - 2 * s) * m1
+    )
+
+
+def julian_day_to_datetime(julian_day: float) -> datetime:
+    """
+    儒略日轉為 UTC 時間（naive，精確到微秒）
+
+    Args:
+        julian_day: 儒略日（UT）
+
+    Returns:
+        UTC datetime
+    """
+    return datetime(1970, 1, 1) + timedelta(days=julian_day - _JULIAN_DAY_EPOCH)
+
+
+class PlanetPositionTable:
+    """
+    行星位置預計算表
+
+    以 mmap 映射二進位表，查詢時不複製整張表；表外時刻退回 Swiss Ephemeris 計算。
+    """
+
+    def __init__(self, path: Path = DEFAULT_TABLE_PATH):
+        """
+        載入行星位置表
+
+        Args:
+            path: 二進位表檔案路徑
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, start_year, end_year, step_minutes = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or step_minutes == 0 or 1440 % step_minutes:
+            raise ValueError(f"無效的行星位置表檔案: {self.path}")
+
+        self.start_year = start_year
+        self.end_year = end_year
+        self.step_days = step_minutes / 1440
+        self.start_jd = swe.julday(start_year, 1, 1, 0.0)
+        self.end_jd = swe.julday(end_year + 1, 1, 1, 0.0)
+
+        count = round((self.end_jd - self.start_jd) / self.step_days) + 1
+        planets = len(PLANET_NAMES)
+        if len(self._mmap) != _HEADER.size + count * planets * _FIELDS * 4:
+            raise ValueError(f"行星位置表檔案大小不符: {self.path}")
+
+        values = np.frombuffer(self._mmap, dtype='<f4', offset=_HEADER.size)
+        self._values = values.reshape(count, planets, _FIELDS)
+        self._fallback: Optional[AstrologyBatch] = None
+
+    def covers(self, julian_day: float) -> bool:
+        """檢查時刻是否在表的範圍內"""
+        return self.start_jd <= julian_day <= self.end_jd
+
+    def _locate(self, julian_days: np.ndarray):
+        """返回（取樣區間索引, 區間內位置 0–1, 是否在表內）"""
+        position = (julian_days - self.start_jd) / self.step_days
+        index = np.floor(position).astype(np.int64)
+        inside = (index >= 0) & (position <= len(self._values) - 1)
+        index = np.clip(index, 0, len(self._values) - 2)
+        return index, position - index, inside
+
+    def planets(self, julian_days: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        計算十大行星在各時刻的位置（與 AstrologyBatch.planets 介面相同）
+
+        Args:
+            julian_days: 儒略日（UT）陣列 (N,)
+
+        Returns:
+            {"longitude", "latitude", "speed"}：各為 (N, 10) 陣列，行依 PLANET_NAMES 順序；
+            黃經為 [0, 360)，速度為度/日
+        """
+        julian_days = np.atleast_1d(np.asarray(julian_days, dtype=np.float64))
+        index, fraction, inside = self._locate(julian_days)
+
+        before = self._values[index].astype(np.float64)       # (N, 10, 4)
+        after = self._values[index + 1].astype(np.float64)
+        s = fraction[:, None]
+        h = self.step_days
+
+        # 黃經跨越 0° 時展開成連續值再插值
+        lon0 = before[..., 0]
+        lon1 = lon0 + _wrap180(after[..., 0] - lon0)
+        longitude = _hermite(lon0, lon1, before[..., 2] * h, after[..., 2] * h, s) % 360.0
+        latitude = _hermite(before[..., 1], after[..., 1], before[..., 3] * h, after[..., 3] * h, s)
+        speed = _hermite_slope(lon0, lon1, before[..., 2] * h, after[..., 2] * h, s) / h
+
+        if not inside.all():
+            if self._fallback is None:
+                self._fallback = AstrologyBatch()
+            outside = self._fallback.planets(julian_days[~inside])
+            longitude[~inside] = outside["longitude"]
+            latitude[~inside] = outside["latitude"]
+            speed[~inside] = outside["speed"]
+
+        return {"longitude": longitude, "latitude": latitude, "speed": speed}
+
+    def planet_index(self, planet: PlanetKey) -> int:
+        """行星名稱或索引 → PLANET_NAMES 中的索引"""
+        if isinstance(planet, str):
+            if planet not in PLANET_NAMES:
+                raise ValueError(f"未知的行星: {planet}")
+            return PLANET_NAMES.index(planet)
+        if not 0 <= planet < len(PLANET_NAMES):
+            raise ValueError(f"行星索引超出範圍: {planet}")
+        return planet
+
+    def crossings(
+        self,
+        planet: PlanetKey,
+        longitude: float,
+        start_jd: float,
+        end_jd: float
+    ) -> np.ndarray:
+        """
+        求行星在時段內經過指定黃經的所有時刻（含逆行造成的多次經過）
+
+        先在各取樣區間檢查插值曲線兩端是否位於目標黃經兩側，
+        再對所有候選區間同時以二分法求根。
+        同一取樣區間內來回經過兩次（恰在留的附近）不會被偵測，需要時請使用較密的取樣間隔。
+
+        Args:
+            planet: 行星名稱（如 "火星"）或 PLANET_NAMES 索引
+            longitude: 目標黃經（度）
+            start_jd: 起始儒略日（UT）
+            end_jd: 結束儒略日（UT）
+
+        Returns:
+            經過時刻的儒略日陣列（遞增）
+
+        Raises:
+            ValueError: 行星不存在，或時段不在表的範圍內
+        """
+        planet = self.planet_index(planet)
+        if not (self.covers(start_jd) and self.covers(end_jd)):
+            raise ValueError(
+                f"時段超出行星位置表範圍（{self.start_year}–{self.end_year}），請以較大範圍重建表"
+            )
+        if end_jd <= start_jd:
+            return np.empty(0, dtype=np.float64)
+
+        h = self.step_days
+        first = int((start_jd - self.start_jd) // h)
+        last = min(int(np.ceil((end_jd - self.start_jd) / h)), len(self._values) - 1)
+        samples = self._values[first:last + 1, planet].astype(np.float64)
+
+        # 以目標黃經為零點的連續角距：區間兩端異號即有經過
+        d0 = _wrap180(samples[:-1, 0] - longitude)
+        d1 = d0 + _wrap180(samples[1:, 0] - samples[:-1, 0])
+        m0 = samples[:-1, 2] * h
+        m1 = samples[1:, 2] * h
+        candidates = np.flatnonzero((d0 == 0) | ((np.sign(d0) != np.sign(d1)) & (d1 != 0)))
+
+        p0, p1 = d0[candidates], d1[candidates]
+        m0, m1 = m0[candidates], m1[candidates]
+        low = np.zeros(len(candidates))
+        high = np.ones(len(candidates))
+        low_sign = np.sign(p0)
+        for _ in range(_BISECTION_STEPS):
+            middle = (low + high) / 2
+            same = np.sign(_hermite(p0, p1, m0, m1, middle)) == low_sign
+            low = np.where(same, middle, low)
+            high = np.where(same, high, middle)
+
+        roots = self.start_jd + (first + candidates + (low + high) / 2) * h
+        return roots[(roots >= start_jd) & (roots <= end_jd)]
+
+
+def load_table(path: Path = DEFAULT_TABLE_PATH) -> Optional[PlanetPositionTable]:
+    """
+    載入行星位置表，檔案不存在或損壞時返回 None（呼叫端應改用 Swiss Ephemeris）
+
+    Args:
+        path: 二進位表檔案路徑
+
+    Returns:
+        PlanetPositionTable 或 None
+    """
+    if not Path(path).exists():
+        logger.warning(f"行星位置預計算表不存在，請執行 build_tables planet-positions: {path}")
+        return None
+
+    try:
+        return PlanetPositionTable(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"行星位置預計算表載入失敗: {e}")
+        return None
+
+
+_default_table: Optional[PlanetPositionTable] = None
+_default_table_loaded = False
+
+
+def get_default_table() -> Optional[PlanetPositionTable]:
+    """首次呼叫時映射預設行星位置表（之後共用同一份）"""
+    global _default_table, _default_table_loaded
+    if not _default_table_loaded:
+        _default_table = load_table()
+        _default_table_loaded = True
+    return _default_table
+
+
+# ============================================
+# 建表與精度報告 (Build & Accuracy Report)
+# ============================================
+
+def build_table(
+    path: Path = DEFAULT_TABLE_PATH,
+    start_year: int = TABLE_START_YEAR,
+    end_year: int = TABLE_END_YEAR,
+    step_minutes: int = TABLE_STEP_MINUTES
+) -> Path:
+    """
+    以 Swiss Ephemeris 計算各取樣點的行星位置並寫出二進位表
+
+    Args:
+        path: 輸出檔案路徑
+        start_year: 起始年份
+        end_year: 結束年份（含）
+        step_minutes: 取樣間隔（分鐘，需整除一天）
+
+    Returns:
+        輸出檔案路徑
+    """
+    if step_minutes <= 0 or 1440 % step_minutes:
+        raise ValueError(f"取樣間隔需整除一天: {step_minutes} 分鐘")
+
+    start_jd = swe.julday(start_year, 1, 1, 0.0)
+    end_jd = swe.julday(end_year + 1, 1, 1, 0.0)
+    step_days = step_minutes / 1440
+    count = round((end_jd - start_jd) / step_days) + 1
+    julian_days = start_jd + np.arange(count) * step_days
+
+    flags = AstrologyBatch().flags
+    planet_ids = list(PLANET_IDS.values())
+    values = np.empty((count, len(planet_ids), _FIELDS), dtype='<f4')
+    calc_ut = swe.calc_ut
+    for i, jd in enumerate(julian_days.tolist()):
+        row = values[i]
+        for j, planet_id in enumerate(planet_ids):
+            xx, _ = calc_ut(jd, planet_id, flags)
+            row[j] = (xx[0], xx[1], xx[3], xx[4])
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, start_year, end_year, step_minutes))
+        f.write(values.tobytes())
+    tmp_path.replace(path)
+
+    return path
+
+
+def accuracy_report(table: PlanetPositionTable, samples: int = 20000, seed: int = 0) -> List[Dict]:
+    """
+    在表的範圍內隨機取樣，比較插值結果與 Swiss Ephemeris 即時計算
+
+    Args:
+        table: 行星位置表
+        samples: 取樣數
+        seed: 隨機種子
+
+    Returns:
+        每顆行星一筆：最大與均方根黃經誤差（角秒）、最大速度誤差（度/日）
+    """
+    rng = np.random.default_rng(seed)
+    julian_days = rng.uniform(table.start_jd, table.end_jd, size=samples)
+    actual = table.planets(julian_days)
+    expected = AstrologyBatch().planets(julian_days)
+
+    longitude_error = np.abs(_wrap180(actual["longitude"] - expected["longitude"])) * 3600
+    latitude_error = np.abs(actual["latitude"] - expected["latitude"]) * 3600
+    speed_error = np.abs(actual["speed"] - expected["speed"])
+
+    return [
+        {
+            "planet": name,
+            "max_longitude_arcsec": float(longitude_error[:, i].max()),
+            "rms_longitude_arcsec": float(np.sqrt((longitude_error[:, i] ** 2).mean())),
+            "max_latitude_arcsec": float(latitude_error[:, i].max()),
+            "max_speed_error": float(speed_error[:, i].max()),
+        }
+        for i, name in enumerate(PLANET_NAMES)
+    ]
+
+
+def format_accuracy_report(reports: List[Dict]) -> str:
+    """將 accuracy_report 的結果格式化為表格文字"""
+    lines = [f"{'行星':<6}{'黃經最大(″)':>14}{'黃經RMS(″)':>14}{'黃緯最大(″)':>14}{'速度最大(°/日)':>16}"]
+    for report in reports:
+        lines.append(
+            f"{report['planet']:<6}"
+            f"{report['max_longitude_arcsec']:>14.3f}"
+            f"{report['rms_longitude_arcsec']:>14.3f}"
+            f"{report['max_latitude_arcsec']:>14.3f}"
+            f"{report['max_speed_error']:>16.6f}"
+        )
+    return "\n".join(lines)
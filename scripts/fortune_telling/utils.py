@@ -5,7 +5,7 @@
 包含命理計算所需的基本常數、數據結構和輔助函數。
 """
 
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, NamedTuple, Tuple, Optional
 from enum import Enum
 from pydantic import BaseModel, Field, validator
 from datetime import datetime
@@ -306,10 +306,24 @@ def get_nayin(stem: str, branch: str) -> str:
     Returns:
         納音名稱（如「海中金」）
     """
-    pillar = stem + branch
-    for key, value in NAYIN_TABLE.items():
-        if pillar in key:
-            return value
+    stem_code = STEM_CODE.get(stem)
+    branch_code = BRANCH_CODE.get(branch)
+    if stem_code is None or branch_code is None:
+        return "未知"
+    return get_nayin_by_index(JIAZI_INDEX[stem_code][branch_code])
+
+def get_nayin_by_index(index: int) -> str:
+    """
+    按甲子序號獲取納音五行
+
+    Args:
+        index: 六十甲子序號 (0-59)，見 JIAZI_TABLE
+
+    Returns:
+        納音名稱（如「海中金」），序號無效時返回「未知」
+    """
+    if 0 <= index < 60:
+        return NAYIN_BY_INDEX[index]
     return "未知"
 
 def calculate_hour_branch(hour: int, minute: int = 0) -> str:
@@ -344,17 +358,11 @@ def is_yin_yang(character: str) -> str:
     Returns:
         "陽" 或 "陰"
     """
-    if character in HEAVENLY_STEMS:
-        index = HEAVENLY_STEMS.index(character)
-        return "陽" if index % 2 == 0 else "陰"
-    elif character in EARTHLY_BRANCHES:
-        index = EARTHLY_BRANCHES.index(character)
-        return "陽" if index % 2 == 0 else "陰"
-    return "未知"
+    return _YINYANG_BY_CHARACTER.get(character, "未知")
 
 def get_ten_god(day_stem: str, other_stem: str) -> TenGods:
     """
-    計算十神關係
+    計算十神關係（查 TEN_GOD_MATRIX）
 
     Args:
         day_stem: 日主天干
@@ -362,7 +370,17 @@ def get_ten_god(day_stem: str, other_stem: str) -> TenGods:
 
     Returns:
         十神類型
+
+    Raises:
+        ValueError: 任一參數不是天干
     """
+    try:
+        return TEN_GOD_MATRIX[STEM_CODE[day_stem]][STEM_CODE[other_stem]]
+    except KeyError as e:
+        raise ValueError(f"無效的天干: {e.args[0]!r}（應為 {''.join(HEAVENLY_STEMS)} 之一）") from None
+
+def _derive_ten_god(day_stem: str, other_stem: str) -> TenGods:
+    """由陰陽五行生剋推導十神關係（用於建立 TEN_GOD_MATRIX）"""
     day_wuxing = get_wuxing_from_stem(day_stem)
     other_wuxing = get_wuxing_from_stem(other_stem)
     day_yinyang = is_yin_yang(day_stem)
@@ -392,6 +410,145 @@ def get_ten_god(day_stem: str, other_stem: str) -> TenGods:
 
     return TenGods.BI_JIAN  # 默認返回比肩
 
+# ============================================
+# 整數編碼查表 (Integer-Coded Lookup Tables)
+# ============================================
+# 天干以 0-9、地支以 0-11 編碼（即在 HEAVENLY_STEMS / EARTHLY_BRANCHES 中的位置），
+# 計算器內部以整數查表，只在輸出時換回中文字。
+
+STEM_CODE: Dict[str, int] = {stem: code for code, stem in enumerate(HEAVENLY_STEMS)}
+BRANCH_CODE: Dict[str, int] = {branch: code for code, branch in enumerate(EARTHLY_BRANCHES)}
+
+# 陰陽（偶數位為陽）
+STEM_YINYANG: List[str] = ["陽" if code % 2 == 0 else "陰" for code in range(10)]
+BRANCH_YINYANG: List[str] = ["陽" if code % 2 == 0 else "陰" for code in range(12)]
+
+_YINYANG_BY_CHARACTER: Dict[str, str] = {
+    **{stem: STEM_YINYANG[code] for stem, code in STEM_CODE.items()},
+    **{branch: BRANCH_YINYANG[code] for branch, code in BRANCH_CODE.items()},
+}
+
+# 五行
+STEM_WUXING: List[WuXing] = [STEM_TO_WUXING[stem] for stem in HEAVENLY_STEMS]
+BRANCH_WUXING: List[WuXing] = [BRANCH_TO_WUXING[branch] for branch in EARTHLY_BRANCHES]
+
+# 地支藏干：[(藏干編碼, 司令日數), ...]
+BRANCH_HIDDEN_STEM_CODES: List[List[Tuple[int, int]]] = [
+    [(STEM_CODE[stem], days) for stem, days in BRANCH_HIDDEN_STEMS[branch]]
+    for branch in EARTHLY_BRANCHES
+]
+
+# 十神矩陣：TEN_GOD_MATRIX[日主編碼][其他天干編碼]
+TEN_GOD_MATRIX: List[List[TenGods]] = [
+    [_derive_ten_god(day_stem, other_stem) for other_stem in HEAVENLY_STEMS]
+    for day_stem in HEAVENLY_STEMS
+]
+
+
+class JiaZi(NamedTuple):
+    """六十甲子中的一組干支"""
+    index: int        # 甲子序號 (0-59)，滿足 index % 10 == 天干編碼、index % 12 == 地支編碼
+    stem_code: int
+    branch_code: int
+    stem: str
+    branch: str
+    pillar: str
+    nayin: str
+
+
+# 干支編碼 → 甲子序號（陰陽不配的組合為 -1）
+JIAZI_INDEX: List[List[int]] = [[-1] * 12 for _ in range(10)]
+for _index in range(60):
+    JIAZI_INDEX[_index % 10][_index % 12] = _index
+del _index
+
+# 納音：NAYIN_BY_INDEX[甲子序號]，由 NAYIN_TABLE 展開
+NAYIN_BY_INDEX: List[str] = ["未知"] * 60
+for _pillars, _nayin in NAYIN_TABLE.items():
+    for _pillar in _pillars:
+        NAYIN_BY_INDEX[JIAZI_INDEX[STEM_CODE[_pillar[0]]][BRANCH_CODE[_pillar[1]]]] = _nayin
+del _pillars, _nayin, _pillar
+
+# 六十甲子表（納音預先填入）
+JIAZI_TABLE: List[JiaZi] = [
+    JiaZi(
+        index=index,
+        stem_code=index % 10,
+        branch_code=index % 12,
+        stem=HEAVENLY_STEMS[index % 10],
+        branch=EARTHLY_BRANCHES[index % 12],
+        pillar=HEAVENLY_STEMS[index % 10] + EARTHLY_BRANCHES[index % 12],
+        nayin=NAYIN_BY_INDEX[index],
+    )
+    for index in range(60)
+]
+
+# ============================================
+# 不可變結果 (Immutable Results)
+# ============================================
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} 為共享的緩存結果，不可修改；請先以 thaw() 複製")
+
+
+class FrozenDict(dict):
+    """
+    唯讀字典
+
+    用於多個呼叫端共享的緩存結果。仍是 dict 的子類別，
+    因此 json.dumps、比較運算和既有的讀取程式碼都不受影響。
+    """
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+class FrozenList(list):
+    """唯讀列表（見 FrozenDict）"""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = remove = pop = clear = sort = reverse = _readonly
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+
+def freeze(obj):
+    """
+    將巢狀的 dict/list 結構遞迴轉為唯讀版本
+
+    Args:
+        obj: 任意 JSON 相容的結構
+
+    Returns:
+        以 FrozenDict/FrozenList 組成的同構結構
+    """
+    if isinstance(obj, dict):
+        return FrozenDict((key, freeze(value)) for key, value in obj.items())
+    if isinstance(obj, list):
+        return FrozenList(freeze(value) for value in obj)
+    return obj
+
+
+def thaw(obj):
+    """
+    將 freeze() 的結果遞迴複製為一般可修改的 dict/list
+
+    Args:
+        obj: 任意 JSON 相容的結構
+
+    Returns:
+        可修改的深層副本
+    """
+    if isinstance(obj, dict):
+        return {key: thaw(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [thaw(value) for value in obj]
+    return obj
+
 # ============================================
 # 城市經緯度數據庫 (City Coordinates Database)
 # ============================================
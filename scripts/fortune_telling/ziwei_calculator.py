@@ -7,10 +7,77 @@
 2. 主星安置
 3. 四化計算
 4. 基本宮位解讀
+
+整張命盤只取決於農曆月、農曆日、時支與年干，
+宮位、星曜、解讀與摘要預先建成 tables/ziwei_layouts.json（見 ziwei_table.py），
+analyze() 只需查表。
 """
 
 from typing import Dict, List, Tuple
-from .utils import EARTHLY_BRANCHES, ZIWEI_MAJOR_STARS, ZIWEI_TWELVE_PALACES
+from .utils import (
+    BRANCH_CODE,
+    STEM_CODE,
+    ZIWEI_MAJOR_STARS,
+    ZIWEI_TWELVE_PALACES,
+)
+from .chart_models import Palace, palaces_to_dict
+from .ziwei_table import load_table
+
+# 安星規則變更時遞增，使舊的預計算表失效（需重新執行 build_tables ziwei-layouts）
+ZIWEI_RULES_VERSION = 1
+
+# 主星相對紫微的宮位偏移（簡化版，實際紫微斗數星曜排列非常複雜）
+STAR_OFFSETS: Dict[str, int] = {
+    "紫微": 0,
+    "天機": 1,
+    "太陽": 2,
+    "武曲": 3,
+    "天同": 4,
+    "廉貞": 5,
+    "天府": 6,
+    "太陰": 7,
+    "貪狼": 8,
+    "巨門": 9,
+    "天相": 10,
+    "天梁": 11,
+    "七殺": 6,   # 與紫微相對
+    "破軍": 4    # 固定位置
+}
+
+# 四化表（簡化版）：年干 → 祿權科忌
+FOUR_TRANSFORMATIONS: Dict[str, Dict[str, str]] = {
+    "甲": {"祿": "廉貞", "權": "破軍", "科": "武曲", "忌": "太陽"},
+    "乙": {"祿": "天機", "權": "天梁", "科": "紫微", "忌": "太陰"},
+    "丙": {"祿": "天同", "權": "天機", "科": "文昌", "忌": "廉貞"},
+    "丁": {"祿": "太陰", "權": "天同", "科": "天機", "忌": "巨門"},
+    "戊": {"祿": "貪狼", "權": "太陰", "科": "右弼", "忌": "天機"},
+    "己": {"祿": "武曲", "權": "貪狼", "科": "天梁", "忌": "文曲"},
+    "庚": {"祿": "太陽", "權": "武曲", "科": "太陰", "忌": "天同"},
+    "辛": {"祿": "巨門", "權": "太陽", "科": "文曲", "忌": "文昌"},
+    "壬": {"祿": "天梁", "權": "紫微", "科": "左輔", "忌": "武曲"},
+    "癸": {"祿": "破軍", "權": "巨門", "科": "太陰", "忌": "貪狼"}
+}
+
+# 星曜基本含義（極簡版）
+STAR_MEANINGS: Dict[str, str] = {
+    "紫微": "帝王之星，主貴氣權威",
+    "天機": "智慧之星，主聰明靈活",
+    "太陽": "光明之星，主熱情積極",
+    "武曲": "財帛之星，主理財能力",
+    "天同": "福德之星，主享福安逸",
+    "廉貞": "桃花之星，主感情豐富",
+    "天府": "財庫之星，主守成穩健",
+    "太陰": "柔順之星，主細膩溫和",
+    "貪狼": "多才之星，主才藝廣泛",
+    "巨門": "口才之星，主善於溝通",
+    "天相": "輔佐之星，主助人為樂",
+    "天梁": "蔭庇之星，主化解災厄",
+    "七殺": "將星之星，主果斷勇敢",
+    "破軍": "開創之星，主變革創新"
+}
+
+# 重要宮位（有主星時評為重要）
+IMPORTANT_PALACES = ("夫妻", "財帛", "官祿", "福德")
 
 
 class ZiweiCalculator:
@@ -30,35 +97,74 @@ class ZiweiCalculator:
         self.birth_day = self.lunar["day"]
         self.birth_hour_branch = self.four_pillars["hour"]["branch"]
 
-    def analyze(self) -> Dict:
-        """完整紫微分析"""
+    def analyze(self, use_table: bool = True) -> Dict:
+        """
+        完整紫微分析
+
+        Args:
+            use_table: 是否使用預計算命盤表（表不存在或版本不符時自動改為即時計算）
+
+        Returns:
+            紫微分析結果。宮位、解讀與摘要為多張命盤共享的唯讀結構，
+            頂層 dict 為每次新建；需要修改巢狀內容時請先以 thaw() 複製
+        """
+        table = _get_layout_table() if use_table else None
+        if table is not None:
+            chart = table.lookup(
+                self.birth_month,
+                self.birth_day,
+                BRANCH_CODE[self.birth_hour_branch],
+                STEM_CODE[self.four_pillars["year"]["stem"]]
+            )
+            if chart is not None:
+                return chart
+
         # 1. 定命宮
         ming_palace_position = self._locate_ming_palace()
 
         # 2. 安紫微星
         ziwei_position = self._locate_ziwei_star()
 
-        # 3. 建立十二宮
-        palaces = self._build_twelve_palaces(ming_palace_position)
-
-        # 4. 安置主星
-        palaces_with_stars = self._place_major_stars(palaces, ziwei_position)
+        # 3-4. 建立十二宮、安置主星、6. 宮位解讀
+        layout = self.build_layout(ming_palace_position, ziwei_position)
 
         # 5. 四化
         four_transformations = self._calculate_four_transformations()
 
-        # 6. 宮位解讀
-        interpretations = self._interpret_palaces(palaces_with_stars)
-
         return {
             "ming_palace_position": ming_palace_position,
             "ziwei_position": ziwei_position,
-            "palaces": palaces_with_stars,
+            "palaces": layout["palaces"],
             "four_transformations": four_transformations,
-            "interpretations": interpretations,
-            "chart_summary": self._generate_summary(palaces_with_stars)
+            "interpretations": layout["interpretations"],
+            "chart_summary": layout["chart_summary"]
+        }
+
+    @classmethod
+    def build_layout(cls, ming_palace_position: int, ziwei_position: int) -> Dict:
+        """
+        由命宮與紫微星位置排出十二宮、主星、宮位解讀與摘要
+
+        Returns:
+            {"palaces": ..., "interpretations": ..., "chart_summary": ...}
+        """
+        palaces_with_stars = palaces_to_dict(cls.build_palaces(ming_palace_position, ziwei_position))
+
+        return {
+            "palaces": palaces_with_stars,
+            "interpretations": cls._interpret_palaces(palaces_with_stars),
+            "chart_summary": cls._generate_summary(palaces_with_stars)
         }
 
+    def palaces(self) -> Tuple[Palace, ...]:
+        """
+        十二宮模型（宮名、地支位置與主星）
+
+        與 analyze() 的 palaces 內容相同（palaces_to_dict(palaces())），
+        但以緊湊的 NamedTuple 保存
+        """
+        return self.build_palaces(self._locate_ming_palace(), self._locate_ziwei_star())
+
     def _locate_ming_palace(self) -> int:
         """
         定命宮位置
@@ -68,15 +174,7 @@ class ZiweiCalculator:
         Returns:
             命宮在地支的索引位置 (0-11)
         """
-        # 從子位（0）起正月，逆數到生月
-        month = self.birth_month
-        month_position = (12 - month + 1) % 12  # 逆數
-
-        # 從生月位置起子時，順數到生時
-        hour_index = EARTHLY_BRANCHES.index(self.birth_hour_branch)
-        ming_palace_position = (month_position + hour_index) % 12
-
-        return ming_palace_position
+        return locate_ming_palace(self.birth_month, BRANCH_CODE[self.birth_hour_branch])
 
     def _locate_ziwei_star(self) -> int:
         """
@@ -87,86 +185,29 @@ class ZiweiCalculator:
         Returns:
             紫微星在地支的索引位置 (0-11)
         """
-        # 簡化版：根據生日直接定位（實際需要五行局數）
-        day = self.birth_day
-
-        # 紫微星定位表（簡化）
-        if 1 <= day <= 10:
-            base = 0  # 寅宮
-        elif 11 <= day <= 20:
-            base = 4  # 午宮
-        else:
-            base = 8  # 戌宮
-
-        # 根據日數微調
-        offset = (day - 1) % 3
-        ziwei_position = (base + offset) % 12
+        return locate_ziwei_star(self.birth_day)
 
-        return ziwei_position
-
-    def _build_twelve_palaces(self, ming_palace_position: int) -> Dict:
+    @staticmethod
+    def build_palaces(ming_palace_position: int, ziwei_position: int) -> Tuple[Palace, ...]:
         """
-        建立十二宮結構
+        建立十二宮並安置十四主星
+
+        從命宮開始順時針排列，根據紫微星位置推算其他主星
 
-        從命宮開始順時針排列
+        Returns:
+            十二宮（依 ZIWEI_TWELVE_PALACES 順序）
         """
-        palaces = {}
+        # 地支位置 → 主星（依 STAR_OFFSETS 順序）
+        stars_by_position: List[List[str]] = [[] for _ in range(12)]
+        for star_name, offset in STAR_OFFSETS.items():
+            stars_by_position[(ziwei_position + offset) % 12].append(star_name)
 
+        palaces = []
         for i, palace_name in enumerate(ZIWEI_TWELVE_PALACES):
             position = (ming_palace_position + i) % 12
-            branch = EARTHLY_BRANCHES[position]
-
-            palaces[palace_name] = {
-                "name": palace_name,
-                "position": position,
-                "branch": branch,
-                "major_stars": [],
-                "transformations": []
-            }
-
-        return palaces
-
-    def _place_major_stars(self, palaces: Dict, ziwei_position: int) -> Dict:
-        """
-        安置十四主星
+            palaces.append(Palace(palace_name, position, tuple(stars_by_position[position])))
 
-        根據紫微星位置推算其他主星
-        """
-        # 主星排列規則（簡化版）
-        # 實際紫微斗數星曜排列非常複雜
-
-        star_offsets = {
-            "紫微": 0,
-            "天機": 1,
-            "太陽": 2,
-            "武曲": 3,
-            "天同": 4,
-            "廉貞": 5,
-            "天府": 6,
-            "太陰": 7,
-            "貪狼": 8,
-            "巨門": 9,
-            "天相": 10,
-            "天梁": 11,
-            "七殺": 6,   # 與紫微相對
-            "破軍": 4    # 固定位置
-        }
-
-        # 根據紫微位置計算各星位置
-        for star_name, offset in star_offsets.items():
-            if star_name in ["七殺", "破軍"]:
-                # 特殊星曜有固定關係
-                star_position = (ziwei_position + offset) % 12
-            else:
-                star_position = (ziwei_position + offset) % 12
-
-            # 找到對應宮位並添加星曜
-            for palace_name, palace_data in palaces.items():
-                if palace_data["position"] == star_position:
-                    palace_data["major_stars"].append(star_name)
-                    break
-
-        return palaces
+        return tuple(palaces)
 
     def _calculate_four_transformations(self) -> Dict:
         """
@@ -175,24 +216,10 @@ class ZiweiCalculator:
         根據出生年天干確定
         """
         year_stem = self.four_pillars["year"]["stem"]
+        return dict(FOUR_TRANSFORMATIONS.get(year_stem, {}))
 
-        # 四化表（簡化版）
-        transformations_table = {
-            "甲": {"祿": "廉貞", "權": "破軍", "科": "武曲", "忌": "太陽"},
-            "乙": {"祿": "天機", "權": "天梁", "科": "紫微", "忌": "太陰"},
-            "丙": {"祿": "天同", "權": "天機", "科": "文昌", "忌": "廉貞"},
-            "丁": {"祿": "太陰", "權": "天同", "科": "天機", "忌": "巨門"},
-            "戊": {"祿": "貪狼", "權": "太陰", "科": "右弼", "忌": "天機"},
-            "己": {"祿": "武曲", "權": "貪狼", "科": "天梁", "忌": "文曲"},
-            "庚": {"祿": "太陽", "權": "武曲", "科": "太陰", "忌": "天同"},
-            "辛": {"祿": "巨門", "權": "太陽", "科": "文曲", "忌": "文昌"},
-            "壬": {"祿": "天梁", "權": "紫微", "科": "左輔", "忌": "武曲"},
-            "癸": {"祿": "破軍", "權": "巨門", "科": "太陰", "忌": "貪狼"}
-        }
-
-        return transformations_table.get(year_stem, {})
-
-    def _interpret_palaces(self, palaces: Dict) -> Dict:
+    @classmethod
+    def _interpret_palaces(cls, palaces: Dict) -> Dict:
         """
         解讀各宮位
 
@@ -200,31 +227,13 @@ class ZiweiCalculator:
         """
         interpretations = {}
 
-        # 星曜基本含義（極簡版）
-        star_meanings = {
-            "紫微": "帝王之星，主貴氣權威",
-            "天機": "智慧之星，主聰明靈活",
-            "太陽": "光明之星，主熱情積極",
-            "武曲": "財帛之星，主理財能力",
-            "天同": "福德之星，主享福安逸",
-            "廉貞": "桃花之星，主感情豐富",
-            "天府": "財庫之星，主守成穩健",
-            "太陰": "柔順之星，主細膩溫和",
-            "貪狼": "多才之星，主才藝廣泛",
-            "巨門": "口才之星，主善於溝通",
-            "天相": "輔佐之星，主助人為樂",
-            "天梁": "蔭庇之星，主化解災厄",
-            "七殺": "將星之星，主果斷勇敢",
-            "破軍": "開創之星，主變革創新"
-        }
-
         for palace_name, palace_data in palaces.items():
             stars = palace_data["major_stars"]
 
             if not stars:
                 interpretation = "此宮無主星，需借對宮之星參看"
             elif len(stars) == 1:
-                interpretation = star_meanings.get(stars[0], "主星特質待分析")
+                interpretation = STAR_MEANINGS.get(stars[0], "主星特質待分析")
             else:
                 # 多星組合
                 star_names = "、".join(stars)
@@ -233,25 +242,26 @@ class ZiweiCalculator:
             interpretations[palace_name] = {
                 "stars": stars,
                 "interpretation": interpretation,
-                "importance": self._rate_palace_importance(palace_name, stars)
+                "importance": cls._rate_palace_importance(palace_name, stars)
             }
 
         return interpretations
 
-    def _rate_palace_importance(self, palace_name: str, stars: List[str]) -> str:
+    @staticmethod
+    def _rate_palace_importance(palace_name: str, stars: List[str]) -> str:
         """評估宮位重要性"""
         # 命宮最重要
         if palace_name == "命宮":
             return "極為重要"
 
         # 有主星的宮位較重要
-        important_palaces = ["夫妻", "財帛", "官祿", "福德"]
-        if palace_name in important_palaces:
+        if palace_name in IMPORTANT_PALACES:
             return "重要" if stars else "次要"
 
         return "一般"
 
-    def _generate_summary(self, palaces: Dict) -> Dict:
+    @classmethod
+    def _generate_summary(cls, palaces: Dict) -> Dict:
         """生成命盤摘要"""
         ming_palace = palaces["命宮"]
         caibo_palace = palaces["財帛"]
@@ -261,10 +271,11 @@ class ZiweiCalculator:
             "命宮主星": ming_palace["major_stars"] or ["無主星"],
             "財帛主星": caibo_palace["major_stars"] or ["無主星"],
             "官祿主星": guanlu_palace["major_stars"] or ["無主星"],
-            "命格特徵": self._determine_fate_pattern(ming_palace)
+            "命格特徵": cls._determine_fate_pattern(ming_palace)
         }
 
-    def _determine_fate_pattern(self, ming_palace: Dict) -> str:
+    @staticmethod
+    def _determine_fate_pattern(ming_palace: Dict) -> str:
         """判斷命格特徵"""
         stars = ming_palace["major_stars"]
 
@@ -281,6 +292,64 @@ class ZiweiCalculator:
             return f"{stars[0]}坐命格局"
 
 
+# ============================================
+# 安星規則 (Placement Rules)
+# ============================================
+
+def locate_ming_palace(lunar_month: int, hour_code: int) -> int:
+    """
+    定命宮位置
+
+    Args:
+        lunar_month: 農曆月 (1-12)
+        hour_code: 時支編碼 (0-11)
+
+    Returns:
+        命宮在地支的索引位置 (0-11)
+    """
+    # 從子位（0）起正月，逆數到生月
+    month_position = (12 - lunar_month + 1) % 12
+
+    # 從生月位置起子時，順數到生時
+    return (month_position + hour_code) % 12
+
+
+def locate_ziwei_star(lunar_day: int) -> int:
+    """
+    定紫微星位置（簡化版：根據生日直接定位，實際需要五行局數）
+
+    Args:
+        lunar_day: 農曆日 (1-30)
+
+    Returns:
+        紫微星在地支的索引位置 (0-11)
+    """
+    # 紫微星定位表（簡化）
+    if 1 <= lunar_day <= 10:
+        base = 0  # 寅宮
+    elif 11 <= lunar_day <= 20:
+        base = 4  # 午宮
+    else:
+        base = 8  # 戌宮
+
+    # 根據日數微調
+    offset = (lunar_day - 1) % 3
+    return (base + offset) % 12
+
+
+_layout_table = None
+_layout_table_loaded = False
+
+
+def _get_layout_table():
+    """首次使用時載入預計算命盤表（之後共用同一份）"""
+    global _layout_table, _layout_table_loaded
+    if not _layout_table_loaded:
+        _layout_table = load_table(rules_version=ZIWEI_RULES_VERSION)
+        _layout_table_loaded = True
+    return _layout_table
+
+
 def quick_ziwei_analysis(calendar_data: Dict, gender: str) -> Dict:
     """快速紫微分析"""
     calculator = ZiweiCalculator(calendar_data, gender)
@@ -23,6 +23,7 @@ from .prompt_utils import (
     calculate_confidence_level
 )
 from .llm_analyzer import (
+    LLMRequest,
     get_llm_analyzer,
     construct_ziwei_palace_prompt
 )
@@ -960,40 +961,50 @@ def interpret_destiny_palace(ziwei_data: Dict) -> Dict:
     llm_analyzer = get_llm_analyzer()
 
     if llm_analyzer.is_available() and ZIWEI_SYSTEM_PROMPT:
-        palaces_data = ziwei_data.get('palaces', {})
-        ming_gong = palaces_data.get('命宮', {})
-
-        analysis_prompt = construct_ziwei_palace_prompt('命宮', ming_gong)
-
-        llm_result = llm_analyzer.analyze_with_fallback(
-            system_prompt=ZIWEI_SYSTEM_PROMPT,
-            analysis_prompt=analysis_prompt,
-            fallback_func=_traditional_destiny_palace_analysis,
-            fallback_args=(ziwei_data,),
-            min_length=250,
-            temperature=0.7,
-            max_tokens=3000
-        )
+        return llm_analyzer.run_request(destiny_palace_request(ziwei_data))
 
-        # Check if llm_result is a string (LLM success) or dict (fallback was used)
-        if isinstance(llm_result, str) and len(llm_result.replace(' ', '').replace('\n', '')) >= 250:
-            confidence = calculate_confidence_level(
-                consensus_indicators=1,
-                total_indicators=1,
-                data_quality=1.0,
-                theoretical_support=0.9
-            )
+    return _traditional_destiny_palace_analysis(ziwei_data)
 
-            traditional_result = _traditional_destiny_palace_analysis(ziwei_data)
-            traditional_result['llm_analysis'] = llm_result
-            traditional_result['confidence_level'] = confidence
-            traditional_result['analysis_method'] = 'LLM enhanced'
-            return traditional_result
-        elif isinstance(llm_result, dict):
-            # Fallback was already executed, return it directly
-            return llm_result
 
-    return _traditional_destiny_palace_analysis(ziwei_data)
+def destiny_palace_request(ziwei_data: Dict) -> Optional[LLMRequest]:
+    """
+    命宮分析的LLM請求（可交給 LLMAnalyzer.analyze_many 與其他請求並行）
+
+    Returns:
+        LLMRequest，系統提示詞未載入時返回 None
+    """
+    if not ZIWEI_SYSTEM_PROMPT:
+        return None
+
+    palaces_data = ziwei_data.get('palaces', {})
+    ming_gong = palaces_data.get('命宮', {})
+
+    return LLMRequest(
+        key='ziwei_destiny_palace',
+        system_prompt=ZIWEI_SYSTEM_PROMPT,
+        analysis_prompt=construct_ziwei_palace_prompt('命宮', ming_gong),
+        fallback_func=_traditional_destiny_palace_analysis,
+        fallback_args=(ziwei_data,),
+        min_length=250,
+        on_success=lambda llm_result: _llm_enhanced_destiny_palace(ziwei_data, llm_result),
+        llm_kwargs={'temperature': 0.7, 'max_tokens': 3000}
+    )
+
+
+def _llm_enhanced_destiny_palace(ziwei_data: Dict, llm_result: str) -> Dict:
+    """將LLM分析附加到傳統命宮分析結構（保持相容）"""
+    confidence = calculate_confidence_level(
+        consensus_indicators=1,
+        total_indicators=1,
+        data_quality=1.0,
+        theoretical_support=0.9
+    )
+
+    traditional_result = _traditional_destiny_palace_analysis(ziwei_data)
+    traditional_result['llm_analysis'] = llm_result
+    traditional_result['confidence_level'] = confidence
+    traditional_result['analysis_method'] = 'LLM enhanced'
+    return traditional_result
 
 
 def _traditional_destiny_palace_analysis(ziwei_data: Dict) -> Dict:
@@ -1357,6 +1368,7 @@ __all__ = [
     'interpret_ziwei_palaces',
     'analyze_four_transformations',
     'interpret_destiny_palace',
+    'destiny_palace_request',
     'interpret_wealth_palace',
     'interpret_career_palace',
     'interpret_marriage_palace',
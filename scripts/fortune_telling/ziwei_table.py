@@ -0,0 +1,213 @@
+"""
+紫微命盤預計算表 (Precomputed Zi Wei Chart Layouts)
+=================================================
+
+紫微命盤只取決於（農曆月、農曆日、時支、年干）：
+1. 命宮位置由農曆月與時支決定（12 × 12 種組合）
+2. 紫微星位置由農曆日決定（30 種）
+3. 十二宮、主星、宮位解讀與摘要只取決於命宮與紫微星位置（12 × 12 種排盤）
+4. 四化只取決於年干（10 種）
+
+因此將上述四張索引表與 144 種排盤預先建成 JSON，
+載入時轉為唯讀結構，查詢時只需四次索引並組出頂層 dict，
+所有命盤共享同一份宮位與解讀資料。
+
+表中記錄建表時的安星規則版本（ZIWEI_RULES_VERSION），
+規則變更後版本不符的表不會被載入，呼叫端改為即時計算。
+建表與驗證請使用 build_tables 命令（見 build_tables.py）。
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .utils import EARTHLY_BRANCHES, HEAVENLY_STEMS, freeze
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TABLE_PATH = Path(__file__).parent / 'tables' / 'ziwei_layouts.json'
+
+_FORMAT = "ziwei-layouts"
+_MONTHS = 12
+_DAYS = 30
+
+
+class ZiweiLayoutTable:
+    """
+    紫微命盤預計算表
+
+    所有查詢結果共享同一份唯讀的宮位、解讀與摘要資料。
+    """
+
+    def __init__(self, path: Path):
+        """
+        載入紫微命盤表
+
+        Args:
+            path: JSON 表檔案路徑
+        """
+        self.path = Path(path)
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        if data.get("format") != _FORMAT:
+            raise ValueError(f"無效的紫微命盤表檔案: {self.path}")
+
+        self.rules_version = data["rules_version"]
+        self._ming_positions: List[List[int]] = data["ming_positions"]
+        self._ziwei_positions: List[int] = data["ziwei_positions"]
+        self._transformations = freeze(data["four_transformations"])
+        self._layouts = freeze(data["layouts"])
+
+        if (
+            len(self._ming_positions) != _MONTHS
+            or len(self._ziwei_positions) != _DAYS
+            or len(self._transformations) != len(HEAVENLY_STEMS)
+            or len(self._layouts) != 12 * 12
+        ):
+            raise ValueError(f"紫微命盤表內容不完整: {self.path}")
+
+    def lookup(self, lunar_month: int, lunar_day: int, hour_code: int, year_stem_code: int) -> Optional[Dict]:
+        """
+        查詢紫微命盤
+
+        Args:
+            lunar_month: 農曆月 (1-12)
+            lunar_day: 農曆日 (1-30)
+            hour_code: 時支編碼 (0-11)
+            year_stem_code: 年干編碼 (0-9)
+
+        Returns:
+            與 ZiweiCalculator.analyze 相同結構的結果（巢狀內容唯讀），
+            輸入不在表內則返回 None
+        """
+        if not (1 <= lunar_month <= _MONTHS and 1 <= lunar_day <= _DAYS):
+            return None
+
+        ming_palace_position = self._ming_positions[lunar_month - 1][hour_code]
+        ziwei_position = self._ziwei_positions[lunar_day - 1]
+        layout = self._layouts[ming_palace_position * 12 + ziwei_position]
+
+        return {
+            "ming_palace_position": ming_palace_position,
+            "ziwei_position": ziwei_position,
+            "palaces": layout["palaces"],
+            "four_transformations": self._transformations[year_stem_code],
+            "interpretations": layout["interpretations"],
+            "chart_summary": layout["chart_summary"]
+        }
+
+
+def load_table(
+    path: Path = DEFAULT_TABLE_PATH,
+    rules_version: Optional[int] = None
+) -> Optional[ZiweiLayoutTable]:
+    """
+    載入紫微命盤表，檔案不存在、損壞或規則版本不符時返回 None（呼叫端應改為即時計算）
+
+    Args:
+        path: JSON 表檔案路徑
+        rules_version: 目前的安星規則版本（None 表示不檢查）
+
+    Returns:
+        ZiweiLayoutTable 或 None
+    """
+    if not Path(path).exists():
+        logger.warning(f"紫微命盤預計算表不存在，使用即時計算: {path}")
+        return None
+
+    try:
+        table = ZiweiLayoutTable(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"紫微命盤預計算表載入失敗: {e}")
+        return None
+
+    if rules_version is not None and table.rules_version != rules_version:
+        logger.warning(
+            f"紫微命盤預計算表的規則版本不符（表 v{table.rules_version}，目前 v{rules_version}），"
+            f"使用即時計算；請執行 build_tables ziwei-layouts 重建"
+        )
+        return None
+
+    return table
+
+
+# ============================================
+# 建表與驗證 (Build & Verify)
+# ============================================
+
+def build_table(path: Path = DEFAULT_TABLE_PATH) -> Path:
+    """
+    以 ZiweiCalculator 的安星規則排出所有組合並寫出 JSON 表
+
+    Args:
+        path: 輸出檔案路徑
+
+    Returns:
+        輸出檔案路徑
+    """
+    from .ziwei_calculator import (
+        ZIWEI_RULES_VERSION,
+        FOUR_TRANSFORMATIONS,
+        ZiweiCalculator,
+        locate_ming_palace,
+        locate_ziwei_star,
+    )
+
+    data = {
+        "format": _FORMAT,
+        "rules_version": ZIWEI_RULES_VERSION,
+        "ming_positions": [
+            [locate_ming_palace(month, hour_code) for hour_code in range(12)]
+            for month in range(1, _MONTHS + 1)
+        ],
+        "ziwei_positions": [locate_ziwei_star(day) for day in range(1, _DAYS + 1)],
+        "four_transformations": [FOUR_TRANSFORMATIONS.get(stem, {}) for stem in HEAVENLY_STEMS],
+        "layouts": [
+            ZiweiCalculator.build_layout(ming_palace_position, ziwei_position)
+            for ming_palace_position in range(12)
+            for ziwei_position in range(12)
+        ],
+    }
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    tmp_path.replace(path)
+
+    return path
+
+
+def verify_table(table: ZiweiLayoutTable) -> List[str]:
+    """
+    將紫微命盤表與即時計算逐一比對（所有月、日、時支、年干組合）
+
+    Args:
+        table: 要驗證的紫微命盤表
+
+    Returns:
+        差異描述列表，空列表表示完全一致
+    """
+    from .ziwei_calculator import ZIWEI_RULES_VERSION, ZiweiCalculator
+
+    differences = []
+    if table.rules_version != ZIWEI_RULES_VERSION:
+        differences.append(f"規則版本不符: 表 v{table.rules_version}，目前 v{ZIWEI_RULES_VERSION}")
+
+    for month in range(1, _MONTHS + 1):
+        for day in range(1, _DAYS + 1):
+            for hour_code, hour_branch in enumerate(EARTHLY_BRANCHES):
+                for stem_code, stem in enumerate(HEAVENLY_STEMS):
+                    calendar_data = {
+                        "lunar": {"year": None, "month": month, "day": day},
+                        "four_pillars": {"year": {"stem": stem}, "hour": {"branch": hour_branch}},
+                    }
+                    expected = ZiweiCalculator(calendar_data, "男").analyze(use_table=False)
+                    actual = table.lookup(month, day, hour_code, stem_code)
+                    if actual != expected:
+                        differences.append(f"農曆{month}月{day}日 {hour_branch}時 {stem}年: 表內容與即時計算不符")
+
+    return differences